@@ -6,13 +6,12 @@ BedrockモデルでClaude Haiku 4.5を使用。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
 
-# Bedrockモデルの設定（Claude Haiku 4.5、東京リージョン）
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model
+
+# 共通のBedrockモデル（Claude Haiku 4.5、東京リージョン）
+# プロセス内で共有され、接続は初回呼び出し時に確立される（common/models.py）
+model = get_model()
 
 # 最もシンプルなエージェントの作成
 agent = Agent(model=model)
@@ -5,13 +5,11 @@ strands-agents-toolsパッケージで提供される組み込みツールを使
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
 from strands_tools import calculator
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model
+
+model = get_model()
 
 # 組み込みのcalculatorツールを使用
 agent = Agent(
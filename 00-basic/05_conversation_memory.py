@@ -5,12 +5,10 @@
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model
+
+model = get_model()
 
 # エージェントの作成
 agent = Agent(
@@ -6,13 +6,11 @@ ToolContextを使うと、ツール内からこの共有状態にアクセスで
 """
 
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
 from strands.types.tools import ToolContext
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model
+
+model = get_model()
 
 
 @tool(context=True)
@@ -6,17 +6,21 @@
 """
 
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.agent_pool import AgentPool
+from common.models import get_model
+from common.response_cache import get_response_cache
+
+model = get_model()
+
+# 専門家エージェントのプール（同じシステムプロンプトのエージェントを使い回す）
+# 同じ翻訳リクエストには、キャッシュからモデルを呼ばずに応答する
+pool = AgentPool(model, cache=get_response_cache())
 
 
 # 専門家エージェントをツールとしてラップ
 @tool
-def translator_agent(text: str, target_language: str) -> str:
+async def translator_agent(text: str, target_language: str) -> str:
     """テキストを指定された言語に翻訳する専門家エージェントです。
 
     Args:
@@ -26,15 +30,13 @@ def translator_agent(text: str, target_language: str) -> str:
     Returns:
         翻訳されたテキスト
     """
-    translator = Agent(
-        model=model,
+    return await pool.run_async(
+        f"次のテキストを翻訳してください: {text}",
         system_prompt=f"""あなたはプロの翻訳者です。
 与えられたテキストを{target_language}に翻訳してください。
 翻訳結果のみを返し、説明は不要です。
 自然で流暢な翻訳を心がけてください。""",
     )
-    result = translator(f"次のテキストを翻訳してください: {text}")
-    return str(result)
 
 
 # オーケストレーター（上位エージェント）
@@ -3,19 +3,23 @@
 
 それぞれ異なる専門知識を持つエージェントをツールとして定義し、
 オーケストレーターが質問の内容に応じて適切な専門家を選択する。
+複数の分野にまたがる質問では、consult_expertsで専門家に並列に相談する。
 """
 
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.agent_pool import AgentPool
+from common.fanout import fan_out_async
+from common.models import get_model
+
+model = get_model()
+
+# 専門家エージェントのプール（呼び出しごとに履歴が空のエージェントを貸し出す）
+pool = AgentPool(model)
 
 
 @tool
-def math_expert(question: str) -> str:
+async def math_expert(question: str) -> str:
     """数学の専門家エージェントです。数学的な問題を解決します。
 
     Args:
@@ -24,18 +28,16 @@ def math_expert(question: str) -> str:
     Returns:
         数学的な回答と解説
     """
-    expert = Agent(
-        model=model,
+    return await pool.run_async(
+        question,
         system_prompt="""あなたは数学の専門家です。
 数学的な問題を正確に解き、わかりやすく解説してください。
 計算過程も示しながら説明してください。""",
     )
-    result = expert(question)
-    return str(result)
 
 
 @tool
-def history_expert(question: str) -> str:
+async def history_expert(question: str) -> str:
     """歴史の専門家エージェントです。歴史に関する質問に答えます。
 
     Args:
@@ -44,18 +46,16 @@ def history_expert(question: str) -> str:
     Returns:
         歴史的な事実と解説
     """
-    expert = Agent(
-        model=model,
+    return await pool.run_async(
+        question,
         system_prompt="""あなたは歴史の専門家です。
 歴史的な出来事や人物について、正確で詳細な情報を提供してください。
 時代背景や因果関係も含めて説明してください。""",
     )
-    result = expert(question)
-    return str(result)
 
 
 @tool
-def science_expert(question: str) -> str:
+async def science_expert(question: str) -> str:
     """科学の専門家エージェントです。自然科学に関する質問に答えます。
 
     Args:
@@ -64,14 +64,43 @@ def science_expert(question: str) -> str:
     Returns:
         科学的な説明と解説
     """
-    expert = Agent(
-        model=model,
+    return await pool.run_async(
+        question,
         system_prompt="""あなたは自然科学の専門家です。
 物理学、化学、生物学などの科学的な質問に対して、
 正確でわかりやすい説明を提供してください。""",
     )
-    result = expert(question)
-    return str(result)
+
+
+EXPERTS = {
+    "math_expert": math_expert,
+    "history_expert": history_expert,
+    "science_expert": science_expert,
+}
+
+
+@tool
+async def consult_experts(question: str, experts: list[str]) -> str:
+    """複数の専門家エージェントに同じ質問を並列に相談します。
+
+    Args:
+        question: 専門家に相談する質問
+        experts: 相談する専門家の名前のリスト（math_expert, history_expert, science_expert）
+
+    Returns:
+        各専門家の回答（expertsで指定した順）
+    """
+    selected = [name for name in experts if name in EXPERTS]
+    if not selected:
+        return f"専門家の名前を指定してください: {', '.join(EXPERTS)}"
+
+    # 全員の回答がそろうまでの時間は、最も遅い専門家の所要時間とほぼ同じになる
+    answers = await fan_out_async(
+        [lambda name=name: EXPERTS[name](question) for name in selected]
+    )
+    return "\n\n".join(
+        f"【{name}】\n{answer}" for name, answer in zip(selected, answers, strict=True)
+    )
 
 
 # オーケストレーター
@@ -84,8 +113,9 @@ orchestrator = Agent(
 - 歴史に関する質問 → history_expert
 - 科学に関する質問 → science_expert
 
-複数の分野にまたがる質問の場合は、必要な専門家すべてに相談してください。""",
-    tools=[math_expert, history_expert, science_expert],
+複数の分野にまたがる質問の場合は、consult_expertsで必要な専門家すべてにまとめて相談してください。
+（consult_expertsは専門家に並列に問い合わせるため、個別に呼ぶより速く回答がそろいます）""",
+    tools=[math_expert, history_expert, science_expert, consult_experts],
 )
 
 print("=== 数学の質問 ===")
@@ -97,5 +127,7 @@ response2 = orchestrator("江戸幕府が開かれた経緯を教えてくださ
 print(response2)
 
 print("\n=== 複合的な質問 ===")
-response3 = orchestrator("ピタゴラスについて、数学者としての業績と生きた時代背景を教えてください")
+response3 = orchestrator(
+    "ピタゴラスについて、数学者としての業績と生きた時代背景を教えてください"
+)
 print(response3)
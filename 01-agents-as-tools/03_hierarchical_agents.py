@@ -7,17 +7,19 @@
 """
 
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.agent_pool import AgentPool
+from common.models import get_model
+
+model = get_model()
+
+# 各階層の専門家エージェントのプール（システムプロンプトとツール構成ごとに使い回す）
+pool = AgentPool(model)
 
 
 # 最下層: 特定のタスクを実行する専門エージェント
 @tool
-def code_formatter(code: str, language: str) -> str:
+async def code_formatter(code: str, language: str) -> str:
     """コードを整形する専門エージェントです。
 
     Args:
@@ -27,18 +29,16 @@ def code_formatter(code: str, language: str) -> str:
     Returns:
         整形されたコード
     """
-    formatter = Agent(
-        model=model,
+    return await pool.run_async(
+        f"次のコードを整形してください:\n{code}",
         system_prompt=f"""あなたはコード整形の専門家です。
 与えられた{language}のコードを、適切なインデントと改行で整形してください。
 整形されたコードのみを返してください。""",
     )
-    result = formatter(f"次のコードを整形してください:\n{code}")
-    return str(result)
 
 
 @tool
-def code_explainer(code: str, language: str) -> str:
+async def code_explainer(code: str, language: str) -> str:
     """コードを解説する専門エージェントです。
 
     Args:
@@ -48,19 +48,17 @@ def code_explainer(code: str, language: str) -> str:
     Returns:
         コードの解説
     """
-    explainer = Agent(
-        model=model,
+    return await pool.run_async(
+        f"次のコードを解説してください:\n{code}",
         system_prompt=f"""あなたはプログラミング教育の専門家です。
 与えられた{language}のコードを、初心者にもわかりやすく解説してください。
 各部分が何をしているか、順を追って説明してください。""",
     )
-    result = explainer(f"次のコードを解説してください:\n{code}")
-    return str(result)
 
 
 # 中間層: 複数の専門エージェントを統括するエージェント
 @tool
-def code_review_agent(code: str, language: str) -> str:
+async def code_review_agent(code: str, language: str) -> str:
     """コードレビューを行う中間エージェントです。
     必要に応じて整形や解説の専門家に依頼します。
 
@@ -71,8 +69,8 @@ def code_review_agent(code: str, language: str) -> str:
     Returns:
         レビュー結果（整形済みコードと解説を含む）
     """
-    reviewer = Agent(
-        model=model,
+    return await pool.run_async(
+        f"次の{language}コードをレビューしてください:\n{code}",
         system_prompt="""あなたはシニアエンジニアです。
 コードレビューを担当しています。
 
@@ -84,8 +82,6 @@ def code_review_agent(code: str, language: str) -> str:
 これらを組み合わせて、包括的なレビューを提供してください。""",
         tools=[code_formatter, code_explainer],
     )
-    result = reviewer(f"次の{language}コードをレビューしてください:\n{code}")
-    return str(result)
 
 
 # 最上層: プロジェクト全体を管理するオーケストレーター
@@ -112,5 +108,7 @@ print("=== 階層的なコードレビュー ===")
 print("（オーケストレーター → レビューエージェント → 整形/解説エージェント）")
 print()
 
-response = orchestrator(f"次のPythonコードについてレビューをお願いします:\n{sample_code}")
+response = orchestrator(
+    f"次のPythonコードについてレビューをお願いします:\n{sample_code}"
+)
 print(response)
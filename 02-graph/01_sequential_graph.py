@@ -6,13 +6,12 @@ GraphBuilderを使って、ノードが順番に実行される基本的なグ
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.graph import GraphBuilder
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.graph import GraphBuilder
+from common.models import get_model
+from common.payload import PayloadPolicy
+
+model = get_model()
 
 # 各ステップを担当するエージェントを作成
 idea_generator = Agent(
@@ -54,6 +53,9 @@ builder.add_edge("evaluate", "plan")
 # エントリーポイントの設定
 builder.set_entry_point("generate")
 
+# 前のノードの出力は1500トークンまで（超えた分は中間を省略して渡す）
+builder.set_payload_policy(PayloadPolicy(mode="truncate", max_tokens=1500))
+
 # グラフをビルド
 graph = builder.build()
 
@@ -6,13 +6,12 @@
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.graph import GraphBuilder, GraphState
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.graph import GraphBuilder
+from common.models import get_model
+from common.routing import EdgeRouter
+
+model = get_model()
 
 # 分類エージェント
 classifier = Agent(
@@ -51,23 +50,9 @@ summarizer = Agent(
 これまでの回答を簡潔にまとめ、ユーザーに最終的な回答を提供してください。""",
 )
 
-
-# 条件関数の定義
-def is_tech_question(state: GraphState) -> bool:
-    """技術的な質問かどうかを判定"""
-    classifier_result = state.results.get("classify")
-    if classifier_result:
-        return "技術" in str(classifier_result.result)
-    return False
-
-
-def is_business_question(state: GraphState) -> bool:
-    """ビジネスの質問かどうかを判定"""
-    classifier_result = state.results.get("classify")
-    if classifier_result:
-        return "ビジネス" in str(classifier_result.result)
-    return False
-
+# 条件付きエッジのルーティング
+# 分類結果のテキストは1回だけ取り出し、全エッジのキーワードを1回の走査で判定する
+classify_router = EdgeRouter("classify", {"tech": "技術", "business": "ビジネス"})
 
 # グラフの構築
 builder = GraphBuilder()
@@ -79,8 +64,7 @@ builder.add_node(business_expert, "business")
 builder.add_node(summarizer, "summarize")
 
 # 条件付きエッジの追加
-builder.add_edge("classify", "tech", condition=is_tech_question)
-builder.add_edge("classify", "business", condition=is_business_question)
+classify_router.add_edges(builder)
 
 # 両方のパスから最終ノードへ
 builder.add_edge("tech", "summarize")
@@ -102,3 +86,10 @@ print(result1)
 print("\n--- ビジネスの質問 ---")
 result2 = graph("スタートアップの資金調達方法について教えてください")
 print(result2)
+
+# ノードごとの実行区間とクリティカルパス
+print("\n--- 実行タイムライン（ビジネスの質問） ---")
+for span in result2.timeline:
+    print(f"{span.node_id:<10} {span.start:6.2f}s → {span.end:6.2f}s")
+print(f"クリティカルパス: {' → '.join(result2.critical_path)}")
+print(f"ルーティングの評価: {classify_router.stats.to_dict()}")
@@ -8,13 +8,13 @@ Workflowパターン（DAG）では不可能な、繰り返し処理を実現で
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.graph import GraphBuilder, GraphState
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.convergence import ConvergenceGuard
+from common.graph import GraphBuilder
+from common.models import get_model
+from common.routing import EdgeRouter
+
+model = get_model()
 
 # コード生成エージェント
 coder = Agent(
@@ -52,24 +52,12 @@ approver = Agent(
 「最終承認:」で始まるコメントを出力してください。""",
 )
 
+# レビュー結果によるルーティング（要修正ならコードに戻り、承認なら最終承認へ）
+review_router = EdgeRouter("review", {"code": "要修正", "approve": "承認"})
 
-def needs_revision(state: GraphState) -> bool:
-    """レビュー結果が要修正かどうかを判定"""
-    review_result = state.results.get("review")
-    if review_result:
-        result_text = str(review_result.result)
-        return "要修正" in result_text
-    return False
-
-
-def is_approved(state: GraphState) -> bool:
-    """レビュー結果が承認かどうかを判定"""
-    review_result = state.results.get("review")
-    if review_result:
-        result_text = str(review_result.result)
-        return "承認" in result_text
-    return False
-
+# 収束ガード: コードが前回から変わらない、またはレビューに新しい指摘がない場合は
+# 要修正でもループを打ち切って最終承認へ進む
+guard = ConvergenceGuard(outputs=["code"], findings="review")
 
 # グラフの構築
 builder = GraphBuilder()
@@ -81,11 +69,17 @@ builder.add_node(approver, "approve")
 
 # エッジの追加
 builder.add_edge("code", "review")
-builder.add_edge("review", "code", condition=needs_revision)  # ループ: 要修正なら戻る
-builder.add_edge("review", "approve", condition=is_approved)  # 承認なら最終承認へ
+# ループ: 要修正なら戻る / 承認（または収束）なら最終承認へ
+builder.add_edge(
+    "review", "code", condition=guard.loop(review_router.condition("code"))
+)
+builder.add_edge(
+    "review", "approve", condition=guard.exit(review_router.condition("approve"))
+)
 
 # ループ回数の制限（無限ループ防止）
-builder.set_max_node_executions(3)
+# レビュー3回分（code → review を3周 + approve）。収束すればそれより前に抜ける
+builder.set_max_node_executions(7)
 
 # エントリーポイント
 builder.set_entry_point("code")
@@ -109,3 +103,7 @@ result = graph(
 
 print("=== 最終結果 ===")
 print(result)
+
+for event in result.convergence:
+    print(f"\nループを打ち切り: {event.reason}（類似度 {event.similarity:.2f}）")
+print(f"省いたモデル呼び出し: {result.saved_model_calls}回")
@@ -3,16 +3,17 @@
 
 Swarmパターンでは、エージェントが自律的に判断して
 別のエージェントに処理を引き継ぐ（handoff）ことができる。
+
+common.swarm の Swarm に HandoffPolicy を指定すると、
+引き継ぎ先に渡す入力（共有コンテキストや担当履歴）を予算内に収められる。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.swarm import Swarm
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model
+from common.swarm import HandoffPolicy, Swarm
+
+model = get_model()
 
 # リサーチャーエージェント
 researcher = Agent(
@@ -43,6 +44,7 @@ swarm = Swarm(
     max_handoffs=5,
     max_iterations=10,
     execution_timeout=300.0,
+    handoff_policy=HandoffPolicy(max_tokens=1000),
 )
 
 # Swarmの実行
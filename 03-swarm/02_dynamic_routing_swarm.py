@@ -7,18 +7,24 @@ Graphとの違い:
 - Graph: 条件関数（コード）でルーティングを定義
 - Swarm: エージェント（LLM）が文脈を理解してルーティングを判断
 
+引き継ぎが続くと共有コンテキストが溜まって入力が膨らむため、
+HandoffPolicy で引き継ぎ先に渡す入力を予算内に収める。
+また、受付の判断基準はキーワードで書けるため、PreRouter で問い合わせを照合し、
+確実に振り分けられる場合は受付のモデル呼び出しを飛ばして担当者から始める。
+retention_specialist ↔ technical_support のような往復は HandoffGuard で打ち切る。
+
 このサンプルでは、「技術的な問題かと思ったら請求の問題だった」など、
 会話を通じて問題の本質が明らかになり、動的にhandoffするケースを示す。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.swarm import Swarm
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.handoff_guard import HandoffGuard
+from common.models import get_model
+from common.pre_router import PreRouter
+from common.swarm import HandoffPolicy, Swarm
+
+model = get_model()
 
 # 受付エージェント（トリアージ担当）
 receptionist = Agent(
@@ -82,6 +88,16 @@ retention_specialist = Agent(
 technical_supportに引き継いで問題解決を試みてください。""",
 )
 
+# 受付の判断基準と同じキーワードで振り分ける前段のルーター
+# （複数の担当者に同程度に一致する曖昧な問い合わせは受付に任せる）
+pre_router = PreRouter(
+    {
+        "technical_support": ["エラー", "動作しない", "不具合", "使えない"],
+        "billing_support": ["料金", "請求", "支払", "払って", "プラン"],
+        "retention_specialist": ["解約", "退会"],
+    }
+)
+
 # Swarmの構築
 swarm = Swarm(
     nodes=[receptionist, technical_support, billing_support, retention_specialist],
@@ -89,6 +105,9 @@ swarm = Swarm(
     max_handoffs=10,
     max_iterations=15,
     execution_timeout=300.0,
+    handoff_policy=HandoffPolicy(max_tokens=1000, max_value_tokens=200),
+    pre_router=pre_router,
+    handoff_guard=HandoffGuard(action="terminate"),
 )
 
 # テスト実行
@@ -108,3 +127,29 @@ result = swarm(
 )
 print("=== 結果 ===")
 print(result)
+print(f"\n前段のルーター: {result.pre_route}")
+
+print("\n=== 引き継ぎごとの入力トークン数 ===")
+for stats in result.handoffs:
+    print(
+        f"  {stats.hop}: {stats.node_id:<22}"
+        f"{stats.original_tokens:>6} → {stats.sent_tokens:>5}"
+        f"（省略した共有コンテキスト {stats.dropped_context}件）"
+    )
+
+# ケース: キーワードで確実に振り分けられる問い合わせ（受付を飛ばす）
+print()
+print("--- ケース: 明確な問い合わせ（料金） ---")
+print("問い合わせ: 「請求額がプランの料金と違います」")
+print()
+result = swarm("今月の請求額が契約しているプランの料金と違います。確認してください。")
+print("=== 結果 ===")
+print(result)
+print(f"\n前段のルーター: {result.pre_route}")
+print(f"担当した順: {' → '.join(node.node_id for node in result.node_history)}")
+
+stats = pre_router.stats
+print(
+    f"\n前段のルーターの命中率: {stats.hit_rate:.0%}（{stats.hits}/{stats.requests}）"
+    f" / 省いた時間の見積もり: {stats.saved_ms:.0f}ms"
+)
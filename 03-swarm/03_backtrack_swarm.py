@@ -9,16 +9,18 @@ Graphとの違い:
 
 このサンプルでは、処理が失敗したときに前のステップに戻って
 再試行するバックトラックパターンを示す。
+
+戻る判断が噛み合わないと implementer ↔ requirements_analyst の往復が
+max_handoffs まで続くため、HandoffGuard で往復を検出して打ち切る。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.swarm import Swarm
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.handoff_guard import HandoffGuard
+from common.models import get_model
+from common.swarm import Swarm
+
+model = get_model()
 
 # 要件定義エージェント
 requirements_analyst = Agent(
@@ -85,6 +87,8 @@ swarm = Swarm(
     max_handoffs=10,  # バックトラックを考慮して多めに設定
     max_iterations=15,
     execution_timeout=600.0,
+    # 同じ並びの引き継ぎが3回続いたら、現在のエージェントの応答で終了する
+    handoff_guard=HandoffGuard(min_repeats=3, action="terminate"),
 )
 
 # テスト実行
@@ -104,10 +108,15 @@ print("--- ケース: 曖昧な要件からの実装 ---")
 print("要件: 「ユーザー管理機能を作って」（詳細が曖昧）")
 print()
 
-result = swarm(
-    "ユーザー管理機能を作ってください。"
-    "ログインとかできるようにしたいです。"
-)
+result = swarm("ユーザー管理機能を作ってください。ログインとかできるようにしたいです。")
 
 print("=== 最終結果 ===")
 print(result)
+
+if result.cycles:
+    print("\n=== 検出した引き継ぎの往復 ===")
+    for cycle in result.cycles:
+        print(
+            f"  {cycle.reason}: {' → '.join(cycle.pattern)}"
+            f"（{cycle.repeats}回、{cycle.hop}回目の引き継ぎ）→ {cycle.action}"
+        )
@@ -3,25 +3,23 @@
 
 workflowツールを使って、依存関係のあるタスクを順番に実行する。
 agent.tool.workflow() でプログラム的にワークフローを制御。
+common.workflow の workflow ツールで、モデルごとの同時実行数を調整しながら実行する。
+タスクの出力は既定でキャッシュディレクトリ（$XDG_CACHE_HOME/strands-workflows.sqlite3）に保存するため、
+2回目以降の実行はモデルを呼び出さずに前回の出力を返す（WORKFLOW_STATE_PATH=:memory: で毎回実行する）。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands_tools import workflow
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model, workflow_task_model
+from common.workflow import workflow
+
+model = get_model()
 
 # workflowツールを持つエージェント
 agent = Agent(model=model, tools=[workflow])
 
-# Bedrockモデル設定（各タスクで使用）
-bedrock_settings = {
-    "model_id": "jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    "region_name": "ap-northeast-1",
-}
+# 各タスクで使用するモデル指定（Bedrock。MODEL_PROVIDER=fake の場合は親エージェントのモデル）
+task_model = workflow_task_model()
 
 # タスク定義: 調査 → 分析 → レポート作成
 tasks = [
@@ -30,8 +28,7 @@ tasks = [
         "description": "再生可能エネルギー（太陽光、風力、水力）それぞれの特徴を1文ずつ、計3文で説明してください。",
         "system_prompt": "簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "priority": 3,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     {
         "task_id": "analysis",
@@ -39,8 +36,7 @@ tasks = [
         "system_prompt": "簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["research"],
         "priority": 3,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     {
         "task_id": "report",
@@ -48,8 +44,7 @@ tasks = [
         "system_prompt": "簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["analysis"],
         "priority": 5,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
 ]
 
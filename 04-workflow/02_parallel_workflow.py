@@ -3,24 +3,22 @@
 
 依存関係のないタスクは並列に実行される。
 最後のタスクで並列タスクの結果を統合する。
+common.workflow の workflow ツールで、モデルごとの同時実行数を調整しながら実行する。
+タスクの出力は既定でキャッシュディレクトリ（$XDG_CACHE_HOME/strands-workflows.sqlite3）に保存するため、
+2回目以降の実行はモデルを呼び出さずに前回の出力を返す（WORKFLOW_STATE_PATH=:memory: で毎回実行する）。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands_tools import workflow
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model, workflow_task_model
+from common.workflow import workflow
+
+model = get_model()
 
 agent = Agent(model=model, tools=[workflow])
 
-# Bedrockモデル設定（各タスクで使用）
-bedrock_settings = {
-    "model_id": "jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    "region_name": "ap-northeast-1",
-}
+# 各タスクで使用するモデル指定（Bedrock。MODEL_PROVIDER=fake の場合は親エージェントのモデル）
+task_model = workflow_task_model()
 
 # タスク定義: 3つの並列調査 → 統合レポート
 tasks = [
@@ -31,8 +29,7 @@ tasks = [
         "system_prompt": "あなたは競合分析の専門家です。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "priority": 3,
         "timeout": 120,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     {
         "task_id": "customer_needs",
@@ -40,8 +37,7 @@ tasks = [
         "system_prompt": "あなたは顧客調査の専門家です。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "priority": 3,
         "timeout": 120,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     {
         "task_id": "market_trends",
@@ -49,8 +45,7 @@ tasks = [
         "system_prompt": "あなたは市場調査アナリストです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "priority": 3,
         "timeout": 120,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     # 統合タスク（全ての並列タスクに依存）
     {
@@ -60,8 +55,7 @@ tasks = [
         "dependencies": ["competitor_analysis", "customer_needs", "market_trends"],
         "priority": 5,
         "timeout": 180,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
 ]
 
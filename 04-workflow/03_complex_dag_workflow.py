@@ -3,25 +3,23 @@
 
 シーケンシャルと並列を組み合わせた複雑な依存関係を持つワークフロー。
 ソフトウェア開発プロセスをシミュレートし、DAGの特性を示す。
+common.workflow の workflow ツールで、モデルごとの同時実行数を調整しながら実行する。
+タスクの出力は既定でキャッシュディレクトリ（$XDG_CACHE_HOME/strands-workflows.sqlite3）に保存するため、
+2回目以降の実行はモデルを呼び出さずに前回の出力を返す（WORKFLOW_STATE_PATH=:memory: で毎回実行する）。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands_tools import workflow
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model, workflow_task_model
+from common.workflow import workflow
+
+model = get_model()
 
 # workflowツールを持つエージェント
 agent = Agent(model=model, tools=[workflow])
 
-# Bedrockモデル設定（各タスクで使用）
-bedrock_settings = {
-    "model_id": "jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    "region_name": "ap-northeast-1",
-}
+# 各タスクで使用するモデル指定（Bedrock。MODEL_PROVIDER=fake の場合は親エージェントのモデル）
+task_model = workflow_task_model()
 
 # DAG構造:
 #
@@ -53,8 +51,7 @@ tasks = [
         "description": "ECサイトの新機能「お気に入り機能」の要件を3点にまとめてください。",
         "system_prompt": "あなたはプロダクトマネージャーです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "priority": 5,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     # フェーズ2: 並列開発（requirementsに依存）
     {
@@ -63,8 +60,7 @@ tasks = [
         "system_prompt": "あなたはフロントエンドエンジニアです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["requirements"],
         "priority": 3,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     {
         "task_id": "backend_dev",
@@ -72,8 +68,7 @@ tasks = [
         "system_prompt": "あなたはバックエンドエンジニアです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["requirements"],
         "priority": 3,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     {
         "task_id": "api_design",
@@ -81,8 +76,7 @@ tasks = [
         "system_prompt": "あなたはAPIアーキテクトです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["requirements"],
         "priority": 3,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     # フェーズ3: 部分的な依存
     {
@@ -91,8 +85,7 @@ tasks = [
         "system_prompt": "あなたはインテグレーションエンジニアです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["frontend_dev", "backend_dev"],
         "priority": 3,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     {
         "task_id": "api_impl",
@@ -100,8 +93,7 @@ tasks = [
         "system_prompt": "あなたはバックエンドエンジニアです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["api_design", "backend_dev"],
         "priority": 3,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     # フェーズ4: テスト
     {
@@ -110,8 +102,7 @@ tasks = [
         "system_prompt": "あなたはQAエンジニアです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["integration", "api_impl"],
         "priority": 5,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
     # フェーズ5: リリース
     {
@@ -120,8 +111,7 @@ tasks = [
         "system_prompt": "あなたはリリースマネージャーです。簡潔に回答してください。ツールは使わず、あなたの知識だけで回答してください。",
         "dependencies": ["testing"],
         "priority": 5,
-        "model_provider": "bedrock",
-        "model_settings": bedrock_settings,
+        **task_model,
     },
 ]
 
@@ -9,16 +9,17 @@
 
 別ターミナルからクライアントで接続:
     uv run python 05-a2a/02_a2a_client.py
+
+複数のワーカープロセスで起動（同時実行数の制限と 429 による背圧つき）:
+    uv run python -m common.a2a_server 05-a2a/01_a2a_server.py:server --workers 4
 """
 
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
 from strands.multiagent.a2a import A2AServer
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.models import get_model
+
+model = get_model()
 
 
 # サーバー側で提供するツール
@@ -63,10 +64,12 @@ calculateツールで数式を計算し、get_greetingツールで挨拶がで
 )
 
 # A2Aサーバーの作成と起動
+# テキストの差分は A2A 準拠のアーティファクト更新としてストリーミングする
 server = A2AServer(
     agent=agent,
     host="127.0.0.1",
     port=9000,
+    enable_a2a_compliant_streaming=True,
 )
 
 if __name__ == "__main__":
@@ -2,61 +2,79 @@
 02_a2a_client.py - A2Aクライアント
 
 A2Aプロトコルでサーバーに接続し、リモートエージェントを呼び出す。
+common.a2a_client.A2AClientManager が接続プール・エージェントカード・クライアントを
+サーバーごとに保持するため、2回目以降のリクエストはカードの取得と接続の確立を省略できる。
+stream_text() はリモートのエージェントが生成したテキストを、生成された順に受け取る。
 
 前提条件:
     01_a2a_server.py が別ターミナルで実行中であること
 
 実行方法:
     uv run python 05-a2a/02_a2a_client.py
+
+複数のレプリカに振り分ける場合（common.a2a_gateway.A2AGateway を使う）:
+    uv run python -m common.a2a_server 05-a2a/01_a2a_server.py:server --port 9000
+    uv run python -m common.a2a_server 05-a2a/01_a2a_server.py:server --port 9001
+    A2A_SERVER_URLS=http://127.0.0.1:9000,http://127.0.0.1:9001 uv run python 05-a2a/02_a2a_client.py
 """
 
 import asyncio
-from uuid import uuid4
+import os
 
-import httpx
-from a2a.client import A2ACardResolver, ClientConfig, ClientFactory
-from a2a.types import Message, Part, Role, TextPart
+from common.a2a_client import A2AClientManager
+from common.a2a_gateway import A2AGateway
 
-A2A_SERVER_URL = "http://127.0.0.1:9000"
+A2A_SERVER_URLS = os.getenv("A2A_SERVER_URLS", "http://127.0.0.1:9000").split(",")
+A2A_SERVER_URL = A2A_SERVER_URLS[0]
 
 
 async def main():
     print("=== A2Aクライアント ===")
     print(f"接続先: {A2A_SERVER_URL}\n")
 
-    async with httpx.AsyncClient(timeout=300) as httpx_client:
+    async with A2AClientManager() as manager:
         # エージェントカードの取得（サーバー情報の確認）
         print("--- エージェント情報の取得 ---")
-        resolver = A2ACardResolver(httpx_client=httpx_client, base_url=A2A_SERVER_URL)
-        agent_card = await resolver.get_agent_card()
+        agent_card = await manager.get_card(A2A_SERVER_URL)
         print(f"エージェント名: {agent_card.name}")
         print(f"説明: {agent_card.description}")
         print()
 
-        # ClientFactoryでクライアントを作成
-        config = ClientConfig(httpx_client=httpx_client, streaming=False)
-        factory = ClientFactory(config)
-        client = factory.create(agent_card)
-
-        # メッセージの送信
+        # メッセージの送信（カードとクライアントはマネージャーが使い回す）
         print("--- メッセージ送信: 計算リクエスト ---")
-        message = Message(
-            role=Role.user,
-            parts=[Part(TextPart(text="100 + 200 * 3 を計算してください"))],
-            message_id=uuid4().hex,
-        )
-        async for event in client.send_message(message):
+        async for event in manager.send_message(
+            A2A_SERVER_URL, "100 + 200 * 3 を計算してください"
+        ):
             print(f"レスポンス: {event}")
         print()
 
         print("--- メッセージ送信: 挨拶リクエスト ---")
-        message2 = Message(
-            role=Role.user,
-            parts=[Part(TextPart(text="田中さんに挨拶してください"))],
-            message_id=uuid4().hex,
-        )
-        async for event in client.send_message(message2):
+        async for event in manager.send_message(
+            A2A_SERVER_URL, "田中さんに挨拶してください"
+        ):
             print(f"レスポンス: {event}")
+        print()
+
+        # ストリーミング: 生成されたテキストの差分を届いた順に表示する
+        print("--- ストリーミング: 計算リクエスト ---")
+        async for delta in manager.stream_text(
+            A2A_SERVER_URL, "1 + 2 + 3 を計算してください"
+        ):
+            print(delta, end="", flush=True)
+        print("\n")
+
+        print("--- 接続の統計 ---")
+        print(manager.stats(A2A_SERVER_URL))
+
+        if len(A2A_SERVER_URLS) > 1:
+            # 同じエージェントカードのレプリカに、処理中のリクエストが少ない方から振り分ける
+            print("\n--- レプリカへの振り分け ---")
+            async with A2AGateway(A2A_SERVER_URLS, manager=manager) as gateway:
+                await asyncio.gather(
+                    *(gateway.send(f"{i} + {i} を計算してください") for i in range(6))
+                )
+                for url, replica in gateway.stats()["replicas"].items():
+                    print(f"{url}: {replica['requests']}件")
 
 
 if __name__ == "__main__":
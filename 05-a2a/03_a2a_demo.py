@@ -9,20 +9,15 @@
 """
 
 import asyncio
-import threading
-from uuid import uuid4
 
-import httpx
-from a2a.client import A2ACardResolver, ClientConfig, ClientFactory
-from a2a.types import Message, Part, Role, TextPart
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
 from strands.multiagent.a2a import A2AServer
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.a2a_client import A2AClientManager
+from common.a2a_server import BackgroundA2AServer
+from common.models import get_model
+
+model = get_model()
 
 
 @tool
@@ -53,69 +48,62 @@ server_agent = Agent(
 日本語から英語への翻訳を行います。
 translate_to_englishツールを使用して翻訳してください。""",
     tools=[translate_to_english],
+    # 同じプロセスでクライアントの出力と混ざらないよう、サーバー側では表示しない
+    callback_handler=None,
 )
 
 
-def run_server():
-    """サーバーを別スレッドで起動"""
-    server = A2AServer(
-        agent=server_agent,
-        host="127.0.0.1",
-        port=9001,
-    )
-    server.serve()
-
-
-async def run_client():
+async def run_client(url: str):
     """クライアントからサーバーにアクセス"""
-    # サーバー起動を待機
-    await asyncio.sleep(2)
-
     print("--- クライアントからサーバーに接続 ---\n")
 
-    async with httpx.AsyncClient(timeout=300) as httpx_client:
+    async with A2AClientManager() as manager:
         # エージェントカードの取得
         try:
-            resolver = A2ACardResolver(httpx_client=httpx_client, base_url="http://127.0.0.1:9001")
-            agent_card = await resolver.get_agent_card()
+            agent_card = await manager.get_card(url)
             print(f"接続成功！エージェント: {agent_card.name}")
             print()
         except Exception as e:
             print(f"接続エラー: {e}")
             return
 
-        # ClientFactoryでクライアントを作成
-        config = ClientConfig(httpx_client=httpx_client, streaming=False)
-        factory = ClientFactory(config)
-        client = factory.create(agent_card)
-
-        # 翻訳リクエスト
+        # 翻訳リクエスト（カードとクライアントはマネージャーが使い回す）
         print("--- 翻訳リクエスト送信 ---")
-        message = Message(
-            role=Role.user,
-            parts=[Part(TextPart(text="「こんにちは」を英語に翻訳してください"))],
-            message_id=uuid4().hex,
-        )
-        async for event in client.send_message(message):
+        async for event in manager.send_message(
+            url, "「こんにちは」を英語に翻訳してください"
+        ):
             print(f"レスポンス: {event}")
+        print()
+
+        # ストリーミングで同じリクエストを送り、テキストの差分を届いた順に表示する
+        print("--- 翻訳リクエスト送信（ストリーミング） ---")
+        async for delta in manager.stream_text(
+            url, "「ありがとう」を英語に翻訳してください"
+        ):
+            print(delta, end="", flush=True)
+        print("\n")
+        print(f"接続の統計: {manager.stats(url)}")
 
 
-async def main():
+def main():
     print("=== A2A統合デモ ===")
     print("サーバー: http://127.0.0.1:9001")
     print()
 
-    # サーバーをバックグラウンドスレッドで起動
+    # サーバーをバックグラウンドスレッドで起動し、接続を受け付けるまで待つ
     print("--- サーバー起動中 ---")
-    server_thread = threading.Thread(target=run_server, daemon=True)
-    server_thread.start()
-
-    # クライアント実行
-    await run_client()
+    server = A2AServer(
+        agent=server_agent,
+        host="127.0.0.1",
+        port=9001,
+        enable_a2a_compliant_streaming=True,
+    )
+    with BackgroundA2AServer(server) as url:
+        # クライアント実行
+        asyncio.run(run_client(url))
 
     print("\n--- デモ完了 ---")
-    print("（サーバースレッドは自動終了します）")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -8,13 +8,12 @@ Graphパターンを使った基本的なコンテンツ制作フロー。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.graph import GraphBuilder
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.graph import GraphBuilder
+from common.models import get_model
+from common.payload import PayloadPolicy
+
+model = get_model()
 
 # 企画担当エージェント
 planner = Agent(
@@ -91,6 +90,12 @@ builder.add_edge("writing", "review")
 # エントリーポイント
 builder.set_entry_point("planning")
 
+# ノード間で受け渡す出力の上限
+# 各ノードには直前のノードの出力だけを1500トークンまで渡し、
+# レビューには記事本文を800トークン以内に要約して渡す
+builder.set_payload_policy(PayloadPolicy(mode="latest", max_tokens=1500))
+builder.set_payload_policy(PayloadPolicy(mode="summarize", max_tokens=800), "review")
+
 # グラフをビルド
 graph = builder.build()
 
@@ -106,3 +111,11 @@ if __name__ == "__main__":
 
     print("=== 最終結果 ===")
     print(result)
+
+    print("\n=== ノードごとの入力トークン ===")
+    for stats in result.payloads:
+        print(
+            f"{stats.node_id:<10} {stats.mode:<10} "
+            f"{stats.original_tokens:>6} → {stats.sent_tokens:>6}（削減 {stats.saved_tokens}）"
+        )
+    print(f"合計削減: {result.saved_tokens} トークン")
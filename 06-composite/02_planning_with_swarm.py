@@ -8,14 +8,12 @@ Graphの「企画」ノードをSwarmで置き換え。
 """
 
 from strands import Agent
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.graph import GraphBuilder
 from strands.multiagent.swarm import Swarm
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.graph import GraphBuilder
+from common.models import get_model
+
+model = get_model()
 
 
 # === 企画フェーズ用のSwarm ===
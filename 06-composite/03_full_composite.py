@@ -8,57 +8,92 @@ Graph + Swarm + Agents as Tools を組み合わせたコンテンツ制作シス
 - 調査: Agents as Tools（専門エージェントをツールとして呼び出し）
 - 執筆: 単純なAgent
 - レビュー: Swarm（技術・文章の両面からレビュー）
+
+実行中のイベントは common.events.print_stream で逐次表示する。
+入れ子の Swarm のエージェントのトークンも [planning/editor] のように階層付きで
+生成されたそばから表示されるため、パイプライン全体の完了を待たずに出力が見える。
+（各エージェントの callback_handler は二重に表示しないよう None にしている）
+
+調査の専門家ツールは async で定義し、イベントループのスレッドを塞がずに専門家を呼び出す。
+多数のリクエストを1つのイベントループで同時に処理する場合は、build_pipeline() で
+リクエストごとに Graph を組み立てて common.runner.RequestRunner に渡す。
 """
 
+from typing import Any
+
 from strands import Agent, tool
-from strands.models.bedrock import BedrockModel
-from strands.multiagent.graph import GraphBuilder
+from strands.multiagent.graph import Graph
 from strands.multiagent.swarm import Swarm
 
-model = BedrockModel(
-    model_id="jp.anthropic.claude-haiku-4-5-20251001-v1:0",
-    region_name="ap-northeast-1",
-)
+from common.agent_pool import AgentPool
+from common.events import print_stream
+from common.fanout import fan_out_async
+from common.graph import GraphBuilder
+from common.models import get_model
+from common.response_cache import get_response_cache
+
+model = get_model()
+
+# 調査フェーズの専門家エージェントのプール
+# 同じトピックのトレンド分析・事例調査は、キャッシュからモデルを呼ばずに応答する
+pool = AgentPool(model, cache=get_response_cache())
 
 
 # ============================================================
-# 企画フェーズ: Swarm（複数専門家が協議）
+# 各エージェントのシステムプロンプト
 # ============================================================
 
-editor = Agent(
-    model=model,
-    name="editor",
-    system_prompt="""あなたは編集者です。
+# 企画フェーズ: Swarm（複数専門家が協議）
+EDITOR_PROMPT = """あなたは編集者です。
 テーマを受けて、記事の方向性を提案してください。
-提案後、marketerに引き継いでください。""",
-)
-
-marketer = Agent(
-    model=model,
-    name="marketer",
-    system_prompt="""あなたはマーケターです。
-読者視点でアドバイスし、content_writerに引き継いでください。""",
-)
-
-content_writer = Agent(
-    model=model,
-    name="content_writer",
-    system_prompt="""あなたはコンテンツライターです。
+提案後、marketerに引き継いでください。"""
+
+MARKETER_PROMPT = """あなたはマーケターです。
+読者視点でアドバイスし、content_writerに引き継いでください。"""
+
+CONTENT_WRITER_PROMPT = """あなたはコンテンツライターです。
 意見を踏まえて企画案をまとめてください。
 
 出力形式:
 【タイトル案】【想定読者】【記事構成】【キーメッセージ】
 
-他のエージェントには引き継がないでください。""",
-)
+他のエージェントには引き継がないでください。"""
+
+# 調査フェーズ: Agents as Tools（専門エージェントをツールとして呼び出し）
+RESEARCH_ORCHESTRATOR_PROMPT = """あなたは調査コーディネーターです。
+企画内容を受けて、専門家ツールを使って情報を収集してください。
+
+必ずgather_researchを使って、以下の両方を実行してください:
+1. analyze_trends: トレンド分析
+2. find_case_studies: 事例調査
+（gather_researchは両方の専門家に並列に問い合わせます）
+
+収集した情報を整理して出力してください。"""
+
+# 執筆フェーズ: シンプルなAgent
+WRITER_PROMPT = """あなたはライターです。
+企画と調査結果をもとに、300〜500字程度の記事を執筆してください。
+読みやすく、具体的な内容を盛り込んでください。"""
 
-planning_swarm = Swarm(
-    nodes=[editor, marketer, content_writer],
-    entry_point=editor,
-    max_handoffs=5,
-    max_iterations=10,
-    execution_timeout=300.0,
-)
+# レビューフェーズ: Swarm（複数観点からレビュー）
+TECHNICAL_REVIEWER_PROMPT = """あなたは技術レビュアーです。
+記事の正確性と具体性をチェックしてください。
+チェック後、style_reviewerに引き継いでください。"""
+
+STYLE_REVIEWER_PROMPT = """あなたは文章レビュアーです。
+記事の読みやすさと構成をチェックしてください。
+チェック後、final_editorに引き継いでください。"""
+
+FINAL_EDITOR_PROMPT = """あなたは最終編集者です。
+レビュー結果を踏まえて、総合評価をまとめてください。
+
+出力形式:
+【総合評価】良い / 要修正
+【良い点】
+【改善点】
+【最終コメント】
+
+他のエージェントには引き継がないでください。"""
 
 
 # ============================================================
@@ -66,15 +101,12 @@ planning_swarm = Swarm(
 # ============================================================
 
 # 専門家エージェント1: トレンド調査
-trend_analyst_agent = Agent(
-    model=model,
-    system_prompt="""あなたはトレンドアナリストです。
-指定されたテーマの最新トレンドを3点挙げてください。簡潔に。""",
-)
+TREND_ANALYST_PROMPT = """あなたはトレンドアナリストです。
+指定されたテーマの最新トレンドを3点挙げてください。簡潔に。"""
 
 
 @tool
-def analyze_trends(topic: str) -> str:
+async def analyze_trends(topic: str) -> str:
     """指定されたトピックの最新トレンドを分析します。
 
     Args:
@@ -83,20 +115,20 @@ def analyze_trends(topic: str) -> str:
     Returns:
         トレンド分析結果
     """
-    result = trend_analyst_agent(f"「{topic}」の最新トレンドを分析してください。")
-    return str(result)
+    return await pool.run_async(
+        f"「{topic}」の最新トレンドを分析してください。",
+        TREND_ANALYST_PROMPT,
+        callback_handler=None,
+    )
 
 
 # 専門家エージェント2: 事例調査
-case_researcher_agent = Agent(
-    model=model,
-    system_prompt="""あなたは事例リサーチャーです。
-指定されたテーマに関する具体的な事例を2つ挙げてください。簡潔に。""",
-)
+CASE_RESEARCHER_PROMPT = """あなたは事例リサーチャーです。
+指定されたテーマに関する具体的な事例を2つ挙げてください。簡潔に。"""
 
 
 @tool
-def find_case_studies(topic: str) -> str:
+async def find_case_studies(topic: str) -> str:
     """指定されたトピックの事例を調査します。
 
     Args:
@@ -105,106 +137,106 @@ def find_case_studies(topic: str) -> str:
     Returns:
         事例調査結果
     """
-    result = case_researcher_agent(f"「{topic}」に関する事例を調査してください。")
-    return str(result)
-
-
-# 調査オーケストレーター（Agents as Toolsパターン）
-research_orchestrator = Agent(
-    model=model,
-    name="research_orchestrator",
-    system_prompt="""あなたは調査コーディネーターです。
-企画内容を受けて、専門家ツールを使って情報を収集してください。
-
-必ず以下の両方を実行してください:
-1. analyze_trends: トレンド分析
-2. find_case_studies: 事例調査
-
-収集した情報を整理して出力してください。""",
-    tools=[analyze_trends, find_case_studies],
-)
-
-
-# ============================================================
-# 執筆フェーズ: シンプルなAgent
-# ============================================================
-
-writer = Agent(
-    model=model,
-    name="writer",
-    system_prompt="""あなたはライターです。
-企画と調査結果をもとに、300〜500字程度の記事を執筆してください。
-読みやすく、具体的な内容を盛り込んでください。""",
-)
-
-
-# ============================================================
-# レビューフェーズ: Swarm（複数観点からレビュー）
-# ============================================================
+    return await pool.run_async(
+        f"「{topic}」に関する事例を調査してください。",
+        CASE_RESEARCHER_PROMPT,
+        callback_handler=None,
+    )
 
-technical_reviewer = Agent(
-    model=model,
-    name="technical_reviewer",
-    system_prompt="""あなたは技術レビュアーです。
-記事の正確性と具体性をチェックしてください。
-チェック後、style_reviewerに引き継いでください。""",
-)
-
-style_reviewer = Agent(
-    model=model,
-    name="style_reviewer",
-    system_prompt="""あなたは文章レビュアーです。
-記事の読みやすさと構成をチェックしてください。
-チェック後、final_editorに引き継いでください。""",
-)
-
-final_editor = Agent(
-    model=model,
-    name="final_editor",
-    system_prompt="""あなたは最終編集者です。
-レビュー結果を踏まえて、総合評価をまとめてください。
 
-出力形式:
-【総合評価】良い / 要修正
-【良い点】
-【改善点】
-【最終コメント】
+@tool
+async def gather_research(topic: str) -> str:
+    """トレンド分析と事例調査を並列に実行します。
 
-他のエージェントには引き継がないでください。""",
-)
+    Args:
+        topic: 調査するトピック
 
-review_swarm = Swarm(
-    nodes=[technical_reviewer, style_reviewer, final_editor],
-    entry_point=technical_reviewer,
-    max_handoffs=5,
-    max_iterations=10,
-    execution_timeout=300.0,
-)
+    Returns:
+        トレンド分析結果と事例調査結果
+    """
+    # 2人の専門家は互いに独立しているため同時に問い合わせる
+    trends, cases = await fan_out_async(
+        [lambda: analyze_trends(topic), lambda: find_case_studies(topic)]
+    )
+    return f"【トレンド分析】\n{trends}\n\n【事例調査】\n{cases}"
 
 
 # ============================================================
 # Graphの構築（全体フロー）
 # ============================================================
 
-builder = GraphBuilder()
 
-# ノードの追加
-# SwarmやAgentは直接add_nodeに渡せる（MultiAgentBaseを継承）
-builder.add_node(planning_swarm, "planning")  # Swarm
-builder.add_node(research_orchestrator, "research")  # Agent (with tools)
-builder.add_node(writer, "writing")  # Simple Agent
-builder.add_node(review_swarm, "review")  # Swarm
+def _agent(name: str, system_prompt: str, **kwargs: Any) -> Agent:
+    return Agent(
+        model=model,
+        callback_handler=None,
+        name=name,
+        system_prompt=system_prompt,
+        **kwargs,
+    )
 
-# エッジの追加
-builder.add_edge("planning", "research")
-builder.add_edge("research", "writing")
-builder.add_edge("writing", "review")
 
-# エントリーポイント
-builder.set_entry_point("planning")
+def build_pipeline() -> Graph:
+    """コンテンツ制作パイプラインの Graph を組み立てる。
 
-# グラフをビルド
-graph = builder.build()
+    Agent は同時に1つの実行しか受け付けず、Graph も実行の状態を持つため、
+    同時に処理するリクエストごとに新しく組み立てる（モデルとツールは共有する）。
+    """
+    editor = _agent("editor", EDITOR_PROMPT)
+    planning_swarm = Swarm(
+        nodes=[
+            editor,
+            _agent("marketer", MARKETER_PROMPT),
+            _agent("content_writer", CONTENT_WRITER_PROMPT),
+        ],
+        entry_point=editor,
+        max_handoffs=5,
+        max_iterations=10,
+        execution_timeout=300.0,
+    )
+
+    # 調査オーケストレーター（Agents as Toolsパターン）
+    research_orchestrator = _agent(
+        "research_orchestrator", RESEARCH_ORCHESTRATOR_PROMPT, tools=[gather_research]
+    )
+
+    writer = _agent("writer", WRITER_PROMPT)
+
+    technical_reviewer = _agent("technical_reviewer", TECHNICAL_REVIEWER_PROMPT)
+    review_swarm = Swarm(
+        nodes=[
+            technical_reviewer,
+            _agent("style_reviewer", STYLE_REVIEWER_PROMPT),
+            _agent("final_editor", FINAL_EDITOR_PROMPT),
+        ],
+        entry_point=technical_reviewer,
+        max_handoffs=5,
+        max_iterations=10,
+        execution_timeout=300.0,
+    )
+
+    builder = GraphBuilder()
+
+    # ノードの追加
+    # SwarmやAgentは直接add_nodeに渡せる（MultiAgentBaseを継承）
+    builder.add_node(planning_swarm, "planning")  # Swarm
+    builder.add_node(research_orchestrator, "research")  # Agent (with tools)
+    builder.add_node(writer, "writing")  # Simple Agent
+    builder.add_node(review_swarm, "review")  # Swarm
+
+    # エッジの追加
+    builder.add_edge("planning", "research")
+    builder.add_edge("research", "writing")
+    builder.add_edge("writing", "review")
+
+    # エントリーポイント
+    builder.set_entry_point("planning")
+
+    # グラフをビルド
+    return builder.build()
+
+
+graph = build_pipeline()
 
 
 # ============================================================
@@ -218,14 +250,22 @@ if __name__ == "__main__":
     print("├─ 企画(planning): Swarm")
     print("│    └─ editor → marketer → content_writer")
     print("├─ 調査(research): Agents as Tools")
-    print("│    └─ orchestrator → [trend_analyst, case_researcher]")
+    print("│    └─ orchestrator → [trend_analyst, case_researcher]（並列）")
     print("├─ 執筆(writing): Simple Agent")
     print("│    └─ writer")
     print("└─ レビュー(review): Swarm")
     print("     └─ technical_reviewer → style_reviewer → final_editor")
     print()
 
-    result = graph("「リモートワークの生産性向上」をテーマに記事を作成してください。")
+    stream = print_stream(
+        graph, "「リモートワークの生産性向上」をテーマに記事を作成してください。"
+    )
+    result = stream.result
 
+    print()
     print("=== 最終結果 ===")
     print(result)
+    # テキストの差分が1つも来なかった場合、first_token_ms は None になる
+    first_token_ms = stream.stats.first_token_ms
+    first_token = "なし" if first_token_ms is None else f"{first_token_ms:.0f}ms"
+    print(f"\n最初のトークンまで {first_token} / 全体 {stream.stats.total_ms:.0f}ms")
@@ -0,0 +1,244 @@
+"""
+04_remote_research.py - リモートのA2Aエージェントを組み込んだ複合パターン
+
+03_full_composite.py の調査フェーズの専門家を、別のホストで動く A2A サーバーに置き換える。
+common.a2a_agent.remote_agent() はリモートのエージェントに処理を任せる Agent を作るため、
+Graph のノードにも Swarm のメンバーにもそのまま使える。
+
+フロー:
+- 企画: Agent（ローカル）
+- 調査: trend_analyst・case_researcher（リモート。Graph の兄弟ノードとして並列に実行）
+- 執筆: Agent（ローカル）
+- レビュー: Swarm（fact_checker はリモート。応答の後に final_editor へ引き継ぐ）
+
+リモートのエージェントは1つの A2AClientManager で接続を使い回し、応答のテキストの差分は
+そのまま Graph のイベントとして届く（print_stream で [research_trends] のように逐次表示される）。
+
+既定では専門家のサーバーを同じプロセスのバックグラウンドで起動する。
+別のホストで動かす場合はサーバーを起動し、URLを環境変数で渡す。
+
+実行方法:
+    uv run --extra a2a python 06-composite/04_remote_research.py
+
+    # 専門家を別のプロセス（ホスト）で動かす場合
+    uv run --extra a2a python -m common.a2a_server 06-composite/04_remote_research.py:trend_server --port 9101 --a2a-compliant-streaming
+    uv run --extra a2a python -m common.a2a_server 06-composite/04_remote_research.py:case_server --port 9102 --a2a-compliant-streaming
+    uv run --extra a2a python -m common.a2a_server 06-composite/04_remote_research.py:fact_server --port 9103 --a2a-compliant-streaming
+    TREND_ANALYST_URL=http://127.0.0.1:9101 CASE_RESEARCHER_URL=http://127.0.0.1:9102 \\
+        FACT_CHECKER_URL=http://127.0.0.1:9103 uv run --extra a2a python 06-composite/04_remote_research.py
+"""
+
+import asyncio
+import contextlib
+import os
+
+from strands import Agent
+from strands.multiagent.a2a import A2AServer
+from strands.multiagent.graph import Graph
+from strands.multiagent.swarm import Swarm
+
+from common.a2a_agent import remote_agent
+from common.a2a_client import A2AClientManager
+from common.a2a_server import BackgroundA2AServer, free_port
+from common.events import print_stream_async
+from common.graph import GraphBuilder
+from common.models import get_model
+
+model = get_model()
+
+# リモートの応答がこの秒数で終わらなければ、そのノードを失敗にする
+REMOTE_TIMEOUT = 120.0
+
+
+# ============================================================
+# リモートの専門家（A2Aサーバー側）
+# ============================================================
+
+TREND_ANALYST_PROMPT = """あなたはトレンドアナリストです。
+指定されたテーマの最新トレンドを3点挙げてください。簡潔に。"""
+
+CASE_RESEARCHER_PROMPT = """あなたは事例リサーチャーです。
+指定されたテーマに関する具体的な事例を2つ挙げてください。簡潔に。"""
+
+FACT_CHECKER_PROMPT = """あなたはファクトチェッカーです。
+記事中の事実・数値の誤りや根拠の不足を指摘してください。簡潔に。"""
+
+
+def _server(name: str, description: str, system_prompt: str) -> A2AServer:
+    agent = Agent(
+        model=model,
+        name=name,
+        description=description,
+        system_prompt=system_prompt,
+        callback_handler=None,
+    )
+    return A2AServer(agent=agent, port=free_port(), enable_a2a_compliant_streaming=True)
+
+
+def trend_server() -> A2AServer:
+    """トレンドアナリストのサーバー"""
+    return _server(
+        "TrendAnalyst",
+        "テーマの最新トレンドを分析するエージェント",
+        TREND_ANALYST_PROMPT,
+    )
+
+
+def case_server() -> A2AServer:
+    """事例リサーチャーのサーバー"""
+    return _server(
+        "CaseResearcher",
+        "テーマに関する事例を調査するエージェント",
+        CASE_RESEARCHER_PROMPT,
+    )
+
+
+def fact_server() -> A2AServer:
+    """ファクトチェッカーのサーバー"""
+    return _server(
+        "FactChecker", "記事の事実関係を確認するエージェント", FACT_CHECKER_PROMPT
+    )
+
+
+# ============================================================
+# ローカルのエージェント
+# ============================================================
+
+PLANNER_PROMPT = """あなたは編集者です。
+テーマを受けて、記事の方向性と調査してほしい観点をまとめてください。"""
+
+WRITER_PROMPT = """あなたはライターです。
+企画と調査結果をもとに、300〜500字程度の記事を執筆してください。
+読みやすく、具体的な内容を盛り込んでください。"""
+
+FINAL_EDITOR_PROMPT = """あなたは最終編集者です。
+ファクトチェックの結果を踏まえて、総合評価をまとめてください。
+
+出力形式:
+【総合評価】良い / 要修正
+【改善点】
+【最終コメント】
+
+他のエージェントには引き継がないでください。"""
+
+
+def _agent(name: str, system_prompt: str) -> Agent:
+    return Agent(
+        model=model, callback_handler=None, name=name, system_prompt=system_prompt
+    )
+
+
+def build_pipeline(urls: dict[str, str], manager: A2AClientManager) -> Graph:
+    """リモートの専門家を組み込んだ Graph を組み立てる。
+
+    Args:
+        urls: trend_analyst・case_researcher・fact_checker のベースURL
+        manager: リモートのエージェントで共有する A2AClientManager
+    """
+    final_editor = _agent("final_editor", FINAL_EDITOR_PROMPT)
+    review_swarm = Swarm(
+        nodes=[
+            # Swarm のメンバーとしてのリモートのエージェント（応答の後に final_editor へ引き継ぐ）
+            remote_agent(
+                urls["fact_checker"],
+                "fact_checker",
+                description="記事の事実関係を確認する（リモート）",
+                manager=manager,
+                timeout=REMOTE_TIMEOUT,
+                handoff_to="final_editor",
+            ),
+            final_editor,
+        ],
+        max_handoffs=3,
+        max_iterations=5,
+        execution_timeout=300.0,
+    )
+
+    builder = GraphBuilder()
+    builder.add_node(_agent("planner", PLANNER_PROMPT), "planning")
+    # Graph のノードとしてのリモートのエージェント（兄弟ノードなので並列に実行される）
+    builder.add_node(
+        remote_agent(
+            urls["trend_analyst"],
+            "trend_analyst",
+            manager=manager,
+            timeout=REMOTE_TIMEOUT,
+        ),
+        "research_trends",
+    )
+    builder.add_node(
+        remote_agent(
+            urls["case_researcher"],
+            "case_researcher",
+            manager=manager,
+            timeout=REMOTE_TIMEOUT,
+        ),
+        "research_cases",
+    )
+    builder.add_node(_agent("writer", WRITER_PROMPT), "writing")
+    builder.add_node(review_swarm, "review")
+
+    builder.add_edge("planning", "research_trends")
+    builder.add_edge("planning", "research_cases")
+    builder.add_edge("research_trends", "writing")
+    builder.add_edge("research_cases", "writing")
+    builder.add_edge("writing", "review")
+    builder.set_entry_point("planning")
+    return builder.build()
+
+
+def _ms(value: float | None) -> str:
+    return "なし" if value is None else f"{value:.0f}ms"
+
+
+async def run(urls: dict[str, str]) -> None:
+    async with A2AClientManager() as manager:
+        graph = build_pipeline(urls, manager)
+        stream = await print_stream_async(
+            graph, "「リモートワークの生産性向上」をテーマに記事を作成してください。"
+        )
+
+        print()
+        print("=== 最終結果 ===")
+        print(stream.result)
+        # テキストの差分が1つも来なかった場合、最初のトークン・テキストまでの時間は None になる
+        print(
+            f"\n最初のトークンまで {_ms(stream.stats.first_token_ms)} / "
+            f"全体 {stream.stats.total_ms:.0f}ms"
+        )
+        print("\n--- リモートのエージェントへの接続 ---")
+        for url, stats in manager.stats().items():
+            print(
+                f"{url}: {stats['requests']}件 / 接続 {stats['connections_opened']} / "
+                f"最初のテキストまで {_ms(stats['ttft_p50_ms'])}"
+            )
+
+
+def main():
+    print("=== リモートのA2Aエージェントを組み込んだ複合パターン ===")
+    print()
+    print("全体構造: Graph")
+    print("├─ 企画(planning): Agent")
+    print("├─ 調査: research_trends・research_cases（リモート、並列）")
+    print("├─ 執筆(writing): Agent")
+    print("└─ レビュー(review): Swarm")
+    print("     └─ fact_checker（リモート） → final_editor")
+    print()
+
+    servers = {
+        "trend_analyst": (os.getenv("TREND_ANALYST_URL"), trend_server),
+        "case_researcher": (os.getenv("CASE_RESEARCHER_URL"), case_server),
+        "fact_checker": (os.getenv("FACT_CHECKER_URL"), fact_server),
+    }
+    with contextlib.ExitStack() as stack:
+        urls = {}
+        for name, (url, factory) in servers.items():
+            # URLの指定がなければ、同じプロセスのバックグラウンドで起動する
+            urls[name] = url or stack.enter_context(BackgroundA2AServer(factory()))
+            print(f"{name}: {urls[name]}")
+        print()
+        asyncio.run(run(urls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+benchmarks - ローカルのスタブを使ったベンチマーク集
+
+実際のBedrockに接続せずに、各パターンのオーバーヘッドを計測する。
+リポジトリのルートから `uv run python -m benchmarks.<name>` で実行する。
+"""
@@ -0,0 +1,160 @@
+"""
+a2a_client.py - A2Aクライアントの接続とエージェントカードの使い回しのベンチマーク
+
+05-a2a/01_a2a_server.py の CalculatorAgent（MODEL_PROVIDER=fake の FakeModel）を
+ローカルの A2AServer で起動し、短いプロンプトを順に送って1リクエストあたりの所要時間を比較する。
+
+- per_request: リクエストごとに httpx.AsyncClient を作り、A2ACardResolver でカードを取得して
+  ClientFactory でクライアントを作る（05-a2a/02 のセッションをリクエストごとに行う場合）
+- manager: common.a2a_client.A2AClientManager で接続プール・カード・クライアントを使い回す
+- manager_ttl0: manager でカードの TTL を0にし、リクエストごとにカードを取得し直す
+
+新しく確立した TCP 接続数とカードの取得回数も数える。
+
+実行方法:
+    uv run --extra a2a python -m benchmarks.a2a_client
+    uv run --extra a2a python -m benchmarks.a2a_client --requests 200 --latency 0.05 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import runpy
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+from a2a.client import A2ACardResolver, ClientConfig, ClientFactory
+from strands.handlers.callback_handler import null_callback_handler
+from strands.multiagent.a2a import A2AServer
+
+from common.a2a_client import A2AClientManager, message_text
+from common.a2a_server import BackgroundA2AServer, free_port
+from common.models import clear_models
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVER_SCRIPT = ROOT / "05-a2a/01_a2a_server.py"
+PROMPT = "1 + 2 を計算してください"
+
+
+def _summary(latencies: list[float], connections: int, cards: int) -> dict[str, Any]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "mean_ms": round(statistics.mean(ordered), 2),
+        "p50_ms": round(statistics.median(ordered), 2),
+        "p95_ms": round(statistics.quantiles(ordered, n=20, method="inclusive")[18], 2),
+        "connections_opened": connections,
+        "card_fetches": cards,
+    }
+
+
+async def run_per_request(url: str, requests: int) -> dict[str, Any]:
+    """リクエストごとに接続・カード・クライアントを作る"""
+    connections = 0
+
+    async def trace(event_name: str, info: dict[str, Any]) -> None:
+        nonlocal connections
+        if event_name == "connection.connect_tcp.complete":
+            connections += 1
+
+    async def add_trace(request: httpx.Request) -> None:
+        request.extensions["trace"] = trace
+
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(
+            timeout=300, event_hooks={"request": [add_trace]}
+        ) as http:
+            card = await A2ACardResolver(
+                httpx_client=http, base_url=url
+            ).get_agent_card()
+            client = ClientFactory(
+                ClientConfig(httpx_client=http, streaming=False)
+            ).create(card)
+            async for _event in client.send_message(message_text(PROMPT)):
+                pass
+        latencies.append((time.perf_counter() - start) * 1000)
+    return _summary(latencies, connections, requests)
+
+
+async def run_manager(url: str, requests: int, card_ttl: float) -> dict[str, Any]:
+    """A2AClientManager で使い回す"""
+    latencies = []
+    async with A2AClientManager(card_ttl=card_ttl) as manager:
+        for _ in range(requests):
+            start = time.perf_counter()
+            await manager.send(url, PROMPT)
+            latencies.append((time.perf_counter() - start) * 1000)
+        stats = manager.stats(url)
+    return _summary(latencies, stats["connections_opened"], stats["card_fetches"])
+
+
+def run(requests: int, latency: float) -> dict[str, Any]:
+    """ローカルのサーバーに対して全ての方式を実行する"""
+    os.environ["MODEL_PROVIDER"] = "fake"
+    os.environ["FAKE_MODEL_LATENCY"] = str(latency)
+    clear_models()
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = runpy.run_path(str(SERVER_SCRIPT), run_name="a2a_server")["agent"]
+    agent.callback_handler = null_callback_handler
+    server = A2AServer(agent=agent, port=free_port())
+
+    async def measure(url: str) -> dict[str, Any]:
+        # 初回のみのインポートや初期化の時間を含めないよう、1回空実行する
+        await run_manager(url, 1, 300)
+        return {
+            "per_request": await run_per_request(url, requests),
+            "manager": await run_manager(url, requests, 300),
+            "manager_ttl0": await run_manager(url, requests, 0),
+        }
+
+    with BackgroundA2AServer(server) as url:
+        variants = asyncio.run(measure(url))
+    return {
+        "config": {"requests": requests, "latency_s": latency},
+        "variants": variants,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="A2Aクライアントの接続とエージェントカードの使い回しのベンチマーク"
+    )
+    parser.add_argument("--requests", type=int, default=100, help="リクエスト数")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== A2Aクライアントの接続とエージェントカードの使い回しのベンチマーク ===")
+    print(
+        f"ローカルの A2AServer（FakeModel: 最初のトークンまで {args.latency}秒）に"
+        f"{args.requests}件を順に送信\n"
+    )
+    print(
+        f"{'方式':<14}{'平均(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}"
+        f"{'接続':>6}{'カード取得':>10}"
+    )
+    for name, r in results["variants"].items():
+        print(
+            f"{name:<14}{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+            f"{r['connections_opened']:>6}{r['card_fetches']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
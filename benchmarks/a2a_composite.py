@@ -0,0 +1,250 @@
+"""
+a2a_composite.py - リモートのA2Aエージェントを Graph のノードにした場合のベンチマーク
+
+企画 → 調査（trends・cases の2ノードを並列） → 執筆 の Graph を、調査の2ノードを以下で組んで比較する。
+モデルはすべて FakeModel（最初のトークンまで latency 秒、tokens_per_second でストリーミング）。
+
+- local: 同じプロセスの Agent
+- remote: common.a2a_agent.remote_agent()（ローカルの A2A サーバー。1つの A2AClientManager を共有）
+- remote_non_streaming: remote で streaming=False（応答全体がそろってからノードのテキストを返す）
+- remote_no_reuse: remote で実行ごとに A2AClientManager を作る（接続とエージェントカードを使い回さない）
+- remote_timeout: remote で timeout を応答時間より短くする（調査ノードの失敗で Graph が止まるまでの時間）
+
+Graph 全体の所要時間、調査ノードの最初のトークンまでの時間（Graph の開始から）、
+確立した接続数・エージェントカードの取得回数を repeat 回の中央値・合計で比べる。
+
+実行方法:
+    uv run --extra a2a python -m benchmarks.a2a_composite
+    uv run --extra a2a python -m benchmarks.a2a_composite --latency 0.5 --repeat 10 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import statistics
+import time
+from typing import Any
+
+from strands import Agent
+from strands.multiagent.a2a import A2AServer
+from strands.multiagent.base import Status
+
+from common.a2a_agent import remote_agent
+from common.a2a_client import A2AClientManager
+from common.a2a_server import BackgroundA2AServer, build_app, free_port
+from common.events import EventStream
+from common.fake_model import FakeModel
+from common.graph import GraphBuilder
+
+TASK = "「リモートワークの生産性向上」をテーマに記事を作成してください。"
+RESEARCH = ("trends", "cases")
+VARIANTS = (
+    "local",
+    "remote",
+    "remote_non_streaming",
+    "remote_no_reuse",
+    "remote_timeout",
+)
+
+
+def _model(latency: float, tokens_per_second: float) -> FakeModel:
+    return FakeModel(
+        latency=latency, tokens_per_second=tokens_per_second, text_length=100
+    )
+
+
+def _agent(name: str, latency: float, tokens_per_second: float) -> Agent:
+    return Agent(
+        model=_model(latency, tokens_per_second),
+        name=name,
+        description=f"{name}の担当のエージェント",
+        system_prompt=f"あなたは{name}の担当です。",
+        callback_handler=None,
+    )
+
+
+def _server(name: str, latency: float, tokens_per_second: float) -> A2AServer:
+    agent = _agent(name, latency, tokens_per_second)
+    return A2AServer(agent=agent, port=free_port(), enable_a2a_compliant_streaming=True)
+
+
+def _graph(research: dict[str, Agent], latency: float, tokens_per_second: float):
+    builder = GraphBuilder()
+    builder.add_node(_agent("planning", latency, tokens_per_second), "planning")
+    builder.add_node(_agent("writing", latency, tokens_per_second), "writing")
+    for node_id, agent in research.items():
+        builder.add_node(agent, node_id)
+        builder.add_edge("planning", node_id)
+        builder.add_edge(node_id, "writing")
+    builder.set_entry_point("planning")
+    return builder.build()
+
+
+async def _run_once(
+    variant: str,
+    urls: dict[str, str],
+    shared: A2AClientManager,
+    latency: float,
+    tokens_per_second: float,
+    timeout: float,
+) -> dict[str, Any]:
+    """Graph を1回組み立てて実行する"""
+    manager = shared
+    if variant == "remote_no_reuse":
+        manager = A2AClientManager()
+    if variant == "local":
+        research = {n: _agent(n, latency, tokens_per_second) for n in RESEARCH}
+    else:
+        research = {
+            n: remote_agent(
+                urls[n],
+                n,
+                manager=manager,
+                streaming=variant != "remote_non_streaming",
+                timeout=timeout if variant == "remote_timeout" else None,
+            )
+            for n in RESEARCH
+        }
+    stream = EventStream(_graph(research, latency, tokens_per_second), TASK)
+    start = time.perf_counter()
+    completed = False
+    try:
+        async for _event in stream:
+            pass
+        completed = stream.result.status == Status.COMPLETED
+    except TimeoutError:
+        # リモートの応答が timeout 秒で終わらず、調査ノードの失敗で Graph が止まった
+        pass
+    total_ms = (time.perf_counter() - start) * 1000
+    if manager is not shared:
+        await manager.aclose()
+    by_node = stream.stats.first_token_by_node
+    first_tokens = [by_node[n] for n in RESEARCH if n in by_node]
+    return {
+        "total_ms": total_ms,
+        "research_first_token_ms": min(first_tokens) if first_tokens else None,
+        "completed": completed,
+        "stats": manager.stats() if variant != "local" else {},
+    }
+
+
+def _summary(samples: list[dict[str, Any]], stats: dict[str, Any]) -> dict[str, Any]:
+    first_tokens = [
+        s["research_first_token_ms"]
+        for s in samples
+        if s["research_first_token_ms"] is not None
+    ]
+    return {
+        "total_p50_ms": round(statistics.median(s["total_ms"] for s in samples), 1),
+        "research_first_token_p50_ms": (
+            round(statistics.median(first_tokens), 1) if first_tokens else None
+        ),
+        "completed": sum(s["completed"] for s in samples),
+        "connections_opened": sum(s.get("connections_opened", 0) for s in stats),
+        "card_fetches": sum(s.get("card_fetches", 0) for s in stats),
+    }
+
+
+def run(
+    variants: list[str],
+    latency: float,
+    tokens_per_second: float,
+    repeat: int,
+    timeout: float,
+) -> dict[str, Any]:
+    """各方式を repeat 回ずつ実行する"""
+
+    async def measure(urls: dict[str, str]) -> dict[str, Any]:
+        results = {}
+        for variant in variants:
+            async with A2AClientManager() as shared:
+                samples = []
+                no_reuse_stats = []
+                for _ in range(repeat):
+                    sample = await _run_once(
+                        variant, urls, shared, latency, tokens_per_second, timeout
+                    )
+                    samples.append(sample)
+                    if variant == "remote_no_reuse":
+                        no_reuse_stats.extend(sample["stats"].values())
+                if variant == "remote_no_reuse":
+                    stats = no_reuse_stats
+                else:
+                    stats = list(shared.stats().values())
+            results[variant] = _summary(samples, stats)
+        return results
+
+    with contextlib.ExitStack() as stack:
+        urls = {}
+        for name in RESEARCH:
+            server = _server(name, latency, tokens_per_second)
+            urls[name] = stack.enter_context(
+                BackgroundA2AServer(server, app=build_app(server))
+            )
+        variant_results = asyncio.run(measure(urls))
+    return {
+        "config": {
+            "latency_s": latency,
+            "tokens_per_second": tokens_per_second,
+            "repeat": repeat,
+            "timeout_s": timeout,
+        },
+        "variants": variant_results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="リモートのA2Aエージェントを Graph のノードにした場合のベンチマーク"
+    )
+    parser.add_argument(
+        "--variants", default=",".join(VARIANTS), help="比較する方式（カンマ区切り）"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.3, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=100, help="ストリーミング速度"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="各方式の実行回数")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=0.5,
+        help="remote_timeout でのリモートの応答の上限（秒）",
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(
+        args.variants.split(","),
+        args.latency,
+        args.tokens_per_second,
+        args.repeat,
+        args.timeout,
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== リモートのA2Aエージェントを Graph のノードにした場合のベンチマーク ===")
+    print(
+        f"FakeModel: 最初のトークンまで {args.latency}秒、"
+        f"{args.tokens_per_second}トークン/秒、{args.repeat}回の中央値\n"
+    )
+    print(
+        f"{'方式':<22}{'全体(ms)':>10}{'調査TTFT(ms)':>14}{'完了':>6}"
+        f"{'接続':>6}{'カード取得':>10}"
+    )
+    for name, r in results["variants"].items():
+        ttft = r["research_first_token_p50_ms"]
+        print(
+            f"{name:<22}{r['total_p50_ms']:>10}{ttft if ttft is not None else '-':>14}"
+            f"{r['completed']:>6}{r['connections_opened']:>6}{r['card_fetches']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+a2a_gateway.py - 複数のA2Aサーバー（レプリカ）への負荷分散のベンチマーク
+
+同じエージェントカードを持つレプリカをローカルで起動し、一部に遅延を注入する。
+
+- fast: 通常のレプリカ（stall_rate の確率で応答が stall 秒止まる）
+- slow: 全ての応答が slow_delay 秒遅れるレプリカ
+- down: 途中で停止するレプリカ（停止後は接続できない）
+
+concurrency 件を同時に送り続ける（1件返るたびに次を送る）クライアントで requests 件を送り、
+common.a2a_gateway.A2AGateway の方式ごとに p50・p95・p99・失敗数・レプリカごとの件数を比較する。
+
+- single: 1つ目のレプリカのURLに固定で送る（05-a2a のクライアントと同じ）
+- round_robin: 順番に送る（切り離し・ヘッジなし）
+- least_outstanding / p2c: 処理中のリクエストが少ないレプリカに送り、失敗したレプリカを切り離す
+- p2c+hedge: p2c に加え、直近の p90 を過ぎても返らないリクエストを別のレプリカにも送る
+
+実行方法:
+    uv run --extra a2a python -m benchmarks.a2a_gateway
+    uv run --extra a2a python -m benchmarks.a2a_gateway --requests 400 --concurrency 16 --json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import Any
+
+from strands import Agent
+from strands.multiagent.a2a import A2AServer
+
+from common.a2a_client import A2AClientManager
+from common.a2a_gateway import A2AGateway
+from common.a2a_server import BackgroundA2AServer, build_app, free_port
+from common.fake_model import FakeModel
+
+REPLICAS = ("fast", "fast", "fast", "slow", "down")
+PROMPT = "100 + 200 を計算してください"
+
+
+def _inject(app: Any, delay: float, probability: float, seed: int) -> Any:
+    """POST のリクエストを probability の確率で delay 秒止める ASGI アプリで包む"""
+    rng = random.Random(seed)
+
+    async def wrapped(scope: dict, receive: Any, send: Any) -> None:
+        post = scope["type"] == "http" and scope["method"] == "POST"
+        if post and delay and rng.random() < probability:
+            await asyncio.sleep(delay)
+        await app(scope, receive, send)
+
+    return wrapped
+
+
+def _replica(
+    kind: str,
+    index: int,
+    latency: float,
+    stall: float,
+    stall_rate: float,
+    slow_delay: float,
+) -> BackgroundA2AServer:
+    agent = Agent(
+        model=FakeModel(latency=latency),
+        name="CalculatorAgent",
+        description="計算ができるアシスタントエージェント",
+        system_prompt="あなたは計算ができるアシスタントです。",
+        callback_handler=None,
+    )
+    server = A2AServer(agent=agent, port=free_port())
+    if kind == "slow":
+        app = _inject(build_app(server), slow_delay, 1.0, index)
+    else:
+        app = _inject(build_app(server), stall, stall_rate, index)
+    return BackgroundA2AServer(server, app=app)
+
+
+def _summary(
+    latencies: list[float], failed: int, elapsed: float, stats: dict[str, Any]
+) -> dict[str, Any]:
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "succeeded": len(latencies),
+        "failed": failed,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(quantiles[94], 1),
+        "p99_ms": round(quantiles[98], 1),
+        **stats,
+    }
+
+
+async def drive(
+    variant: str,
+    urls: list[str],
+    kinds: list[str],
+    requests: int,
+    concurrency: int,
+    down_after: int,
+    stop_down: Any,
+) -> dict[str, Any]:
+    """variant の方式で requests 件を送る（down_after 件目で down のレプリカを止める）"""
+    latencies: list[float] = []
+    failed = 0
+    sent = 0
+    manager = A2AClientManager(timeout=30)
+    gateway = None
+    if variant != "single":
+        strategy = variant.removesuffix("+hedge")
+        gateway = A2AGateway(
+            urls,
+            manager=manager,
+            strategy=strategy,
+            health_interval=1.0,
+            eject_seconds=10.0,
+            hedge_after="p90" if variant.endswith("+hedge") else None,
+            seed=0,
+        )
+        if strategy == "round_robin":
+            # 比較用に、切り離しをせずに順番に送り続ける
+            gateway.failure_threshold = requests + 1
+            gateway.health_interval = None
+        await gateway.start()
+
+    async def client() -> None:
+        nonlocal sent, failed
+        while sent < requests:
+            sent += 1
+            if sent == down_after:
+                await asyncio.to_thread(stop_down)
+            start = time.perf_counter()
+            try:
+                if gateway is None:
+                    await manager.send(urls[0], PROMPT)
+                else:
+                    await gateway.send(PROMPT)
+            except Exception:  # noqa: BLE001
+                failed += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stats: dict[str, Any] = {}
+    if gateway is not None:
+        gateway_stats = gateway.stats()
+        stats = {
+            "retries": gateway_stats["retries"],
+            "hedges": gateway_stats["hedges"],
+            "per_replica": {
+                f"{kind}#{i}": r["requests"]
+                for i, (kind, r) in enumerate(
+                    zip(kinds, gateway_stats["replicas"].values(), strict=True)
+                )
+            },
+        }
+        await gateway.aclose()
+    await manager.aclose()
+    return _summary(latencies, failed, elapsed, stats)
+
+
+def run(
+    variants: list[str],
+    requests: int,
+    concurrency: int,
+    latency: float,
+    stall: float,
+    stall_rate: float,
+    slow_delay: float,
+) -> dict[str, Any]:
+    """方式ごとにレプリカを起動し直して計測する"""
+    results = {}
+    for variant in variants:
+        servers = [
+            _replica(kind, i, latency, stall, stall_rate, slow_delay)
+            for i, kind in enumerate(REPLICAS)
+        ]
+        urls = [server.start() for server in servers]
+        down = servers[REPLICAS.index("down")]
+        try:
+            results[variant] = asyncio.run(
+                drive(
+                    variant,
+                    urls,
+                    list(REPLICAS),
+                    requests,
+                    concurrency,
+                    requests // 4,
+                    down.stop,
+                )
+            )
+        finally:
+            for server in servers:
+                server.stop()
+    return {
+        "config": {
+            "replicas": list(REPLICAS),
+            "requests": requests,
+            "concurrency": concurrency,
+            "latency_s": latency,
+            "stall_s": stall,
+            "stall_rate": stall_rate,
+            "slow_delay_s": slow_delay,
+        },
+        "variants": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="複数のA2Aサーバー（レプリカ）への負荷分散のベンチマーク"
+    )
+    parser.add_argument(
+        "--variants",
+        default="single,round_robin,least_outstanding,p2c,p2c+hedge",
+        help="比較する方式（カンマ区切り）",
+    )
+    parser.add_argument("--requests", type=int, default=400, help="リクエスト数")
+    parser.add_argument("--concurrency", type=int, default=4, help="同時リクエスト数")
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument(
+        "--stall",
+        type=float,
+        default=1.0,
+        help="fast のレプリカがまれに止まる時間（秒）",
+    )
+    parser.add_argument(
+        "--stall-rate",
+        type=float,
+        default=0.02,
+        help="fast のレプリカが止まる確率",
+    )
+    parser.add_argument(
+        "--slow-delay", type=float, default=0.5, help="slow のレプリカの遅延（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(
+        args.variants.split(","),
+        args.requests,
+        args.concurrency,
+        args.latency,
+        args.stall,
+        args.stall_rate,
+        args.slow_delay,
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== 複数のA2Aサーバー（レプリカ）への負荷分散のベンチマーク ===")
+    print(
+        f"レプリカ: {', '.join(REPLICAS)}（fast は{args.stall_rate:.0%}の確率で{args.stall}秒停止、"
+        f"slow は{args.slow_delay}秒遅延、down は{args.requests // 4}件目で停止）"
+    )
+    print(f"同時 {args.concurrency}件で{args.requests}件を送信\n")
+    print(
+        f"{'方式':<19}{'RPS':>7}{'失敗':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}"
+        f"{'再送':>6}{'ヘッジ':>7}  レプリカごとの件数"
+    )
+    for name, r in results["variants"].items():
+        per_replica = " ".join(str(n) for n in r.get("per_replica", {}).values())
+        print(
+            f"{name:<19}{r['rps']:>7}{r['failed']:>6}{r['p50_ms']:>10}"
+            f"{r['p95_ms']:>10}{r['p99_ms']:>10}{r.get('retries', '-'):>6}"
+            f"{r.get('hedges', '-'):>7}  {per_replica or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+a2a_load.py - A2Aサーバーのワーカー数ごとの負荷試験
+
+CPU を使う同期のツール（指定したミリ秒だけ GIL を握って計算する）を持つエージェントを、
+common.a2a_server のサーバー（python -m common.a2a_server）として別プロセスで起動し、
+同時に concurrency 件のリクエストを送り続ける（1件返るたびに次を送る）。
+スループット（RPS）と成功したリクエストの p50・p95・p99、429 とその他のエラーの件数を比較する。
+
+- shared: A2AServer.serve() と同じく1つの Agent を共有する（同時のリクエストはエラーになる）
+- workers=N: リクエストごとに AgentPool の Agent を使い、N 個のワーカープロセスで処理する
+- saturated: 1ワーカーで同時実行数と待ち行列を小さくし、あふれたリクエストに 429 を返す
+
+ワーカー数による改善はCPUのコア数が上限になる（結果の cpu_count を参照）。
+
+実行方法:
+    uv run --extra a2a python -m benchmarks.a2a_load
+    uv run --extra a2a python -m benchmarks.a2a_load --workers 1,2,4,8 --concurrency 64 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+from a2a.client.errors import A2AClientHTTPError
+from strands import Agent, tool
+from strands.multiagent.a2a import A2AServer
+
+from common.a2a_client import A2AClientManager
+from common.a2a_server import free_port
+from common.models import get_model
+
+ROOT = Path(__file__).resolve().parent.parent
+TOOL_MS_ENV = "A2A_LOAD_TOOL_MS"
+
+
+@tool
+def checksum(text: str) -> str:
+    """テキストのチェックサムを計算します。
+
+    Args:
+        text: チェックサムを計算するテキスト
+
+    Returns:
+        チェックサム
+    """
+    # CPU を使うツール（calculate の eval のような処理）を模擬する
+    end = time.perf_counter() + float(os.getenv(TOOL_MS_ENV, "5")) / 1000
+    value = 0
+    while time.perf_counter() < end:
+        for char in text:
+            value = (value * 31 + ord(char)) % 1_000_000_007
+    return str(value)
+
+
+def load_server() -> A2AServer:
+    """負荷試験用のサーバー（python -m common.a2a_server benchmarks.a2a_load:load_server）"""
+    agent = Agent(
+        model=get_model(),
+        name="ChecksumAgent",
+        description="テキストのチェックサムを計算するエージェント",
+        system_prompt="あなたはchecksumツールでチェックサムを計算するアシスタントです。",
+        tools=[checksum],
+        callback_handler=None,
+    )
+    return A2AServer(agent=agent)
+
+
+def start_server(
+    port: int, workers: int, options: list[str], env: dict[str, str]
+) -> subprocess.Popen:
+    """サーバーを別プロセスで起動し、エージェントカードを返すまで待つ"""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "common.a2a_server",
+            "benchmarks.a2a_load:load_server",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            *options,
+        ],
+        cwd=ROOT,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    url = f"http://127.0.0.1:{port}/.well-known/agent-card.json"
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("A2A server exited during startup")
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return process
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("A2A server did not start in time")
+
+
+async def drive(url: str, concurrency: int, duration: float) -> dict[str, Any]:
+    """concurrency 件を同時に送り続け、duration 秒の結果を集計する"""
+    latencies: list[float] = []
+    rejected = 0
+    errors = 0
+
+    async with A2AClientManager(max_keepalive_connections=concurrency) as manager:
+        await manager.get_card(url)
+        deadline = time.perf_counter() + duration
+
+        async def client(index: int) -> None:
+            nonlocal rejected, errors
+            count = 0
+            while time.perf_counter() < deadline:
+                count += 1
+                start = time.perf_counter()
+                try:
+                    await manager.send(url, f"client {index} request {count}")
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except A2AClientHTTPError as e:
+                    if e.status_code != 429:
+                        errors += 1
+                        continue
+                    rejected += 1
+                    await asyncio.sleep(0.05)
+                except Exception:  # noqa: BLE001
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    result: dict[str, Any] = {
+        "succeeded": len(latencies),
+        "rejected_429": rejected,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+    }
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        result.update(
+            p50_ms=round(statistics.median(latencies), 1),
+            p95_ms=round(quantiles[94], 1),
+            p99_ms=round(quantiles[98], 1),
+        )
+    return result
+
+
+def run_variant(
+    workers: int,
+    options: list[str],
+    concurrency: int,
+    duration: float,
+    env: dict[str, str],
+) -> dict[str, Any]:
+    """サーバーを起動して負荷をかけ、停止する"""
+    port = free_port()
+    process = start_server(port, workers, options, env)
+    try:
+        return {
+            "workers": workers,
+            **asyncio.run(drive(f"http://127.0.0.1:{port}", concurrency, duration)),
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(
+    worker_counts: list[int],
+    concurrency: int,
+    duration: float,
+    latency: float,
+    tool_ms: float,
+) -> dict[str, Any]:
+    """全ての構成で負荷試験を行う"""
+    env = {
+        "MODEL_PROVIDER": "fake",
+        "FAKE_MODEL_LATENCY": str(latency),
+        TOOL_MS_ENV: str(tool_ms),
+    }
+    limit = ["--max-concurrency", str(concurrency), "--max-queue", str(concurrency)]
+    variants = {
+        "shared": run_variant(
+            1, ["--shared-agent", *limit], concurrency, duration, env
+        ),
+    }
+    for workers in worker_counts:
+        variants[f"workers={workers}"] = run_variant(
+            workers, limit, concurrency, duration, env
+        )
+    small = max(concurrency // 8, 1)
+    variants["saturated"] = run_variant(
+        1,
+        ["--max-concurrency", str(small), "--max-queue", str(small)],
+        concurrency,
+        duration,
+        env,
+    )
+    return {
+        "config": {
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "latency_s": latency,
+            "tool_ms": tool_ms,
+            "cpu_count": os.cpu_count(),
+        },
+        "variants": variants,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="A2Aサーバーのワーカー数ごとの負荷試験"
+    )
+    parser.add_argument("--workers", default="1,2,4", help="ワーカー数（カンマ区切り）")
+    parser.add_argument("--concurrency", type=int, default=32, help="同時リクエスト数")
+    parser.add_argument("--duration", type=float, default=5.0, help="計測時間（秒）")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument(
+        "--tool-ms", type=float, default=5.0, help="ツール1回のCPU時間（ミリ秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    worker_counts = [int(n) for n in args.workers.split(",")]
+    results = run(
+        worker_counts, args.concurrency, args.duration, args.latency, args.tool_ms
+    )
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    config = results["config"]
+    print("=== A2Aサーバーのワーカー数ごとの負荷試験 ===")
+    print(
+        f"同時 {args.concurrency}件 × {args.duration}秒、FakeModel: 最初のトークンまで "
+        f"{args.latency}秒、ツール {args.tool_ms}ms、CPU {config['cpu_count']}コア\n"
+    )
+    print(
+        f"{'構成':<12}{'RPS':>8}{'成功':>7}{'429':>6}{'エラー':>7}"
+        f"{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}"
+    )
+    for name, r in results["variants"].items():
+        print(
+            f"{name:<12}{r['rps']:>8}{r['succeeded']:>7}{r['rejected_429']:>6}"
+            f"{r['errors']:>7}{r.get('p50_ms', '-'):>10}{r.get('p95_ms', '-'):>10}"
+            f"{r.get('p99_ms', '-'):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
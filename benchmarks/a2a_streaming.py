@@ -0,0 +1,171 @@
+"""
+a2a_streaming.py - A2Aの応答の最初のテキストまでの時間（TTFT）のベンチマーク
+
+ゆっくりストリーミングする FakeModel のエージェントをローカルの A2A サーバー（common.a2a_server.build_app）で
+起動し、同じプロンプトを以下の方式で順に送って比較する。
+
+- non_streaming: ClientConfig(streaming=False) で応答全体を待つ（05-a2a のクライアントの従来の方式）
+- artifact: stream_text() で A2A 準拠のアーティファクト更新（enable_a2a_compliant_streaming=True）を受け取る
+- status: stream_text() で strands の既定のステータス更新を受け取る
+
+TTFT（最初のテキストを受け取るまでの時間）・全体の所要時間・差分の件数を計測し、
+差分をつなげたテキストがストリーミングなしの応答と一致することを確認する。
+
+実行方法:
+    uv run --extra a2a python -m benchmarks.a2a_streaming
+    uv run --extra a2a python -m benchmarks.a2a_streaming --latency 0.5 --tokens-per-second 20 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import statistics
+import time
+import warnings
+from typing import Any
+
+from strands import Agent
+from strands.multiagent.a2a import A2AServer
+
+from common.a2a_client import A2AClientManager
+from common.a2a_server import BackgroundA2AServer, build_app, free_port
+from common.fake_model import FakeModel
+
+PROMPT = "A2Aプロトコルについて説明してください"
+
+
+def _server(latency: float, tokens_per_second: float, compliant: bool) -> A2AServer:
+    model = FakeModel(
+        latency=latency, tokens_per_second=tokens_per_second, text_length=300
+    )
+    agent = Agent(
+        model=model,
+        name="ExplainerAgent",
+        description="質問に答えるエージェント",
+        system_prompt="あなたは質問に答えるアシスタントです。",
+        callback_handler=None,
+    )
+    return A2AServer(
+        agent=agent, port=free_port(), enable_a2a_compliant_streaming=compliant
+    )
+
+
+async def _measure(
+    manager: A2AClientManager, url: str, streaming: bool
+) -> dict[str, Any]:
+    start = time.perf_counter()
+    ttft = None
+    deltas = []
+    if streaming:
+        async for text in manager.stream_text(url, PROMPT):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            deltas.append(text)
+    else:
+        deltas.append(await manager.send(url, PROMPT))
+        ttft = time.perf_counter() - start
+    return {
+        "ttft_ms": (ttft or 0) * 1000,
+        "total_ms": (time.perf_counter() - start) * 1000,
+        "deltas": len(deltas),
+        "text": "".join(deltas),
+    }
+
+
+def _summary(samples: list[dict[str, Any]], expected: str) -> dict[str, Any]:
+    return {
+        "ttft_p50_ms": round(statistics.median(s["ttft_ms"] for s in samples), 1),
+        "total_p50_ms": round(statistics.median(s["total_ms"] for s in samples), 1),
+        "deltas": samples[-1]["deltas"],
+        "matches_non_streaming": all(
+            s["text"].strip() == expected.strip() for s in samples
+        ),
+    }
+
+
+def run(latency: float, tokens_per_second: float, repeat: int) -> dict[str, Any]:
+    """各方式を repeat 回ずつ実行する"""
+    artifact = _server(latency, tokens_per_second, compliant=True)
+    status = _server(latency, tokens_per_second, compliant=False)
+
+    async def measure(artifact_url: str, status_url: str) -> dict[str, Any]:
+        samples: dict[str, list[dict[str, Any]]] = {
+            "non_streaming": [],
+            "artifact": [],
+            "status": [],
+        }
+        async with A2AClientManager() as manager:
+            # 接続とカードの取得を計測に含めないよう、1回ずつ空実行する
+            await manager.send(artifact_url, PROMPT)
+            await manager.send(status_url, PROMPT)
+            for _ in range(repeat):
+                samples["non_streaming"].append(
+                    await _measure(manager, artifact_url, streaming=False)
+                )
+                samples["artifact"].append(
+                    await _measure(manager, artifact_url, streaming=True)
+                )
+                samples["status"].append(
+                    await _measure(manager, status_url, streaming=True)
+                )
+        expected = samples["non_streaming"][-1]["text"]
+        return {name: _summary(s, expected) for name, s in samples.items()}
+
+    with warnings.catch_warnings():
+        # strands の既定のストリーミングが A2A 準拠でないことの警告
+        warnings.simplefilter("ignore", UserWarning)
+        with contextlib.ExitStack() as stack:
+            artifact_url = stack.enter_context(
+                BackgroundA2AServer(artifact, app=build_app(artifact))
+            )
+            status_url = stack.enter_context(
+                BackgroundA2AServer(status, app=build_app(status))
+            )
+            variants = asyncio.run(measure(artifact_url, status_url))
+    return {
+        "config": {
+            "latency_s": latency,
+            "tokens_per_second": tokens_per_second,
+            "repeat": repeat,
+        },
+        "variants": variants,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="A2Aの応答の最初のテキストまでの時間（TTFT）のベンチマーク"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.3, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=100, help="ストリーミング速度"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="各方式の実行回数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.latency, args.tokens_per_second, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== A2Aの応答の最初のテキストまでの時間（TTFT）のベンチマーク ===")
+    print(
+        f"FakeModel: 最初のトークンまで {args.latency}秒、"
+        f"{args.tokens_per_second}トークン/秒、{args.repeat}回の中央値\n"
+    )
+    print(f"{'方式':<15}{'TTFT(ms)':>10}{'全体(ms)':>10}{'差分':>6}  一致")
+    for name, r in results["variants"].items():
+        match = "○" if r["matches_non_streaming"] else "×"
+        print(
+            f"{name:<15}{r['ttft_p50_ms']:>10}{r['total_p50_ms']:>10}"
+            f"{r['deltas']:>6}  {match}"
+        )
+
+
+if __name__ == "__main__":
+    main()
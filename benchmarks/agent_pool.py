@@ -0,0 +1,135 @@
+"""
+agent_pool.py - 専門家エージェントのプールのベンチマーク
+
+ツール呼び出しごとに Agent を生成する従来方式と、AgentPool で使い回す方式を比較する。
+モデルは待ち時間なしの FakeModel を使い、1回の専門家呼び出しにかかる
+エージェント生成・実行のオーバーヘッドだけを計測する。
+並列のツール呼び出しを想定し、複数スレッドから同時に呼び出した場合も計測する。
+
+実行方法:
+    uv run python -m benchmarks.agent_pool
+    uv run python -m benchmarks.agent_pool --calls 500 --threads 8 --json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from strands import Agent, tool
+from strands.agent.conversation_manager import NullConversationManager
+
+from common.agent_pool import AgentPool
+from common.fake_model import FakeModel
+
+SYSTEM_PROMPT = """あなたは数学の専門家です。
+数学的な問題を正確に解き、わかりやすく解説してください。"""
+
+
+@tool
+def calculator(expression: str) -> str:
+    """数式を計算します。
+
+    Args:
+        expression: 計算する数式
+    """
+    return expression
+
+
+@tool
+def unit_converter(value: float, unit: str) -> str:
+    """単位を変換します。
+
+    Args:
+        value: 変換する値
+        unit: 変換先の単位
+    """
+    return f"{value} {unit}"
+
+
+TOOLS = [calculator, unit_converter]
+
+
+def _measure(call: Callable[[str], str], calls: int, threads: int) -> dict[str, float]:
+    """call を calls 回実行し、1回あたりの時間とスループットを返す"""
+    timings: list[float] = []
+
+    def timed(i: int) -> None:
+        start = time.perf_counter()
+        call(f"質問{i}")
+        timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(timed, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "per_call_p50_ms": round(statistics.median(timings), 3),
+        "per_call_mean_ms": round(statistics.fmean(timings), 3),
+        "calls_per_sec": round(calls / elapsed, 1),
+    }
+
+
+def run(calls: int, threads: int) -> dict[str, Any]:
+    """両方式のベンチマークを実行する"""
+    model = FakeModel(text_length=20)
+    agent_kwargs = {
+        "callback_handler": None,
+        "conversation_manager": NullConversationManager(),
+    }
+
+    def fresh(question: str) -> str:
+        agent = Agent(
+            model=model, system_prompt=SYSTEM_PROMPT, tools=TOOLS, **agent_kwargs
+        )
+        return str(agent(question))
+
+    pool = AgentPool(model)
+
+    def pooled(question: str) -> str:
+        return pool.run(question, SYSTEM_PROMPT, TOOLS, **agent_kwargs)
+
+    results: dict[str, Any] = {}
+    for workers in sorted({1, threads}):
+        results[f"fresh_agent_x{workers}"] = _measure(fresh, calls, workers)
+        pool.clear()
+        results[f"pooled_x{workers}"] = _measure(pooled, calls, workers)
+    results["pool_stats"] = pool.stats.to_dict()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="専門家エージェントのプールのベンチマーク"
+    )
+    parser.add_argument("--calls", type=int, default=200, help="各方式の呼び出し回数")
+    parser.add_argument(
+        "--threads", type=int, default=4, help="並列呼び出し時のスレッド数"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.calls, args.threads)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=== 専門家エージェントのプールのベンチマーク ===")
+    print(f"呼び出し回数: {args.calls}（待ち時間なしの FakeModel で計測）\n")
+    print(f"{'方式':<18}{'p50(ms)':>10}{'平均(ms)':>10}{'呼出/秒':>10}")
+    for name, r in results.items():
+        if name == "pool_stats":
+            continue
+        print(
+            f"{name:<18}{r['per_call_p50_ms']:>10}{r['per_call_mean_ms']:>10}{r['calls_per_sec']:>10}"
+        )
+    print(f"\nプール統計: {results['pool_stats']}")
+
+
+if __name__ == "__main__":
+    main()
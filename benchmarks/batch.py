@@ -0,0 +1,197 @@
+"""
+batch.py - プロンプトの一括実行のベンチマーク
+
+同時に max_concurrency 件を超える呼び出しをスロットリングする FakeModel（スタブ）に対して、
+common.batch.BatchRunner で独立したプロンプトを一括実行し、以下を比較する。
+
+- sequential: 1件ずつ実行する（件数を 1/10 にして計測）
+- fixed: 同時実行数 64、送信レートは固定（スロットリングされても再試行するだけ）
+- adaptive: 同時実行数 64、AdaptiveRateLimiter で送信レートを調整する
+- matched: 同時実行数をスタブの上限に合わせ、AdaptiveRateLimiter を使う
+
+モデル呼び出し回数はスロットリングされた呼び出しも含む。
+
+さらに adaptive の実行を途中で打ち切り、同じチェックポイントで再実行して、
+飛ばした件数と再実行でのモデル呼び出し回数を確認する。
+
+実行方法:
+    uv run python -m benchmarks.batch
+    uv run python -m benchmarks.batch --prompts 2000 --model-concurrency 32 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from common.agent_pool import AgentPool
+from common.batch import AdaptiveRateLimiter, BatchRunner, read_jsonl
+from common.fake_model import FakeModel
+
+SYSTEM_PROMPT = "あなたは翻訳者です。与えられたテキストを英語に翻訳してください。"
+
+
+def _prompts(count: int) -> list[dict[str, Any]]:
+    return [
+        {"id": f"q{i}", "prompt": f"「ありがとうございます #{i}」を翻訳してください。"}
+        for i in range(count)
+    ]
+
+
+def _runner(
+    model: FakeModel, concurrency: int, rate_limiter: AdaptiveRateLimiter
+) -> BatchRunner:
+    return BatchRunner(
+        SYSTEM_PROMPT,
+        pool=AgentPool(model, max_size=concurrency),
+        max_concurrency=concurrency,
+        rate_limiter=rate_limiter,
+        max_retries=8,
+        base_delay=0.1,
+        max_delay=2.0,
+    )
+
+
+def run_variant(
+    name: str, prompts: int, model_concurrency: int, latency: float, workdir: Path
+) -> dict[str, Any]:
+    """1つの方式でプロンプトを一括実行する"""
+    model = FakeModel(
+        latency=latency, text_length=60, max_concurrency=model_concurrency
+    )
+    if name == "sequential":
+        prompts = max(1, prompts // 10)
+        runner = _runner(model, 1, AdaptiveRateLimiter(1000, min_rate=1000))
+    elif name == "fixed":
+        runner = _runner(model, 64, AdaptiveRateLimiter(1000, min_rate=1000))
+    elif name == "adaptive":
+        runner = _runner(model, 64, AdaptiveRateLimiter(50))
+    else:
+        runner = _runner(model, model_concurrency, AdaptiveRateLimiter(50))
+
+    output = workdir / f"{name}.jsonl"
+    stats = runner.run(_prompts(prompts), output)
+    return {
+        "prompts": prompts,
+        **stats.to_dict(),
+        "model_calls": model.stats.invocations + model.stats.throttled,
+        "final_rate": round(runner.rate_limiter.rate, 1),
+        "output_lines": sum(1 for _ in read_jsonl(output)),
+    }
+
+
+def run_resume(
+    prompts: int, model_concurrency: int, latency: float, workdir: Path
+) -> dict[str, Any]:
+    """途中で打ち切った一括実行を、チェックポイントから再開する"""
+    model = FakeModel(
+        latency=latency, text_length=60, max_concurrency=model_concurrency
+    )
+    items = _prompts(prompts)
+    output, checkpoint = workdir / "resume.jsonl", workdir / "resume.ckpt"
+
+    # 全体の半分ほどの時間で打ち切る
+    expected = prompts * latency / model_concurrency
+    first = _runner(model, model_concurrency, AdaptiveRateLimiter(50))
+
+    async def interrupted() -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(
+                first.run_async(items, output, checkpoint), expected / 2
+            )
+
+    asyncio.run(interrupted())
+    first_calls = model.stats.invocations + model.stats.throttled
+
+    second = _runner(model, model_concurrency, AdaptiveRateLimiter(50))
+    start = time.perf_counter()
+    stats = second.run(items, output, checkpoint)
+    resumed_s = time.perf_counter() - start
+
+    ids = [row["id"] for row in read_jsonl(output) if "output" in row]
+    return {
+        "prompts": prompts,
+        "first_run_succeeded": first.stats.succeeded,
+        "first_run_model_calls": first_calls,
+        "skipped": stats.skipped,
+        "resumed_succeeded": stats.succeeded,
+        "resumed_model_calls": (
+            model.stats.invocations + model.stats.throttled - first_calls
+        ),
+        "resumed_s": round(resumed_s, 2),
+        "unique_outputs": len(set(ids)),
+        "duplicate_outputs": len(ids) - len(set(ids)),
+    }
+
+
+def run(prompts: int, model_concurrency: int, latency: float) -> dict[str, Any]:
+    """全ての方式と再開を実行する"""
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        return {
+            "config": {
+                "prompts": prompts,
+                "model_concurrency": model_concurrency,
+                "latency_s": latency,
+            },
+            "variants": {
+                name: run_variant(name, prompts, model_concurrency, latency, workdir)
+                for name in ("sequential", "fixed", "adaptive", "matched")
+            },
+            "resume": run_resume(prompts, model_concurrency, latency, workdir),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="プロンプトの一括実行のベンチマーク")
+    parser.add_argument("--prompts", type=int, default=1000, help="プロンプト数")
+    parser.add_argument(
+        "--model-concurrency",
+        type=int,
+        default=16,
+        help="スタブがスロットリングせずに処理できる同時呼び出し数",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="スタブの応答までの待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.prompts, args.model_concurrency, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== プロンプトの一括実行のベンチマーク ===")
+    print(
+        f"スタブ: 同時 {args.model_concurrency} 件を超えるとスロットリング、"
+        f"待ち時間 {args.latency} 秒\n"
+    )
+    print(
+        f"{'方式':<12}{'件数':>6}{'成功':>6}{'失敗':>5}{'件/秒':>8}"
+        f"{'呼出':>7}{'制限':>6}{'再試行':>7}{'最終レート':>10}"
+    )
+    for name, r in results["variants"].items():
+        print(
+            f"{name:<12}{r['prompts']:>6}{r['succeeded']:>6}{r['failed']:>5}"
+            f"{r['throughput']:>8}{r['model_calls']:>7}{r['throttled']:>6}"
+            f"{r['retries']:>7}{r['final_rate']:>10}"
+        )
+    r = results["resume"]
+    print(
+        f"\n再開: 1回目 {r['first_run_succeeded']}件成功（{r['first_run_model_calls']}回呼出）で打ち切り → "
+        f"再実行で {r['skipped']}件を飛ばし {r['resumed_succeeded']}件成功"
+        f"（{r['resumed_model_calls']}回呼出、{r['resumed_s']}秒）"
+    )
+    print(
+        f"出力: {r['unique_outputs']}/{r['prompts']}件、重複 {r['duplicate_outputs']}件"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+concurrency.py - 同時リクエスト数とスループットのベンチマーク
+
+06-composite/03_full_composite.py のパイプライン（企画 Swarm → 調査 → 執筆 → レビュー Swarm）を、
+レイテンシを注入した FakeModel（MODEL_PROVIDER=fake）で同時実行数を変えながら実行し、
+以下の2通りのスループット・所要時間・スレッド数を比較する。
+
+- threads: 同時実行数と同じワーカー数のスレッドプールで、同期の graph(task) を呼ぶ
+  （strands は同期呼び出しのたびにイベントループ用のスレッドをもう1つ使う）
+- async: common.runner.RequestRunner で、1つのイベントループから invoke_async を呼ぶ
+
+どちらもリクエストごとに build_pipeline() で Graph を組み立てる。
+リクエスト数は同時実行数の2倍（最低4件）。
+
+FakeModel ではモデルの待ち時間以外は strands のイベント処理の CPU 時間だけになるため、
+同時実行数を増やすとどちらも同じところ（GIL）で頭打ちになる。
+async の違いは、同時実行数を増やしてもスレッド数が増えない点に現れる。
+
+実行方法:
+    uv run python -m benchmarks.concurrency
+    uv run python -m benchmarks.concurrency --levels 1,10,100,300 --latency 0.2 --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import runpy
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Self
+
+from common.models import clear_models, get_model
+from common.response_cache import get_response_cache
+from common.runner import RequestRunner
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = ROOT / "06-composite/03_full_composite.py"
+
+
+def _task(index: int) -> str:
+    # 調査の専門家の応答キャッシュが効かないよう、リクエストごとにテーマを変える
+    return f"「リモートワークの生産性向上 #{index}」をテーマに記事を作成してください。"
+
+
+class ThreadSampler:
+    """実行中のスレッド数の最大値を記録する"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _run_threads(
+    build: Callable[[], Any], concurrency: int, requests: int
+) -> list[float]:
+    def handle(index: int) -> float:
+        start = time.perf_counter()
+        build()(_task(index))
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(handle, range(requests)))
+
+
+def _run_async(
+    build: Callable[[], Any], concurrency: int, requests: int
+) -> list[float]:
+    runner = RequestRunner(build, max_concurrency=concurrency)
+    results = runner.run(_task(index) for index in range(requests))
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        raise errors[0]
+    return runner.stats.latencies_ms
+
+
+def measure(
+    mode: str, build: Callable[[], Any], concurrency: int, requests: int
+) -> dict[str, Any]:
+    """1つの方式・同時実行数で requests 件を処理する"""
+    get_response_cache().clear()
+    model = get_model()
+    calls_before = model.stats.invocations
+    run = _run_threads if mode == "threads" else _run_async
+    with ThreadSampler() as sampler, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        latencies = run(build, concurrency, requests)
+        elapsed = time.perf_counter() - start
+    return {
+        "requests": requests,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(sorted(latencies)[int(0.95 * (len(latencies) - 1))], 1),
+        "peak_threads": sampler.peak,
+        "model_calls": model.stats.invocations - calls_before,
+    }
+
+
+def run(levels: list[int], latency: float, tokens_per_second: float) -> dict[str, Any]:
+    """同時実行数ごとに threads / async を実行する"""
+    os.environ["MODEL_PROVIDER"] = "fake"
+    os.environ["FAKE_MODEL_LATENCY"] = str(latency)
+    os.environ["FAKE_MODEL_TPS"] = str(tokens_per_second)
+    clear_models()
+    with contextlib.redirect_stdout(io.StringIO()):
+        build = runpy.run_path(str(SCRIPT), run_name="composite_pipeline")[
+            "build_pipeline"
+        ]
+        # 初回のみのインポートや初期化の時間を含めないよう、1回空実行する
+        build()(_task(-1))
+
+    return {
+        "config": {"latency_s": latency, "tokens_per_second": tokens_per_second},
+        "levels": {
+            concurrency: {
+                mode: measure(mode, build, concurrency, max(4, concurrency * 2))
+                for mode in ("threads", "async")
+            }
+            for concurrency in levels
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="同時リクエスト数とスループットのベンチマーク"
+    )
+    parser.add_argument(
+        "--levels", default="1,10,50,100,200", help="同時実行数（カンマ区切り）"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=0,
+        help="FakeModel のストリーミング速度（0で無制限）",
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",")]
+    results = run(levels, args.latency, args.tokens_per_second)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== 同時リクエスト数とスループットのベンチマーク ===")
+    print(
+        f"FakeModel: 最初のトークンまで {args.latency}秒、"
+        f"{args.tokens_per_second or '無制限'} トークン/秒\n"
+    )
+    print(
+        f"{'同時実行':>8}  {'方式':<8}{'件数':>6}{'req/s':>8}"
+        f"{'p50(ms)':>10}{'p95(ms)':>10}{'スレッド':>9}{'呼出':>7}"
+    )
+    for concurrency, modes in results["levels"].items():
+        for mode, r in modes.items():
+            print(
+                f"{concurrency:>8}  {mode:<8}{r['requests']:>6}{r['throughput_rps']:>8}"
+                f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['peak_threads']:>9}"
+                f"{r['model_calls']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+fanout.py - 専門家エージェントの並列呼び出しのベンチマーク
+
+3人の専門家（応答までの待ち時間がそれぞれ異なる FakeModel）に同じ質問をする場合の
+所要時間を、順番に呼び出す方式と fan_out() で並列に呼び出す方式で比較する。
+並列方式の所要時間は、最も遅い専門家の所要時間に近くなる。
+
+実行方法:
+    uv run python -m benchmarks.fanout
+    uv run python -m benchmarks.fanout --latencies 0.2 0.4 0.6 0.8 --json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from common.agent_pool import AgentPool
+from common.fake_model import FakeModel
+from common.fanout import fan_out
+
+
+def _measure(run: Callable[[], list[str]], repeat: int) -> float:
+    """run を repeat 回実行し、所要時間の中央値（ミリ秒）を返す"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 1)
+
+
+def run(latencies: list[float], repeat: int) -> dict[str, Any]:
+    """順次呼び出しと並列呼び出しの所要時間を計測する"""
+    experts = [
+        (
+            AgentPool(FakeModel(latency=latency, text_length=50)),
+            f"あなたは専門家{i}です。",
+        )
+        for i, latency in enumerate(latencies)
+    ]
+    calls = [
+        lambda pool=pool, prompt=prompt: pool.run("質問", prompt, callback_handler=None)
+        for pool, prompt in experts
+    ]
+
+    return {
+        "experts": len(latencies),
+        "latencies_s": latencies,
+        "sequential_ms": _measure(lambda: [call() for call in calls], repeat),
+        "fan_out_ms": _measure(lambda: fan_out(calls), repeat),
+        "slowest_expert_ms": _measure(
+            lambda: [calls[latencies.index(max(latencies))]()], repeat
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="専門家エージェントの並列呼び出しのベンチマーク"
+    )
+    parser.add_argument(
+        "--latencies",
+        type=float,
+        nargs="+",
+        default=[0.3, 0.5, 0.8],
+        help="各専門家の待ち時間（秒）",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="各方式の実行回数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.latencies, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=== 専門家エージェントの並列呼び出しのベンチマーク ===")
+    print(
+        f"専門家: {results['experts']}人（待ち時間 {results['latencies_s']} 秒の FakeModel）\n"
+    )
+    print(f"順次呼び出し:       {results['sequential_ms']:>8} ms")
+    print(f"fan_out（並列）:    {results['fan_out_ms']:>8} ms")
+    print(f"最も遅い専門家のみ: {results['slowest_expert_ms']:>8} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+graph_fanout.py - 横に広い Graph の並列実行のベンチマーク
+
+root → N本の枝（analyze_i → refine_i）→ join という Graph を、
+待ち時間の異なる FakeModel で実行し、以下の方式の所要時間を比較する。
+
+- strands: strands の GraphBuilder（バッチ単位で並列実行）
+- dataflow: common.graph の GraphBuilder（先行ノードが終わり次第実行）
+- max_parallelism=K: 同時実行数を K に制限した dataflow
+- sequential: 同時実行数を 1 に制限した dataflow（順次実行の目安）
+
+analyze と refine の待ち時間を逆順にしているため、バッチ実行では
+「最も遅い analyze + 最も遅い refine」、dataflow では「最も遅い枝」が所要時間の目安になる。
+
+実行方法:
+    uv run python -m benchmarks.graph_fanout
+    uv run python -m benchmarks.graph_fanout --branches 16 --max-parallelism 4 --json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from strands import Agent
+from strands.multiagent.graph import GraphBuilder as StrandsGraphBuilder
+
+from common.fake_model import FakeModel
+from common.graph import GraphBuilder
+
+
+def _latencies(branches: int, max_latency: float) -> list[float]:
+    """枝ごとの待ち時間（max_latency/branches 〜 max_latency の等間隔）"""
+    return [max_latency * (i + 1) / branches for i in range(branches)]
+
+
+def build_graph(builder: StrandsGraphBuilder, branches: int, max_latency: float) -> Any:
+    """root → analyze_i → refine_i → join の Graph を構築する"""
+
+    def agent(name: str, latency: float) -> Agent:
+        return Agent(
+            model=FakeModel(latency=latency, text_length=20),
+            name=name,
+            system_prompt=f"あなたは{name}の担当です。",
+            callback_handler=None,
+        )
+
+    latencies = _latencies(branches, max_latency)
+    builder.add_node(agent("root", 0.0), "root")
+    builder.add_node(agent("join", 0.0), "join")
+    for i, (first, second) in enumerate(zip(latencies, reversed(latencies))):
+        builder.add_node(agent(f"analyze_{i}", first), f"analyze_{i}")
+        builder.add_node(agent(f"refine_{i}", second), f"refine_{i}")
+        builder.add_edge("root", f"analyze_{i}")
+        builder.add_edge(f"analyze_{i}", f"refine_{i}")
+        builder.add_edge(f"refine_{i}", "join")
+    builder.set_entry_point("root")
+    return builder.build()
+
+
+def _measure(make_graph: Callable[[], Any], repeat: int) -> dict[str, Any]:
+    """Graph を repeat 回実行し、所要時間の中央値と最後の実行の計測結果を返す"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        graph = make_graph()
+        start = time.perf_counter()
+        result = graph("分析してください")
+        timings.append((time.perf_counter() - start) * 1000)
+
+    measured: dict[str, Any] = {
+        "makespan_ms": round(statistics.median(timings), 1),
+        "node_executions": len(result.execution_order),
+    }
+    if hasattr(result, "critical_path"):
+        measured["critical_path"] = result.critical_path
+        measured["critical_path_ms"] = result.critical_path_ms
+        measured["peak_parallelism"] = result.peak_parallelism
+    return measured
+
+
+def run(
+    branches: int, max_latency: float, max_parallelism: int, repeat: int
+) -> dict[str, Any]:
+    """各方式で Graph を実行して計測する"""
+
+    def dataflow(limit: int | None) -> Callable[[], Any]:
+        def make() -> Any:
+            builder = GraphBuilder()
+            builder.set_max_parallelism(limit)
+            return build_graph(builder, branches, max_latency)
+
+        return make
+
+    latencies = _latencies(branches, max_latency)
+    return {
+        "branches": branches,
+        "max_latency_s": max_latency,
+        "expected_batch_ms": round((max(latencies) * 2) * 1000, 1),
+        "expected_dataflow_ms": round(
+            max(a + b for a, b in zip(latencies, reversed(latencies))) * 1000, 1
+        ),
+        "methods": {
+            "strands": _measure(
+                lambda: build_graph(StrandsGraphBuilder(), branches, max_latency),
+                repeat,
+            ),
+            "dataflow": _measure(dataflow(None), repeat),
+            f"max_parallelism={max_parallelism}": _measure(
+                dataflow(max_parallelism), repeat
+            ),
+            "sequential": _measure(dataflow(1), repeat),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="横に広い Graph の並列実行のベンチマーク"
+    )
+    parser.add_argument("--branches", type=int, default=8, help="枝の数")
+    parser.add_argument(
+        "--max-latency", type=float, default=0.4, help="最も遅いノードの待ち時間（秒）"
+    )
+    parser.add_argument(
+        "--max-parallelism", type=int, default=4, help="同時実行数を制限する方式の上限"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="各方式の実行回数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.branches, args.max_latency, args.max_parallelism, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== 横に広い Graph の並列実行のベンチマーク ===")
+    print(
+        f"枝: {results['branches']}本（root → analyze_i → refine_i → join、"
+        f"待ち時間は最大 {results['max_latency_s']} 秒）"
+    )
+    print(
+        f"目安: バッチ実行 {results['expected_batch_ms']} ms / "
+        f"dataflow {results['expected_dataflow_ms']} ms\n"
+    )
+    print(f"{'方式':<22}{'所要時間(ms)':>14}{'CP(ms)':>10}{'最大並列':>10}")
+    for name, r in results["methods"].items():
+        print(
+            f"{name:<22}{r['makespan_ms']:>14}"
+            f"{r.get('critical_path_ms', '-'):>10}{r.get('peak_parallelism', '-'):>10}"
+        )
+    dataflow = results["methods"]["dataflow"]
+    print(f"\nクリティカルパス（dataflow）: {' → '.join(dataflow['critical_path'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+graph_payload.py - Graph のノード間で受け渡す出力の量のベンチマーク
+
+コンテンツ制作パイプライン（planning → research → writing → review）を、
+各ノードがそれまでの全ノードの出力を受け取る構成（後ろのノードほど入力が膨らむ）で実行し、
+PayloadPolicy ごとのノード別の入力トークン数と、モデル呼び出し全体のトークン数を比較する。
+
+- none: PayloadPolicy なし（strands と同じ）
+- latest: 直前のノードの出力だけを渡す
+- truncate: 各ノードに渡す出力を予算内に省略する
+- summarize: 予算を超える出力を要約して渡す
+  （要約は別の FakeModel で行い、その呼び出し回数とトークン数は summarizer として別に集計する）
+
+実行方法:
+    uv run python -m benchmarks.graph_payload
+    uv run python -m benchmarks.graph_payload --output-length 3000 --budget 600 --json
+"""
+
+import argparse
+import json
+import time
+from typing import Any
+
+from strands import Agent
+
+from common.fake_model import FakeModel
+from common.graph import GraphBuilder
+from common.payload import PayloadPolicy
+
+STAGES = {
+    "planning": "あなたはコンテンツ企画担当です。",
+    "research": "あなたはリサーチャーです。",
+    "writing": "あなたはライターです。",
+    "review": "あなたは編集者です。",
+}
+
+
+def run_policy(
+    policy: PayloadPolicy | None, output_length: int, latency: float
+) -> dict[str, Any]:
+    """パイプラインを1回実行し、ノード別の入力とモデルの使用量を返す"""
+    model = FakeModel(latency=latency, text_length=output_length)
+    builder = GraphBuilder()
+    for node_id, prompt in STAGES.items():
+        builder.add_node(
+            Agent(model=model, system_prompt=prompt, callback_handler=None), node_id
+        )
+    # 各ノードはそれまでの全ノードの出力を受け取る
+    stages = list(STAGES)
+    for i, to_node in enumerate(stages):
+        for from_node in stages[:i]:
+            builder.add_edge(from_node, to_node)
+    builder.set_entry_point("planning")
+    builder.set_payload_policy(policy)
+
+    start = time.perf_counter()
+    result = builder.build()(
+        "「リモートワークの生産性向上」をテーマに記事を作成してください。"
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+
+    summarizer = policy.summarizer if policy else None
+    return {
+        "elapsed_ms": round(elapsed, 1),
+        "model": model.stats.to_dict(),
+        "summarizer": summarizer.stats.to_dict() if summarizer else None,
+        "saved_tokens": result.saved_tokens,
+        "nodes": [stats.to_dict() for stats in result.payloads],
+    }
+
+
+def run(output_length: int, budget: int, latency: float) -> dict[str, Any]:
+    """各ポリシーでパイプラインを実行する"""
+    policies = {
+        "none": None,
+        "latest": PayloadPolicy(mode="latest"),
+        "truncate": PayloadPolicy(mode="truncate", max_tokens=budget),
+        "summarize": PayloadPolicy(
+            mode="summarize",
+            max_tokens=budget,
+            summarizer=FakeModel(latency=latency, text_length=budget // 4),
+        ),
+    }
+    return {
+        "output_length": output_length,
+        "budget_tokens": budget,
+        "policies": {
+            name: run_policy(policy, output_length, latency)
+            for name, policy in policies.items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Graph のノード間で受け渡す出力の量のベンチマーク"
+    )
+    parser.add_argument(
+        "--output-length", type=int, default=1500, help="各ノードの出力の文字数"
+    )
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=800,
+        help="truncate / summarize の予算（トークン）",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="FakeModel の待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.output_length, args.budget, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== Graph のノード間で受け渡す出力の量のベンチマーク ===")
+    print(
+        f"各ノードの出力: 約{results['output_length']}文字 / "
+        f"予算: {results['budget_tokens']}トークン\n"
+    )
+    for name, r in results["policies"].items():
+        model = r["model"]
+        print(
+            f"[{name}] モデル呼び出し {model['invocations']}回 / "
+            f"入力 {model['input_tokens']} / 出力 {model['output_tokens']} トークン"
+        )
+        if r["summarizer"]:
+            summarizer = r["summarizer"]
+            print(
+                f"  要約: {summarizer['invocations']}回 / 入力 {summarizer['input_tokens']}"
+                f" / 出力 {summarizer['output_tokens']} トークン"
+            )
+        for node in r["nodes"]:
+            print(
+                f"  {node['node_id']:<10}{node['original_tokens']:>7} → "
+                f"{node['sent_tokens']:>6}（削減 {node['saved_tokens']}）"
+            )
+    print()
+    baseline = results["policies"]["none"]["model"]["input_tokens"]
+    for name, r in results["policies"].items():
+        ratio = r["model"]["input_tokens"] / baseline if baseline else 0
+        print(f"{name:<10} ノードへの入力トークン合計 x{ratio:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+handoff_cycles.py - Swarm の引き継ぎの往復の検出のベンチマーク
+
+台本どおりに引き継ぐ Swarm（要件アナリスト・実装担当・レビュアー・責任者）を、
+HandoffGuard なし・terminate・escalate で実行し、モデル呼び出し回数と所要時間を比較する。
+
+シナリオ:
+- ping_pong: requirements_analyst ↔ implementer が同じメッセージで往復し続ける
+- triangle: analyst → implementer → reviewer → analyst が毎回違うメッセージで回り続ける
+- backtrack_once: 1回だけ要件に戻ってからレビューで承認される（ガードがあっても変わらない）
+
+ガードなしの場合は max_handoffs に達するまで往復が続き、Swarm は失敗として終了する。
+
+実行方法:
+    uv run python -m benchmarks.handoff_cycles
+    uv run python -m benchmarks.handoff_cycles --max-handoffs 30 --latency 0.05 --json
+"""
+
+import argparse
+import itertools
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from strands import Agent
+
+from common.fake_model import (
+    HANDOFF_TOOL_NAME,
+    FakeModel,
+    FakeRequest,
+    FakeResponse,
+    FakeRule,
+    FakeToolUse,
+)
+from common.handoff_guard import HandoffGuard
+from common.swarm import Swarm
+
+AGENTS = {
+    "requirements_analyst": "あなたは要件アナリストです。",
+    "implementer": "あなたは実装担当のエンジニアです。",
+    "reviewer": "あなたはシニアエンジニアのレビュアーです。",
+    "supervisor": "あなたはプロジェクトの責任者です。",
+}
+
+Responder = Callable[[FakeRequest], FakeResponse]
+
+
+def _handoff(targets: Callable[[], tuple[str, str] | None]) -> Responder:
+    """targets() が返す (引き継ぎ先, メッセージ) へ引き継ぎ、None なら回答して終える応答"""
+
+    def respond(request: FakeRequest) -> FakeResponse:
+        if HANDOFF_TOOL_NAME in request.called_tools:
+            return FakeResponse("現時点の情報で回答します。")
+        handoff = targets()
+        if handoff is None:
+            return FakeResponse("承認: 実装計画に問題はありません。")
+        target, message = handoff
+        return FakeResponse(
+            f"{target}に引き継ぎます。",
+            tool_uses=[
+                FakeToolUse(
+                    HANDOFF_TOOL_NAME, {"agent_name": target, "message": message}
+                )
+            ],
+        )
+
+    return respond
+
+
+def _scenario(name: str) -> dict[str, Responder]:
+    """シナリオごとの各エージェントの応答を返す"""
+    counter = itertools.count(1)
+    finish = _handoff(lambda: None)
+    if name == "ping_pong":
+        return {
+            "requirements_analyst": _handoff(
+                lambda: ("implementer", "要件を明確化しました。実装してください。")
+            ),
+            "implementer": _handoff(
+                lambda: ("requirements_analyst", "要件が不明確です。")
+            ),
+            "reviewer": finish,
+        }
+    if name == "triangle":
+        return {
+            "requirements_analyst": _handoff(
+                lambda: ("implementer", f"要件 v{next(counter)} を反映しました。")
+            ),
+            "implementer": _handoff(
+                lambda: ("reviewer", f"実装 v{next(counter)} をレビューしてください。")
+            ),
+            "reviewer": _handoff(
+                lambda: (
+                    "requirements_analyst",
+                    f"指摘 {next(counter)}: 要件レベルの問題があります。",
+                )
+            ),
+        }
+    implementer_visits = itertools.count(1)
+    return {
+        "requirements_analyst": _handoff(
+            lambda: ("implementer", "要件を明確化しました。")
+        ),
+        "implementer": _handoff(
+            lambda: (
+                ("requirements_analyst", "要件が不明確です。")
+                if next(implementer_visits) == 1
+                else ("reviewer", "レビューしてください。")
+            )
+        ),
+        "reviewer": finish,
+    }
+
+
+def run_swarm(
+    scenario: str, guard: HandoffGuard | None, max_handoffs: int, latency: float
+) -> dict[str, Any]:
+    """シナリオの Swarm を1回実行する"""
+    responders = _scenario(scenario)
+    responders.setdefault("supervisor", _handoff(lambda: None))
+    model = FakeModel(
+        latency=latency,
+        rules=[
+            FakeRule(AGENTS[node_id], respond, target="system_prompt")
+            for node_id, respond in responders.items()
+        ],
+    )
+    agents = [
+        Agent(model=model, name=node_id, system_prompt=prompt, callback_handler=None)
+        for node_id, prompt in AGENTS.items()
+    ]
+    swarm = Swarm(
+        nodes=agents,
+        entry_point=agents[0],
+        max_handoffs=max_handoffs,
+        max_iterations=max_handoffs,
+        handoff_guard=guard,
+    )
+
+    start = time.perf_counter()
+    result = swarm("ユーザー管理機能を作ってください。")
+    elapsed = (time.perf_counter() - start) * 1000
+
+    return {
+        "status": result.status.value,
+        "model_calls": model.stats.invocations,
+        "elapsed_ms": round(elapsed, 1),
+        "node_history": [node.node_id for node in result.node_history],
+        "cycles": [cycle.to_dict() for cycle in result.cycles],
+    }
+
+
+def run(max_handoffs: int, latency: float) -> dict[str, Any]:
+    """全シナリオをガードなし・terminate・escalate で実行する"""
+    variants = {
+        "unguarded": lambda: None,
+        "terminate": lambda: HandoffGuard(action="terminate"),
+        "escalate": lambda: HandoffGuard(action="escalate", escalate_to="supervisor"),
+    }
+    return {
+        scenario: {
+            name: run_swarm(scenario, guard(), max_handoffs, latency)
+            for name, guard in variants.items()
+        }
+        for scenario in ("ping_pong", "triangle", "backtrack_once")
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Swarm の引き継ぎの往復の検出のベンチマーク"
+    )
+    parser.add_argument(
+        "--max-handoffs", type=int, default=20, help="Swarm の max_handoffs"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="FakeModel の待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.max_handoffs, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== Swarm の引き継ぎの往復の検出のベンチマーク ===")
+    print(
+        f"max_handoffs={args.max_handoffs}（待ち時間 {args.latency} 秒の FakeModel）\n"
+    )
+    print(
+        f"{'シナリオ':<16}{'ガード':<11}{'状態':<11}{'担当':>5}{'呼出':>6}"
+        f"{'所要時間(ms)':>14}  検出"
+    )
+    for scenario, variants in results.items():
+        for name, r in variants.items():
+            detected = (
+                ", ".join(
+                    f"{c['reason']}({' → '.join(c['pattern'])}) → {c['action']}"
+                    for c in r["cycles"]
+                )
+                or "-"
+            )
+            print(
+                f"{scenario:<16}{name:<12}{r['status']:<11}{len(r['node_history']):>5}"
+                f"{r['model_calls']:>6}{r['elapsed_ms']:>14}  {detected}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+loop_convergence.py - ループを含む Graph の収束判定のベンチマーク
+
+code → review → (要修正なら code に戻る / 承認なら approve) のループを、
+ConvergenceGuard なし・ありで実行し、モデル呼び出し回数と所要時間を比較する。
+
+シナリオ:
+- stuck_review: レビューが毎回同じ指摘を繰り返す（コードは毎回変わる）
+- stable_code: コードが変わらないのに、レビューが毎回新しい指摘を出す
+- approved: 2回目のレビューで承認される（ガードがあっても呼び出し回数は変わらない）
+
+ガードなしの場合は max_node_executions に達するまでループが回り続ける。
+
+実行方法:
+    uv run python -m benchmarks.loop_convergence
+    uv run python -m benchmarks.loop_convergence --rounds 8 --latency 0.05 --json
+"""
+
+import argparse
+import itertools
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from strands import Agent
+
+from common.convergence import ConvergenceGuard
+from common.fake_model import FakeModel, FakeRequest, FakeResponse, FakeRule
+from common.graph import GraphBuilder
+from common.routing import EdgeRouter
+
+CODER_PROMPT = "あなたはPython開発者です。"
+REVIEWER_PROMPT = "あなたはコードレビュアーです。"
+APPROVER_PROMPT = "あなたは最終承認者です。"
+
+CODE = "```python\ndef add(a, b):\n    return a + b\n```"
+
+
+def _scenario(name: str) -> tuple[Callable[..., FakeResponse], ...]:
+    """シナリオごとのコード生成とレビューの応答を返す"""
+    code_versions = itertools.count(1)
+    reviews = itertools.count(1)
+
+    def changing_code(request: FakeRequest) -> FakeResponse:
+        # 修正のたびに入力値の検証を1つずつ追加する
+        checks = "".join(
+            f"    if not isinstance({arg}, (int, float)):\n"
+            f"        raise TypeError('{arg} must be a number')\n"
+            for arg in ["a", "b", "a + b"][: next(code_versions)]
+        )
+        return FakeResponse(CODE.replace("    return", checks + "    return"))
+
+    def stable_code(request: FakeRequest) -> FakeResponse:
+        return FakeResponse(CODE)
+
+    def stuck_review(request: FakeRequest) -> FakeResponse:
+        return FakeResponse("要修正:\n- 入力値の検証を追加してください")
+
+    def new_findings(request: FakeRequest) -> FakeResponse:
+        return FakeResponse(f"要修正:\n- 指摘{next(reviews)}: 命名を見直してください")
+
+    def approve_second(request: FakeRequest) -> FakeResponse:
+        if next(reviews) >= 2:
+            return FakeResponse("承認: 問題ありません")
+        return FakeResponse("要修正:\n- 型ヒントを追加してください")
+
+    return {
+        "stuck_review": (changing_code, stuck_review),
+        "stable_code": (stable_code, new_findings),
+        "approved": (changing_code, approve_second),
+    }[name]
+
+
+def run_loop(
+    scenario: str, guarded: bool, rounds: int, latency: float
+) -> dict[str, Any]:
+    """ループのグラフを1回実行する"""
+    coder, reviewer = _scenario(scenario)
+    model = FakeModel(
+        latency=latency,
+        rules=[
+            FakeRule(CODER_PROMPT, coder, target="system_prompt"),
+            FakeRule(REVIEWER_PROMPT, reviewer, target="system_prompt"),
+        ],
+    )
+    builder = GraphBuilder()
+    for node_id, prompt in [
+        ("code", CODER_PROMPT),
+        ("review", REVIEWER_PROMPT),
+        ("approve", APPROVER_PROMPT),
+    ]:
+        builder.add_node(
+            Agent(model=model, system_prompt=prompt, callback_handler=None), node_id
+        )
+
+    router = EdgeRouter("review", {"code": "要修正", "approve": "承認"})
+    loop = router.condition("code")
+    exit_ = router.condition("approve")
+    if guarded:
+        guard = ConvergenceGuard(outputs=["code"], findings="review")
+        loop, exit_ = guard.loop(loop), guard.exit(exit_)
+    builder.add_edge("code", "review")
+    builder.add_edge("review", "code", condition=loop)
+    builder.add_edge("review", "approve", condition=exit_)
+    builder.set_entry_point("code")
+    builder.set_max_node_executions(rounds * 2 + 1)
+
+    start = time.perf_counter()
+    result = builder.build()("2つの数値の合計を返す関数を作成してください。")
+    elapsed = (time.perf_counter() - start) * 1000
+
+    return {
+        "status": result.status.value,
+        "model_calls": model.stats.invocations,
+        "elapsed_ms": round(elapsed, 1),
+        "execution_order": [node.node_id for node in result.execution_order],
+        "saved_model_calls": result.saved_model_calls,
+        "convergence": [event.to_dict() for event in result.convergence],
+    }
+
+
+def run(rounds: int, latency: float) -> dict[str, Any]:
+    """全シナリオをガードなし・ありで実行する"""
+    return {
+        scenario: {
+            "unguarded": run_loop(scenario, False, rounds, latency),
+            "guarded": run_loop(scenario, True, rounds, latency),
+        }
+        for scenario in ("stuck_review", "stable_code", "approved")
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="ループを含む Graph の収束判定のベンチマーク"
+    )
+    parser.add_argument(
+        "--rounds", type=int, default=5, help="ループの最大周回数（code → review）"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="FakeModel の待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== ループを含む Graph の収束判定のベンチマーク ===")
+    print(f"最大 {args.rounds} 周（待ち時間 {args.latency} 秒の FakeModel）\n")
+    print(
+        f"{'シナリオ':<14}{'ガード':<8}{'状態':<11}{'呼出':>6}{'所要時間(ms)':>14}  打ち切り"
+    )
+    for scenario, variants in results.items():
+        for variant, r in variants.items():
+            reasons = ", ".join(event["reason"] for event in r["convergence"]) or "-"
+            print(
+                f"{scenario:<14}{variant:<10}{r['status']:<11}{r['model_calls']:>6}"
+                f"{r['elapsed_ms']:>14}  {reasons}（省略 {r['saved_model_calls']}回）"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+model_factory.py - モデル生成方式のベンチマーク
+
+スクリプトごとに BedrockModel を生成する従来方式と、common.models.get_model() による
+共有方式を比較する。ローカルに Bedrock Converse API のスタブを立て、
+ネットワークやAWS認証なしでコールドスタートと1呼び出しあたりのオーバーヘッドを計測する。
+
+実行方法:
+    uv run python -m benchmarks.model_factory
+    uv run python -m benchmarks.model_factory --calls 50 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from strands.models.bedrock import BedrockModel
+from strands.models.model import Model
+
+from common import models
+from common.models import DEFAULT_MODEL_ID, DEFAULT_REGION, get_model
+
+# スタブが返すConverse APIのレスポンス
+STUB_RESPONSE = {
+    "output": {"message": {"role": "assistant", "content": [{"text": "ok"}]}},
+    "stopReason": "end_turn",
+    "usage": {"inputTokens": 8, "outputTokens": 1, "totalTokens": 9},
+    "metrics": {"latencyMs": 1},
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """POST /model/{model_id}/converse に固定レスポンスを返すハンドラー"""
+
+    protocol_version = "HTTP/1.1"  # keep-aliveで接続を再利用できるようにする
+    disable_nagle_algorithm = True  # 小さなレスポンスが遅延ACKで待たされないようにする
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.server.connections.add(self.client_address)  # type: ignore[attr-defined]
+
+        body = json.dumps(STUB_RESPONSE).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    """Bedrockスタブをバックグラウンドスレッドで起動する"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.connections = set()  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _invoke(model: Model) -> None:
+    """1回のモデル呼び出しを最後まで消費する"""
+    messages = [{"role": "user", "content": [{"text": "ping"}]}]
+    async for _ in model.stream(messages):  # type: ignore[arg-type]
+        pass
+
+
+def _measure(make_model: Callable[[], Model], calls: int) -> dict[str, float]:
+    """モデル取得から呼び出し完了までの時間を calls 回計測する"""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        asyncio.run(_invoke(make_model()))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "cold_start_ms": round(timings[0], 2),
+        "per_call_p50_ms": round(statistics.median(timings[1:]), 2),
+        "per_call_mean_ms": round(statistics.fmean(timings[1:]), 2),
+    }
+
+
+def run(calls: int) -> dict[str, Any]:
+    """両方式のベンチマークを実行する"""
+    server = start_stub_server()
+    endpoint_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # スタブ接続用のダミー認証情報（実際のAWSには接続しない）
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "stub")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "stub")
+    os.environ["BEDROCK_ENDPOINT_URL"] = endpoint_url
+
+    results: dict[str, Any] = {}
+
+    # 従来方式: 呼び出しのたびにスクリプト相当の BedrockModel を生成
+    server.connections.clear()  # type: ignore[attr-defined]
+    results["per_script"] = _measure(
+        lambda: BedrockModel(
+            model_id=DEFAULT_MODEL_ID,
+            region_name=DEFAULT_REGION,
+            endpoint_url=endpoint_url,
+            streaming=False,
+        ),
+        calls,
+    )
+    results["per_script"]["connections"] = len(server.connections)  # type: ignore[attr-defined]
+
+    # 共有方式: get_model() が返すプロセス共通のモデルを使い回す
+    models.clear_models()
+    server.connections.clear()  # type: ignore[attr-defined]
+    results["shared"] = _measure(lambda: get_model(streaming=False), calls)
+    results["shared"]["connections"] = len(server.connections)  # type: ignore[attr-defined]
+
+    server.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="モデル生成方式のベンチマーク")
+    parser.add_argument("--calls", type=int, default=30, help="各方式の呼び出し回数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(max(args.calls, 2))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=== モデル生成方式のベンチマーク ===")
+    print(f"呼び出し回数: {args.calls}（ローカルのBedrockスタブに対して計測）\n")
+    print(
+        f"{'方式':<12}{'コールド(ms)':>14}{'p50(ms)':>10}{'平均(ms)':>10}{'接続数':>8}"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:<12}{r['cold_start_ms']:>14}{r['per_call_p50_ms']:>10}"
+            f"{r['per_call_mean_ms']:>10}{r['connections']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
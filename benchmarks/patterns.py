@@ -0,0 +1,258 @@
+"""
+patterns.py - マルチエージェントパターンのベンチマーク
+
+02-graph / 03-swarm / 04-workflow / 06-composite の各サンプルを、レイテンシを注入した
+FakeModel（MODEL_PROVIDER=fake）で実行し、パターンごとに以下を計測する。
+
+- 壁時計時間の p50 / p95
+- モデル呼び出し回数
+- 入力 / 出力トークン数（FakeModel の疑似トークン）
+- ピークRSS
+
+各サンプルは1回ごとに独立したサブプロセスで実行するため、ピークRSSはパターンごとの値になる。
+結果はJSONのベースラインとして保存でき、--compare で以前の結果との差分を表示する。
+
+実行方法:
+    uv run python -m benchmarks.patterns
+    uv run python -m benchmarks.patterns --output benchmarks/baselines/patterns.json
+    uv run python -m benchmarks.patterns --compare benchmarks/baselines/patterns.json
+    uv run python -m benchmarks.patterns --only 06-composite --repeat 10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import runpy
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 計測対象のサンプル（リポジトリルートからの相対パス）
+PATTERNS = [
+    "02-graph/01_sequential_graph.py",
+    "02-graph/02_conditional_graph.py",
+    "02-graph/03_loop_graph.py",
+    "03-swarm/01_basic_swarm.py",
+    "03-swarm/02_dynamic_routing_swarm.py",
+    "03-swarm/03_backtrack_swarm.py",
+    "04-workflow/01_basic_workflow.py",
+    "04-workflow/02_parallel_workflow.py",
+    "04-workflow/03_complex_dag_workflow.py",
+    "06-composite/01_content_pipeline.py",
+    "06-composite/02_planning_with_swarm.py",
+    "06-composite/03_full_composite.py",
+]
+
+# 差分表示の対象となる指標
+METRICS = [
+    "p50_ms",
+    "p95_ms",
+    "invocations",
+    "input_tokens",
+    "output_tokens",
+    "peak_rss_mb",
+]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """線形補間でパーセンタイルを求める"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def run_script(script: str) -> dict[str, Any]:
+    """サブプロセス内でサンプルを1回実行し、計測結果を返す"""
+    # インポート時間を計測に含めないよう、サンプルが使うパッケージを先に読み込む
+    import strands.multiagent  # noqa: F401
+    import strands_tools  # noqa: F401
+
+    from common.models import get_model
+
+    model = get_model()  # サンプルと同じ共有 FakeModel
+    random.seed(0)  # workflow ツールのジッターを毎回同じにする
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        runpy.run_path(str(ROOT / script), run_name="__main__")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "elapsed_ms": elapsed_ms,
+        **model.stats.to_dict(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_pattern(
+    script: str, repeat: int, latency: float, tokens_per_second: float | None
+) -> dict[str, Any]:
+    """1つのサンプルを repeat 回計測する。
+
+    1回ごとに新しいサブプロセスで実行する。workflow ツールの保存先（WORKFLOW_STATE_PATH）は
+    実行ごとの一時ディレクトリに置き、前の実行のタスクの出力をキャッシュから復元しないようにする。
+    """
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workflow_dir:
+            env = {
+                **os.environ,
+                "MODEL_PROVIDER": "fake",
+                "FAKE_MODEL_LATENCY": str(latency),
+                # ワークフローの状態とタスクの出力を実行ごとに分離する
+                "WORKFLOW_STATE_PATH": str(Path(workflow_dir) / "workflows.sqlite3"),
+            }
+            if tokens_per_second:
+                env["FAKE_MODEL_TPS"] = str(tokens_per_second)
+            else:
+                env.pop("FAKE_MODEL_TPS", None)
+
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.patterns", "--child", script],
+                cwd=ROOT,
+                env=env,
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+        if proc.returncode != 0:
+            raise RuntimeError(f"{script} の実行に失敗しました:\n{proc.stderr[-2000:]}")
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    timings = [r["elapsed_ms"] for r in runs]
+    # 呼び出し回数とトークン数は決定論的だが、念のため実行間の中央値を採る
+    return {
+        "runs": repeat,
+        "p50_ms": round(percentile(timings, 0.5), 1),
+        "p95_ms": round(percentile(timings, 0.95), 1),
+        "invocations": int(statistics.median(r["invocations"] for r in runs)),
+        "input_tokens": int(statistics.median(r["input_tokens"] for r in runs)),
+        "output_tokens": int(statistics.median(r["output_tokens"] for r in runs)),
+        "peak_rss_mb": round(max(r["peak_rss_mb"] for r in runs), 1),
+    }
+
+
+def run(
+    patterns: list[str], repeat: int, latency: float, tokens_per_second: float | None
+) -> dict[str, Any]:
+    """全パターンを計測する"""
+    return {
+        "config": {
+            "repeat": repeat,
+            "latency_s": latency,
+            "tokens_per_second": tokens_per_second,
+        },
+        "patterns": {
+            script: run_pattern(script, repeat, latency, tokens_per_second)
+            for script in patterns
+        },
+    }
+
+
+def _format_delta(current: float, baseline: float) -> str:
+    if not baseline:
+        return ""
+    return f"({(current - baseline) / baseline * 100:+.0f}%)"
+
+
+def print_report(
+    results: dict[str, Any], baseline: dict[str, Any] | None = None
+) -> None:
+    """結果を表形式で表示する（baseline があれば差分も表示）"""
+    config = results["config"]
+    print("=== マルチエージェントパターンのベンチマーク ===")
+    print(
+        f"FakeModel: 最初のトークンまで {config['latency_s']}秒、"
+        f"{config['tokens_per_second'] or '無制限'} トークン/秒、各 {config['repeat']} 回実行\n"
+    )
+
+    baseline_patterns = (baseline or {}).get("patterns", {})
+    header = f"{'パターン':<40}{'p50(ms)':>10}{'p95(ms)':>10}{'呼出':>6}{'入力tok':>9}{'出力tok':>9}{'RSS(MB)':>9}"
+    print(header)
+    for script, r in results["patterns"].items():
+        print(
+            f"{script:<40}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['invocations']:>6}"
+            f"{r['input_tokens']:>9}{r['output_tokens']:>9}{r['peak_rss_mb']:>9}"
+        )
+        base = baseline_patterns.get(script)
+        if base:
+            deltas = [_format_delta(r[m], base[m]) for m in METRICS]
+            print(
+                f"{'  vs baseline':<40}{deltas[0]:>10}{deltas[1]:>10}{deltas[2]:>6}"
+                f"{deltas[3]:>9}{deltas[4]:>9}{deltas[5]:>9}"
+            )
+
+    # コンテンツ制作パイプラインの Graph 版と Graph + Swarm 版の比較
+    graph_only = results["patterns"].get("06-composite/01_content_pipeline.py")
+    with_swarm = results["patterns"].get("06-composite/02_planning_with_swarm.py")
+    if graph_only and with_swarm:
+        print("\nコンテンツ制作パイプライン: Graph + Swarm（02）/ Graph（01）")
+        for metric in ["p50_ms", "invocations", "input_tokens", "output_tokens"]:
+            ratio = (
+                with_swarm[metric] / graph_only[metric]
+                if graph_only[metric]
+                else float("nan")
+            )
+            print(
+                f"  {metric:<14}{graph_only[metric]:>10} → {with_swarm[metric]:<10}(x{ratio:.2f})"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="マルチエージェントパターンのベンチマーク"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="各パターンの実行回数")
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument(
+        "--tps",
+        type=float,
+        default=1000,
+        help="ストリーミング速度（トークン/秒、0で無制限）",
+    )
+    parser.add_argument("--only", help="パスにこの文字列を含むパターンだけ実行する")
+    parser.add_argument(
+        "--output", type=Path, help="結果をJSONのベースラインとして保存するパス"
+    )
+    parser.add_argument("--compare", type=Path, help="比較するベースラインJSONのパス")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_script(args.child)))
+        return
+
+    patterns = [p for p in PATTERNS if not args.only or args.only in p]
+    results = run(patterns, max(args.repeat, 1), args.latency, args.tps or None)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2, ensure_ascii=False) + "\n")
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print_report(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
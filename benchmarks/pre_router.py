@@ -0,0 +1,175 @@
+"""
+pre_router.py - Swarm の前段のルーターのベンチマーク
+
+カスタマーサポートの Swarm（受付 → 技術・請求・解約防止のいずれか）に問い合わせを順に流し、
+PreRouter なし・ありで、モデル呼び出し回数・1件あたりの所要時間・命中率を比較する。
+
+受付は台本で常に正しい担当者へ引き継ぐ（LLM による振り分けの正解とみなす）。
+最終的に対応した担当者が正解と一致した件数も数え、PreRouter の振り分けの誤りを確認する。
+問い合わせには、キーワードが複数の担当者にまたがる曖昧なものやキーワードを含まないものも混ぜている。
+
+実行方法:
+    uv run python -m benchmarks.pre_router
+    uv run python -m benchmarks.pre_router --latency 0.2 --json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any
+
+from strands import Agent
+
+from common.fake_model import (
+    HANDOFF_TOOL_NAME,
+    FakeModel,
+    FakeRequest,
+    FakeResponse,
+    FakeRule,
+    FakeToolUse,
+)
+from common.pre_router import PreRouter
+from common.swarm import Swarm
+
+RECEPTIONIST_PROMPT = "あなたはカスタマーサポートの受付担当です。"
+SPECIALISTS = {
+    "technical_support": "あなたは技術サポートの専門家です。",
+    "billing_support": "あなたは請求・料金サポートの専門家です。",
+    "retention_specialist": "あなたは顧客維持の専門家です。",
+}
+
+ROUTES = {
+    "technical_support": ["エラー", "動作しない", "不具合", "使えない"],
+    "billing_support": ["料金", "請求", "支払", "払って", "プラン"],
+    "retention_specialist": ["解約", "退会"],
+}
+
+# (問い合わせ, 正しい担当者)
+INQUIRIES = [
+    ("アプリを起動するとエラーが表示されて動作しないです。", "technical_support"),
+    ("ファイルのアップロード機能に不具合があるようです。", "technical_support"),
+    ("ログイン後にエラーコード500が出ます。", "technical_support"),
+    ("今月の請求額がプランの料金と違います。", "billing_support"),
+    ("支払い方法をクレジットカードに変更したいです。", "billing_support"),
+    ("年間プランに切り替えると料金はいくらですか？", "billing_support"),
+    ("解約の手続きを教えてください。", "retention_specialist"),
+    ("退会したいのですが、データはどうなりますか？", "retention_specialist"),
+    ("料金が高いので解約を考えています。", "retention_specialist"),
+    ("プレミアム機能が使えないのにお金を払っています。", "billing_support"),
+    ("画面が真っ白になります。", "technical_support"),
+    ("サービスの今後のロードマップを知りたいです。", "technical_support"),
+]
+
+
+def _receptionist(request: FakeRequest) -> FakeResponse:
+    """問い合わせの正しい担当者へ引き継ぐ"""
+    if HANDOFF_TOOL_NAME in request.called_tools:
+        return FakeResponse("担当者に引き継ぎました。")
+    target = next(label for text, label in INQUIRIES if text in request.last_text)
+    return FakeResponse(
+        f"{target}に引き継ぎます。",
+        tool_uses=[
+            FakeToolUse(
+                HANDOFF_TOOL_NAME,
+                {"agent_name": target, "message": f"{target}に引き継ぎます。"},
+            )
+        ],
+    )
+
+
+def run_inquiries(use_router: bool, latency: float) -> dict[str, Any]:
+    """全ての問い合わせを順に処理する"""
+    model = FakeModel(
+        latency=latency,
+        rules=[
+            FakeRule(RECEPTIONIST_PROMPT, _receptionist, target="system_prompt"),
+            *(
+                FakeRule(prompt, FakeResponse("ご案内します。"), target="system_prompt")
+                for prompt in SPECIALISTS.values()
+            ),
+        ],
+    )
+    receptionist = Agent(
+        model=model,
+        name="receptionist",
+        system_prompt=RECEPTIONIST_PROMPT,
+        callback_handler=None,
+    )
+    specialists = [
+        Agent(model=model, name=name, system_prompt=prompt, callback_handler=None)
+        for name, prompt in SPECIALISTS.items()
+    ]
+    router = PreRouter(ROUTES) if use_router else None
+    swarm = Swarm(
+        nodes=[receptionist, *specialists],
+        entry_point=receptionist,
+        pre_router=router,
+    )
+
+    latencies = []
+    correct = routed = 0
+    for text, label in INQUIRIES:
+        start = time.perf_counter()
+        result = swarm(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+        handled_by = result.node_history[-1].node_id
+        correct += handled_by == label
+        if result.pre_route is not None and result.pre_route.target is not None:
+            routed += 1
+
+    return {
+        "model_calls": model.stats.invocations,
+        "input_tokens": model.stats.input_tokens,
+        "total_ms": round(sum(latencies), 1),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "correct": correct,
+        "routed": routed,
+        "router": router.stats.to_dict() if router else None,
+    }
+
+
+def run(latency: float) -> dict[str, Any]:
+    """PreRouter なし・ありで実行する"""
+    return {
+        "inquiries": len(INQUIRIES),
+        "without_router": run_inquiries(False, latency),
+        "with_router": run_inquiries(True, latency),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Swarm の前段のルーターのベンチマーク")
+    parser.add_argument(
+        "--latency", type=float, default=0.1, help="FakeModel の待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== Swarm の前段のルーターのベンチマーク ===")
+    print(
+        f"問い合わせ {results['inquiries']}件（待ち時間 {args.latency} 秒の FakeModel）\n"
+    )
+    print(f"{'':<16}{'呼出':>6}{'入力tok':>9}{'合計(ms)':>10}{'p50(ms)':>9}{'正解':>6}")
+    for name in ("without_router", "with_router"):
+        r = results[name]
+        print(
+            f"{name:<16}{r['model_calls']:>6}{r['input_tokens']:>9}"
+            f"{r['total_ms']:>10}{r['p50_ms']:>9}{r['correct']:>6}"
+        )
+    stats = results["with_router"]["router"]
+    print(
+        f"\n命中率 {stats['hit_rate']:.0%}（{stats['hits']}/{stats['requests']}）"
+        f" / 照合の所要時間 合計 {stats['classify_ms']}ms"
+        f" / 省いた時間の見積もり {stats['saved_ms']}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
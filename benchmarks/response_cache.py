@@ -0,0 +1,108 @@
+"""
+response_cache.py - 専門家エージェントの応答キャッシュのベンチマーク
+
+同じ質問が繰り返し届く状況を想定し、キャッシュなし・メモリ層のみ・SQLite層ありの
+AgentPool で同じ質問列を処理したときの所要時間、モデル呼び出し回数、ヒット率を比較する。
+SQLite層は新しいプロセスを想定して、メモリ層を空にした2つ目のキャッシュからも計測する。
+
+実行方法:
+    uv run python -m benchmarks.response_cache
+    uv run python -m benchmarks.response_cache --requests 100 --unique 10 --json
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from common.agent_pool import AgentPool
+from common.fake_model import FakeModel
+from common.response_cache import ResponseCache
+
+SYSTEM_PROMPT = """あなたはプロの翻訳者です。
+与えられたテキストを英語に翻訳してください。"""
+
+
+def _questions(requests: int, unique: int) -> list[str]:
+    """unique 種類の質問から requests 件の質問列を作る（表記ゆれを含む）"""
+    rng = random.Random(0)
+    variants = ["{}", " {} ", "{}\n", "{}　"]  # 前後の空白や全角スペースの違い
+    return [
+        rng.choice(variants).format(
+            f"次のテキストを翻訳してください: 文{rng.randrange(unique)}"
+        )
+        for _ in range(requests)
+    ]
+
+
+def _run(
+    questions: list[str], latency: float, cache: ResponseCache | None
+) -> dict[str, Any]:
+    model = FakeModel(latency=latency, text_length=50)
+    pool = AgentPool(model, cache=cache)
+
+    start = time.perf_counter()
+    for question in questions:
+        pool.run(question, SYSTEM_PROMPT, callback_handler=None)
+    elapsed = time.perf_counter() - start
+
+    result: dict[str, Any] = {
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "model_invocations": model.stats.invocations,
+    }
+    if cache:
+        result["cache"] = cache.stats.to_dict()
+    return result
+
+
+def run(requests: int, unique: int, latency: float) -> dict[str, Any]:
+    """各方式で同じ質問列を処理する"""
+    questions = _questions(requests, unique)
+    results: dict[str, Any] = {
+        "no_cache": _run(questions, latency, None),
+        "memory": _run(questions, latency, ResponseCache()),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "responses.sqlite3"
+        results["sqlite_cold"] = _run(questions, latency, ResponseCache(path=path))
+        # 別プロセスを想定: メモリ層は空で、SQLite層のエントリだけが残っている
+        results["sqlite_warm"] = _run(questions, latency, ResponseCache(path=path))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="専門家エージェントの応答キャッシュのベンチマーク"
+    )
+    parser.add_argument("--requests", type=int, default=50, help="質問の件数")
+    parser.add_argument("--unique", type=int, default=5, help="質問の種類数")
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="FakeModel の待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.unique, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=== 専門家エージェントの応答キャッシュのベンチマーク ===")
+    print(
+        f"質問: {args.requests}件（{args.unique}種類）、FakeModel の待ち時間: {args.latency}秒\n"
+    )
+    print(f"{'方式':<14}{'所要時間(ms)':>14}{'モデル呼出':>12}{'ヒット率':>10}")
+    for name, r in results.items():
+        hit_rate = r["cache"]["hit_rate"] if "cache" in r else "-"
+        print(
+            f"{name:<14}{r['elapsed_ms']:>14}{r['model_invocations']:>12}{hit_rate:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+routing.py - Graph の条件付きエッジの評価のベンチマーク
+
+1つのノードから複数の条件付きエッジが出ている場合に、
+全エッジの条件を評価する時間を以下の方式で比較する。
+
+- per_edge: 条件関数ごとに str(result) を作り直してキーワードを探す（従来のサンプルの方式）
+- router: EdgeRouter でテキストを1回だけ取り出し、結合した正規表現で1回だけ走査する
+
+strands の Graph は、同じ条件関数を実行可能判定や後続ノードの入力の組み立てで
+ノードの実行ごとに何度も呼ぶ（--passes 回の評価として再現する）。
+ノードが実行されるたびに新しい結果が入る想定で、計測のたびに NodeResult を作り直す。
+キーワードはテキストの末尾付近に置き、走査が全体に及ぶようにしている。
+
+実行方法:
+    uv run python -m benchmarks.routing
+    uv run python -m benchmarks.routing --edges 2 8 32 --sizes 1000 100000 --passes 3 --json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from strands.agent.agent_result import AgentResult
+from strands.multiagent.base import NodeResult, Status
+from strands.multiagent.graph import GraphState
+from strands.telemetry.metrics import EventLoopMetrics
+
+from common.routing import EdgeRouter
+
+FILLER = "これはノードの出力です。"
+
+
+def _node_result(text: str) -> NodeResult:
+    """text を出力したノードの NodeResult を作成する"""
+    result = AgentResult(
+        stop_reason="end_turn",
+        message={"role": "assistant", "content": [{"text": text}]},
+        metrics=EventLoopMetrics(),
+        state={},
+    )
+    return NodeResult(result=result, status=Status.COMPLETED)
+
+
+def _measure(
+    conditions: list[Callable[[GraphState], bool]], text: str, passes: int, repeat: int
+) -> float:
+    """1回のノード実行分の評価を repeat 回行い、所要時間の中央値（マイクロ秒）を返す"""
+    timings = []
+    for _ in range(repeat):
+        state = GraphState(results={"source": _node_result(text)})
+        start = time.perf_counter()
+        for _ in range(passes):
+            for condition in conditions:
+                condition(state)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return round(statistics.median(timings), 1)
+
+
+def run(
+    edges_list: list[int], sizes: list[int], passes: int, repeat: int
+) -> list[dict[str, Any]]:
+    """エッジ数と出力サイズの組み合わせごとに計測する"""
+    results = []
+    for edges in edges_list:
+        keywords = [f"分類: カテゴリ{i:02d}" for i in range(edges)]
+        routes = {f"target_{i}": keyword for i, keyword in enumerate(keywords)}
+
+        def per_edge_condition(keyword: str) -> Callable[[GraphState], bool]:
+            def condition(state: GraphState) -> bool:
+                node_result = state.results.get("source")
+                if node_result:
+                    return keyword in str(node_result.result)
+                return False
+
+            return condition
+
+        per_edge = [per_edge_condition(keyword) for keyword in keywords]
+        router = EdgeRouter("source", routes)
+        routed = [router.condition(target) for target in routes]
+
+        for size in sizes:
+            text = FILLER * (size // len(FILLER)) + keywords[-1]
+            row = {
+                "edges": edges,
+                "output_chars": len(text),
+                "per_edge_us": _measure(per_edge, text, passes, repeat),
+                "router_us": _measure(routed, text, passes, repeat),
+            }
+            row["speedup"] = round(row["per_edge_us"] / row["router_us"], 2)
+            results.append(row)
+        results[-1]["router_stats"] = router.stats.to_dict()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Graph の条件付きエッジの評価のベンチマーク"
+    )
+    parser.add_argument(
+        "--edges", type=int, nargs="+", default=[2, 8, 32], help="エッジの数"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 100_000],
+        help="ノードの出力の文字数",
+    )
+    parser.add_argument(
+        "--passes", type=int, default=3, help="ノードの実行ごとに全条件を評価する回数"
+    )
+    parser.add_argument("--repeat", type=int, default=200, help="各方式の評価回数")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.edges, args.sizes, args.passes, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("=== Graph の条件付きエッジの評価のベンチマーク ===")
+    print(f"1回のノード実行で全エッジの条件を {args.passes} 回評価する時間（中央値）\n")
+    print(
+        f"{'エッジ数':>8}{'出力文字数':>12}{'per_edge(us)':>14}{'router(us)':>12}{'倍率':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['edges']:>8}{r['output_chars']:>12}{r['per_edge_us']:>14}"
+            f"{r['router_us']:>12}{r['speedup']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+streaming.py - 複合パイプラインの最初のトークンまでの時間（TTFT）のベンチマーク
+
+06-composite/03_full_composite.py の Graph（企画 Swarm → 調査 → 執筆 → レビュー Swarm）を、
+レイテンシを注入した FakeModel（MODEL_PROVIDER=fake）で以下の2通りに実行して比較する。
+
+- blocking: graph.invoke_async() で結果を待つ（呼び出し元が出力を受け取れるのは全体の完了後）
+- stream: common.events.EventStream でイベントを受け取る
+
+stream では、最初のトークン・最後のノード（review/final_editor）の最初のトークン・完了までの
+時間と、ノードごとの最初のトークンまでの時間を記録する。
+
+実行方法:
+    uv run python -m benchmarks.streaming
+    uv run python -m benchmarks.streaming --latency 0.3 --tokens-per-second 50 --repeat 5 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import runpy
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+from common.events import EventStream
+from common.models import clear_models
+from common.response_cache import get_response_cache
+
+ROOT = Path(__file__).resolve().parent.parent
+SCRIPT = ROOT / "06-composite/03_full_composite.py"
+TASK = "「リモートワークの生産性向上」をテーマに記事を作成してください。"
+FINAL_NODE = "review/final_editor"
+
+
+def _load_graph() -> Any:
+    """サンプルの Graph を読み込む（__main__ の処理は実行しない）"""
+    return runpy.run_path(str(SCRIPT), run_name="composite_pipeline")["graph"]
+
+
+async def _blocking(graph: Any) -> dict[str, float]:
+    start = time.perf_counter()
+    await graph.invoke_async(TASK)
+    total = (time.perf_counter() - start) * 1000
+    return {"first_output_ms": total, "total_ms": total}
+
+
+async def _stream(graph: Any) -> dict[str, Any]:
+    stream = EventStream(graph, TASK)
+    async for _ in stream:
+        pass
+    stats = stream.stats
+    return {
+        "first_output_ms": stats.first_token_ms,
+        "final_node_first_token_ms": stats.first_token_by_node.get(FINAL_NODE),
+        "total_ms": stats.total_ms,
+        "first_token_by_node": stats.first_token_by_node,
+    }
+
+
+def run(repeat: int, latency: float, tokens_per_second: float) -> dict[str, Any]:
+    """blocking と stream を交互に repeat 回実行し、中央値を返す"""
+    os.environ["MODEL_PROVIDER"] = "fake"
+    os.environ["FAKE_MODEL_LATENCY"] = str(latency)
+    os.environ["FAKE_MODEL_TPS"] = str(tokens_per_second)
+    clear_models()
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph = _load_graph()
+
+    # 初回のみのインポートや初期化の時間を含めないよう、1回空実行する
+    get_response_cache().clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(_blocking(graph))
+
+    runs: dict[str, list[dict[str, Any]]] = {"blocking": [], "stream": []}
+    for _ in range(repeat):
+        for name, measure in [("blocking", _blocking), ("stream", _stream)]:
+            # 調査の専門家の応答キャッシュが効かないよう、毎回空にする
+            get_response_cache().clear()
+            with contextlib.redirect_stdout(io.StringIO()):
+                runs[name].append(asyncio.run(measure(graph)))
+
+    def median(name: str, key: str) -> float:
+        return round(statistics.median(r[key] for r in runs[name]), 1)
+
+    stream_nodes = runs["stream"][-1]["first_token_by_node"]
+    return {
+        "config": {
+            "repeat": repeat,
+            "latency_s": latency,
+            "tokens_per_second": tokens_per_second,
+        },
+        "blocking": {
+            "first_output_ms": median("blocking", "first_output_ms"),
+            "total_ms": median("blocking", "total_ms"),
+        },
+        "stream": {
+            "first_output_ms": median("stream", "first_output_ms"),
+            "final_node_first_token_ms": median("stream", "final_node_first_token_ms"),
+            "total_ms": median("stream", "total_ms"),
+            "first_token_by_node": {
+                label: round(ms, 1) for label, ms in stream_nodes.items()
+            },
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="複合パイプラインの最初のトークンまでの時間のベンチマーク"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="各方式の実行回数")
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=200,
+        help="FakeModel のストリーミング速度",
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.latency, args.tokens_per_second)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    blocking, stream = results["blocking"], results["stream"]
+    print("=== 複合パイプラインの最初のトークンまでの時間のベンチマーク ===")
+    print(
+        f"FakeModel: 最初のトークンまで {args.latency}秒、"
+        f"{args.tokens_per_second} トークン/秒、各 {args.repeat} 回実行（中央値）\n"
+    )
+    print(f"{'':<10}{'最初の出力(ms)':>16}{'最終ノードの出力(ms)':>22}{'完了(ms)':>10}")
+    print(
+        f"{'blocking':<10}{blocking['first_output_ms']:>16}"
+        f"{blocking['total_ms']:>22}{blocking['total_ms']:>10}"
+    )
+    print(
+        f"{'stream':<10}{stream['first_output_ms']:>16}"
+        f"{stream['final_node_first_token_ms']:>22}{stream['total_ms']:>10}"
+    )
+    ratio = blocking["first_output_ms"] / stream["first_output_ms"]
+    print(f"\n最初の出力までの時間: x{ratio:.1f} 短縮")
+    print("\nノードごとの最初のトークン（stream）:")
+    for label, ms in stream["first_token_by_node"].items():
+        print(f"  {label:<32}{ms:>10}")
+
+
+if __name__ == "__main__":
+    main()
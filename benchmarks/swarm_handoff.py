@@ -0,0 +1,184 @@
+"""
+swarm_handoff.py - Swarm の引き継ぎごとの入力トークン数のベンチマーク
+
+カスタマーサポートの Swarm（受付・技術・請求・解約防止）で、台本どおりに10回引き継ぎ、
+各エージェントが引き継ぎのたびに調査メモを共有コンテキストに追加する構成で実行する。
+HandoffPolicy なし（strands と同じ）・ありで、引き継ぎごとの入力トークン数と
+モデル呼び出し全体の入力トークン数を比較する。
+
+実行方法:
+    uv run python -m benchmarks.swarm_handoff
+    uv run python -m benchmarks.swarm_handoff --budget 600 --note-length 600 --json
+"""
+
+import argparse
+import json
+import time
+from typing import Any
+
+from strands import Agent
+
+from common.fake_model import (
+    HANDOFF_TOOL_NAME,
+    FakeModel,
+    FakeRequest,
+    FakeResponse,
+    FakeRule,
+    FakeToolUse,
+)
+from common.swarm import HandoffPolicy, Swarm
+
+AGENTS = {
+    "receptionist": "あなたはカスタマーサポートの受付担当です。",
+    "technical_support": "あなたは技術サポートの専門家です。",
+    "billing_support": "あなたは請求・料金サポートの専門家です。",
+    "retention_specialist": "あなたは顧客維持の専門家です。",
+}
+
+# 引き継ぎの台本（10回引き継いだ後、最後のエージェントが回答して終了する）
+ROUTE = [
+    "receptionist",
+    "technical_support",
+    "billing_support",
+    "technical_support",
+    "retention_specialist",
+    "billing_support",
+    "technical_support",
+    "billing_support",
+    "retention_specialist",
+    "billing_support",
+    "receptionist",
+]
+
+NOTE = "お客様の利用状況とエラーの発生状況を確認しました。"
+
+
+def _agent_response(node_id: str, note_length: int) -> Any:
+    """台本に従って次のエージェントへ調査メモ付きで引き継ぐ応答を返す関数を作る"""
+    visits = [hop for hop, name in enumerate(ROUTE) if name == node_id]
+    calls = iter(visits)
+
+    def respond(request: FakeRequest) -> FakeResponse:
+        if HANDOFF_TOOL_NAME in request.called_tools:
+            return FakeResponse("引き継ぎました。")
+        hop = next(calls)
+        if hop + 1 >= len(ROUTE):
+            return FakeResponse("ご案内は以上です。プランの変更を承りました。")
+        target = ROUTE[hop + 1]
+        note = (NOTE * (note_length // len(NOTE) + 1))[:note_length]
+        return FakeResponse(
+            f"{target}に引き継ぎます。",
+            tool_uses=[
+                FakeToolUse(
+                    HANDOFF_TOOL_NAME,
+                    {
+                        "agent_name": target,
+                        "message": f"{target}に引き継ぎます。ここまでの調査結果を確認してください。",
+                        "context": {f"notes_{hop + 1:02d}": note, "plan": "premium"},
+                    },
+                )
+            ],
+        )
+
+    return respond
+
+
+def run_swarm(
+    policy: HandoffPolicy | None, note_length: int, latency: float
+) -> dict[str, Any]:
+    """台本どおりの Swarm を1回実行し、引き継ぎごとの入力トークン数を返す"""
+    model = FakeModel(
+        latency=latency,
+        rules=[
+            FakeRule(
+                prompt, _agent_response(node_id, note_length), target="system_prompt"
+            )
+            for node_id, prompt in AGENTS.items()
+        ],
+    )
+    agents = [
+        Agent(model=model, name=node_id, system_prompt=prompt, callback_handler=None)
+        for node_id, prompt in AGENTS.items()
+    ]
+    swarm = Swarm(
+        nodes=agents,
+        entry_point=agents[0],
+        max_handoffs=len(ROUTE) + 1,
+        max_iterations=len(ROUTE) + 1,
+        handoff_policy=policy,
+    )
+
+    start = time.perf_counter()
+    result = swarm("プレミアム機能が使えないんですけど、どうなってますか？")
+    elapsed = (time.perf_counter() - start) * 1000
+
+    return {
+        "status": result.status.value,
+        "elapsed_ms": round(elapsed, 1),
+        "model": model.stats.to_dict(),
+        "saved_tokens": result.saved_tokens,
+        "hops": [stats.to_dict() for stats in result.handoffs],
+    }
+
+
+def run(budget: int, note_length: int, latency: float) -> dict[str, Any]:
+    """HandoffPolicy なし・ありで実行する"""
+    return {
+        "handoffs": len(ROUTE) - 1,
+        "budget_tokens": budget,
+        "note_length": note_length,
+        "full": run_swarm(None, note_length, latency),
+        "compact": run_swarm(HandoffPolicy(max_tokens=budget), note_length, latency),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Swarm の引き継ぎごとの入力トークン数のベンチマーク"
+    )
+    parser.add_argument(
+        "--budget", type=int, default=800, help="HandoffPolicy の予算（トークン）"
+    )
+    parser.add_argument(
+        "--note-length", type=int, default=400, help="引き継ぎごとの調査メモの文字数"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="FakeModel の待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.budget, args.note_length, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    full, compact = results["full"], results["compact"]
+    print("=== Swarm の引き継ぎごとの入力トークン数のベンチマーク ===")
+    print(
+        f"引き継ぎ {results['handoffs']}回 / 調査メモ: 約{results['note_length']}文字 / "
+        f"予算: {results['budget_tokens']}トークン\n"
+    )
+    print(f"{'hop':>4}  {'エージェント':<22}{'full':>8}{'compact':>9}{'省略':>6}")
+    for before, after in zip(full["hops"], compact["hops"], strict=True):
+        print(
+            f"{after['hop']:>4}  {after['node_id']:<22}{before['sent_tokens']:>8}"
+            f"{after['sent_tokens']:>9}{after['dropped_context']:>6}"
+        )
+    print()
+    for name, r in [("full", full), ("compact", compact)]:
+        model = r["model"]
+        print(
+            f"[{name}] {r['status']} / モデル呼び出し {model['invocations']}回 / "
+            f"入力 {model['input_tokens']} / 出力 {model['output_tokens']} トークン"
+        )
+    baseline = full["model"]["input_tokens"]
+    ratio = compact["model"]["input_tokens"] / baseline if baseline else 0
+    print(
+        f"\nモデルへの入力トークン合計 x{ratio:.2f}（削減 {compact['saved_tokens']}）"
+    )
+
+
+if __name__ == "__main__":
+    main()
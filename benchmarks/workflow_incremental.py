@@ -0,0 +1,139 @@
+"""
+workflow_incremental.py - タスクの定義を変えたワークフローの再実行のベンチマーク
+
+04-workflow/03_complex_dag_workflow.py と同じ DAG（release_process）を一度最後まで実行してから、
+1つのタスクの description を変え、以下の2通りで実行し直して比較する。
+
+- full: 保存先なしで全タスクを実行し直す（strands_tools の workflow と同じ）
+- incremental: WorkflowStore に保存した出力を使い、入力のハッシュが変わったタスクだけを実行する
+
+実行前に WorkflowScheduler.plan()（ドライラン）で実行し直すタスクを求め、
+実際に実行したタスクと一致することを確認する。
+FakeModel は入力全体のハッシュを応答に含めるルールを使い、入力が変わると出力も変わるようにする。
+
+実行方法:
+    uv run python -m benchmarks.workflow_incremental
+    uv run python -m benchmarks.workflow_incremental --latency 0.5 --json
+"""
+
+import argparse
+import hashlib
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from strands import Agent
+
+from benchmarks.workflow_scheduling import release_process
+from common.fake_model import FakeModel, FakeResponse, FakeRule
+from common.workflow import WorkflowScheduler
+from common.workflow_store import WorkflowStore
+
+WORKFLOW_ID = "release_process"
+EDITS = (None, "testing", "api_design", "requirements")
+
+
+def _parent(latency: float) -> tuple[Agent, FakeModel]:
+    # 入力全体のハッシュを含む応答を返し、入力が変わると出力も変わるようにする
+    rule = FakeRule(
+        ".",
+        lambda request: FakeResponse(
+            text="[fake] " + hashlib.sha256(request.last_text.encode()).hexdigest()[:16]
+        ),
+    )
+    model = FakeModel(rules=[rule], latency=latency)
+    return Agent(model=model, callback_handler=None), model
+
+
+def _tasks(edited: str | None) -> list[dict[str, Any]]:
+    tasks, _ = release_process()
+    for task in tasks:
+        if task["task_id"] == edited:
+            task["description"] += "（変更）"
+    return tasks
+
+
+def run_edit(edited: str | None, latency: float, path: Path) -> dict[str, Any]:
+    """最後まで実行した後に edited の description を変え、実行し直す"""
+    parent, _ = _parent(latency)
+    store = WorkflowStore(path)
+    WorkflowScheduler().run(WORKFLOW_ID, _tasks(None), parent, store)
+
+    tasks = _tasks(edited)
+    scheduler = WorkflowScheduler()
+    start = time.perf_counter()
+    plan = scheduler.plan(WORKFLOW_ID, tasks, parent, store)
+    plan_ms = (time.perf_counter() - start) * 1000
+
+    parent, full_model = _parent(latency)
+    start = time.perf_counter()
+    WorkflowScheduler().run(WORKFLOW_ID, tasks, parent)
+    full_s = time.perf_counter() - start
+
+    parent, model = _parent(latency)
+    start = time.perf_counter()
+    run = scheduler.run(WORKFLOW_ID, tasks, parent, store)
+    incremental_s = time.perf_counter() - start
+    store.close()
+
+    executed = [r.task_id for r in run.results.values() if not r.restored]
+    return {
+        "edited": edited or "（変更なし）",
+        "planned": [task_id for task_id, state in plan.items() if state != "cached"],
+        "executed": executed,
+        "plan_ms": round(plan_ms, 2),
+        "full_s": round(full_s, 3),
+        "full_model_calls": full_model.stats.invocations,
+        "incremental_s": round(incremental_s, 3),
+        "incremental_model_calls": model.stats.invocations,
+        "succeeded": run.succeeded,
+    }
+
+
+def run(latency: float) -> dict[str, Any]:
+    """タスクごとの変更で比較する"""
+    with tempfile.TemporaryDirectory() as tmp:
+        return {
+            "config": {"latency_s": latency},
+            "edits": [
+                run_edit(edited, latency, Path(tmp) / f"{edited}.sqlite")
+                for edited in EDITS
+            ],
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="タスクの定義を変えたワークフローの再実行のベンチマーク"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.3, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== タスクの定義を変えたワークフローの再実行のベンチマーク ===")
+    print(f"release_process、FakeModel: 最初のトークンまで {args.latency}秒\n")
+    print(
+        f"{'変更したタスク':<14}{'全体(秒)':>9}{'呼出':>6}{'差分(秒)':>10}{'呼出':>6}"
+        f"{'計画(ms)':>10}  実行し直したタスク"
+    )
+    for r in results["edits"]:
+        match = "" if r["planned"] == r["executed"] else "  ※ドライランと不一致"
+        print(
+            f"{r['edited']:<14}{r['full_s']:>9}{r['full_model_calls']:>6}"
+            f"{r['incremental_s']:>10}{r['incremental_model_calls']:>6}"
+            f"{r['plan_ms']:>10}  {', '.join(r['executed']) or '-'}{match}"
+        )
+
+
+if __name__ == "__main__":
+    main()
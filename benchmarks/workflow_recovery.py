@@ -0,0 +1,182 @@
+"""
+workflow_recovery.py - ワークフローの途中で落ちた場合の再開のベンチマーク
+
+04-workflow/03_complex_dag_workflow.py と同じ DAG（release_process）を、
+レイテンシを注入した FakeModel で common.workflow.WorkflowScheduler により実行し、
+全体の所要時間の一定割合の時点で実行を打ち切る（プロセスが落ちた場合を模擬）。
+その後、以下の2通りで最後まで実行し直して比較する。
+
+- scratch: 保存先なしで最初から実行し直す（strands_tools の workflow と同じ）
+- resume: SQLite の WorkflowStore を開き直し、完了済みのタスクを飛ばして再開する
+
+再開の準備時間（保存先を開いて完了済みの結果を読み込むまで）と、
+保存先ありで最後まで実行した場合の書き込みのオーバーヘッドも計測する。
+
+実行方法:
+    uv run python -m benchmarks.workflow_recovery
+    uv run python -m benchmarks.workflow_recovery --crash-at 0.3,0.6,0.9 --latency 0.5 --json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from strands import Agent
+
+from benchmarks.workflow_scheduling import release_process
+from common.fake_model import FakeModel
+from common.workflow import WorkflowScheduler
+from common.workflow_store import WorkflowStore
+
+WORKFLOW_ID = "release_process"
+
+
+def _parent(latency: float) -> tuple[Agent, FakeModel]:
+    model = FakeModel(latency=latency, text_length=200)
+    return Agent(model=model, callback_handler=None), model
+
+
+def run_clean(latency: float, path: Path | None) -> dict[str, Any]:
+    """最後まで実行する（path を指定すると結果を保存する）"""
+    tasks, _ = release_process()
+    parent, model = _parent(latency)
+    store = None
+    if path is not None:
+        store = WorkflowStore(path)
+        store.save_workflow(WORKFLOW_ID, tasks)
+    start = time.perf_counter()
+    run = WorkflowScheduler().run(WORKFLOW_ID, tasks, parent, store)
+    elapsed = time.perf_counter() - start
+    if store is not None:
+        store.close()
+    return {
+        "succeeded": run.succeeded,
+        "elapsed_s": round(elapsed, 3),
+        "model_calls": model.stats.invocations,
+    }
+
+
+def run_crash(
+    latency: float, crash_at: float, clean_s: float, workdir: Path
+) -> dict[str, Any]:
+    """clean_s * crash_at 秒で打ち切り、最初から実行し直す場合と再開する場合を比較する"""
+    tasks, _ = release_process()
+    path = workdir / f"crash_{crash_at}.sqlite"
+    parent, model = _parent(latency)
+    store = WorkflowStore(path)
+    store.save_workflow(WORKFLOW_ID, tasks)
+
+    async def interrupted() -> None:
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(
+                WorkflowScheduler().run_async(WORKFLOW_ID, tasks, parent, store),
+                clean_s * crash_at,
+            )
+
+    asyncio.run(interrupted())
+    store.close()
+    first_calls = model.stats.invocations
+
+    # 最初から実行し直す
+    parent, scratch_model = _parent(latency)
+    start = time.perf_counter()
+    WorkflowScheduler().run(WORKFLOW_ID, tasks, parent)
+    scratch_s = time.perf_counter() - start
+
+    # 保存先を開き直して再開する
+    parent, resume_model = _parent(latency)
+    start = time.perf_counter()
+    store = WorkflowStore(path)
+    definition = store.load_workflow(WORKFLOW_ID)
+    completed = store.load_results(WORKFLOW_ID, "completed")
+    recovery_ms = (time.perf_counter() - start) * 1000
+    run = WorkflowScheduler().run(WORKFLOW_ID, definition["tasks"], parent, store)
+    resume_s = time.perf_counter() - start
+    store.close()
+
+    return {
+        "crash_at_s": round(clean_s * crash_at, 2),
+        "completed_before_crash": len(completed),
+        "model_calls_before_crash": first_calls,
+        "scratch_s": round(scratch_s, 3),
+        "scratch_model_calls": scratch_model.stats.invocations,
+        "resume_s": round(resume_s, 3),
+        "resume_model_calls": resume_model.stats.invocations,
+        "model_calls_saved": (
+            scratch_model.stats.invocations - resume_model.stats.invocations
+        ),
+        "recovery_ms": round(recovery_ms, 2),
+        "restored": run.restored,
+        "succeeded": run.succeeded,
+    }
+
+
+def run(crash_points: list[float], latency: float) -> dict[str, Any]:
+    """全ての打ち切り時点で比較する"""
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        memory = run_clean(latency, None)
+        durable = run_clean(latency, workdir / "clean.sqlite")
+        return {
+            "config": {"latency_s": latency, "tasks": len(release_process()[0])},
+            "clean": {"without_store": memory, "with_store": durable},
+            "crashes": {
+                crash_at: run_crash(latency, crash_at, memory["elapsed_s"], workdir)
+                for crash_at in crash_points
+            },
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="ワークフローの途中で落ちた場合の再開のベンチマーク"
+    )
+    parser.add_argument(
+        "--crash-at",
+        default="0.25,0.5,0.75",
+        help="打ち切る時点（全体の所要時間に対する割合、カンマ区切り）",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.3, help="最初のトークンまでの待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    crash_points = [float(point) for point in args.crash_at.split(",")]
+    results = run(crash_points, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== ワークフローの途中で落ちた場合の再開のベンチマーク ===")
+    clean = results["clean"]
+    print(
+        f"release_process（{results['config']['tasks']}タスク）、"
+        f"FakeModel: 最初のトークンまで {args.latency}秒"
+    )
+    print(
+        f"最後まで実行: 保存先なし {clean['without_store']['elapsed_s']}秒、"
+        f"SQLite に保存 {clean['with_store']['elapsed_s']}秒"
+        f"（{clean['with_store']['model_calls']}回呼出）\n"
+    )
+    print(
+        f"{'打切(秒)':>8}{'完了済':>7}{'最初から(秒)':>13}{'呼出':>6}"
+        f"{'再開(秒)':>10}{'呼出':>6}{'削減':>6}{'準備(ms)':>10}"
+    )
+    for r in results["crashes"].values():
+        print(
+            f"{r['crash_at_s']:>8}{r['completed_before_crash']:>7}"
+            f"{r['scratch_s']:>13}{r['scratch_model_calls']:>6}"
+            f"{r['resume_s']:>10}{r['resume_model_calls']:>6}"
+            f"{r['model_calls_saved']:>6}{r['recovery_ms']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
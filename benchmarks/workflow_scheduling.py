@@ -0,0 +1,181 @@
+"""
+workflow_scheduling.py - ワークフローのタスクの開始順序のシミュレーション
+
+同時実行数に上限があると、実行可能なタスクをどの順に開始するかで全体の完了までの時間
+（メイクスパン）が変わる。common.workflow.simulate() でモデルを呼ばずに実行を模擬し、
+WorkflowScheduler の開始順序ごとのメイクスパンを比較する。
+
+- fifo: 実行可能になった順
+- priority: タスク定義の priority の高い順
+- critical_path: クリティカルパスの長い順（所要時間の記録を使う）
+- critical_path_no_history: クリティカルパスの長い順（記録がなく、全タスクを同じ所要時間とみなす）
+
+1. release_process: 04-workflow/03_complex_dag_workflow.py と同じ DAG で、
+   api_design → api_impl の系列が長い場合
+2. random: 層状のランダムな DAG（所要時間は対数正規分布、priority はランダム）の平均。
+   メイクスパンは下限（クリティカルパスの長さと、合計時間 / 同時実行数の大きい方）との比で示す
+
+実行方法:
+    uv run python -m benchmarks.workflow_scheduling
+    uv run python -m benchmarks.workflow_scheduling --dags 500 --tasks 50 --json
+"""
+
+import argparse
+import json
+import random
+import statistics
+from typing import Any
+
+from common.workflow import critical_path_lengths, normalize_tasks, simulate
+
+ORDERS = ("fifo", "priority", "critical_path", "critical_path_no_history")
+
+# 04-workflow/03_complex_dag_workflow.py の DAG（依存関係と priority）と、所要時間（秒）
+RELEASE_PROCESS = [
+    ("requirements", [], 5, 20),
+    ("frontend_dev", ["requirements"], 3, 30),
+    ("backend_dev", ["requirements"], 3, 30),
+    ("api_design", ["requirements"], 3, 25),
+    ("integration", ["frontend_dev", "backend_dev"], 3, 20),
+    ("api_impl", ["api_design", "backend_dev"], 3, 60),
+    ("testing", ["integration", "api_impl"], 5, 20),
+    ("release", ["testing"], 5, 10),
+]
+
+
+def _task(task_id: str, dependencies: list[str], priority: int) -> dict[str, Any]:
+    return {
+        "task_id": task_id,
+        "description": task_id,
+        "dependencies": dependencies,
+        "priority": priority,
+    }
+
+
+def release_process() -> tuple[list[dict[str, Any]], dict[str, float]]:
+    """04-workflow/03 と同じ DAG と所要時間"""
+    tasks = [_task(t, deps, priority) for t, deps, priority, _ in RELEASE_PROCESS]
+    return tasks, {t: seconds for t, _, _, seconds in RELEASE_PROCESS}
+
+
+def random_dag(
+    rng: random.Random, count: int, layers: int = 5
+) -> tuple[list[dict[str, Any]], dict[str, float]]:
+    """層状のランダムな DAG（各タスクは前の層のタスク1〜3個に依存する）"""
+    tasks: list[dict[str, Any]] = []
+    durations: dict[str, float] = {}
+    by_layer: list[list[str]] = [[] for _ in range(layers)]
+    for i in range(count):
+        layer = 0 if i < layers else rng.randrange(layers)
+        task_id = f"t{i}"
+        previous = by_layer[layer - 1] if layer else []
+        dependencies = rng.sample(previous, min(len(previous), rng.randint(1, 3)))
+        tasks.append(_task(task_id, dependencies, rng.randint(1, 5)))
+        durations[task_id] = rng.lognormvariate(0, 1)
+        by_layer[layer].append(task_id)
+    return tasks, durations
+
+
+def makespans(
+    tasks: list[dict[str, Any]], durations: dict[str, float], concurrency: int
+) -> dict[str, float]:
+    """開始順序ごとのメイクスパン"""
+    result = {}
+    for order in ORDERS:
+        if order == "critical_path_no_history":
+            makespan, _ = simulate(
+                tasks, durations, concurrency=concurrency, estimates={}
+            )
+        else:
+            makespan, _ = simulate(
+                tasks, durations, concurrency=concurrency, order=order
+            )
+        result[order] = makespan
+    return result
+
+
+def lower_bound(
+    tasks: list[dict[str, Any]], durations: dict[str, float], concurrency: int
+) -> float:
+    """メイクスパンの下限"""
+    longest = max(critical_path_lengths(normalize_tasks(tasks), durations).values())
+    return max(longest, sum(durations.values()) / concurrency)
+
+
+def run(dags: int, task_count: int, levels: list[int], seed: int) -> dict[str, Any]:
+    """全てのシナリオを実行する"""
+    tasks, durations = release_process()
+    release = {
+        concurrency: {
+            "lower_bound_s": round(lower_bound(tasks, durations, concurrency), 1),
+            **{
+                order: round(makespan, 1)
+                for order, makespan in makespans(tasks, durations, concurrency).items()
+            },
+        }
+        for concurrency in (1, 2, 3)
+    }
+
+    rng = random.Random(seed)
+    graphs = [random_dag(rng, task_count) for _ in range(dags)]
+    random_results: dict[int, dict[str, Any]] = {}
+    for concurrency in levels:
+        ratios: dict[str, list[float]] = {order: [] for order in ORDERS}
+        for tasks, durations in graphs:
+            bound = lower_bound(tasks, durations, concurrency)
+            for order, makespan in makespans(tasks, durations, concurrency).items():
+                ratios[order].append(makespan / bound)
+        random_results[concurrency] = {
+            order: {
+                "mean_ratio": round(statistics.mean(values), 3),
+                "worst_ratio": round(max(values), 3),
+            }
+            for order, values in ratios.items()
+        }
+
+    return {
+        "config": {"dags": dags, "tasks": task_count, "seed": seed},
+        "release_process": release,
+        "random": random_results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="ワークフローのタスクの開始順序のシミュレーション"
+    )
+    parser.add_argument("--dags", type=int, default=200, help="ランダムな DAG の数")
+    parser.add_argument("--tasks", type=int, default=30, help="DAG あたりのタスク数")
+    parser.add_argument("--levels", default="2,4,8", help="同時実行数（カンマ区切り）")
+    parser.add_argument("--seed", type=int, default=0, help="乱数のシード")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",")]
+    results = run(args.dags, args.tasks, levels, args.seed)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== ワークフローのタスクの開始順序のシミュレーション ===\n")
+    print("release_process（04-workflow/03 の DAG、メイクスパン 秒）")
+    print(f"{'同時実行':>8}{'下限':>8}" + "".join(f"{o:>26}" for o in ORDERS))
+    for concurrency, r in results["release_process"].items():
+        print(
+            f"{concurrency:>8}{r['lower_bound_s']:>8}"
+            + "".join(f"{r[o]:>26}" for o in ORDERS)
+        )
+
+    print(
+        f"\nrandom（{args.dags}個の DAG、タスク {args.tasks}件、"
+        "メイクスパン / 下限 の平均（最悪））"
+    )
+    print(f"{'同時実行':>8}" + "".join(f"{o:>26}" for o in ORDERS))
+    for concurrency, r in results["random"].items():
+        cells = [f"{r[o]['mean_ratio']} ({r[o]['worst_ratio']})" for o in ORDERS]
+        print(f"{concurrency:>8}" + "".join(f"{cell:>26}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+workflow_throttling.py - ワークフローのタスクの同時実行数制御のベンチマーク
+
+同時に max_concurrency 件を超える呼び出しをスロットリングする FakeModel（スタブ）に対して、
+依存関係のない多数のタスクと、それらを統合する1つのタスクからなるワークフローを
+common.workflow.WorkflowScheduler で実行し、以下を比較する。
+
+- fixed: 同時実行数の上限を固定（32）。strands_tools の workflow と同じく一斉に実行し、
+  スロットリングされたら待ってから再試行するだけ
+- adaptive: モデルごとの AdaptiveConcurrencyLimiter（AIMD）で上限を調整する
+
+タスクの一部は priority が高く、残りは低い。priority ごとの完了までの平均時間で、
+上限に達しているときに priority の高いタスクが先に実行されることを確認する。
+モデル呼び出し回数はスロットリングされた呼び出しも含む。
+
+実行方法:
+    uv run python -m benchmarks.workflow_throttling
+    uv run python -m benchmarks.workflow_throttling --tasks 80 --model-concurrency 8 --json
+"""
+
+import argparse
+import json
+import statistics
+from typing import Any
+
+from strands import Agent
+
+from common.fake_model import FakeModel
+from common.workflow import AdaptiveConcurrencyLimiter, WorkflowScheduler
+
+FIXED_LIMIT = 32
+
+
+def _tasks(count: int, high_priority: int) -> list[dict[str, Any]]:
+    tasks = [
+        {
+            "task_id": f"research_{i}",
+            "description": f"テーマ {i} について1文で調査してください。",
+            "system_prompt": "あなたは調査の専門家です。",
+            "priority": 5 if i < high_priority else 1,
+            "timeout": 120,
+        }
+        for i in range(count)
+    ]
+    tasks.append(
+        {
+            "task_id": "summary",
+            "description": "全ての調査結果を統合してください。",
+            "dependencies": [task["task_id"] for task in tasks],
+            "priority": 5,
+            "timeout": 120,
+        }
+    )
+    return tasks
+
+
+def run_variant(
+    name: str, tasks: int, high_priority: int, model_concurrency: int, latency: float
+) -> dict[str, Any]:
+    """1つの方式でワークフローを実行する"""
+    model = FakeModel(
+        latency=latency, text_length=40, max_concurrency=model_concurrency
+    )
+    parent = Agent(model=model, callback_handler=None)
+    scheduler = WorkflowScheduler(max_attempts=20, base_delay=0.2, max_delay=2.0)
+    if name == "fixed":
+        # 下限と上限を同じにして、スロットリングされても上限を変えない
+        key, _ = scheduler.resolve_model({}, parent)
+        scheduler.limiters[key] = AdaptiveConcurrencyLimiter(
+            FIXED_LIMIT, min_limit=FIXED_LIMIT, max_limit=FIXED_LIMIT
+        )
+
+    run = scheduler.run(name, _tasks(tasks, high_priority), parent)
+    results = list(run.results.values())
+    research = [r for r in results if r.task_id != "summary"]
+    high = [r.elapsed_ms for r in research[:high_priority]]
+    low = [r.elapsed_ms for r in research[high_priority:]]
+    elapsed = sorted(r.elapsed_ms for r in research)
+    limiter = next(iter(run.limiters.values()))
+    return {
+        "succeeded": sum(r.status == "completed" for r in results),
+        "failed": sum(r.status != "completed" for r in results),
+        "elapsed_s": round(run.elapsed_ms / 1000, 2),
+        "p95_task_ms": round(elapsed[int(0.95 * (len(elapsed) - 1))], 1),
+        "high_priority_ms": round(statistics.mean(high), 1) if high else None,
+        "low_priority_ms": round(statistics.mean(low), 1) if low else None,
+        "model_calls": model.stats.invocations + model.stats.throttled,
+        "throttled": model.stats.throttled,
+        "retries": run.retries,
+        "final_limit": limiter["limit"],
+        "peak_in_flight": limiter["peak_in_flight"],
+    }
+
+
+def run(
+    tasks: int, high_priority: int, model_concurrency: int, latency: float
+) -> dict[str, Any]:
+    """全ての方式を実行する"""
+    return {
+        "config": {
+            "tasks": tasks,
+            "high_priority": high_priority,
+            "model_concurrency": model_concurrency,
+            "latency_s": latency,
+        },
+        "variants": {
+            name: run_variant(name, tasks, high_priority, model_concurrency, latency)
+            for name in ("fixed", "adaptive")
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="ワークフローのタスクの同時実行数制御のベンチマーク"
+    )
+    parser.add_argument("--tasks", type=int, default=40, help="並列タスク数")
+    parser.add_argument(
+        "--high-priority", type=int, default=10, help="priority の高いタスク数"
+    )
+    parser.add_argument(
+        "--model-concurrency",
+        type=int,
+        default=4,
+        help="スタブがスロットリングせずに処理できる同時呼び出し数",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.3, help="スタブの応答までの待ち時間（秒）"
+    )
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力する")
+    args = parser.parse_args()
+
+    results = run(args.tasks, args.high_priority, args.model_concurrency, args.latency)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+
+    print("=== ワークフローのタスクの同時実行数制御のベンチマーク ===")
+    print(
+        f"並列タスク {args.tasks}件（priority 高 {args.high_priority}件）+ 統合タスク、"
+        f"スタブ: 同時 {args.model_concurrency} 件を超えるとスロットリング、"
+        f"待ち時間 {args.latency} 秒\n"
+    )
+    print(
+        f"{'方式':<10}{'成功':>5}{'失敗':>5}{'秒':>7}{'p95(ms)':>9}"
+        f"{'高(ms)':>9}{'低(ms)':>9}{'呼出':>6}{'制限':>6}{'上限':>7}"
+    )
+    for name, r in results["variants"].items():
+        print(
+            f"{name:<10}{r['succeeded']:>5}{r['failed']:>5}{r['elapsed_s']:>7}"
+            f"{r['p95_task_ms']:>9}{r['high_priority_ms']:>9}"
+            f"{r['low_priority_ms']:>9}{r['model_calls']:>6}"
+            f"{r['throttled']:>6}{r['final_limit']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
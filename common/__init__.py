@@ -0,0 +1,55 @@
+"""
+common - サンプル間で共有するユーティリティ
+
+各パターンのサンプルから共通して使う部品をまとめたパッケージ。
+"""
+
+from .agent_pool import AgentPool, get_agent_pool
+from .batch import BatchRunner
+from .convergence import ConvergenceGuard
+from .events import EventStream
+from .fake_model import FakeModel, FakeResponse, FakeRule, FakeToolUse
+from .fanout import fan_out, fan_out_async
+from .graph import GraphBuilder
+from .handoff_guard import HandoffGuard
+from .models import DEFAULT_MODEL_ID, DEFAULT_REGION, get_model, workflow_task_model
+from .payload import PayloadPolicy
+from .pre_router import PreRouter
+from .response_cache import ResponseCache, get_response_cache
+from .routing import EdgeRouter
+from .runner import RequestRunner
+from .swarm import HandoffPolicy, Swarm
+from .workflow import WorkflowScheduler, get_workflow_scheduler
+from .workflow_store import WorkflowStore, get_workflow_store
+
+__all__ = [
+    "DEFAULT_MODEL_ID",
+    "DEFAULT_REGION",
+    "AgentPool",
+    "BatchRunner",
+    "ConvergenceGuard",
+    "EdgeRouter",
+    "EventStream",
+    "FakeModel",
+    "FakeResponse",
+    "FakeRule",
+    "FakeToolUse",
+    "GraphBuilder",
+    "HandoffGuard",
+    "HandoffPolicy",
+    "PayloadPolicy",
+    "PreRouter",
+    "RequestRunner",
+    "ResponseCache",
+    "Swarm",
+    "WorkflowScheduler",
+    "WorkflowStore",
+    "fan_out",
+    "fan_out_async",
+    "get_agent_pool",
+    "get_model",
+    "get_response_cache",
+    "get_workflow_scheduler",
+    "get_workflow_store",
+    "workflow_task_model",
+]
@@ -0,0 +1,263 @@
+"""
+a2a_agent.py - リモートのA2Aエージェントを Graph のノードや Swarm のメンバーとして使うプロキシ
+
+strands の Graph / Swarm のノードは同じプロセスの Agent（Swarm は Agent のみ）に限られる。
+A2AModel は strands の Model インターフェースを実装し、モデルを呼ぶ代わりに最後のユーザー入力を
+リモートのA2Aエージェントに送って、応答のテキストの差分をモデルのストリームイベントとして返す。
+remote_agent() はこのモデルを持つ普通の Agent を作るため、GraphBuilder.add_node() にも
+Swarm(nodes=...) にもそのまま渡せる。
+
+- 接続の使い回し: 複数のリモートエージェントで1つの A2AClientManager（または A2AGateway）を共有できる
+- タイムアウト: timeout 秒以内に応答が終わらなければ TimeoutError（Graph ではノードの失敗）にする。
+  接続と読み取りのタイムアウトは A2AClientManager の設定に従う
+- ストリーミング: 既定ではリモートの差分をそのまま返すため、print_stream() などで
+  リモートのエージェントのトークンも生成されたそばから表示される
+- Swarm の引き継ぎ: リモートのエージェントは Swarm が注入する handoff_to_agent を呼べないため、
+  handoff_to を指定すると応答の後にそのエージェントへ引き継ぐ（省略した場合はそこで Swarm が終わる）
+
+システムプロンプトとツールはリモート側のエージェントのものを使う（ローカル側の指定は送らない）。
+A2AClientManager はイベントループに結び付くため、同時に使うのは1つのイベントループからにする。
+
+使い方:
+    from common.a2a_agent import remote_agent
+    from common.a2a_client import A2AClientManager
+
+    manager = A2AClientManager()
+    trends = remote_agent("http://127.0.0.1:9000", "trend_analyst", manager=manager)
+    builder.add_node(trends, "trends")
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import time
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+from strands import Agent
+from strands.models.model import Model
+from strands.types.content import Messages
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+from .a2a_client import A2AClientManager
+from .a2a_gateway import A2AGateway
+from .fake_model import HANDOFF_TOOL_NAME
+from .tokens import estimate_tokens
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def _last_user_text(messages: Messages) -> str:
+    """最後のユーザーメッセージのテキスト"""
+    for message in reversed(messages):
+        if message["role"] != "user":
+            continue
+        texts = [block["text"] for block in message["content"] if "text" in block]
+        if texts:
+            return "\n".join(texts)
+    return ""
+
+
+class A2AModel(Model):
+    """モデルの代わりにリモートのA2Aエージェントへ入力を送るプロキシ。"""
+
+    def __init__(
+        self,
+        target: str | A2AGateway,
+        *,
+        manager: A2AClientManager | None = None,
+        timeout: float | None = None,
+        streaming: bool = True,
+        handoff_to: str | None = None,
+    ):
+        """プロキシを初期化する。
+
+        Args:
+            target: リモートのエージェントのベースURL、またはレプリカに振り分ける A2AGateway
+            manager: 接続を使い回す A2AClientManager（省略時は新しく作る。target が A2AGateway の場合は使わない）
+            timeout: 1回の呼び出しで応答が終わるまでの上限（秒。None なら制限しない）
+            streaming: 応答の差分を届いた順に返すかどうか（False なら応答全体を1回で返す）
+            handoff_to: Swarm の中で、応答の後に引き継ぐエージェントの名前
+        """
+        self.target = target
+        if isinstance(target, A2AGateway):
+            self.manager = target.manager
+        else:
+            self.manager = manager or A2AClientManager()
+        self.config: dict[str, Any] = {
+            "model_id": target if isinstance(target, str) else "a2a-gateway",
+            "timeout": timeout,
+            "streaming": streaming,
+            "handoff_to": handoff_to,
+        }
+        self._tool_use_ids = itertools.count(1)
+
+    def update_config(self, **model_config: Any) -> None:
+        """設定（timeout, streaming, handoff_to）を更新する"""
+        self.config.update(model_config)
+
+    def get_config(self) -> dict[str, Any]:
+        """設定を返す"""
+        return self.config
+
+    async def _remote_text(self, text: str) -> AsyncIterator[str]:
+        """リモートのエージェントに送り、応答のテキストを返す"""
+        if self.config["streaming"]:
+            if isinstance(self.target, A2AGateway):
+                deltas = self.target.stream_text(text)
+            else:
+                deltas = self.manager.stream_text(self.target, text)
+            async for delta in deltas:
+                yield delta
+        elif isinstance(self.target, A2AGateway):
+            yield await self.target.send(text)
+        else:
+            yield await self.manager.send(self.target, text)
+
+    async def _deltas(self, text: str) -> AsyncIterator[str]:
+        """_remote_text() に timeout を適用する。
+
+        締め切りは差分を待つ間だけにかけ、yield で呼び出し元に戻っている間は取り消さない
+        （呼び出し元のコードの途中で CancelledError が起きないようにする）。
+        """
+        timeout = self.config["timeout"]
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        deltas = aiter(self._remote_text(text))
+        try:
+            while True:
+                try:
+                    # 締め切り（None なら無制限）は全体で1つ。差分ごとに残りの時間だけ待つ
+                    async with asyncio.timeout_at(deadline):
+                        delta = await anext(deltas)
+                except StopAsyncIteration:
+                    return
+                except TimeoutError as e:
+                    if deadline is None:
+                        raise
+                    raise TimeoutError(
+                        f"A2A agent {self.config['model_id']} did not respond within "
+                        f"{timeout}s"
+                    ) from e
+                yield delta
+        finally:
+            await deltas.aclose()
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None = None,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamEvent]:
+        """リモートの応答をBedrockと同じ形式のストリームイベントとして返す"""
+        start = time.perf_counter()
+        yield {"messageStart": {"role": "assistant"}}
+
+        # 引き継ぎのツール結果を受け取った直後は、リモートに送らずに終える
+        last = messages[-1]["content"] if messages else []
+        if any("toolResult" in block for block in last):
+            yield {"messageStop": {"stopReason": "end_turn"}}
+            return
+
+        text = _last_user_text(messages)
+        output: list[str] = []
+        yield {"contentBlockStart": {"start": {}}}
+        async for delta in self._deltas(text):
+            output.append(delta)
+            yield {"contentBlockDelta": {"delta": {"text": delta}}}
+        yield {"contentBlockStop": {}}
+
+        handoff_to = self.config["handoff_to"]
+        tool_names = {spec["name"] for spec in tool_specs or []}
+        handoff = handoff_to is not None and HANDOFF_TOOL_NAME in tool_names
+        if handoff:
+            tool_input = {"agent_name": handoff_to, "message": "".join(output)}
+            yield {
+                "contentBlockStart": {
+                    "start": {
+                        "toolUse": {
+                            "toolUseId": f"tooluse_a2a_{next(self._tool_use_ids)}",
+                            "name": HANDOFF_TOOL_NAME,
+                        }
+                    }
+                }
+            }
+            yield {
+                "contentBlockDelta": {
+                    "delta": {
+                        "toolUse": {"input": json.dumps(tool_input, ensure_ascii=False)}
+                    }
+                }
+            }
+            yield {"contentBlockStop": {}}
+
+        yield {"messageStop": {"stopReason": "tool_use" if handoff else "end_turn"}}
+        # 使用量はリモート側のモデルのもの。送受信したテキストから見積もる
+        input_tokens = estimate_tokens(text)
+        output_tokens = estimate_tokens("".join(output))
+        yield {
+            "metadata": {
+                "usage": {
+                    "inputTokens": input_tokens,
+                    "outputTokens": output_tokens,
+                    "totalTokens": input_tokens + output_tokens,
+                },
+                "metrics": {
+                    "latencyMs": math.ceil((time.perf_counter() - start) * 1000)
+                },
+            }
+        }
+
+    async def structured_output(
+        self,
+        output_model: type[T],
+        prompt: Messages,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[dict[str, T | Any]]:
+        """リモートの応答テキストをJSONとして解釈し、構造化出力を返す"""
+        text = _last_user_text(prompt)
+        response = "".join([delta async for delta in self._deltas(text)])
+        yield {"output": output_model.model_validate_json(response)}
+
+
+def remote_agent(
+    target: str | A2AGateway,
+    name: str,
+    *,
+    description: str | None = None,
+    manager: A2AClientManager | None = None,
+    timeout: float | None = None,
+    streaming: bool = True,
+    handoff_to: str | None = None,
+    **kwargs: Any,
+) -> Agent:
+    """リモートのA2Aエージェントに処理を任せる Agent を作る。
+
+    Args:
+        target: リモートのエージェントのベースURL、またはレプリカに振り分ける A2AGateway
+        name: ノードID・Swarm のメンバー名として使う名前
+        description: Swarm の他のメンバーに示す説明（リモートのエージェントカードの説明など）
+        manager: 接続を使い回す A2AClientManager
+        timeout: 1回の呼び出しで応答が終わるまでの上限（秒）
+        streaming: 応答の差分を届いた順に返すかどうか
+        handoff_to: Swarm の中で、応答の後に引き継ぐエージェントの名前
+        **kwargs: Agent に渡すその他の引数（callback_handler など）
+    """
+    kwargs.setdefault("callback_handler", None)
+    return Agent(
+        model=A2AModel(
+            target,
+            manager=manager,
+            timeout=timeout,
+            streaming=streaming,
+            handoff_to=handoff_to,
+        ),
+        name=name,
+        description=description,
+        **kwargs,
+    )
@@ -0,0 +1,381 @@
+"""
+a2a_client.py - リモートA2Aエージェントへの接続を使い回すクライアントマネージャー
+
+05-a2a のクライアントは、セッションごとに httpx.AsyncClient を作り、A2ACardResolver で
+エージェントカードを取得してから ClientFactory でクライアントを作る。リクエストごとに
+これを行うと、短いプロンプトではカードの取得と接続の確立が所要時間の大半を占める。
+
+A2AClientManager は以下をリモートのベースURLごとに保持して使い回す。
+
+- keep-alive の httpx.AsyncClient（接続プール。http2=True で HTTP/2 を使う。h2 パッケージが必要）
+- エージェントカード: TTL の間はキャッシュを返し、期限切れ後はサーバーが ETag を返していれば
+  If-None-Match で再検証する（304 ならキャッシュを使い続ける）。Cache-Control の max-age があれば TTL より優先する
+- エージェントカードから作った A2A クライアント（ストリーミングの有無ごと）
+
+stream_text() はストリーミングでメッセージを送り、リモートのエージェントが生成したテキストの差分を
+届いた順に返す（A2A 準拠のアーティファクト更新と、strands の既定のステータス更新のどちらにも対応する。
+サーバーがストリーミングに対応していなければ、応答全体を1回で返す）。
+
+リクエスト数・新しく確立した接続数・カードの取得回数などは stats() で確認できる。
+httpx.AsyncClient はイベントループに結び付くため、別のイベントループから使われた場合は作り直す
+（古い接続は、前のループが別のスレッドで動いていればそのループで、そうでなければ新しいループで閉じる）。
+
+使い方:
+    async with A2AClientManager() as manager:
+        text = await manager.send("http://127.0.0.1:9000", "100 + 200 を計算してください")
+        async for delta in manager.stream_text("http://127.0.0.1:9000", "自己紹介してください"):
+            print(delta, end="", flush=True)
+        print(manager.stats())
+"""
+
+import asyncio
+import contextlib
+import importlib.util
+import re
+import statistics
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, Self
+from uuid import uuid4
+
+import httpx
+from a2a.client import Client, ClientConfig, ClientEvent, ClientFactory
+from a2a.types import (
+    AgentCard,
+    Message,
+    Part,
+    Role,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class EndpointStats:
+    """リモートのベースURLごとの統計"""
+
+    requests: int = 0
+    errors: int = 0
+    connections_opened: int = 0
+    card_fetches: int = 0
+    card_cache_hits: int = 0
+    card_not_modified: int = 0
+    # 直近 1000 件の所要時間と最初のテキストまでの時間
+    latencies_ms: deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+    ttft_ms: deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        ordered = sorted(self.latencies_ms)
+        p95 = None
+        if ordered:
+            p95 = ordered[0]
+            if len(ordered) > 1:
+                p95 = statistics.quantiles(ordered, n=20, method="inclusive")[18]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "card_fetches": self.card_fetches,
+            "card_cache_hits": self.card_cache_hits,
+            "card_not_modified": self.card_not_modified,
+            "p50_ms": round(statistics.median(ordered), 1) if ordered else None,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+            "ttft_p50_ms": (
+                round(statistics.median(self.ttft_ms), 1) if self.ttft_ms else None
+            ),
+        }
+
+
+@dataclass
+class _CachedCard:
+    card: AgentCard
+    etag: str | None
+    expires_at: float
+
+
+def message_text(text: str, context_id: str | None = None) -> Message:
+    """テキスト1つからなるユーザーのメッセージを作る"""
+    return Message(
+        role=Role.user,
+        parts=[Part(TextPart(text=text))],
+        message_id=uuid4().hex,
+        context_id=context_id,
+    )
+
+
+def _text(parts: list[Part]) -> str:
+    return "".join(part.root.text for part in parts if isinstance(part.root, TextPart))
+
+
+def response_text(event: ClientEvent | Message) -> str:
+    """send_message() のイベント（Message または (Task, 更新イベント)）から応答のテキストを取り出す"""
+    if isinstance(event, Message):
+        parts = event.parts
+    else:
+        task = event[0]
+        parts = [part for artifact in task.artifacts or [] for part in artifact.parts]
+        if not parts and task.status.message:
+            parts = task.status.message.parts
+    return _text(parts)
+
+
+async def delta_texts(
+    events: AsyncIterator[ClientEvent | Message],
+) -> AsyncIterator[str]:
+    """send_message() のイベントから、応答のテキストの差分を順に取り出す。
+
+    - TaskArtifactUpdateEvent: 追加されたパーツのテキスト（A2A 準拠のストリーミング）
+    - TaskStatusUpdateEvent: 途中経過のメッセージのテキスト（strands の既定のストリーミング。
+      この場合、最後のアーティファクトは全文の繰り返しなので返さない）
+    - Message、または更新イベントのない Task: 差分をまだ返していなければ応答全体（ストリーミングなし）
+    """
+    streamed = False
+    status_deltas = False
+    async for event in events:
+        if isinstance(event, Message):
+            text = "" if streamed else _text(event.parts)
+        else:
+            task, update = event
+            if isinstance(update, TaskArtifactUpdateEvent):
+                text = "" if status_deltas else _text(update.artifact.parts)
+            elif isinstance(update, TaskStatusUpdateEvent):
+                message = update.status.message
+                text = _text(message.parts) if message else ""
+                status_deltas = status_deltas or bool(text)
+            else:
+                text = "" if streamed else response_text((task, None))
+        if text:
+            streamed = True
+            yield text
+
+
+async def _close_clients(clients: list[httpx.AsyncClient]) -> None:
+    """別のイベントループで作った httpx.AsyncClient を閉じる"""
+    for client in clients:
+        # 終了したループの接続はそのループの後始末を呼べないが、ここで参照を手放してソケットを解放する
+        with contextlib.suppress(RuntimeError):
+            await client.aclose()
+
+
+class A2AClientManager:
+    """リモートのA2Aエージェントごとに、接続プール・エージェントカード・クライアントを使い回すマネージャー。"""
+
+    def __init__(
+        self,
+        *,
+        timeout: float = 300.0,
+        connect_timeout: float = 5.0,
+        card_ttl: float = 300.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        streaming: bool = False,
+    ):
+        """マネージャーを初期化する。
+
+        Args:
+            timeout: リクエストのタイムアウト（秒）
+            connect_timeout: 接続の確立のタイムアウト（秒）
+            card_ttl: エージェントカードを再取得せずに使う期間（秒）
+            max_connections: ベースURLごとの同時接続数の上限
+            max_keepalive_connections: ベースURLごとに保持するアイドル接続数の上限
+            keepalive_expiry: アイドル接続を保持する期間（秒）
+            http2: HTTP/2 を使うかどうか（h2 パッケージが必要。平文の HTTP では HTTP/1.1 になる）
+            streaming: A2A クライアントでストリーミングを使うかどうか
+        """
+        if http2 and importlib.util.find_spec("h2") is None:
+            raise ImportError(
+                "http2=True requires the h2 package (pip install 'httpx[http2]')"
+            )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.card_ttl = card_ttl
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.streaming = streaming
+        self._stats: dict[str, EndpointStats] = {}
+        self._cards: dict[str, _CachedCard] = {}
+        self._http: dict[str, httpx.AsyncClient] = {}
+        self._clients: dict[tuple[str, bool], tuple[AgentCard, Client]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._card_locks: dict[str, asyncio.Lock] = {}
+        # 別のイベントループに切り替えたときに、古い接続を閉じているタスク
+        self._closing: set[asyncio.Task[None]] = set()
+
+    def _check_loop(self) -> None:
+        """別のイベントループから使われた場合は、古い接続を閉じて接続とクライアントを作り直す"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        old, clients = self._loop, list(self._http.values())
+        if clients and old is not None and old.is_running() and not old.is_closed():
+            # 前のループは別のスレッドで動いている
+            asyncio.run_coroutine_threadsafe(_close_clients(clients), old)
+        elif clients:
+            task = loop.create_task(_close_clients(clients))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        self._http.clear()
+        self._clients.clear()
+        self._card_locks.clear()
+        self._loop = loop
+
+    def _endpoint(self, base_url: str) -> tuple[str, EndpointStats]:
+        base_url = base_url.rstrip("/")
+        return base_url, self._stats.setdefault(base_url, EndpointStats())
+
+    def http_client(self, base_url: str) -> httpx.AsyncClient:
+        """ベースURLの httpx.AsyncClient を返す（初回のみ生成）"""
+        self._check_loop()
+        base_url, stats = self._endpoint(base_url)
+        client = self._http.get(base_url)
+        if client is None:
+
+            async def trace(event_name: str, info: dict[str, Any]) -> None:
+                if event_name == "connection.connect_tcp.complete":
+                    stats.connections_opened += 1
+
+            async def add_trace(request: httpx.Request) -> None:
+                request.extensions["trace"] = trace
+
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                event_hooks={"request": [add_trace]},
+            )
+            self._http[base_url] = client
+        return client
+
+    async def get_card(self, base_url: str, *, refresh: bool = False) -> AgentCard:
+        """エージェントカードを返す（TTL の間はキャッシュ、期限切れ後は ETag で再検証する）"""
+        http = self.http_client(base_url)
+        base_url, stats = self._endpoint(base_url)
+        lock = self._card_locks.setdefault(base_url, asyncio.Lock())
+        async with lock:
+            cached = self._cards.get(base_url)
+            now = time.monotonic()
+            if cached and not refresh and now < cached.expires_at:
+                stats.card_cache_hits += 1
+                return cached.card
+
+            headers = {"If-None-Match": cached.etag} if cached and cached.etag else {}
+            response = await http.get(
+                f"{base_url}/{AGENT_CARD_WELL_KNOWN_PATH.lstrip('/')}", headers=headers
+            )
+            ttl = self.card_ttl
+            max_age = _MAX_AGE.search(response.headers.get("cache-control", ""))
+            if max_age:
+                ttl = float(max_age.group(1))
+            if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+                stats.card_not_modified += 1
+                cached.expires_at = now + ttl
+                return cached.card
+
+            response.raise_for_status()
+            stats.card_fetches += 1
+            card = AgentCard.model_validate(response.json())
+            self._cards[base_url] = _CachedCard(
+                card, response.headers.get("etag"), now + ttl
+            )
+            return card
+
+    async def get_client(
+        self, base_url: str, *, streaming: bool | None = None
+    ) -> Client:
+        """エージェントカードから作った A2A クライアントを返す（カードが変わった場合は作り直す）
+
+        streaming を省略した場合はマネージャーの streaming の設定を使う。
+        """
+        if streaming is None:
+            streaming = self.streaming
+        card = await self.get_card(base_url)
+        base_url, _ = self._endpoint(base_url)
+        cached = self._clients.get((base_url, streaming))
+        if cached and cached[0] is card:
+            return cached[1]
+        config = ClientConfig(
+            httpx_client=self.http_client(base_url), streaming=streaming
+        )
+        client = ClientFactory(config).create(card)
+        self._clients[base_url, streaming] = (card, client)
+        return client
+
+    async def send_message(
+        self,
+        base_url: str,
+        message: Message | str,
+        *,
+        streaming: bool | None = None,
+    ) -> AsyncIterator[ClientEvent | Message]:
+        """メッセージを送り、A2A クライアントのイベントを順に返す"""
+        client = await self.get_client(base_url, streaming=streaming)
+        _, stats = self._endpoint(base_url)
+        if isinstance(message, str):
+            message = message_text(message)
+        start = time.perf_counter()
+        try:
+            async for event in client.send_message(message):
+                yield event
+        except Exception:
+            # 取り消し（ヘッジで負けたリクエストなど）や GeneratorExit はエラーに数えない
+            stats.errors += 1
+            raise
+        stats.requests += 1
+        stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+
+    async def stream_text(
+        self, base_url: str, message: Message | str
+    ) -> AsyncIterator[str]:
+        """ストリーミングでメッセージを送り、応答のテキストの差分を届いた順に返す"""
+        _, stats = self._endpoint(base_url)
+        start = time.perf_counter()
+        first = True
+        async for text in delta_texts(
+            self.send_message(base_url, message, streaming=True)
+        ):
+            if first:
+                stats.ttft_ms.append((time.perf_counter() - start) * 1000)
+                first = False
+            yield text
+
+    async def send(self, base_url: str, message: Message | str) -> str:
+        """メッセージを送り、最後のイベントの応答テキストを返す"""
+        text = ""
+        async for event in self.send_message(base_url, message):
+            text = response_text(event) or text
+        return text
+
+    def stats(self, base_url: str | None = None) -> dict[str, Any]:
+        """ベースURLごとの統計（base_url を指定した場合はその URL の統計、記録がなければ空の辞書）"""
+        if base_url is not None:
+            stats = self._stats.get(base_url.rstrip("/"))
+            return stats.to_dict() if stats is not None else {}
+        return {url: stats.to_dict() for url, stats in self._stats.items()}
+
+    async def aclose(self) -> None:
+        """全ての接続を閉じる"""
+        clients = list(self._http.values())
+        self._http.clear()
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+        if self._closing:
+            await asyncio.gather(*self._closing)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
@@ -0,0 +1,416 @@
+"""
+a2a_gateway.py - 同じエージェントカードを持つ複数のA2Aサーバー（レプリカ）へのクライアント側のゲートウェイ
+
+05-a2a のクライアントは1つのURLに固定で接続する。A2AGateway はレプリカのURLの一覧を受け取り、
+A2AClientManager の接続を使い回しながら、リクエストごとに送り先のレプリカを選ぶ。
+
+- 負荷分散: "p2c"（ランダムに選んだ2つのうち「応答時間の指数移動平均 ×（処理中の数 + 1）」が
+  小さい方。既定）、"least_outstanding"（処理中のリクエストが最も少ないレプリカ。同じなら応答時間の
+  指数移動平均が短い方）、"round_robin"（比較用）。応答時間の記録がないレプリカを優先する
+- ヘルスチェック: health_interval 秒ごとにエージェントカードを取得し直し、取得できない、
+  または基準（card_name、省略時は先頭のレプリカ）とカードの名前が違うレプリカには送らない
+- 切り離し: failure_threshold 回続けて失敗したレプリカは eject_seconds 秒の間送り先から外す
+  （ヘルスチェックに成功すれば戻す）。失敗したリクエストは別のレプリカで1回だけ再送する
+- 429（ConcurrencyLimit の背圧）は失敗として数えず、別のレプリカに送り直す
+- ヘッジ: hedge_after 秒（"p95" のように指定すると直近の応答時間のパーセンタイル）で応答がなければ、別のレプリカにも同じ
+  リクエストを送り、先に返った方を使う（もう一方はキャンセルする）。ヘッジは全リクエストの
+  hedge_budget の割合までに抑える
+
+全てのレプリカが切り離されている場合は、切り離し中のレプリカにも送る（全停止を避ける）。
+
+使い方:
+    async with A2AGateway(["http://127.0.0.1:9000", "http://127.0.0.1:9001"]) as gateway:
+        text = await gateway.send("100 + 200 を計算してください")
+        print(gateway.stats())
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import re
+import statistics
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Literal, Self
+
+from a2a.client.errors import A2AClientHTTPError
+from a2a.types import AgentCard, Message
+
+from .a2a_client import A2AClientManager, message_text
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("p2c", "least_outstanding", "round_robin")
+HEDGE_MIN_SAMPLES = 20
+
+
+@dataclass
+class Replica:
+    """レプリカごとの状態と統計"""
+
+    url: str
+    outstanding: int = 0
+    ewma_ms: float | None = None
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    healthy: bool = True
+    requests: int = 0
+    errors: int = 0
+    rejected: int = 0
+    ejections: int = 0
+    hedges_won: int = 0
+
+    def available(self, now: float) -> bool:
+        """送り先に選べるかどうか"""
+        return self.healthy and now >= self.ejected_until
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "outstanding": self.outstanding,
+            "ewma_ms": round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "healthy": self.healthy,
+            "ejected": time.monotonic() < self.ejected_until,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "ejections": self.ejections,
+            "hedges_won": self.hedges_won,
+        }
+
+
+@dataclass
+class GatewayStats:
+    """ゲートウェイ全体の統計"""
+
+    requests: int = 0
+    failed: int = 0
+    retries: int = 0
+    hedges: int = 0
+    latencies_ms: deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def percentile(self, q: int) -> float | None:
+        """直近の応答時間のパーセンタイル（ミリ秒。q は 1〜99 の整数）"""
+        if len(self.latencies_ms) < 2:
+            return None
+        return statistics.quantiles(self.latencies_ms, n=100, method="inclusive")[q - 1]
+
+
+class A2AGateway:
+    """同じエージェントカードを持つレプリカに負荷分散・切り離し・ヘッジをして送るゲートウェイ。"""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        *,
+        manager: A2AClientManager | None = None,
+        strategy: Literal["p2c", "least_outstanding", "round_robin"] = "p2c",
+        health_interval: float | None = 5.0,
+        health_timeout: float = 2.0,
+        failure_threshold: int = 3,
+        eject_seconds: float = 30.0,
+        hedge_after: float | str | None = None,
+        hedge_budget: float = 0.1,
+        ewma_alpha: float = 0.3,
+        card_name: str | None = None,
+        seed: int | None = None,
+    ):
+        """ゲートウェイを初期化する。
+
+        Args:
+            urls: レプリカのベースURL
+            manager: 接続を使い回す A2AClientManager（省略時は新しく作り、aclose() で閉じる）
+            strategy: 負荷分散の方式
+            health_interval: ヘルスチェックの間隔（秒。None ならヘルスチェックしない）
+            health_timeout: ヘルスチェックでカードの取得を待つ時間（秒）
+            failure_threshold: 切り離すまでの連続失敗回数
+            eject_seconds: 切り離す期間（秒）
+            hedge_after: ヘッジするまでの待ち時間（秒、"p95" のようなパーセンタイル、
+                または None でヘッジしない）
+            hedge_budget: ヘッジするリクエストの割合の上限
+            ewma_alpha: 応答時間の指数移動平均の重み
+            card_name: レプリカのエージェントカードに期待する名前（省略時は urls の先頭から順に、
+                最初に取得できたレプリカのカードの名前）
+            seed: レプリカを選ぶ乱数のシード
+        """
+        if not urls:
+            raise ValueError("A2AGateway requires at least one replica URL")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {STRATEGIES}: {strategy}")
+        if isinstance(hedge_after, str) and not re.fullmatch(r"p[1-9]\d", hedge_after):
+            raise ValueError(
+                f"hedge_after must be seconds or 'p50'-'p99': {hedge_after}"
+            )
+        self.replicas = [Replica(url.rstrip("/")) for url in urls]
+        self._own_manager = manager is None
+        self.manager = manager or A2AClientManager()
+        self.strategy = strategy
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.hedge_after = hedge_after
+        # "p95" → 95（浮動小数点を経由すると p29 などが1つずれるため整数で持つ）
+        self._hedge_percentile = (
+            int(hedge_after[1:]) if isinstance(hedge_after, str) else None
+        )
+        self.hedge_budget = hedge_budget
+        self.ewma_alpha = ewma_alpha
+        self._stats = GatewayStats()
+        self.card_name = card_name
+        self._random = random.Random(seed)
+        self._next = 0
+        self._health_task: asyncio.Task | None = None
+
+    def pick(self, exclude: Sequence[Replica] = ()) -> Replica | None:
+        """送り先のレプリカを選ぶ（exclude 以外に候補がなければ None）"""
+        now = time.monotonic()
+        candidates = [r for r in self.replicas if r not in exclude]
+        if not candidates:
+            return None
+        available = [r for r in candidates if r.available(now)]
+        if available:
+            candidates = available
+
+        if self.strategy == "round_robin":
+            replica = candidates[self._next % len(candidates)]
+            self._next += 1
+            return replica
+        if self.strategy == "least_outstanding":
+            return min(candidates, key=lambda r: (r.outstanding, r.ewma_ms or 0.0))
+        # 記録がないレプリカは、記録のある中で最も速いレプリカと同じとみなす
+        known = [r.ewma_ms for r in self.replicas if r.ewma_ms is not None]
+        default_ms = min(known, default=1.0)
+        pair = self._random.sample(candidates, min(len(candidates), 2))
+        # 処理中の数が同じでも遅いレプリカには送らず、速いレプリカの待ち行列が伸びたら遅い方も使う
+        return min(
+            pair,
+            key=lambda r: (
+                (r.ewma_ms if r.ewma_ms is not None else default_ms)
+                * (r.outstanding + 1)
+            ),
+        )
+
+    def _hedge_delay(self) -> float | None:
+        """ヘッジするまでの待ち時間（秒。ヘッジしない場合は None）"""
+        stats = self._stats
+        if self.hedge_after is None or len(self.replicas) < 2:
+            return None
+        if stats.hedges >= self.hedge_budget * max(stats.requests, 1):
+            return None
+        if self._hedge_percentile is not None:
+            # 応答時間がある程度たまるまではヘッジしない
+            if len(stats.latencies_ms) < HEDGE_MIN_SAMPLES:
+                return None
+            return stats.percentile(self._hedge_percentile) / 1000
+        return self.hedge_after
+
+    def _record_success(self, replica: Replica, elapsed_ms: float) -> None:
+        replica.consecutive_failures = 0
+        replica.ewma_ms = (
+            elapsed_ms
+            if replica.ewma_ms is None
+            else self.ewma_alpha * elapsed_ms + (1 - self.ewma_alpha) * replica.ewma_ms
+        )
+
+    def _record_failure(self, replica: Replica, error: BaseException) -> None:
+        replica.errors += 1
+        replica.consecutive_failures += 1
+        if replica.consecutive_failures >= self.failure_threshold:
+            replica.ejected_until = time.monotonic() + self.eject_seconds
+            replica.consecutive_failures = 0
+            replica.ejections += 1
+            logger.warning("ejecting A2A replica %s: %s", replica.url, error)
+
+    async def _attempt(self, replica: Replica, message: Message) -> str:
+        """1つのレプリカに送る（結果と失敗をレプリカの状態に記録する）"""
+        start = time.perf_counter()
+        try:
+            text = await self.manager.send(replica.url, message)
+        except A2AClientHTTPError as e:
+            if e.status_code == 429:
+                replica.rejected += 1
+            else:
+                self._record_failure(replica, e)
+            raise
+        except Exception as e:
+            self._record_failure(replica, e)
+            raise
+        self._record_success(replica, (time.perf_counter() - start) * 1000)
+        return text
+
+    async def send(self, message: Message | str) -> str:
+        """レプリカを選んでメッセージを送り、応答のテキストを返す（失敗時は別のレプリカに1回再送する）"""
+        if isinstance(message, str):
+            message = message_text(message)
+        stats = self._stats
+        stats.requests += 1
+        start = time.perf_counter()
+        tried: list[Replica] = []
+        pending: dict[asyncio.Task, Replica] = {}
+        errors: list[BaseException] = []
+        hedge_delay = self._hedge_delay()
+
+        def release(replica: Replica) -> None:
+            replica.outstanding -= 1
+
+        def launch() -> bool:
+            replica = self.pick(tried)
+            if replica is None:
+                return False
+            tried.append(replica)
+            # 次のリクエストの選択に反映されるよう、タスクの開始を待たずに数える
+            replica.outstanding += 1
+            replica.requests += 1
+            task = asyncio.create_task(self._attempt(replica, message))
+            task.add_done_callback(lambda _: release(replica))
+            pending[task] = replica
+            return True
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if hedge_delay is not None:
+                    timeout = max(hedge_delay - (time.perf_counter() - start), 0)
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    # 待ち時間を過ぎても返らないので、別のレプリカにも送る
+                    hedge_delay = None
+                    if launch():
+                        stats.hedges += 1
+                    continue
+                for task in done:
+                    replica = pending.pop(task)
+                    if task.exception() is None:
+                        if replica is not tried[0]:
+                            replica.hedges_won += 1
+                        stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+                        return task.result()
+                    errors.append(task.exception())
+                if not pending and len(errors) == 1 and launch():
+                    stats.retries += 1
+            stats.failed += 1
+            raise errors[-1]
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def stream_text(self, message: Message | str) -> AsyncIterator[str]:
+        """レプリカを選んでストリーミングで送り、応答のテキストの差分を返す（ヘッジ・再送はしない）"""
+        replica = self.pick() or self.replicas[0]
+        stats = self._stats
+        stats.requests += 1
+        replica.outstanding += 1
+        replica.requests += 1
+        start = time.perf_counter()
+        try:
+            async for text in self.manager.stream_text(replica.url, message):
+                yield text
+        except A2AClientHTTPError as e:
+            stats.failed += 1
+            if e.status_code == 429:
+                replica.rejected += 1
+            else:
+                self._record_failure(replica, e)
+            raise
+        except Exception as e:
+            stats.failed += 1
+            self._record_failure(replica, e)
+            raise
+        finally:
+            replica.outstanding -= 1
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._record_success(replica, elapsed_ms)
+        stats.latencies_ms.append(elapsed_ms)
+
+    async def check_health(self) -> dict[str, bool]:
+        """全てのレプリカのエージェントカードを取得し直し、送り先に選べるかを更新する。
+
+        card_name が未設定なら、urls の先頭から順に最初に取得できたカードの名前を使う
+        （応答の早さで基準のレプリカが変わらないようにする）。
+        """
+
+        async def fetch(replica: Replica) -> AgentCard | Exception:
+            try:
+                return await asyncio.wait_for(
+                    self.manager.get_card(replica.url, refresh=True),
+                    self.health_timeout,
+                )
+            except Exception as e:  # noqa: BLE001
+                return e
+
+        cards = await asyncio.gather(*(fetch(replica) for replica in self.replicas))
+        if self.card_name is None:
+            self.card_name = next(
+                (card.name for card in cards if not isinstance(card, Exception)), None
+            )
+        for replica, card in zip(self.replicas, cards, strict=True):
+            if isinstance(card, Exception):
+                if replica.healthy:
+                    logger.warning("A2A replica %s is unhealthy: %s", replica.url, card)
+                replica.healthy = False
+                continue
+            replica.healthy = card.name == self.card_name
+            if replica.healthy:
+                replica.ejected_until = 0.0
+                replica.consecutive_failures = 0
+            else:
+                logger.warning(
+                    "A2A replica %s serves %r instead of %r",
+                    replica.url,
+                    card.name,
+                    self.card_name,
+                )
+        return {replica.url: replica.healthy for replica in self.replicas}
+
+    async def _health_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_health()
+
+    async def start(self) -> None:
+        """ヘルスチェックを開始する（最初のチェックの完了まで待つ）"""
+        await self.check_health()
+        if self.health_interval and self._health_task is None:
+            self._health_task = asyncio.create_task(
+                self._health_loop(self.health_interval)
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """ゲートウェイ全体とレプリカごとの統計"""
+        stats = self._stats
+        p50 = stats.percentile(50)
+        p95 = stats.percentile(95)
+        return {
+            "requests": stats.requests,
+            "failed": stats.failed,
+            "retries": stats.retries,
+            "hedges": stats.hedges,
+            "p50_ms": round(p50, 1) if p50 is not None else None,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+            "replicas": {replica.url: replica.to_dict() for replica in self.replicas},
+        }
+
+    async def aclose(self) -> None:
+        """ヘルスチェックを止め、自分で作った A2AClientManager を閉じる"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+        if self._own_manager:
+            await self.manager.aclose()
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
@@ -0,0 +1,447 @@
+"""
+a2a_server.py - A2Aサーバーの起動ヘルパー
+
+A2AServer.serve() は1つのプロセスの1つのイベントループで、1つの Agent を全リクエストで共有する。
+Agent は同時に1つのリクエストしか実行できず、全クライアントの会話履歴が1つにまとまってしまう。
+また、CPU を使うツール（calculate の eval など）や長い応答のシリアライズが GIL を握る間は、
+他のリクエストが止まる。
+
+- PooledA2AExecutor: AgentPool から会話履歴が空の Agent をリクエストごとに貸し出して実行する
+- ConcurrencyLimit: 同時に実行するリクエスト数を max_concurrency に制限し、待ち行列が max_queue を
+  超えたら 429 Too Many Requests（Retry-After 付き）を返す ASGI ミドルウェア。
+  エージェントカードの取得（GET）は制限しない
+- build_app(): 上の2つと、同期のツールを実行するスレッドプールの大きさ（tool_threads）を設定した
+  Starlette アプリを作る（strands は同期のツールを asyncio.to_thread で実行する）
+- serve(): uvicorn で複数のワーカープロセスを起動する。各ワーカーは target を読み込み直して
+  それぞれの Agent とイベントループで処理する
+- BackgroundA2AServer: uvicorn.Server を別スレッドで起動し、接続を受け付けるまで待つ。
+  同じプロセスでクライアントを動かすデモやベンチマークで使う
+
+target は "ファイルのパス:属性名" または "モジュール名:属性名" で、属性は A2AServer、Agent、
+またはそのどちらかを返す引数なしの関数。
+
+使い方:
+    port = free_port()
+    server = A2AServer(agent=agent, port=port)
+    with BackgroundA2AServer(server) as url:
+        ...
+
+    uv run --extra a2a python -m common.a2a_server 05-a2a/01_a2a_server.py:server \\
+        --workers 4 --max-concurrency 32 --max-queue 64
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import runpy
+import socket
+import threading
+import time
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import uvicorn
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import UnsupportedOperationError
+from a2a.utils.errors import ServerError
+from starlette.applications import Starlette
+from starlette.types import ASGIApp, Receive, Scope, Send
+from strands import Agent
+from strands.handlers.callback_handler import null_callback_handler
+from strands.multiagent.a2a import A2AServer
+from strands.multiagent.a2a.executor import StrandsA2AExecutor
+
+from .agent_pool import AgentPool
+
+CONFIG_ENV = "A2A_SERVE_CONFIG"
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    """空いているポート番号を返す"""
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class PooledA2AExecutor(AgentExecutor):
+    """リクエストごとに AgentPool から会話履歴が空の Agent を貸し出して実行するエグゼキューター。
+
+    元の Agent と同じモデル・システムプロンプト・ツール・名前の Agent を使う。
+    同時に届いたリクエストはそれぞれ別の Agent で実行される。
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        *,
+        max_idle: int = 32,
+        enable_a2a_compliant_streaming: bool = False,
+    ):
+        """エグゼキューターを初期化する。
+
+        Args:
+            agent: 元にする Agent（この Agent 自体は実行に使わない）
+            max_idle: 待機中として保持する Agent の最大数
+            enable_a2a_compliant_streaming: A2AServer の同名の引数と同じ
+        """
+        self.pool = AgentPool(model=agent.model, max_size=max_idle)
+        self.system_prompt = agent.system_prompt or ""
+        self.tools = list(agent.tool_registry.registry.values())
+        self.agent_kwargs = {
+            "name": agent.name,
+            "description": agent.description,
+            "callback_handler": null_callback_handler,
+        }
+        self.enable_a2a_compliant_streaming = enable_a2a_compliant_streaming
+
+    async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
+        """貸し出した Agent で StrandsA2AExecutor と同じ処理を行う"""
+        with self.pool.acquire(
+            self.system_prompt, self.tools, **self.agent_kwargs
+        ) as agent:
+            executor = StrandsA2AExecutor(
+                agent,
+                enable_a2a_compliant_streaming=self.enable_a2a_compliant_streaming,
+            )
+            await executor.execute(context, event_queue)
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        """StrandsA2AExecutor と同じく、キャンセルには対応しない"""
+        raise ServerError(error=UnsupportedOperationError())
+
+
+@dataclass
+class ConcurrencyStats:
+    """ConcurrencyLimit の統計"""
+
+    accepted: int = 0
+    rejected: int = 0
+    active: int = 0
+    waiting: int = 0
+    peak_active: int = 0
+    peak_waiting: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "active": self.active,
+            "waiting": self.waiting,
+            "peak_active": self.peak_active,
+            "peak_waiting": self.peak_waiting,
+        }
+
+
+class ConcurrencyLimit:
+    """POST のリクエストの同時実行数を制限し、待ち行列があふれたら 429 を返す ASGI ミドルウェア。"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        max_concurrency: int = 32,
+        max_queue: int = 64,
+        retry_after: int = 1,
+    ):
+        """ミドルウェアを初期化する。
+
+        Args:
+            app: 包む ASGI アプリ
+            max_concurrency: 同時に実行するリクエスト数の上限
+            max_queue: 実行を待つリクエスト数の上限（超えたら 429 を返す）
+            retry_after: 429 の Retry-After ヘッダーの秒数
+        """
+        self.app = app
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.stats = ConcurrencyStats()
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        stats = self.stats
+        if self._slots.locked() and stats.waiting >= self.max_queue:
+            stats.rejected += 1
+            await self._reject(send)
+            return
+
+        stats.waiting += 1
+        stats.peak_waiting = max(stats.peak_waiting, stats.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            stats.waiting -= 1
+        stats.accepted += 1
+        stats.active += 1
+        stats.peak_active = max(stats.peak_active, stats.active)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stats.active -= 1
+            self._slots.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps(
+            {"error": "server is saturated", "retry_after": self.retry_after}
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def _compliant_streaming(server: A2AServer) -> bool:
+    executor = server.request_handler.agent_executor
+    return getattr(executor, "enable_a2a_compliant_streaming", False)
+
+
+def build_app(
+    server: A2AServer,
+    *,
+    max_concurrency: int = 32,
+    max_queue: int = 64,
+    tool_threads: int | None = None,
+    shared_agent: bool = False,
+    compliant_streaming: bool | None = None,
+) -> ConcurrencyLimit:
+    """本番向けの設定をした A2A サーバーの ASGI アプリを作る。
+
+    Args:
+        server: 公開する A2AServer
+        max_concurrency: 同時に実行するリクエスト数の上限
+        max_queue: 実行を待つリクエスト数の上限（超えたら 429 を返す）
+        tool_threads: 同期のツールを実行するスレッド数（省略時は asyncio の既定値）
+        shared_agent: True なら A2AServer.serve() と同じく1つの Agent を共有する（比較用）
+        compliant_streaming: True ならテキストの差分を A2A 準拠のアーティファクト更新で送る
+            （省略時は server の enable_a2a_compliant_streaming の設定を使う）
+
+    Returns:
+        ConcurrencyLimit で包んだ Starlette アプリ（stats で受付・拒否の件数を確認できる）
+    """
+    executor = server.request_handler.agent_executor
+    if compliant_streaming is None:
+        compliant_streaming = _compliant_streaming(server)
+    if shared_agent:
+        executor.enable_a2a_compliant_streaming = compliant_streaming
+    else:
+        server.request_handler.agent_executor = PooledA2AExecutor(
+            server.strands_agent,
+            max_idle=max_concurrency,
+            enable_a2a_compliant_streaming=compliant_streaming,
+        )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        if tool_threads:
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(tool_threads, thread_name_prefix="a2a-tool")
+            )
+        yield
+
+    app = server.to_starlette_app(app_kwargs={"lifespan": lifespan})
+    return ConcurrencyLimit(app, max_concurrency=max_concurrency, max_queue=max_queue)
+
+
+def load_server(
+    target: str, host: str | None = None, port: int | None = None
+) -> A2AServer:
+    """target（"パス:属性名" または "モジュール:属性名"）から A2AServer を読み込む。
+
+    host / port を指定した場合は、その URL のエージェントカードを返す A2AServer を作り直す。
+    """
+    location, _, attribute = target.rpartition(":")
+    if not location:
+        raise ValueError(
+            f"target must be 'path:attribute' or 'module:attribute': {target}"
+        )
+    if location.endswith(".py"):
+        namespace = runpy.run_path(location, run_name="a2a_worker")
+    else:
+        namespace = vars(importlib.import_module(location))
+    obj: Any = namespace[attribute]
+    if callable(obj) and not isinstance(obj, (A2AServer, Agent)):
+        obj = obj()
+    if isinstance(obj, Agent):
+        return A2AServer(agent=obj, host=host or "127.0.0.1", port=port or 9000)
+    if not isinstance(obj, A2AServer):
+        raise TypeError(f"{target} is not an A2AServer or Agent: {type(obj).__name__}")
+    if (host or obj.host) != obj.host or (port or obj.port) != obj.port:
+        obj = A2AServer(
+            agent=obj.strands_agent,
+            host=host or obj.host,
+            port=port or obj.port,
+            version=obj.version,
+            skills=obj.agent_skills,
+            enable_a2a_compliant_streaming=_compliant_streaming(obj),
+        )
+    return obj
+
+
+def worker_app() -> ConcurrencyLimit:
+    """serve() が起動した各ワーカーで、環境変数の設定からアプリを作る（uvicorn のファクトリ）"""
+    config = json.loads(os.environ[CONFIG_ENV])
+    server = load_server(config.pop("target"), config.pop("host"), config.pop("port"))
+    return build_app(server, **config)
+
+
+def serve(
+    target: str,
+    *,
+    workers: int = 1,
+    host: str = "127.0.0.1",
+    port: int = 9000,
+    max_concurrency: int = 32,
+    max_queue: int = 64,
+    tool_threads: int | None = None,
+    shared_agent: bool = False,
+    compliant_streaming: bool | None = None,
+    **uvicorn_kwargs: Any,
+) -> None:
+    """target の A2A サーバーを uvicorn の複数のワーカープロセスで起動する。
+
+    max_concurrency・max_queue・tool_threads はワーカーごとの値。
+    ワーカーは環境変数 A2A_SERVE_CONFIG で設定を受け取り、それぞれ target を読み込む。
+    """
+    os.environ[CONFIG_ENV] = json.dumps(
+        {
+            "target": target,
+            "host": host,
+            "port": port,
+            "max_concurrency": max_concurrency,
+            "max_queue": max_queue,
+            "tool_threads": tool_threads,
+            "shared_agent": shared_agent,
+            "compliant_streaming": compliant_streaming,
+        }
+    )
+    uvicorn.run(
+        "common.a2a_server:worker_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        **uvicorn_kwargs,
+    )
+
+
+class BackgroundA2AServer:
+    """A2AServer を別スレッドの uvicorn で起動し、with を抜けると停止するサーバー。"""
+
+    def __init__(
+        self,
+        server: A2AServer,
+        *,
+        app: ASGIApp | None = None,
+        log_level: str = "warning",
+        **uvicorn_kwargs: Any,
+    ):
+        """サーバーを初期化する。
+
+        Args:
+            server: 起動する A2AServer（host / port はこのサーバーの設定を使う）
+            app: 起動する ASGI アプリ（省略時は server.to_starlette_app()。build_app() の結果など）
+            log_level: uvicorn のログレベル
+            **uvicorn_kwargs: uvicorn.Config に渡す追加の設定
+        """
+        self.server = server
+        self.url = server.public_base_url
+        config = uvicorn.Config(
+            app or server.to_starlette_app(),
+            host=server.host,
+            port=server.port,
+            log_level=log_level,
+            **uvicorn_kwargs,
+        )
+        self._uvicorn = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._uvicorn.run, daemon=True)
+
+    def start(self, timeout: float = 10.0) -> str:
+        """サーバーを起動し、接続を受け付けるまで待ってからURLを返す"""
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._uvicorn.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"A2A server failed to start on {self.url}")
+            time.sleep(0.01)
+        return self.url
+
+    def stop(self) -> None:
+        """サーバーを停止する"""
+        self._uvicorn.should_exit = True
+        self._thread.join()
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="A2A サーバーを複数のワーカープロセスで起動する"
+    )
+    parser.add_argument(
+        "target", help="公開するサーバー（例: 05-a2a/01_a2a_server.py:server）"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="ワーカープロセス数")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けるホスト")
+    parser.add_argument("--port", type=int, default=9000, help="待ち受けるポート")
+    parser.add_argument(
+        "--max-concurrency", type=int, default=32, help="ワーカーごとの同時実行数"
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=64, help="ワーカーごとの待ち行列の上限"
+    )
+    parser.add_argument(
+        "--tool-threads", type=int, help="ワーカーごとの同期ツールのスレッド数"
+    )
+    parser.add_argument(
+        "--shared-agent",
+        action="store_true",
+        help="1つの Agent を共有する（A2AServer.serve() と同じ。比較用）",
+    )
+    parser.add_argument(
+        "--a2a-compliant-streaming",
+        action="store_true",
+        default=None,
+        help="テキストの差分を A2A 準拠のアーティファクト更新で送る",
+    )
+    parser.add_argument("--log-level", default="warning", help="uvicorn のログレベル")
+    args = parser.parse_args()
+
+    serve(
+        args.target,
+        workers=args.workers,
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.max_concurrency,
+        max_queue=args.max_queue,
+        tool_threads=args.tool_threads,
+        shared_agent=args.shared_agent,
+        compliant_streaming=args.a2a_compliant_streaming,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+agent_pool.py - 専門家エージェントのプール
+
+Agents as Tools パターンでツールが呼ばれるたびに Agent を生成すると、
+システムプロンプトの組み立て、ツールレジストリの構築、モデルの接続を毎回やり直すことになる。
+AgentPool は (システムプロンプト, ツール構成) ごとに生成済みの Agent を保持し、
+会話履歴と state を生成直後の状態に戻して貸し出す。
+
+- ツール構成は名前ではなくツールのオブジェクトで区別する（同じ名前で実装の違うツールは別のキー）
+- 同じキーのエージェントが使用中の場合は新しく生成する（並列のツール呼び出しでも安全）
+- 返却されたエージェントは待機中として保持し、総数が max_size を超えたら
+  最も長く使われていないものから破棄する（LRU）
+- cache を指定すると、run() は同じ専門家への同じ質問にモデルを呼ばずに応答する
+- run_async() は async のツールから使う（イベントループのスレッドを塞がない）
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from strands import Agent
+from strands.agent.state import AgentState
+from strands.models.model import Model
+from strands.telemetry.metrics import EventLoopMetrics
+
+from .models import get_model
+from .response_cache import ResponseCache
+
+
+@dataclass
+class AgentPoolStats:
+    """プールの利用統計"""
+
+    created: int = 0
+    reused: int = 0
+    evicted: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        """JSONに変換できる辞書を返す"""
+        return {"created": self.created, "reused": self.reused, "evicted": self.evicted}
+
+
+class AgentPool:
+    """(システムプロンプト, ツール構成) をキーに Agent を再利用するプール。"""
+
+    def __init__(
+        self,
+        model: Model | None = None,
+        max_size: int = 32,
+        cache: ResponseCache | None = None,
+    ):
+        """プールを初期化する。
+
+        Args:
+            model: エージェントが使うモデル（省略時は get_model() の共有モデル）
+            max_size: 待機中として保持するエージェントの最大数
+            cache: run() の応答キャッシュ（省略時はキャッシュしない）
+        """
+        self.model = model or get_model()
+        self.max_size = max_size
+        self.cache = cache
+        self.stats = AgentPoolStats()
+        self._idle: OrderedDict[tuple, list[Agent]] = OrderedDict()
+        self._idle_count = 0
+        self._lock = threading.Lock()
+
+    def _key(
+        self, system_prompt: str, tools: Sequence[Any], agent_kwargs: dict[str, Any]
+    ) -> tuple:
+        # プール内のエージェントがツールを参照し続けるため、キーにある id は再利用されない
+        return (
+            system_prompt,
+            tuple(sorted(id(tool) for tool in tools)),
+            tuple(sorted((k, repr(v)) for k, v in agent_kwargs.items())),
+        )
+
+    def _reset(self, agent: Agent, initial_state: dict[str, Any] | None) -> None:
+        """エージェントを生成直後と同じ状態に戻す（state は agent_kwargs の state= の値）"""
+        agent.messages = []
+        agent.state = AgentState(initial_state)
+        agent.event_loop_metrics = EventLoopMetrics()
+        if hasattr(agent.conversation_manager, "removed_message_count"):
+            agent.conversation_manager.removed_message_count = 0
+
+    def _checkout(self, key: tuple) -> Agent | None:
+        with self._lock:
+            agents = self._idle.get(key)
+            if not agents:
+                return None
+            agent = agents.pop()
+            self._idle_count -= 1
+            if not agents:
+                del self._idle[key]
+            self.stats.reused += 1
+            return agent
+
+    def _checkin(self, key: tuple, agent: Agent) -> None:
+        with self._lock:
+            self._idle.setdefault(key, []).append(agent)
+            self._idle.move_to_end(key)
+            self._idle_count += 1
+            while self._idle_count > self.max_size:
+                oldest_key, oldest = next(iter(self._idle.items()))
+                oldest.pop(0)
+                self._idle_count -= 1
+                self.stats.evicted += 1
+                if not oldest:
+                    del self._idle[oldest_key]
+
+    @contextmanager
+    def acquire(
+        self, system_prompt: str, tools: Sequence[Any] = (), **agent_kwargs: Any
+    ) -> Iterator[Agent]:
+        """会話履歴が空のエージェントを貸し出す。
+
+        with ブロックを正常に抜けると履歴をリセットしてプールに戻す。
+
+        Args:
+            system_prompt: エージェントのシステムプロンプト
+            tools: エージェントに持たせるツール
+            **agent_kwargs: Agent に渡すその他の引数（name, callback_handler など）
+
+        Yields:
+            貸し出されたエージェント
+        """
+        key = self._key(system_prompt, tools, agent_kwargs)
+        # 実行で書き換わる前の state を控えておく（AgentState はそのまま Agent に使われる）
+        initial_state = agent_kwargs.get("state")
+        if isinstance(initial_state, AgentState):
+            initial_state = initial_state.get()
+        agent = self._checkout(key)
+        if agent is None:
+            agent = Agent(
+                model=self.model,
+                system_prompt=system_prompt,
+                tools=list(tools),
+                **agent_kwargs,
+            )
+            with self._lock:
+                self.stats.created += 1
+        # 例外で中断したエージェントは状態が不定なためプールに戻さない
+        yield agent
+        self._reset(agent, initial_state)
+        self._checkin(key, agent)
+
+    def run(
+        self,
+        prompt: str,
+        system_prompt: str,
+        tools: Sequence[Any] = (),
+        **agent_kwargs: Any,
+    ) -> str:
+        """プールのエージェントで prompt を実行し、結果のテキストを返す"""
+        model_id = str(self.model.get_config().get("model_id", ""))
+        if self.cache:
+            cached = self.cache.get(system_prompt, model_id, prompt)
+            if cached is not None:
+                return cached
+
+        with self.acquire(system_prompt, tools, **agent_kwargs) as agent:
+            result = str(agent(prompt))
+
+        if self.cache:
+            self.cache.set(system_prompt, model_id, prompt, result)
+        return result
+
+    async def run_async(
+        self,
+        prompt: str,
+        system_prompt: str,
+        tools: Sequence[Any] = (),
+        **agent_kwargs: Any,
+    ) -> str:
+        """run() の非同期版（エージェントを invoke_async で実行する）"""
+        model_id = str(self.model.get_config().get("model_id", ""))
+        if self.cache:
+            cached = self.cache.get(system_prompt, model_id, prompt)
+            if cached is not None:
+                return cached
+
+        with self.acquire(system_prompt, tools, **agent_kwargs) as agent:
+            result = str(await agent.invoke_async(prompt))
+
+        if self.cache:
+            self.cache.set(system_prompt, model_id, prompt, result)
+        return result
+
+    def clear(self) -> None:
+        """待機中のエージェントをすべて破棄する"""
+        with self._lock:
+            self._idle.clear()
+            self._idle_count = 0
+
+    def __len__(self) -> int:
+        """待機中のエージェント数"""
+        with self._lock:
+            return self._idle_count
+
+
+_default_pool: AgentPool | None = None
+_default_pool_lock = threading.Lock()
+
+
+def get_agent_pool() -> AgentPool:
+    """プロセス共通の AgentPool を返す（get_model() の共有モデルを使用）"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = AgentPool()
+        return _default_pool
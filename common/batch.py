@@ -0,0 +1,382 @@
+"""
+batch.py - 多数の独立したプロンプトの一括実行
+
+天気や計算の質問、翻訳のように、互いに独立した小さなプロンプトが大量に届く処理を、
+1つのエージェント構成（システムプロンプト・ツール）で同時に実行する。
+
+- max_concurrency 件までを1つのイベントループで同時に実行する（AgentPool のエージェントを使い回す）
+- AdaptiveRateLimiter: スロットリングされたら送信レートを半分にし、成功するたびに少しずつ戻す（AIMD）
+- スロットリングなどの一時的なエラーは、ジッター付きの指数バックオフで再試行する
+  （Agent 自身の再試行は無効にし、レートの調整と再試行をここでまとめて行う）
+- 結果は完了した順に JSONL で1行ずつ書き出す（処理中でも読める）
+- checkpoint を指定すると、成功したプロンプトのIDを追記し、再実行時にはそれらを飛ばす
+  （出力の書き込みとチェックポイントの追記の間で中断した場合、出力に同じIDが2回現れることがある）
+
+入力は文字列、または {"id": ..., "prompt": ...} の辞書（JSONL の各行）。
+id がない場合は入力中の位置（0始まり）を id にする。
+
+使い方:
+    runner = BatchRunner("あなたは翻訳者です。", max_concurrency=32)
+    stats = runner.run(read_jsonl("prompts.jsonl"), "results.jsonl", checkpoint="done.txt")
+
+    uv run python -m common.batch prompts.jsonl --output results.jsonl --checkpoint done.txt \\
+        --system-prompt "あなたは翻訳者です。"
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import time
+from collections.abc import AsyncIterator, Collection, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TextIO
+
+from strands import ModelRetryStrategy
+from strands.types.exceptions import ModelThrottledException
+
+from .agent_pool import AgentPool
+
+# 再試行する一時的なエラー
+RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (
+    ModelThrottledException,
+    TimeoutError,
+    ConnectionError,
+)
+
+
+@dataclass
+class BatchItem:
+    """一括実行する1件のプロンプト"""
+
+    id: str
+    prompt: str
+
+
+@dataclass
+class BatchStats:
+    """一括実行の統計"""
+
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    retries: int = 0
+    throttled: int = 0
+    elapsed_s: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """1秒あたりに処理したプロンプト数（飛ばしたものは含めない）"""
+        done = self.succeeded + self.failed
+        return done / self.elapsed_s if self.elapsed_s else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "elapsed_s": round(self.elapsed_s, 2),
+            "throughput": round(self.throughput, 2),
+        }
+
+
+class AdaptiveRateLimiter:
+    """スロットリングに応じて送信レートを調整するレートリミッター（AIMD）。"""
+
+    def __init__(
+        self,
+        rate: float = 50.0,
+        *,
+        min_rate: float = 1.0,
+        max_rate: float = 1000.0,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        cooldown: float = 0.5,
+    ):
+        """レートリミッターを初期化する。
+
+        Args:
+            rate: 最初の送信レート（件/秒）
+            min_rate: 送信レートの下限
+            max_rate: 送信レートの上限
+            increase: 成功1件ごとに増やす送信レート
+            decrease: スロットリングされたときに送信レートに掛ける係数
+            cooldown: 続けて下げないようにする間隔（秒、同時に送った分のスロットリングは1回と数える）
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("rates must satisfy 0 < min_rate <= rate <= max_rate")
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.decreases = 0
+        self._next_slot = 0.0
+        self._last_decrease = float("-inf")
+
+    async def acquire(self) -> None:
+        """次の送信枠まで待つ"""
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def on_success(self) -> None:
+        """成功したときに送信レートを少し上げる"""
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self) -> None:
+        """スロットリングされたときに送信レートを下げる"""
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.decreases += 1
+
+
+def read_jsonl(path: str | Path) -> Iterator[dict[str, Any]]:
+    """JSONL ファイルを1行ずつ読み込む（空行は飛ばす）"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _items(prompts: Iterable[str | dict[str, Any]]) -> Iterator[BatchItem]:
+    for index, prompt in enumerate(prompts):
+        if isinstance(prompt, str):
+            yield BatchItem(str(index), prompt)
+        else:
+            yield BatchItem(str(prompt.get("id", index)), prompt["prompt"])
+
+
+def _open_append(path: str | Path) -> TextIO:
+    """追記用にファイルを開く（ローカルファイルのため、イベントループ上で開いても待ちは短い）"""
+    return open(path, "a", encoding="utf-8")
+
+
+def _load_checkpoint(path: Path | None) -> set[str]:
+    if path is None or not path.exists():
+        return set()
+    return {line.strip() for line in path.read_text(encoding="utf-8").splitlines()}
+
+
+class BatchRunner:
+    """1つのエージェント構成で大量のプロンプトを同時に実行するランナー。"""
+
+    def __init__(
+        self,
+        system_prompt: str,
+        tools: Iterable[Any] = (),
+        *,
+        pool: AgentPool | None = None,
+        max_concurrency: int = 16,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        retry_on: tuple[type[BaseException], ...] = RETRYABLE_ERRORS,
+        **agent_kwargs: Any,
+    ):
+        """ランナーを初期化する。
+
+        Args:
+            system_prompt: エージェントのシステムプロンプト
+            tools: エージェントに持たせるツール
+            pool: エージェントを借りるプール（省略時は get_model() のモデルで新しく作る）
+            max_concurrency: 同時に実行するプロンプト数の上限
+            rate_limiter: 送信レートの調整（省略時は既定の AdaptiveRateLimiter）
+            max_retries: 1件あたりの再試行回数の上限
+            base_delay: 最初の再試行までの待ち時間の上限（秒、回数ごとに2倍）
+            max_delay: 再試行までの待ち時間の上限（秒）
+            retry_on: 再試行する例外
+            **agent_kwargs: Agent に渡すその他の引数
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.system_prompt = system_prompt
+        self.tools = list(tools)
+        self.pool = pool if pool is not None else AgentPool(max_size=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+        # 再試行はこのランナーで行うため、Agent 自身の再試行（既定で最大6回、4秒から）は無効にする
+        # （max_attempts=1 なら再試行の状態を持たないため、プールの全エージェントで共有できる）
+        agent_kwargs.setdefault("retry_strategy", ModelRetryStrategy(max_attempts=1))
+        agent_kwargs.setdefault("callback_handler", None)
+        self.agent_kwargs = agent_kwargs
+        self.stats = BatchStats()
+
+    def _backoff(self, attempt: int) -> float:
+        """再試行までの待ち時間（フルジッター）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def _process(self, item: BatchItem) -> dict[str, Any]:
+        """1件を実行し、出力する行を返す（再試行を使い切った場合はエラーの行）"""
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            try:
+                output = await self.pool.run_async(
+                    item.prompt, self.system_prompt, self.tools, **self.agent_kwargs
+                )
+            except self.retry_on as e:
+                if isinstance(e, ModelThrottledException):
+                    self.stats.throttled += 1
+                    self.rate_limiter.on_throttle()
+                if attempt == self.max_retries:
+                    error = e
+                    break
+                self.stats.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+            except Exception as e:  # noqa: BLE001 - 1件の失敗はエラーの行として出力する
+                error = e
+                break
+            else:
+                self.rate_limiter.on_success()
+                self.stats.succeeded += 1
+                return {
+                    "id": item.id,
+                    "output": output,
+                    "attempts": attempt + 1,
+                    "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                }
+        self.stats.failed += 1
+        return {
+            "id": item.id,
+            "error": f"{type(error).__name__}: {error}",
+            "attempts": attempt + 1,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+
+    async def iter_async(
+        self, prompts: Iterable[str | dict[str, Any]], done: Collection[str] = ()
+    ) -> AsyncIterator[dict[str, Any]]:
+        """プロンプトを同時に実行し、完了した順に結果の行を返す。
+
+        Args:
+            prompts: 文字列、または {"id": ..., "prompt": ...} の辞書
+            done: 飛ばすプロンプトのID（チェックポイント）
+        """
+        queue: asyncio.Queue[BatchItem | None] = asyncio.Queue(self.max_concurrency)
+        results: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+        async def produce() -> None:
+            for item in _items(prompts):
+                if item.id in done:
+                    self.stats.skipped += 1
+                    continue
+                await queue.put(item)
+            for _ in range(self.max_concurrency):
+                await queue.put(None)
+
+        async def work() -> None:
+            while (item := await queue.get()) is not None:
+                await results.put(await self._process(item))
+
+        workers = [asyncio.create_task(work()) for _ in range(self.max_concurrency)]
+        producer = asyncio.create_task(produce())
+        finished = asyncio.gather(producer, *workers)
+        # 途中で打ち切られた場合の取り消しを「未取得の例外」として警告させない
+        finished.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            while not (finished.done() and results.empty()):
+                getter = asyncio.ensure_future(results.get())
+                await asyncio.wait(
+                    [getter, finished], return_when=asyncio.FIRST_COMPLETED
+                )
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            finished.result()
+        finally:
+            for task in (producer, *workers):
+                task.cancel()
+
+    async def run_async(
+        self,
+        prompts: Iterable[str | dict[str, Any]],
+        output: str | Path | TextIO,
+        checkpoint: str | Path | None = None,
+    ) -> BatchStats:
+        """プロンプトを同時に実行し、結果を JSONL に書き出す。
+
+        Args:
+            prompts: 文字列、または {"id": ..., "prompt": ...} の辞書
+            output: 結果の JSONL（パスの場合は追記する）
+            checkpoint: 成功したプロンプトのIDを記録するファイル（再実行時に飛ばす）
+
+        Returns:
+            この実行の統計
+        """
+        self.stats = BatchStats()
+        checkpoint_path = Path(checkpoint) if checkpoint is not None else None
+        done = _load_checkpoint(checkpoint_path)
+        start = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            out = (
+                stack.enter_context(_open_append(output))
+                if isinstance(output, str | Path)
+                else output
+            )
+            ckpt = (
+                stack.enter_context(_open_append(checkpoint_path))
+                if checkpoint_path
+                else None
+            )
+            try:
+                async for row in self.iter_async(prompts, done):
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    out.flush()
+                    if ckpt is not None and "output" in row:
+                        ckpt.write(row["id"] + "\n")
+                        ckpt.flush()
+            finally:
+                self.stats.elapsed_s = time.perf_counter() - start
+        return self.stats
+
+    def run(
+        self,
+        prompts: Iterable[str | dict[str, Any]],
+        output: str | Path | TextIO,
+        checkpoint: str | Path | None = None,
+    ) -> BatchStats:
+        """run_async() の同期版"""
+        return asyncio.run(self.run_async(prompts, output, checkpoint))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JSONL のプロンプトを一括実行する")
+    parser.add_argument("input", help="プロンプトの JSONL（各行 {id, prompt}）")
+    parser.add_argument("--output", required=True, help="結果の JSONL（追記）")
+    parser.add_argument("--checkpoint", help="成功したIDを記録するファイル")
+    parser.add_argument("--system-prompt", required=True, help="システムプロンプト")
+    parser.add_argument("--concurrency", type=int, default=16, help="同時実行数")
+    parser.add_argument("--rate", type=float, default=50.0, help="最初の送信レート")
+    args = parser.parse_args()
+
+    runner = BatchRunner(
+        args.system_prompt,
+        max_concurrency=args.concurrency,
+        rate_limiter=AdaptiveRateLimiter(args.rate),
+    )
+    stats = runner.run(read_jsonl(args.input), args.output, args.checkpoint)
+    print(json.dumps(stats.to_dict(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
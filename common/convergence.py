@@ -0,0 +1,231 @@
+"""
+convergence.py - ループを含む Graph の収束判定
+
+修正 → レビューのようなループで、出力がもう変わらなくなったのに
+レビューの指摘が続いてループが回り続けると、モデル呼び出しが無駄になる。
+ConvergenceGuard はループに戻るエッジと出口のエッジの条件を包み、
+以下のいずれかを検出したらループを打ち切って出口のエッジへ進める。
+
+- 監視するノード（例: コード生成）の出力が前回と同一、または類似度が閾値以上
+- レビューのノードの指摘に、前回までになかった新しい指摘が1つもない
+
+打ち切りの記録（ConvergenceEvent）は GraphState に保存され、
+common.graph の Graph では結果の convergence / saved_model_calls で確認できる。
+省いたモデル呼び出し回数は、打ち切らなければ次の1周で呼ばれていた回数（最小の見積もり）。
+
+使い方:
+    guard = ConvergenceGuard(outputs=["code"], findings="review")
+    builder.add_edge("review", "code", condition=guard.loop(needs_revision))
+    builder.add_edge("review", "approve", condition=guard.exit(is_approved))
+"""
+
+import difflib
+import re
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from strands.multiagent.base import NodeResult
+from strands.multiagent.graph import GraphState
+
+from .routing import node_text
+
+# GraphState に付与する記録の属性名
+_HISTORY_ATTR = "_convergence_history"
+_DECISIONS_ATTR = "_convergence_decisions"
+_RECORDED_ATTR = "_convergence_recorded"
+_EVENTS_ATTR = "_convergence_events"
+
+# 指摘の行頭にある箇条書きの記号や番号
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*・●]|\d+[.)．、]|【[^】]*】)\s*")
+
+
+@dataclass
+class ConvergenceEvent:
+    """ループを打ち切ったときの記録"""
+
+    node_id: str
+    reason: str
+    similarity: float
+    iteration: int
+    saved_model_calls: int
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "node_id": self.node_id,
+            "reason": self.reason,
+            "similarity": round(self.similarity, 3),
+            "iteration": self.iteration,
+            "saved_model_calls": self.saved_model_calls,
+        }
+
+
+def _state_attr(state: GraphState, name: str, factory: Callable[[], Any]) -> Any:
+    """GraphState に付与した記録を返す（なければ作成する）"""
+    value = getattr(state, name, None)
+    if value is None:
+        value = factory()
+        setattr(state, name, value)
+    return value
+
+
+def convergence_events(state: GraphState) -> list[ConvergenceEvent]:
+    """GraphState に記録された打ち切りの一覧を返す"""
+    return list(getattr(state, _EVENTS_ATTR, []))
+
+
+def similarity(a: str, b: str) -> float:
+    """2つのテキストの類似度（0.0〜1.0、同一なら1.0）"""
+    if a == b:
+        return 1.0
+    matcher = difflib.SequenceMatcher(None, a, b)
+    # 上限値で足切りしてから正確な値を計算する
+    if matcher.real_quick_ratio() == 0 or matcher.quick_ratio() == 0:
+        return 0.0
+    return matcher.ratio()
+
+
+def extract_findings(text: str) -> set[str]:
+    """レビューの出力から指摘（空でない行）を取り出して正規化する"""
+    normalized = (
+        re.sub(r"\s+", " ", _BULLET_PATTERN.sub("", line)).strip()
+        for line in text.splitlines()
+    )
+    return {line for line in normalized if line}
+
+
+def _model_calls(node_result: NodeResult) -> int:
+    """ノード1回の実行でのモデル呼び出し回数"""
+    calls = 0
+    for result in node_result.get_agent_results():
+        # エージェントのメトリクスは呼び出しをまたいで累積されるため、最後の呼び出し分を数える
+        invocations = result.metrics.agent_invocations
+        calls += max(len(invocations[-1].cycles), 1) if invocations else 1
+    return calls
+
+
+class ConvergenceGuard:
+    """ループの収束を検出し、ループに戻るエッジを打ち切るガード。"""
+
+    def __init__(
+        self,
+        outputs: Sequence[str] = (),
+        findings: str | None = None,
+        threshold: float = 0.98,
+    ):
+        """ガードを初期化する。
+
+        Args:
+            outputs: 出力が変わらなくなったら打ち切るノードのID
+            findings: 新しい指摘がなくなったら打ち切るレビューのノードのID
+            threshold: 前回の出力と同じとみなす類似度
+        """
+        if not outputs and findings is None:
+            raise ValueError("outputs or findings must be specified")
+        self.outputs = list(outputs)
+        self.findings = findings
+        self.threshold = threshold
+        self._watched = [*self.outputs, *([findings] if findings else [])]
+
+    def _history(self, state: GraphState, node_id: str) -> list[tuple[NodeResult, str]]:
+        """ノードの出力の履歴を更新して返す（新しい結果のときだけ追加する）"""
+        histories = _state_attr(state, _HISTORY_ATTR, dict)
+        history = histories.setdefault((id(self), node_id), [])
+        node_result = state.results.get(node_id)
+        if node_result is not None and (
+            not history or history[-1][0] is not node_result
+        ):
+            history.append((node_result, node_text(state, node_id)))
+        return history
+
+    def _check(self, state: GraphState) -> tuple[str, float] | None:
+        """収束していれば (理由, 類似度) を返す"""
+        for node_id in self.outputs:
+            history = self._history(state, node_id)
+            if len(history) >= 2:
+                ratio = similarity(history[-2][1], history[-1][1])
+                if ratio >= self.threshold:
+                    reason = "identical_output" if ratio == 1.0 else "similar_output"
+                    return reason, ratio
+
+        if self.findings is not None:
+            history = self._history(state, self.findings)
+            if len(history) >= 2:
+                seen = set().union(
+                    *(extract_findings(text) for _, text in history[:-1])
+                )
+                if not extract_findings(history[-1][1]) - seen:
+                    return "no_new_findings", similarity(history[-2][1], history[-1][1])
+        return None
+
+    def _key(self, state: GraphState) -> tuple[Any, ...]:
+        """監視するノードの現在の結果を表すキー"""
+        return (
+            id(self),
+            *(id(state.results.get(node_id)) for node_id in self._watched),
+        )
+
+    def _decide(self, state: GraphState) -> tuple[str, float] | None:
+        """収束の判定（同じ実行結果に対する判定は1回だけ行う）"""
+        decisions = _state_attr(state, _DECISIONS_ATTR, dict)
+        key = self._key(state)
+        if key not in decisions:
+            decisions[key] = self._check(state)
+        return decisions[key]
+
+    def converged(self, state: GraphState) -> bool:
+        """ループが収束したかどうか"""
+        return self._decide(state) is not None
+
+    def _record(self, state: GraphState, reason: str, ratio: float) -> None:
+        """ループを打ち切ったことを記録する（同じ実行結果に対しては1回だけ）"""
+        recorded = _state_attr(state, _RECORDED_ATTR, set)
+        key = self._key(state)
+        if key in recorded:
+            return
+        recorded.add(key)
+        # 打ち切らなければ、ループ本体のノードがもう1周分モデルを呼んでいた
+        saved = sum(
+            _model_calls(state.results[node_id])
+            for node_id in self._watched
+            if node_id in state.results
+        )
+        _state_attr(state, _EVENTS_ATTR, list).append(
+            ConvergenceEvent(
+                node_id=self._watched[-1],
+                reason=reason,
+                similarity=ratio,
+                iteration=len(self._history(state, self._watched[-1])),
+                saved_model_calls=saved,
+            )
+        )
+
+    def loop(
+        self, condition: Callable[[GraphState], bool] | None = None
+    ) -> Callable[[GraphState], bool]:
+        """ループに戻るエッジの条件を包む（収束したら False）"""
+
+        def loop_condition(state: GraphState) -> bool:
+            # 出力の履歴を毎回更新するため、条件より先に収束を判定する
+            decision = self._decide(state)
+            if condition is not None and not condition(state):
+                return False
+            if decision is not None:
+                self._record(state, *decision)
+                return False
+            return True
+
+        return loop_condition
+
+    def exit(
+        self, condition: Callable[[GraphState], bool] | None = None
+    ) -> Callable[[GraphState], bool]:
+        """出口のエッジの条件を包む（収束したら True）"""
+
+        def exit_condition(state: GraphState) -> bool:
+            if self.converged(state):
+                return True
+            return condition is not None and condition(state)
+
+        return exit_condition
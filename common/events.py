@@ -0,0 +1,246 @@
+"""
+events.py - マルチエージェント実行のイベントストリーム
+
+strands の Graph / Swarm の stream_async は、ノードのイベントを multiagent_node_stream で
+包んで返す。Swarm を Graph のノードにした場合は包みが入れ子になり、
+エージェントのトークンは何段も内側に入る。
+EventStream はこれをたどって平らにし、どの階層のどのノードのイベントかを
+path（例: ("planning", "editor")）で示した RunEvent として順に返す。
+
+RunEvent の種類:
+- node_start / node_stop: ノードの開始・終了（Swarm や Graph のノードも含む）
+- token: エージェントが生成したテキストの断片
+- tool_use: エージェントのツール呼び出し
+- handoff: Swarm の引き継ぎ・Graph のノード間の遷移
+- node_cancel / node_interrupt: ノードの取り消し・中断
+- result: 実行全体の結果（入れ子の Swarm / Graph の結果は path 付き）
+
+Agent / Graph / Swarm のいずれも同じように扱える。最初のトークンまでの時間（TTFT）と
+ノードごとの最初のトークンまでの時間は stats で確認できる。
+
+使い方:
+    stream = EventStream(graph, task)
+    async for event in stream:
+        if event.type == "token":
+            print(event.text, end="")
+    print(stream.stats.first_token_ms, stream.result)
+"""
+
+import asyncio
+import sys
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from typing import Any, TextIO
+
+from strands import Agent
+from strands.multiagent.base import MultiAgentBase
+
+
+@dataclass
+class RunEvent:
+    """平らにしたマルチエージェント実行のイベント"""
+
+    type: str
+    path: tuple[str, ...]
+    elapsed_ms: float
+    text: str = ""
+    data: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def node_id(self) -> str | None:
+        """イベントを発生させたノードのID（最上位の結果では None）"""
+        return self.path[-1] if self.path else None
+
+    @property
+    def label(self) -> str:
+        """path を / でつないだ表示用の名前"""
+        return "/".join(self.path)
+
+
+@dataclass
+class StreamStats:
+    """イベントストリームの時間の記録（実行開始からのミリ秒）"""
+
+    first_event_ms: float | None = None
+    first_token_ms: float | None = None
+    total_ms: float = 0.0
+    events: int = 0
+    tokens: int = 0
+    first_token_by_node: dict[str, float] = field(default_factory=dict)
+
+    def observe(self, event: RunEvent) -> None:
+        """イベントを記録する"""
+        self.events += 1
+        if self.first_event_ms is None:
+            self.first_event_ms = event.elapsed_ms
+        if event.type == "token":
+            self.tokens += 1
+            if self.first_token_ms is None:
+                self.first_token_ms = event.elapsed_ms
+            self.first_token_by_node.setdefault(event.label, event.elapsed_ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "first_event_ms": _round(self.first_event_ms),
+            "first_token_ms": _round(self.first_token_ms),
+            "total_ms": round(self.total_ms, 1),
+            "events": self.events,
+            "tokens": self.tokens,
+            "first_token_by_node": {
+                label: round(ms, 1) for label, ms in self.first_token_by_node.items()
+            },
+        }
+
+
+def _round(value: float | None) -> float | None:
+    return None if value is None else round(value, 1)
+
+
+def flatten(
+    event: dict[str, Any], path: tuple[str, ...], elapsed_ms: float
+) -> Iterator[RunEvent]:
+    """strands のイベント1件を RunEvent に変換する（入れ子の包みはたどる）"""
+    event_type = event.get("type")
+    if event_type == "multiagent_node_stream":
+        yield from flatten(event["event"], (*path, event["node_id"]), elapsed_ms)
+    elif event_type == "multiagent_node_start":
+        yield RunEvent(
+            "node_start",
+            (*path, event["node_id"]),
+            elapsed_ms,
+            data={"node_type": event.get("node_type")},
+        )
+    elif event_type == "multiagent_node_stop":
+        node_result = event["node_result"]
+        yield RunEvent(
+            "node_stop",
+            (*path, event["node_id"]),
+            elapsed_ms,
+            data={
+                "status": node_result.status.value,
+                "execution_time": node_result.execution_time,
+            },
+        )
+    elif event_type == "multiagent_handoff":
+        yield RunEvent(
+            "handoff",
+            path,
+            elapsed_ms,
+            text=event.get("message") or "",
+            data={
+                "from_node_ids": event.get("from_node_ids", []),
+                "to_node_ids": event.get("to_node_ids", []),
+            },
+        )
+    elif event_type == "multiagent_node_cancel":
+        yield RunEvent(
+            "node_cancel", (*path, event["node_id"]), elapsed_ms, text=event["message"]
+        )
+    elif event_type == "multiagent_node_interrupt":
+        yield RunEvent(
+            "node_interrupt",
+            (*path, event["node_id"]),
+            elapsed_ms,
+            data={"interrupts": event["interrupts"]},
+        )
+    elif event_type == "multiagent_result":
+        yield RunEvent("result", path, elapsed_ms, data={"result": event["result"]})
+    elif "data" in event and isinstance(event["data"], str):
+        yield RunEvent("token", path, elapsed_ms, text=event["data"])
+    elif "message" in event and isinstance(event["message"], dict):
+        # エージェントのメッセージが確定したときに、ツール呼び出しを1件ずつ返す
+        message = event["message"]
+        if message.get("role") == "assistant":
+            for block in message.get("content", []):
+                if "toolUse" in block:
+                    tool_use = block["toolUse"]
+                    yield RunEvent(
+                        "tool_use",
+                        path,
+                        elapsed_ms,
+                        text=tool_use["name"],
+                        data={"input": tool_use.get("input")},
+                    )
+    elif "result" in event and not path:
+        # 単体の Agent を実行した場合の結果
+        yield RunEvent("result", path, elapsed_ms, data={"result": event["result"]})
+
+
+class EventStream:
+    """Agent / Graph / Swarm の実行を RunEvent のストリームとして返す。"""
+
+    def __init__(
+        self,
+        runner: Agent | MultiAgentBase,
+        task: Any,
+        invocation_state: dict[str, Any] | None = None,
+    ):
+        """ストリームを初期化する。
+
+        Args:
+            runner: 実行する Agent / Graph / Swarm
+            task: 実行するタスク
+            invocation_state: エージェントに渡す追加の状態
+        """
+        self.runner = runner
+        self.task = task
+        self.invocation_state = invocation_state
+        self.stats = StreamStats()
+        self.result: Any = None
+
+    def __aiter__(self) -> AsyncIterator[RunEvent]:
+        return self._events()
+
+    async def _events(self) -> AsyncIterator[RunEvent]:
+        self.stats = StreamStats()
+        self.result = None
+        start = time.perf_counter()
+        if isinstance(self.runner, Agent):
+            events = self.runner.stream_async(
+                self.task, invocation_state=self.invocation_state
+            )
+        else:
+            events = self.runner.stream_async(self.task, self.invocation_state)
+        async for raw in events:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for event in flatten(raw, (), elapsed_ms):
+                self.stats.observe(event)
+                if event.type == "result" and not event.path:
+                    self.result = event.data["result"]
+                yield event
+        self.stats.total_ms = (time.perf_counter() - start) * 1000
+
+
+async def print_stream_async(
+    runner: Agent | MultiAgentBase, task: Any, out: TextIO | None = None
+) -> EventStream:
+    """実行しながら、トークンをノードの path 付きで逐次表示する"""
+    out = out or sys.stdout
+    stream = EventStream(runner, task)
+    current: tuple[str, ...] | None = None
+    async for event in stream:
+        if event.type == "token":
+            if event.path != current:
+                out.write(f"\n[{event.label}] ")
+                current = event.path
+            out.write(event.text)
+        elif event.type == "tool_use":
+            out.write(f"\n[{event.label}] ツール呼び出し: {event.text}")
+            current = None
+        elif event.type == "handoff" and event.data["to_node_ids"]:
+            prefix = f"[{event.label}] " if event.path else ""
+            targets = ", ".join(event.data["to_node_ids"])
+            out.write(f"\n{prefix}→ {targets}")
+            current = None
+        out.flush()
+    out.write("\n")
+    return stream
+
+
+def print_stream(
+    runner: Agent | MultiAgentBase, task: Any, out: TextIO | None = None
+) -> EventStream:
+    """print_stream_async の同期版"""
+    return asyncio.run(print_stream_async(runner, task, out))
@@ -0,0 +1,450 @@
+"""
+fake_model.py - オフラインで動作する決定論的なフェイクモデル
+
+strands の Model インターフェースを実装し、Bedrockに接続せずに
+Graph / Swarm / Workflow / A2A の各サンプルを動かすためのモデル。
+
+応答の決め方（上から順に評価）:
+1. responses: 台本として渡した応答を順番に返す
+2. rules: システムプロンプトや入力に正規表現がマッチしたルールの応答を返す
+3. 既定の応答: プロンプトで名前が言及されているツールを呼び、
+   Swarmでは言及されているエージェントへ handoff_to_agent で引き継ぐ
+
+latency（最初のトークンまでの待ち時間）と tokens_per_second（ストリーミング速度）を
+指定すると、実際のモデルに近いレイテンシを注入できる。待機は asyncio.sleep で行うため、
+並列実行時の壁時計時間や同時実行の振る舞いをそのまま計測できる。
+max_concurrency を指定すると、同時に処理中の呼び出しがそれを超えたときに
+ModelThrottledException を送出する（Bedrock のスロットリングの再現用）。
+"""
+
+import asyncio
+import itertools
+import json
+import math
+import re
+import threading
+import time
+from collections.abc import AsyncGenerator, AsyncIterable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from pydantic import BaseModel
+from strands.models.model import Model
+from strands.types.content import Messages
+from strands.types.exceptions import ModelThrottledException
+from strands.types.streaming import StreamEvent
+from strands.types.tools import ToolSpec
+
+from .tokens import estimate_tokens, split_tokens
+
+T = TypeVar("T", bound=BaseModel)
+
+# Swarmが各エージェントに注入する引き継ぎツールの名前
+HANDOFF_TOOL_NAME = "handoff_to_agent"
+
+# Swarmのノード入力に含まれる「他のエージェント」の一覧
+_SWARM_AGENT_PATTERN = re.compile(r"Agent name: ([^\s.]+)\.")
+
+# Swarmのノード入力に含まれる「これまでに担当したエージェント」
+_SWARM_HISTORY_PATTERN = re.compile(r"Previous agents who worked on this: (.+)")
+
+_FILLER_TEXT = "これはフェイクモデルによる決定論的な応答です。"
+
+
+@dataclass
+class FakeToolUse:
+    """フェイクモデルが発行するツール呼び出し"""
+
+    name: str
+    input: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FakeResponse:
+    """フェイクモデルの1回分の応答"""
+
+    text: str = ""
+    tool_uses: list[FakeToolUse] = field(default_factory=list)
+
+
+@dataclass
+class FakeRequest:
+    """応答を決めるためにルールや関数へ渡されるリクエスト情報"""
+
+    messages: Messages
+    system_prompt: str
+    tool_specs: list[ToolSpec]
+
+    @property
+    def tool_names(self) -> list[str]:
+        """利用可能なツール名"""
+        return [spec["name"] for spec in self.tool_specs]
+
+    @property
+    def last_text(self) -> str:
+        """最後のユーザーメッセージのテキスト（ツール結果は除く）"""
+        for message in reversed(self.messages):
+            if message["role"] != "user":
+                continue
+            texts = [block["text"] for block in message["content"] if "text" in block]
+            if texts:
+                return "\n".join(texts)
+        return ""
+
+    @property
+    def called_tools(self) -> set[str]:
+        """この会話で既に呼び出したツール名"""
+        return {
+            block["toolUse"]["name"]
+            for message in self.messages
+            if message["role"] == "assistant"
+            for block in message["content"]
+            if "toolUse" in block
+        }
+
+    @property
+    def has_tool_result(self) -> bool:
+        """最後のメッセージがツール結果かどうか"""
+        return bool(self.messages) and any(
+            "toolResult" in block for block in self.messages[-1]["content"]
+        )
+
+
+Responder = Callable[[FakeRequest], FakeResponse]
+
+
+@dataclass
+class FakeRule:
+    """正規表現にマッチしたときに返す応答
+
+    Attributes:
+        pattern: システムプロンプトと最後の入力テキストに対して検索する正規表現
+        response: 応答テキスト、FakeResponse、またはリクエストから応答を作る関数
+        target: 検索対象（"any" / "system_prompt" / "input"）
+        after_tool_result: ツール結果を受け取った直後の呼び出しにも適用するかどうか
+            （既定では適用せず、ツール呼び出しのループを防ぐ）
+    """
+
+    pattern: str
+    response: str | FakeResponse | Responder
+    target: str = "any"
+    after_tool_result: bool = False
+
+    def matches(self, request: FakeRequest) -> bool:
+        """リクエストがルールにマッチするかどうか"""
+        if request.has_tool_result and not self.after_tool_result:
+            return False
+        if self.target == "system_prompt":
+            haystack = request.system_prompt
+        elif self.target == "input":
+            haystack = request.last_text
+        else:
+            haystack = f"{request.system_prompt}\n{request.last_text}"
+        return re.search(self.pattern, haystack) is not None
+
+    def respond(self, request: FakeRequest) -> FakeResponse:
+        """ルールの応答を FakeResponse として返す"""
+        if isinstance(self.response, str):
+            return FakeResponse(text=self.response)
+        if isinstance(self.response, FakeResponse):
+            return self.response
+        return self.response(request)
+
+
+@dataclass
+class FakeModelStats:
+    """フェイクモデルの呼び出し統計"""
+
+    invocations: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    tool_uses: int = 0
+    throttled: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "invocations": self.invocations,
+            "throttled": self.throttled,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "tool_uses": self.tool_uses,
+        }
+
+
+def _fake_tool_input(spec: ToolSpec, text: str) -> dict[str, Any]:
+    """ツールの入力スキーマから必須パラメーターを埋めた入力を作る"""
+    schema = spec["inputSchema"].get("json", {})
+    properties = schema.get("properties", {})
+    placeholders = {
+        "integer": 1,
+        "number": 1,
+        "boolean": True,
+        "object": {},
+        "array": [],
+    }
+    return {
+        name: placeholders.get(
+            properties.get(name, {}).get("type", "string"), text[:200]
+        )
+        for name in schema.get("required", [])
+    }
+
+
+def default_response(request: FakeRequest, text_length: int = 200) -> FakeResponse:
+    """ルールにマッチしなかった場合の既定の応答を作る。
+
+    - システムプロンプトで名前が言及されているツールをまだ呼んでいなければ、まとめて呼ぶ
+    - Swarmの中では、まだ担当していないエージェントのうちプロンプト中で最初に言及されているものへ引き継ぐ
+    - それ以外はシステムプロンプトの冒頭と入力を含む固定長のテキストを返す
+    """
+    called = request.called_tools
+    specs = {spec["name"]: spec for spec in request.tool_specs}
+
+    pending_tools = [
+        FakeToolUse(name, _fake_tool_input(spec, request.last_text))
+        for name, spec in specs.items()
+        if name != HANDOFF_TOOL_NAME
+        and name not in called
+        and name in request.system_prompt
+    ]
+    if pending_tools:
+        return FakeResponse(tool_uses=pending_tools)
+
+    if HANDOFF_TOOL_NAME in specs and HANDOFF_TOOL_NAME not in called:
+        history = _SWARM_HISTORY_PATTERN.search(request.last_text)
+        visited = set(history.group(1).split(" → ")) if history else set()
+        candidates = [
+            (request.system_prompt.find(name), name)
+            for name in _SWARM_AGENT_PATTERN.findall(request.last_text)
+            if name in request.system_prompt and name not in visited
+        ]
+        if candidates:
+            target = min(candidates)[1]
+            return FakeResponse(
+                text=f"{target}に引き継ぎます。",
+                tool_uses=[
+                    FakeToolUse(
+                        HANDOFF_TOOL_NAME,
+                        {"agent_name": target, "message": f"{target}に引き継ぎます。"},
+                    )
+                ],
+            )
+
+    role = (
+        request.system_prompt.splitlines()[0]
+        if request.system_prompt
+        else "アシスタント"
+    )
+    header = f"[fake] {role} 入力: {request.last_text[:40]}"
+    filler = "".join(
+        itertools.islice(
+            itertools.cycle(_FILLER_TEXT), max(text_length - len(header), 0)
+        )
+    )
+    return FakeResponse(text=header + filler)
+
+
+class FakeModel(Model):
+    """台本・ルール・既定の応答を返し、レイテンシを注入できるフェイクモデル。"""
+
+    def __init__(
+        self,
+        *,
+        responses: list[str | FakeResponse] | None = None,
+        rules: list[FakeRule] | None = None,
+        responder: Responder | None = None,
+        latency: float = 0.0,
+        tokens_per_second: float | None = None,
+        text_length: int = 200,
+        model_id: str = "fake",
+        max_concurrency: int | None = None,
+    ):
+        """フェイクモデルを初期化する。
+
+        Args:
+            responses: 順番に返す応答の台本（使い切ったら rules / 既定の応答に戻る）
+            rules: 正規表現でマッチさせる応答ルール（先にマッチしたものを使う）
+            responder: ルールにマッチしなかったときの応答関数（省略時は default_response）
+            latency: 最初のトークンを返すまでの待ち時間（秒）
+            tokens_per_second: ストリーミング速度（Noneの場合は待たずに全トークンを返す）
+            text_length: 既定の応答テキストの文字数
+            model_id: get_config() で返すモデルID
+            max_concurrency: 同時に処理できる呼び出し数（超えるとスロットリングする）
+        """
+        self.config: dict[str, Any] = {
+            "model_id": model_id,
+            "latency": latency,
+            "tokens_per_second": tokens_per_second,
+            "text_length": text_length,
+            "max_concurrency": max_concurrency,
+        }
+        self.rules = list(rules or [])
+        self.responder = responder
+        self.stats = FakeModelStats()
+        self._responses = list(responses or [])
+        self._lock = threading.Lock()
+        self._tool_use_ids = itertools.count(1)
+        self._in_flight = 0
+
+    def update_config(self, **model_config: Any) -> None:
+        """モデル設定（latency, tokens_per_second など）を更新する"""
+        self.config.update(model_config)
+
+    def get_config(self) -> dict[str, Any]:
+        """モデル設定を返す"""
+        return self.config
+
+    def reset_stats(self) -> FakeModelStats:
+        """統計をリセットし、リセット前の統計を返す"""
+        with self._lock:
+            stats, self.stats = self.stats, FakeModelStats()
+        return stats
+
+    def respond(self, request: FakeRequest) -> FakeResponse:
+        """リクエストに対する応答を決める"""
+        with self._lock:
+            scripted = self._responses.pop(0) if self._responses else None
+        if scripted is not None:
+            return (
+                FakeResponse(text=scripted) if isinstance(scripted, str) else scripted
+            )
+
+        for rule in self.rules:
+            if rule.matches(request):
+                return rule.respond(request)
+
+        if self.responder:
+            return self.responder(request)
+        return default_response(request, self.config["text_length"])
+
+    def _record(self, input_tokens: int, output_tokens: int, tool_uses: int) -> None:
+        with self._lock:
+            self.stats.invocations += 1
+            self.stats.input_tokens += input_tokens
+            self.stats.output_tokens += output_tokens
+            self.stats.tool_uses += tool_uses
+
+    async def stream(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None = None,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamEvent]:
+        """応答をBedrockと同じ形式のストリームイベントとして返す"""
+        max_concurrency = self.config.get("max_concurrency")
+        with self._lock:
+            if max_concurrency is not None and self._in_flight >= max_concurrency:
+                self.stats.throttled += 1
+                raise ModelThrottledException("Too many requests (fake)")
+            self._in_flight += 1
+        try:
+            async for event in self._stream(messages, tool_specs, system_prompt):
+                yield event
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    async def _stream(
+        self,
+        messages: Messages,
+        tool_specs: list[ToolSpec] | None,
+        system_prompt: str | None,
+    ) -> AsyncIterable[StreamEvent]:
+        request = FakeRequest(
+            messages=messages,
+            system_prompt=system_prompt or "",
+            tool_specs=tool_specs or [],
+        )
+        response = self.respond(request)
+
+        input_tokens = estimate_tokens(request.system_prompt) + estimate_tokens(
+            json.dumps(messages, default=str)
+        )
+        input_tokens += estimate_tokens(json.dumps(tool_specs)) if tool_specs else 0
+        tool_inputs = [
+            json.dumps(tool_use.input, ensure_ascii=False)
+            for tool_use in response.tool_uses
+        ]
+        tokens = split_tokens(response.text)
+        output_tokens = len(tokens) + sum(
+            estimate_tokens(tool_input) for tool_input in tool_inputs
+        )
+        self._record(input_tokens, output_tokens, len(response.tool_uses))
+
+        start = time.perf_counter()
+        if self.config["latency"]:
+            await asyncio.sleep(self.config["latency"])
+
+        yield {"messageStart": {"role": "assistant"}}
+
+        if tokens:
+            yield {"contentBlockStart": {"start": {}}}
+            tokens_per_second = self.config["tokens_per_second"]
+            stream_start = time.perf_counter()
+            for i, token in enumerate(tokens):
+                if tokens_per_second:
+                    # 目標時刻より先行していれば待つ（細かいsleepの誤差を累積させない）
+                    delay = stream_start + i / tokens_per_second - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                yield {"contentBlockDelta": {"delta": {"text": token}}}
+            yield {"contentBlockStop": {}}
+
+        for tool_use, tool_input in zip(response.tool_uses, tool_inputs, strict=True):
+            tool_use_id = f"tooluse_fake_{next(self._tool_use_ids)}"
+            yield {
+                "contentBlockStart": {
+                    "start": {
+                        "toolUse": {"toolUseId": tool_use_id, "name": tool_use.name}
+                    }
+                }
+            }
+            yield {"contentBlockDelta": {"delta": {"toolUse": {"input": tool_input}}}}
+            yield {"contentBlockStop": {}}
+
+        yield {
+            "messageStop": {
+                "stopReason": "tool_use" if response.tool_uses else "end_turn"
+            }
+        }
+        yield {
+            "metadata": {
+                "usage": {
+                    "inputTokens": input_tokens,
+                    "outputTokens": output_tokens,
+                    "totalTokens": input_tokens + output_tokens,
+                },
+                "metrics": {
+                    "latencyMs": math.ceil((time.perf_counter() - start) * 1000)
+                },
+            }
+        }
+
+    async def structured_output(
+        self,
+        output_model: type[T],
+        prompt: Messages,
+        system_prompt: str | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[dict[str, T | Any]]:
+        """応答テキストをJSONとして解釈し、構造化出力を返す"""
+        request = FakeRequest(
+            messages=prompt, system_prompt=system_prompt or "", tool_specs=[]
+        )
+        response = self.respond(request)
+        self._record(
+            estimate_tokens(json.dumps(prompt, default=str)),
+            estimate_tokens(response.text),
+            0,
+        )
+
+        if self.config["latency"]:
+            await asyncio.sleep(self.config["latency"])
+
+        try:
+            output = output_model.model_validate_json(response.text)
+        except ValueError:
+            output = output_model.model_construct()
+        yield {"output": output}
@@ -0,0 +1,140 @@
+"""
+fanout.py - 専門家エージェントの並列呼び出し
+
+互いに独立した専門家への問い合わせを、上限付きのスレッドプールで同時に実行する。
+結果は呼び出し順に並べて返すため、並列に実行しても出力の順序は変わらない。
+
+strands の Agent はツール呼び出しを ConcurrentToolExecutor で並列実行するが、
+それはモデルが1ターンで複数のツールを呼んだ場合に限られる。
+fan_out() を使ったツールは、1回の呼び出しで複数の専門家に同時に問い合わせられる。
+async のツールからは、スレッドを使わずに同じイベントループ上で待ち合わせる fan_out_async() を使う。
+fan_out_async() の同時実行数もイベントループごとに同じ上限で制限する。
+
+環境変数:
+    SPECIALIST_MAX_WORKERS: 同時に実行する専門家呼び出しの上限（既定: 8）
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import weakref
+from collections.abc import Awaitable, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+# fan_out の呼び出しの中かどうか（入れ子の fan_out によるデッドロックを防ぐ）
+# ContextVar はワーカーから呼んだエージェントのツールのスレッド（asyncio.to_thread）にも引き継がれる
+_in_worker: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "fanout_in_worker", default=False
+)
+
+# fan_out_async の同時実行数の上限（asyncio.Semaphore はイベントループに結び付くため、ループごとに作る）
+_async_slots: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, asyncio.Semaphore
+] = weakref.WeakKeyDictionary()
+
+# fan_out_async の呼び出しの中かどうか（入れ子の fan_out_async が枠を待ち合わせないようにする）
+_in_async_slot: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "fanout_in_async_slot", default=False
+)
+
+
+def _max_workers() -> int:
+    return int(os.getenv("SPECIALIST_MAX_WORKERS", "8"))
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """プロセス共通のスレッドプールを返す（初回のみ生成）"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_workers(), thread_name_prefix="specialist"
+            )
+        return _executor
+
+
+def _get_async_slots() -> asyncio.Semaphore:
+    """実行中のイベントループの fan_out_async 用のセマフォを返す（初回のみ生成）"""
+    loop = asyncio.get_running_loop()
+    slots = _async_slots.get(loop)
+    if slots is None:
+        slots = _async_slots[loop] = asyncio.Semaphore(_max_workers())
+    return slots
+
+
+def _run_in_worker[T](call: Callable[[], T]) -> T:
+    token = _in_worker.set(True)
+    try:
+        return call()
+    finally:
+        _in_worker.reset(token)
+
+
+def fan_out[T](calls: Sequence[Callable[[], T]]) -> list[T]:
+    """calls を並列に実行し、呼び出し順に結果を返す。
+
+    いずれかが例外を送出した場合は、全ての呼び出しの完了を待ってから最初の例外を送出する。
+    fan_out の呼び出しの中から呼ばれた場合（専門家のツールのスレッドからの入れ子の呼び出しを含む）は、
+    スレッドを使い切って待ち合わせにならないよう呼び出し元のスレッドで順番に実行する。
+
+    Args:
+        calls: 引数なしで呼び出せる関数のリスト
+
+    Returns:
+        calls と同じ順序の結果のリスト
+    """
+    if len(calls) <= 1 or _in_worker.get():
+        return [call() for call in calls]
+
+    executor = _get_executor()
+    # OpenTelemetry のトレースなどのコンテキストをワーカーに引き継ぐ
+    futures = [
+        executor.submit(contextvars.copy_context().run, _run_in_worker, call)
+        for call in calls
+    ]
+    errors = [future.exception() for future in futures]
+    for error in errors:
+        if error is not None:
+            raise error
+    return [future.result() for future in futures]
+
+
+async def _run_in_slot[T](
+    slots: asyncio.Semaphore, call: Callable[[], Awaitable[T]]
+) -> T:
+    async with slots:
+        token = _in_async_slot.set(True)
+        try:
+            return await call()
+        finally:
+            _in_async_slot.reset(token)
+
+
+async def fan_out_async[T](calls: Sequence[Callable[[], Awaitable[T]]]) -> list[T]:
+    """fan_out() の非同期版。calls を同じイベントループ上で同時に実行する。
+
+    同時に実行するのはイベントループごとに SPECIALIST_MAX_WORKERS 件まで。
+    いずれかが例外を送出した場合は、全ての呼び出しの完了を待ってから最初の例外を送出する。
+    fan_out_async の呼び出しの中から呼ばれた場合は、枠を待ち合わせないよう順番に実行する。
+
+    Args:
+        calls: 引数なしで呼び出せる、awaitable を返す関数のリスト
+
+    Returns:
+        calls と同じ順序の結果のリスト
+    """
+    if len(calls) <= 1 or _in_async_slot.get():
+        return [await call() for call in calls]
+
+    slots = _get_async_slots()
+    results = await asyncio.gather(
+        *(_run_in_slot(slots, call) for call in calls), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return list(results)
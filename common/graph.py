@@ -0,0 +1,509 @@
+"""
+graph.py - 並列実行とノード単位の計測に対応した Graph
+
+strands の Graph は、実行可能になったノードを「バッチ」単位でまとめて並列実行し、
+バッチ内の全ノードが終わるまで次のノードを開始しない。
+このモジュールの Graph / GraphBuilder は strands のものと同じ使い方のまま、以下を追加する。
+
+- データフロー実行: 非巡回グラフでは、先行ノードがすべて確定した時点で各ノードを開始する
+  （遅い兄弟ノードを待たない）。巡回を含むグラフは strands と同じバッチ実行になる
+- 最大並列数: 同時に実行するノード数の上限（set_max_parallelism）
+- タイムライン: 各ノードの開始・終了時刻と、そこから求めたクリティカルパスを結果に含める
+- 入力の制御: 後続ノードに渡す先行ノードの出力を PayloadPolicy で絞り込む（set_payload_policy）
+- 収束の記録: ConvergenceGuard がループを打ち切った記録と、省いたモデル呼び出し回数を結果に含める
+
+使い方:
+    from common.graph import GraphBuilder
+
+    builder = GraphBuilder()
+    ...
+    builder.set_max_parallelism(4)
+    result = builder.build()(task)
+    print(result.critical_path, result.critical_path_ms)
+"""
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from strands.hooks import BeforeNodeCallEvent
+from strands.interrupt import Interrupt
+from strands.multiagent import graph as strands_graph
+from strands.multiagent.base import NodeResult, Status
+from strands.multiagent.graph import GraphNode, GraphResult
+from strands.types._events import MultiAgentHandoffEvent, MultiAgentNodeStopEvent
+from strands.types.content import ContentBlock
+from strands.types.event_loop import Usage
+
+from .convergence import ConvergenceEvent, convergence_events
+from .payload import PayloadBuilder, PayloadPolicy, PayloadStats, blocks_tokens
+
+
+@dataclass
+class NodeSpan:
+    """ノード1回分の実行区間（グラフ開始からの経過秒）"""
+
+    node_id: str
+    start: float
+    end: float
+    status: str
+
+    @property
+    def duration_ms(self) -> float:
+        """実行時間（ミリ秒）"""
+        return (self.end - self.start) * 1000
+
+
+@dataclass
+class TimedGraphResult(GraphResult):
+    """タイムラインとクリティカルパスを含む GraphResult"""
+
+    timeline: list[NodeSpan] = field(default_factory=list)
+    critical_path: list[str] = field(default_factory=list)
+    critical_path_ms: float = 0.0
+    peak_parallelism: int = 0
+    payloads: list[PayloadStats] = field(default_factory=list)
+    convergence: list[ConvergenceEvent] = field(default_factory=list)
+
+    @property
+    def saved_tokens(self) -> int:
+        """PayloadPolicy によって削減した入力トークン数の合計"""
+        return sum(stats.saved_tokens for stats in self.payloads)
+
+    @property
+    def saved_model_calls(self) -> int:
+        """ConvergenceGuard がループを打ち切ったことで省いたモデル呼び出し回数"""
+        return sum(event.saved_model_calls for event in self.convergence)
+
+
+def critical_path(
+    timeline: list[NodeSpan], edges: list[tuple[GraphNode, GraphNode]]
+) -> list[NodeSpan]:
+    """タイムラインとエッジから、最後に終わったノードに至るクリティカルパスを求める。
+
+    各ノードについて、開始前に終わった先行ノードのうち最も遅く終わったものをたどる。
+    """
+    if not timeline:
+        return []
+    predecessors: dict[str, set[str]] = {}
+    for from_node, to_node in edges:
+        predecessors.setdefault(to_node.node_id, set()).add(from_node.node_id)
+
+    path = [max(timeline, key=lambda span: span.end)]
+    while True:
+        current = path[-1]
+        candidates = [
+            span
+            for span in timeline
+            if span.node_id in predecessors.get(current.node_id, set())
+            and span.end <= current.start + 1e-6
+        ]
+        if not candidates:
+            break
+        path.append(max(candidates, key=lambda span: span.end))
+    return list(reversed(path))
+
+
+def peak_parallelism(timeline: list[NodeSpan]) -> int:
+    """同時に実行されていたノード数の最大値"""
+    points = sorted(
+        [(span.start, 1) for span in timeline] + [(span.end, -1) for span in timeline]
+    )
+    peak = running = 0
+    for _, delta in points:
+        running += delta
+        peak = max(peak, running)
+    return peak
+
+
+def _is_acyclic(nodes: dict[str, GraphNode]) -> bool:
+    """グラフが巡回を含まないかどうか"""
+    visiting: set[str] = set()
+    done: set[str] = set()
+
+    def visit(node: GraphNode) -> bool:
+        if node.node_id in done:
+            return True
+        if node.node_id in visiting:
+            return False
+        visiting.add(node.node_id)
+        successors = [n for n in nodes.values() if node in n.dependencies]
+        ok = all(visit(successor) for successor in successors)
+        visiting.discard(node.node_id)
+        done.add(node.node_id)
+        return ok
+
+    return all(visit(node) for node in nodes.values())
+
+
+class Graph(strands_graph.Graph):
+    """データフロー実行・最大並列数・タイムラインに対応した Graph。"""
+
+    def __init__(
+        self,
+        *args: Any,
+        max_parallelism: int | None = None,
+        payload_policy: PayloadPolicy | None = None,
+        node_payload_policies: dict[str, PayloadPolicy] | None = None,
+        **kwargs: Any,
+    ):
+        """Graph を初期化する。
+
+        Args:
+            *args: strands の Graph と同じ引数
+            max_parallelism: 同時に実行するノード数の上限（None の場合は無制限）
+            payload_policy: 全ノードに適用する PayloadPolicy（None の場合は strands と同じ）
+            node_payload_policies: ノードID → そのノードに適用する PayloadPolicy
+            **kwargs: strands の Graph と同じキーワード引数
+        """
+        super().__init__(*args, **kwargs)
+        self.max_parallelism = max_parallelism
+        self.payload_policy = payload_policy
+        self.node_payload_policies = dict(node_payload_policies or {})
+        self.dataflow = _is_acyclic(self.nodes)
+        self.timeline: list[NodeSpan] = []
+        self.payloads: list[PayloadStats] = []
+        self._slots: asyncio.Semaphore | None = None
+        self._payload_builder = PayloadBuilder()
+        self._node_inputs: dict[str, list[ContentBlock]] = {}
+        self._node_input_errors: dict[str, Exception] = {}
+        self._summary_usage: dict[str, Usage] = {}
+        # 入力の要約はノードの開始イベントとユーザーのフックの後に行う（最後に登録する）
+        self.hooks.add_callback(BeforeNodeCallEvent, self._on_before_node)
+
+    async def stream_async(
+        self, task: Any, invocation_state: dict[str, Any] | None = None, **kwargs: Any
+    ) -> AsyncIterator[dict[str, Any]]:
+        """strands の Graph と同じイベントを返す（結果は TimedGraphResult）"""
+        if not self._interrupt_state.activated and not self._resume_from_session:
+            self.timeline = []
+            self.payloads = []
+            self._payload_builder = PayloadBuilder()
+        self._node_inputs.clear()
+        self._node_input_errors.clear()
+        self._summary_usage.clear()
+        # セマフォはイベントループごとに作り直す
+        self._slots = (
+            asyncio.Semaphore(self.max_parallelism) if self.max_parallelism else None
+        )
+        async for event in super().stream_async(task, invocation_state, **kwargs):
+            yield event
+
+    async def _stream_node_to_queue(
+        self,
+        node: GraphNode,
+        event_queue: asyncio.Queue[Any | None | Exception],
+        invocation_state: dict[str, Any],
+    ) -> None:
+        """空き枠ができるまで待ってからノードを実行する（待ち時間はノードのタイムアウトに含めない）"""
+        if self._slots is None:
+            await super()._stream_node_to_queue(node, event_queue, invocation_state)
+            return
+        async with self._slots:
+            await super()._stream_node_to_queue(node, event_queue, invocation_state)
+
+    async def _execute_node(
+        self, node: GraphNode, invocation_state: dict[str, Any]
+    ) -> AsyncIterator[Any]:
+        """ノードを実行し、開始・終了時刻をタイムラインに記録する"""
+        start = time.time()
+        try:
+            async for event in super()._execute_node(node, invocation_state):
+                if (
+                    isinstance(event, MultiAgentNodeStopEvent)
+                    and event["node_id"] == node.node_id
+                ):
+                    self._add_summary_usage(node.node_id, event["node_result"])
+                yield event
+        finally:
+            self.timeline.append(
+                NodeSpan(
+                    node_id=node.node_id,
+                    start=start - self.state.start_time,
+                    end=time.time() - self.state.start_time,
+                    status=node.execution_status.value,
+                )
+            )
+
+    async def _on_before_node(self, event: BeforeNodeCallEvent) -> None:
+        """取り消されなかったノードの入力を組み立てる（失敗はノードの失敗にする）"""
+        if event.source is not self or event.cancel_node:
+            return
+        try:
+            await self._prepare_node_input(self.nodes[event.node_id])
+        except Exception as e:  # noqa: BLE001 - ノードの実行時に送出する
+            self._node_input_errors[event.node_id] = e
+
+    def _add_summary_usage(self, node_id: str, node_result: NodeResult) -> None:
+        """入力の要約に使った使用量を、ノードとグラフの使用量に加える"""
+        usage = self._summary_usage.pop(node_id, None)
+        if usage is None:
+            return
+        # エージェントの使用量の辞書をそのまま書き換えないよう、新しい辞書にする
+        node_usage = Usage(**node_result.accumulated_usage)
+        for name in ("inputTokens", "outputTokens", "totalTokens"):
+            node_usage[name] = node_usage.get(name, 0) + usage[name]
+            self.state.accumulated_usage[name] += usage[name]
+        node_result.accumulated_usage = node_usage
+
+    async def _prepare_node_input(self, node: GraphNode) -> None:
+        """PayloadPolicy に従ってノードの入力を組み立て、削減量を記録する"""
+        policy = self.node_payload_policies.get(node.node_id, self.payload_policy)
+        if policy is None:
+            return
+        # 条件を満たした先行ノードの結果（完了順）
+        order = {n.node_id: i for i, n in enumerate(self.state.execution_order)}
+        dependencies = {
+            edge.from_node.node_id: self.state.results[edge.from_node.node_id]
+            for edge in sorted(
+                self.edges, key=lambda e: order.get(e.from_node.node_id, -1)
+            )
+            if edge.to_node == node
+            and edge.from_node in self.state.completed_nodes
+            and edge.from_node.node_id in self.state.results
+            and edge.should_traverse(self.state)
+        }
+        if not dependencies:
+            return
+
+        original = blocks_tokens(super()._build_node_input(node))
+        default_model = getattr(node.executor, "model", None)
+        node_input, summarized, usage = await self._payload_builder.build(
+            self.state.task, dependencies, policy, default_model
+        )
+        self._node_inputs[node.node_id] = node_input
+        if usage["totalTokens"]:
+            self._summary_usage[node.node_id] = usage
+        self.payloads.append(
+            PayloadStats(
+                node_id=node.node_id,
+                mode=policy.mode,
+                original_tokens=original,
+                sent_tokens=blocks_tokens(node_input),
+                summarized=summarized,
+            )
+        )
+
+    def _build_node_input(self, node: GraphNode) -> list[ContentBlock]:
+        """PayloadPolicy で組み立てた入力があればそれを使う"""
+        error = self._node_input_errors.pop(node.node_id, None)
+        if error is not None:
+            raise error
+        node_input = self._node_inputs.pop(node.node_id, None)
+        if node_input is not None:
+            return node_input
+        return super()._build_node_input(node)
+
+    async def _execute_graph(
+        self, invocation_state: dict[str, Any]
+    ) -> AsyncIterator[Any]:
+        """非巡回グラフはデータフロー実行、それ以外は strands のバッチ実行を行う"""
+        if (
+            not self.dataflow
+            or self._interrupt_state.activated
+            or self._resume_from_session
+        ):
+            async for event in super()._execute_graph(invocation_state):
+                yield event
+            return
+
+        event_queue: asyncio.Queue[Any] = asyncio.Queue()
+        running: dict[str, asyncio.Task[None]] = {}
+        finished: set[str] = set()
+
+        async def run_node(node: GraphNode) -> None:
+            await self._stream_node_to_queue(node, event_queue, invocation_state)
+            await event_queue.put(("finished", node))
+
+        def start(nodes: list[GraphNode]) -> bool:
+            for node in nodes:
+                should_continue, _ = self.state.should_continue(
+                    max_node_executions=self.max_node_executions,
+                    execution_timeout=self.execution_timeout,
+                )
+                if not should_continue:
+                    self.state.status = Status.FAILED
+                    return False
+                running[node.node_id] = asyncio.create_task(run_node(node))
+            return True
+
+        try:
+            if not start(list(self.entry_points)):
+                return
+            while running:
+                event = await event_queue.get()
+                if isinstance(event, Exception):
+                    raise event
+                if event is None:
+                    continue
+                if isinstance(event, tuple) and event[0] == "finished":
+                    node = event[1]
+                    del running[node.node_id]
+                    finished.add(node.node_id)
+                    if self.state.status == Status.INTERRUPTED:
+                        # 割り込み中は新しいノードを開始せず、実行中のノードの完了を待つ
+                        if not running:
+                            self._save_interrupt_context(finished)
+                        continue
+                    newly_ready = self._find_dataflow_ready_nodes(
+                        set(running), finished
+                    )
+                    if newly_ready:
+                        yield MultiAgentHandoffEvent(
+                            from_node_ids=[node.node_id],
+                            to_node_ids=[n.node_id for n in newly_ready],
+                        )
+                        if not start(newly_ready):
+                            return
+                    continue
+                yield event
+        finally:
+            for task in running.values():
+                task.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+
+    def _save_interrupt_context(self, finished: set[str]) -> None:
+        """再開時に strands のバッチ実行で続きから実行できるよう、完了ノードを記録する"""
+        self._interrupt_state.context["completed_nodes"] = [
+            node_id
+            for node_id in finished
+            if self.nodes[node_id].execution_status == Status.COMPLETED
+            and not any(
+                edge.from_node.node_id == node_id and edge.to_node.node_id in finished
+                for edge in self.edges
+            )
+        ]
+
+    def _find_dataflow_ready_nodes(
+        self, running: set[str], finished: set[str]
+    ) -> list[GraphNode]:
+        """先行ノードがすべて確定し、満たされた入力エッジが1本以上あるノードを返す。
+
+        先行ノードは、完了したか、今後実行される可能性がなくなった時点で確定とみなす。
+        """
+        pending = set(running)
+        while True:
+            # 実行中・実行予定のノードと、その子孫はこれから実行される可能性がある
+            may_run = set(pending)
+            changed = True
+            while changed:
+                changed = False
+                for node in self.nodes.values():
+                    if node.node_id in may_run or node.node_id in finished:
+                        continue
+                    if any(dep.node_id in may_run for dep in node.dependencies):
+                        may_run.add(node.node_id)
+                        changed = True
+
+            ready = []
+            for node in self.nodes.values():
+                if (
+                    node.node_id in finished
+                    or node.node_id in running
+                    or node in self.entry_points
+                ):
+                    continue
+                if any(dep.node_id in may_run for dep in node.dependencies):
+                    continue
+                if any(
+                    edge.to_node == node
+                    and edge.from_node in self.state.completed_nodes
+                    and edge.should_traverse(self.state)
+                    for edge in self.edges
+                ):
+                    ready.append(node)
+
+            # 新たに実行可能になったノードの後続は、そのノードの完了まで待たせる
+            new_ids = {node.node_id for node in ready} - pending
+            if not new_ids:
+                return ready
+            pending |= new_ids
+
+    def _build_result(self, interrupts: list[Interrupt]) -> TimedGraphResult:
+        """タイムラインとクリティカルパスを含む結果を作成する"""
+        result = super()._build_result(interrupts)
+        timeline = sorted(self.timeline, key=lambda span: span.start)
+        path = critical_path(timeline, result.edges)
+        return TimedGraphResult(
+            **{name: getattr(result, name) for name in result.__dataclass_fields__},
+            timeline=timeline,
+            critical_path=[span.node_id for span in path],
+            critical_path_ms=round(sum(span.duration_ms for span in path), 1),
+            peak_parallelism=peak_parallelism(timeline),
+            payloads=list(self.payloads),
+            convergence=convergence_events(self.state),
+        )
+
+
+class GraphBuilder(strands_graph.GraphBuilder):
+    """common.graph.Graph を構築する GraphBuilder（strands の GraphBuilder と同じ使い方）。"""
+
+    def __init__(self) -> None:
+        """GraphBuilder を初期化する"""
+        super().__init__()
+        self._max_parallelism: int | None = None
+        self._payload_policy: PayloadPolicy | None = None
+        self._node_payload_policies: dict[str, PayloadPolicy] = {}
+
+    def set_max_parallelism(self, max_parallelism: int | None) -> "GraphBuilder":
+        """同時に実行するノード数の上限を設定する。
+
+        Args:
+            max_parallelism: 上限（None の場合は無制限）
+        """
+        if max_parallelism is not None and max_parallelism < 1:
+            raise ValueError("max_parallelism must be at least 1")
+        self._max_parallelism = max_parallelism
+        return self
+
+    def set_payload_policy(
+        self, policy: PayloadPolicy | None, node_id: str | None = None
+    ) -> "GraphBuilder":
+        """後続ノードに渡す先行ノードの出力の扱いを設定する。
+
+        Args:
+            policy: 適用する PayloadPolicy（None の場合は strands と同じ）
+            node_id: 特定のノードだけに適用する場合のノードID（省略時は全ノード）
+        """
+        if node_id is None:
+            self._payload_policy = policy
+        elif policy is None:
+            self._node_payload_policies.pop(node_id, None)
+        else:
+            if node_id not in self.nodes:
+                raise ValueError(f"Node '{node_id}' not found")
+            self._node_payload_policies[node_id] = policy
+        return self
+
+    def build(self) -> Graph:
+        """設定に従って Graph を構築する"""
+        if not self.nodes:
+            raise ValueError("Graph must contain at least one node")
+
+        # エントリーポイントが未指定なら、依存のないノードをエントリーポイントにする
+        if not self.entry_points:
+            self.entry_points = {
+                node for node in self.nodes.values() if not node.dependencies
+            }
+            if not self.entry_points:
+                raise ValueError("No entry points found - all nodes have dependencies")
+
+        self._validate_graph()
+
+        return Graph(
+            nodes=self.nodes.copy(),
+            edges=self.edges.copy(),
+            entry_points=self.entry_points.copy(),
+            max_node_executions=self._max_node_executions,
+            execution_timeout=self._execution_timeout,
+            node_timeout=self._node_timeout,
+            reset_on_revisit=self._reset_on_revisit,
+            session_manager=self._session_manager,
+            hooks=self._hooks,
+            id=self._id,
+            max_parallelism=self._max_parallelism,
+            payload_policy=self._payload_policy,
+            node_payload_policies=self._node_payload_policies,
+        )
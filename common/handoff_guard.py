@@ -0,0 +1,189 @@
+"""
+handoff_guard.py - Swarm の引き継ぎの往復（ping-pong）の検出
+
+Swarm のエージェントは自律的に前のエージェントへ戻れるため、
+implementer ↔ requirements_analyst のような往復が max_handoffs や
+execution_timeout に達するまで続くことがあり、往復のたびにモデルの呼び出しが発生する。
+HandoffGuard は引き継ぎのたびに履歴を調べ、以下のいずれかを検出する。
+
+- oscillation: 同じ並び（A → B、A → B → C など）が min_repeats 回続けて繰り返された
+- repeated_message: 同じエージェント間で同じ（類似度が閾値以上の）メッセージの引き継ぎが
+  max_repeated_messages 回に達した
+
+検出したときの動作（action）:
+- terminate: 引き継ぎを拒否し、現在のエージェントの応答で Swarm を終了する
+- escalate: escalate_to のエージェントへ引き継ぎ先を差し替える
+  （エスカレーション後に再び検出した場合は terminate と同じ）
+
+strands の repetitive_handoff_detection_window は直近の担当者の種類の数だけを見て
+Swarm を失敗として終了するが、HandoffGuard は繰り返しの並びを特定して結果の cycles に残す。
+
+使い方:
+    guard = HandoffGuard(action="escalate", escalate_to="supervisor")
+    swarm = Swarm(nodes=[...], handoff_guard=guard)
+    result = swarm(task)
+    for cycle in result.cycles:
+        print(cycle.reason, cycle.pattern, cycle.action)
+"""
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from .convergence import similarity
+
+HANDOFF_ACTIONS = ("terminate", "escalate")
+
+
+class HandoffLoopError(RuntimeError):
+    """繰り返しを検出して引き継ぎを拒否したときの例外（引き継ぎツールの応答としてエージェントに返る）"""
+
+
+@dataclass
+class HandoffCycle:
+    """検出した引き継ぎの繰り返し"""
+
+    reason: str
+    pattern: list[str]
+    repeats: int
+    hop: int
+    action: str
+    target: str
+    escalated_to: str | None = None
+    messages: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "reason": self.reason,
+            "pattern": self.pattern,
+            "repeats": self.repeats,
+            "hop": self.hop,
+            "action": self.action,
+            "target": self.target,
+            "escalated_to": self.escalated_to,
+        }
+
+
+def _normalize(message: str) -> str:
+    """メッセージの空白の違いを無視する"""
+    return re.sub(r"\s+", " ", message).strip()
+
+
+def find_oscillation(
+    sequence: Sequence[str], min_repeats: int, max_period: int
+) -> tuple[list[str], int] | None:
+    """担当の並びの末尾で同じ並びが min_repeats 回以上繰り返されていれば (並び, 回数) を返す"""
+    for period in range(2, max_period + 1):
+        block = list(sequence[-period:])
+        if len(set(block)) < 2:
+            continue
+        repeats = 1
+        while len(sequence) >= period * (repeats + 1) and (
+            list(sequence[-period * (repeats + 1) : -period * repeats]) == block
+        ):
+            repeats += 1
+        if repeats >= min_repeats:
+            return block, repeats
+    return None
+
+
+class HandoffGuard:
+    """Swarm の引き継ぎの往復や同じメッセージの繰り返しを検出するガード。"""
+
+    def __init__(
+        self,
+        *,
+        min_repeats: int = 3,
+        max_period: int = 3,
+        max_repeated_messages: int = 3,
+        message_threshold: float = 0.95,
+        action: str = "terminate",
+        escalate_to: str | None = None,
+    ):
+        """ガードを初期化する。
+
+        Args:
+            min_repeats: 往復とみなす、同じ並びの繰り返し回数
+            max_period: 検出する並びの最大の長さ（2 なら A ↔ B のみ）
+            max_repeated_messages: 同じ引き継ぎメッセージとみなす回数の上限
+            message_threshold: 同じメッセージとみなす類似度
+            action: 検出したときの動作（"terminate" / "escalate"）
+            escalate_to: action="escalate" の引き継ぎ先のエージェント名
+        """
+        if action not in HANDOFF_ACTIONS:
+            raise ValueError(f"action must be one of {HANDOFF_ACTIONS}: {action}")
+        if action == "escalate" and escalate_to is None:
+            raise ValueError("action=escalate requires escalate_to")
+        if min_repeats < 2:
+            raise ValueError("min_repeats must be at least 2")
+        if max_period < 2:
+            raise ValueError("max_period must be at least 2")
+        self.min_repeats = min_repeats
+        self.max_period = max_period
+        self.max_repeated_messages = max_repeated_messages
+        self.message_threshold = message_threshold
+        self.action = action
+        self.escalate_to = escalate_to
+
+    def _repeated_messages(
+        self, handoffs: Sequence[tuple[str, str, str]], message: str
+    ) -> list[str]:
+        """最後の引き継ぎと同じエージェント間で、同じメッセージだった引き継ぎを返す"""
+        source, target, _ = handoffs[-1]
+        normalized = _normalize(message)
+        return [
+            text
+            for from_node, to_node, text in handoffs
+            if (from_node, to_node) == (source, target)
+            and similarity(_normalize(text), normalized) >= self.message_threshold
+        ]
+
+    def check(
+        self,
+        sequence: Sequence[str],
+        handoffs: Sequence[tuple[str, str, str]],
+        escalated: bool = False,
+    ) -> HandoffCycle | None:
+        """引き継ぎを受け付ける前に繰り返しを調べる。
+
+        Args:
+            sequence: これまでの担当の並び（現在のエージェントと引き継ぎ先を含む）
+            handoffs: これまでの引き継ぎ (引き継ぎ元, 引き継ぎ先, メッセージ)（今回の分を含む）
+            escalated: この実行で既にエスカレーションしたかどうか
+        """
+        target = sequence[-1]
+        oscillation = find_oscillation(sequence, self.min_repeats, self.max_period)
+        if oscillation is not None:
+            pattern, repeats = oscillation
+            cycle = HandoffCycle(
+                reason="oscillation",
+                pattern=pattern,
+                repeats=repeats,
+                hop=len(sequence) - 1,
+                action=self.action,
+                target=target,
+            )
+        else:
+            repeated = self._repeated_messages(handoffs, handoffs[-1][2])
+            if len(repeated) < self.max_repeated_messages:
+                return None
+            cycle = HandoffCycle(
+                reason="repeated_message",
+                pattern=list(handoffs[-1][:2]),
+                repeats=len(repeated),
+                hop=len(sequence) - 1,
+                action=self.action,
+                target=target,
+                messages=repeated,
+            )
+
+        if cycle.action == "escalate" and (
+            escalated or self.escalate_to in (sequence[-2], target)
+        ):
+            # エスカレーション先を巻き込んだ繰り返しは終了させる
+            cycle.action = "terminate"
+        if cycle.action == "escalate":
+            cycle.escalated_to = self.escalate_to
+        return cycle
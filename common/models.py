@@ -0,0 +1,214 @@
+"""
+models.py - プロセス共通のモデルファクトリ
+
+各サンプルが個別に BedrockModel を生成すると、そのたびに boto3 セッションの作成、
+サービス定義の読み込み、認証情報の解決、HTTP接続の確立が発生する。
+get_model() は (model_id, region, 設定) ごとに1つのモデルをプロセス全体で共有し、
+bedrock-runtime クライアントはチューニング済みの接続プール上に初回利用時に生成する。
+
+環境変数:
+    MODEL_PROVIDER: "fake" を指定するとBedrockの代わりに FakeModel を返す（オフライン実行用）
+    FAKE_MODEL_LATENCY: FakeModel の最初のトークンまでの待ち時間（秒、既定: 0）
+    FAKE_MODEL_TPS: FakeModel のストリーミング速度（トークン/秒、既定: 制限なし）
+    FAKE_MODEL_MAX_CONCURRENCY: FakeModel がスロットリングせずに処理できる同時呼び出し数
+        （既定: 制限なし）
+    BEDROCK_ENDPOINT_URL: 接続先エンドポイント（ローカルのスタブやVPCエンドポイント用）
+    BEDROCK_MAX_POOL_CONNECTIONS: 接続プールの上限（既定: 50）
+"""
+
+import json
+import os
+import threading
+from typing import Any
+
+import boto3
+from botocore.config import Config as BotocoreConfig
+from strands.models.bedrock import DEFAULT_READ_TIMEOUT, BedrockModel
+from strands.models.model import Model
+
+from .fake_model import FakeModel
+
+# 全サンプル共通のモデル設定（Claude Haiku 4.5、東京リージョン）
+DEFAULT_MODEL_ID = "jp.anthropic.claude-haiku-4-5-20251001-v1:0"
+DEFAULT_REGION = "ap-northeast-1"
+
+# 接続プール設定
+# 並列のツール呼び出しやGraph/Swarmの同時実行でも接続を使い回せるよう上限を広げ、
+# keep-aliveで長時間のストリーミング中も接続を維持する
+CLIENT_CONFIG = BotocoreConfig(
+    user_agent_extra="strands-agents",
+    max_pool_connections=int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50")),
+    tcp_keepalive=True,
+    connect_timeout=10,
+    read_timeout=DEFAULT_READ_TIMEOUT,
+    retries={"mode": "standard", "max_attempts": 3},
+)
+
+# boto3.Session はスレッドセーフではないため、生成とクライアント作成をロックで保護する
+_session: boto3.Session | None = None
+_session_lock = threading.RLock()
+
+_models: dict[str, Model] = {}
+_models_lock = threading.Lock()
+
+
+def _get_session() -> boto3.Session:
+    """プロセス共通の boto3 セッションを返す（初回のみ生成）"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = boto3.Session()
+        return _session
+
+
+class PooledBedrockModel(BedrockModel):
+    """bedrock-runtime クライアントを初回利用時に生成する BedrockModel。
+
+    BedrockModel.__init__ はクライアントを即時に生成するため呼び出さず、
+    設定の初期化だけを行う。クライアントは共有セッションと CLIENT_CONFIG から作られる。
+    """
+
+    def __init__(
+        self,
+        *,
+        model_id: str,
+        region_name: str,
+        endpoint_url: str | None = None,
+        **model_config: Any,
+    ):
+        """モデル設定を初期化する。
+
+        Args:
+            model_id: BedrockのモデルID
+            region_name: AWSリージョン
+            endpoint_url: 接続先エンドポイント（省略時はリージョンの既定エンドポイント）
+            **model_config: BedrockModel と同じモデル設定（max_tokens, temperature など）
+        """
+        self.config = BedrockModel.BedrockConfig(
+            model_id=model_id, include_tool_result_status="auto"
+        )
+        self.update_config(**model_config)
+        self.region_name = region_name
+        self.endpoint_url = endpoint_url
+        self._client: Any = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> Any:
+        """bedrock-runtime クライアント（初回アクセス時に生成）"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    with _session_lock:
+                        self._client = _get_session().client(
+                            service_name="bedrock-runtime",
+                            config=CLIENT_CONFIG,
+                            endpoint_url=self.endpoint_url,
+                            region_name=self.region_name,
+                        )
+        return self._client
+
+    @client.setter
+    def client(self, value: Any) -> None:
+        self._client = value
+
+    def warm(self) -> None:
+        """クライアント生成と認証情報の解決を前倒しで行う。
+
+        サーバー起動時などに呼んでおくと、最初のリクエストのレイテンシを抑えられる。
+        """
+        _ = self.client
+        with _session_lock:
+            _get_session().get_credentials()
+
+
+def use_fake_model() -> bool:
+    """環境変数 MODEL_PROVIDER で FakeModel が指定されているかどうか"""
+    return os.getenv("MODEL_PROVIDER", "bedrock").lower() == "fake"
+
+
+def _create_fake_model(model_id: str) -> FakeModel:
+    """環境変数の設定から FakeModel を生成する"""
+    tokens_per_second = os.getenv("FAKE_MODEL_TPS")
+    max_concurrency = os.getenv("FAKE_MODEL_MAX_CONCURRENCY")
+    return FakeModel(
+        model_id=model_id,
+        latency=float(os.getenv("FAKE_MODEL_LATENCY", "0")),
+        tokens_per_second=float(tokens_per_second) if tokens_per_second else None,
+        max_concurrency=int(max_concurrency) if max_concurrency else None,
+    )
+
+
+def _cache_key(model_id: str, region_name: str, settings: dict[str, Any]) -> str:
+    """モデルキャッシュのキーを作成する（設定の順序に依存しない）"""
+    return json.dumps([model_id, region_name, settings], sort_keys=True, default=str)
+
+
+def get_model(
+    model_id: str = DEFAULT_MODEL_ID,
+    region_name: str = DEFAULT_REGION,
+    **settings: Any,
+) -> Model:
+    """(model_id, region, 設定) ごとにプロセス全体で共有されるモデルを返す。
+
+    同じ引数で呼ばれた場合は同一インスタンスを返す。返されたモデルは複数のAgentから
+    共有されるため、update_config() で設定を書き換えると全利用者に影響する点に注意。
+    環境変数 MODEL_PROVIDER=fake の場合は、Bedrockに接続しない FakeModel を返す。
+
+    Args:
+        model_id: BedrockのモデルID
+        region_name: AWSリージョン
+        **settings: BedrockModel のモデル設定（max_tokens, temperature など）
+
+    Returns:
+        共有モデル
+    """
+    fake = use_fake_model()
+    key = _cache_key(model_id, region_name, {**settings, "fake": fake})
+    with _models_lock:
+        model = _models.get(key)
+        if model is None and fake:
+            model = _create_fake_model(model_id)
+            _models[key] = model
+        elif model is None:
+            model = PooledBedrockModel(
+                model_id=model_id,
+                region_name=region_name,
+                endpoint_url=os.getenv("BEDROCK_ENDPOINT_URL"),
+                **settings,
+            )
+            _models[key] = model
+        return model
+
+
+def workflow_task_model(**settings: Any) -> dict[str, Any]:
+    """workflow ツールのタスク定義に展開するモデル指定を返す。
+
+    通常は Bedrock の model_provider / model_settings を返す。
+    FakeModel 使用時は空の辞書を返し、タスクのエージェントに親エージェントのモデルを使わせる。
+
+    Args:
+        **settings: model_settings に追加する設定（max_tokens など）
+
+    Returns:
+        タスク定義に `**` で展開する辞書
+    """
+    if use_fake_model():
+        return {}
+    return {
+        "model_provider": "bedrock",
+        "model_settings": {
+            "model_id": DEFAULT_MODEL_ID,
+            "region_name": DEFAULT_REGION,
+            **settings,
+        },
+    }
+
+
+def clear_models() -> None:
+    """共有モデルと共有セッションを破棄する（ベンチマークやテストでの計測用）"""
+    global _session
+    with _models_lock:
+        _models.clear()
+    with _session_lock:
+        _session = None
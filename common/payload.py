@@ -0,0 +1,169 @@
+"""
+payload.py - Graph のノード間で受け渡す出力の量の制御
+
+strands の Graph は、条件を満たした先行ノードの出力をすべて全文で後続ノードに渡す。
+PayloadPolicy を指定すると、後続ノードに渡す出力を以下のいずれかに絞り込める。
+
+- full: strands と同じ（先行ノードの出力をすべて全文で渡す）
+- latest: 最後に完了した先行ノードの出力だけを渡す
+- truncate: 予算（max_tokens）を超える出力は先頭と末尾を残して中間を省略する
+- summarize: 予算を超える出力はモデルで要約してから渡す
+
+latest / full でも max_tokens を指定した場合は、予算を超える部分を省略する。
+トークン数は common.tokens の簡易的な見積もりで数える。
+"""
+
+from dataclasses import dataclass
+from typing import cast
+
+from strands import Agent
+from strands.models.model import Model
+from strands.multiagent.base import NodeResult
+from strands.types.content import ContentBlock
+from strands.types.event_loop import Usage
+
+from .tokens import estimate_tokens, truncate_tokens
+
+PAYLOAD_MODES = ("full", "latest", "truncate", "summarize")
+
+SUMMARIZER_PROMPT = """あなたは要約の担当です。
+与えられた文章の要点を、後続の作業に必要な情報を落とさずに簡潔にまとめてください。"""
+
+
+@dataclass
+class PayloadPolicy:
+    """後続ノードに渡す先行ノードの出力の扱い
+
+    Attributes:
+        mode: "full" / "latest" / "truncate" / "summarize"
+        max_tokens: 先行ノードの出力に使えるトークン数の上限（None の場合は無制限）
+        summarizer: mode="summarize" で要約に使うモデル（省略時はノードのエージェントのモデル）
+    """
+
+    mode: str = "full"
+    max_tokens: int | None = None
+    summarizer: Model | None = None
+
+    def __post_init__(self) -> None:
+        if self.mode not in PAYLOAD_MODES:
+            raise ValueError(f"mode must be one of {PAYLOAD_MODES}: {self.mode}")
+        if self.max_tokens is not None and self.max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        if self.mode in ("truncate", "summarize") and self.max_tokens is None:
+            raise ValueError(f"mode={self.mode} requires max_tokens")
+
+
+@dataclass
+class PayloadStats:
+    """ノード1回分の入力の削減量"""
+
+    node_id: str
+    mode: str
+    original_tokens: int
+    sent_tokens: int
+    summarized: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        """削減したトークン数"""
+        return self.original_tokens - self.sent_tokens
+
+    def to_dict(self) -> dict[str, int | str]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "node_id": self.node_id,
+            "mode": self.mode,
+            "original_tokens": self.original_tokens,
+            "sent_tokens": self.sent_tokens,
+            "saved_tokens": self.saved_tokens,
+            "summarized": self.summarized,
+        }
+
+
+def blocks_tokens(blocks: list[ContentBlock]) -> int:
+    """ContentBlock のリストに含まれるテキストのトークン数"""
+    return sum(estimate_tokens(block.get("text", "")) for block in blocks)
+
+
+class PayloadBuilder:
+    """PayloadPolicy に従って、ノードの入力を strands と同じ形式で組み立てる。"""
+
+    def __init__(self) -> None:
+        # 同じ出力を複数の後続ノードに渡す場合に要約を使い回す
+        self._summaries: dict[tuple[str, int], str] = {}
+
+    async def _summarize(
+        self, text: str, max_tokens: int, model: Model, usage: Usage
+    ) -> str:
+        """text を max_tokens 以内に要約する（収まらない部分は省略する）。
+
+        要約のモデル呼び出しの使用量は usage に加算する（使い回した要約は加算しない）。
+        """
+        key = (text, max_tokens)
+        if key not in self._summaries:
+            summarizer = Agent(
+                model=model, system_prompt=SUMMARIZER_PROMPT, callback_handler=None
+            )
+            result = await summarizer.invoke_async(
+                f"以下の文章を{max_tokens}トークン以内で要約してください。\n\n{text}"
+            )
+            for name in ("inputTokens", "outputTokens", "totalTokens"):
+                usage[name] += result.metrics.accumulated_usage.get(name, 0)
+            self._summaries[key] = truncate_tokens(str(result).strip(), max_tokens)
+        return self._summaries[key]
+
+    async def build(
+        self,
+        task: str | list[ContentBlock],
+        dependencies: dict[str, NodeResult],
+        policy: PayloadPolicy,
+        default_model: Model | None,
+    ) -> tuple[list[ContentBlock], int, Usage]:
+        """ノードの入力と、要約した出力の数、要約のモデル呼び出しの使用量を返す。
+
+        Args:
+            task: グラフに渡された元のタスク
+            dependencies: 先行ノードのID → 結果（完了順）
+            policy: 適用するポリシー
+            default_model: policy.summarizer がない場合に要約に使うモデル
+        """
+        if policy.mode == "latest" and dependencies:
+            last_id = list(dependencies)[-1]
+            dependencies = {last_id: dependencies[last_id]}
+
+        outputs = [
+            (dep_id, getattr(result, "agent_name", "Agent"), str(result))
+            for dep_id, node_result in dependencies.items()
+            for result in node_result.get_agent_results()
+        ]
+
+        summarized = 0
+        usage = Usage(inputTokens=0, outputTokens=0, totalTokens=0)
+        if policy.max_tokens is not None and outputs:
+            budget = max(policy.max_tokens // len(outputs), 1)
+            model = policy.summarizer or default_model
+            bounded = []
+            for dep_id, name, text in outputs:
+                if estimate_tokens(text) > budget:
+                    if policy.mode == "summarize" and model is not None:
+                        text = await self._summarize(text, budget, model, usage)
+                        summarized += 1
+                    else:
+                        text = truncate_tokens(text, budget)
+                bounded.append((dep_id, name, text))
+            outputs = bounded
+
+        # strands の Graph と同じ形式で組み立てる
+        if isinstance(task, str):
+            node_input = [ContentBlock(text=f"Original Task: {task}")]
+        else:
+            node_input = [ContentBlock(text="Original Task:")]
+            node_input.extend(cast(list[ContentBlock], task))
+        node_input.append(ContentBlock(text="\nInputs from previous nodes:"))
+        current = None
+        for dep_id, name, text in outputs:
+            if dep_id != current:
+                node_input.append(ContentBlock(text=f"\nFrom {dep_id}:"))
+                current = dep_id
+            node_input.append(ContentBlock(text=f"  - {name}: {text}"))
+        return node_input, summarized, usage
@@ -0,0 +1,180 @@
+"""
+pre_router.py - Swarm のエントリーポイントの前段のルーター
+
+受付（トリアージ）担当のエージェントは、振り分け先を決めるためだけにモデルを1回呼ぶ。
+振り分けの基準がキーワードで書けるなら、PreRouter がタスクを照合し、
+確信度が十分なときは受付を飛ばして専門のエージェントから実行を始める。
+確信が持てない場合（一致なし・複数の振り分け先に同程度に一致）は、従来どおり受付に任せる。
+
+照合はキーワード（`in`）と正規表現（`re.Pattern.search`）で行う。
+classifier に (タスク) → (振り分け先 | None, 確信度) を返す関数を渡すと、
+ルールの代わりに任意のローカルな分類器を使える。
+
+命中率と、受付を飛ばしたことで省いた時間（受付が実行されたときの平均所要時間から見積もる）は
+stats で確認できる。
+
+使い方:
+    router = PreRouter({
+        "technical_support": ["エラー", "動作しない"],
+        "billing_support": ["料金", "請求"],
+    })
+    swarm = Swarm(nodes=[...], entry_point=receptionist, pre_router=router)
+"""
+
+import re
+import time
+from collections.abc import Callable, Collection, Mapping, Sequence
+from dataclasses import dataclass, field
+
+type Rule = str | re.Pattern[str]
+
+
+@dataclass
+class RouteDecision:
+    """前段のルーターの振り分け結果"""
+
+    target: str | None
+    confidence: float
+    matched: list[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> dict[str, str | float | list[str] | None]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "target": self.target,
+            "confidence": round(self.confidence, 3),
+            "matched": self.matched,
+            "elapsed_ms": round(self.elapsed_ms, 3),
+        }
+
+
+@dataclass
+class PreRouterStats:
+    """前段のルーターの命中率と省いた時間"""
+
+    requests: int = 0
+    hits: int = 0
+    classify_ms: float = 0.0
+    entry_runs: int = 0
+    entry_ms: float = 0.0
+
+    @property
+    def fallbacks(self) -> int:
+        """受付に任せた回数"""
+        return self.requests - self.hits
+
+    @property
+    def hit_rate(self) -> float:
+        """受付を飛ばした割合"""
+        return self.hits / self.requests if self.requests else 0.0
+
+    @property
+    def saved_ms(self) -> float:
+        """受付を飛ばしたことで省いた時間の見積もり（受付の平均所要時間 × 命中数）"""
+        if not self.entry_runs:
+            return 0.0
+        return self.entry_ms / self.entry_runs * self.hits
+
+    def to_dict(self) -> dict[str, float]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "hit_rate": round(self.hit_rate, 3),
+            "classify_ms": round(self.classify_ms, 3),
+            "saved_ms": round(self.saved_ms, 1),
+        }
+
+
+class PreRouter:
+    """タスクをルールで照合し、確信度が十分なら振り分け先を返す前段のルーター。"""
+
+    def __init__(
+        self,
+        routes: Mapping[str, Rule | Sequence[Rule]] | None = None,
+        *,
+        classifier: Callable[[str], tuple[str | None, float]] | None = None,
+        min_confidence: float = 0.6,
+        min_matches: int = 1,
+    ):
+        """ルーターを初期化する。
+
+        Args:
+            routes: 振り分け先のエージェント名 → キーワード・正規表現（複数可）
+            classifier: ルールの代わりに使う分類器（タスク → (振り分け先, 確信度)）
+            min_confidence: 振り分けに必要な確信度（一致数の割合）
+            min_matches: 振り分けに必要な、振り分け先のルールの最小一致数
+        """
+        if routes is None and classifier is None:
+            raise ValueError("routes or classifier must be specified")
+        self.routes = {
+            target: [rules] if isinstance(rules, str | re.Pattern) else list(rules)
+            for target, rules in (routes or {}).items()
+        }
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        self.min_matches = min_matches
+        self.stats = PreRouterStats()
+
+    @property
+    def targets(self) -> list[str]:
+        """ルールで振り分けられるエージェント名"""
+        return list(self.routes)
+
+    def _match(self, text: str) -> dict[str, list[str]]:
+        """振り分け先ごとに一致したルールを返す"""
+        matched = {}
+        for target, rules in self.routes.items():
+            hits = [
+                rule.pattern if isinstance(rule, re.Pattern) else rule
+                for rule in rules
+                if (rule.search(text) if isinstance(rule, re.Pattern) else rule in text)
+            ]
+            if hits:
+                matched[target] = hits
+        return matched
+
+    def classify(
+        self, text: str, known: Collection[str] | None = None
+    ) -> RouteDecision:
+        """タスクを照合して振り分け結果を返す（確信が持てなければ target は None）。
+
+        Args:
+            text: タスク
+            known: 振り分けられるエージェント名（classifier がそれ以外を返したら受付に任せる）
+        """
+        start = time.perf_counter()
+        if self.classifier is not None:
+            target, confidence = self.classifier(text)
+            matched = []
+        else:
+            matches = self._match(text)
+            total = sum(len(hits) for hits in matches.values())
+            target, matched = max(
+                matches.items(), key=lambda item: len(item[1]), default=(None, [])
+            )
+            confidence = len(matched) / total if total else 0.0
+            if len(matched) < self.min_matches:
+                target = None
+        if confidence < self.min_confidence:
+            target = None
+        if known is not None and target not in known:
+            target = None
+        elapsed = (time.perf_counter() - start) * 1000
+
+        self.stats.requests += 1
+        self.stats.classify_ms += elapsed
+        if target is not None:
+            self.stats.hits += 1
+        return RouteDecision(
+            target=target,
+            confidence=confidence,
+            matched=list(matched),
+            elapsed_ms=elapsed,
+        )
+
+    def record_entry(self, execution_ms: float) -> None:
+        """受付が実行されたときの所要時間を記録する（省いた時間の見積もりに使う）"""
+        self.stats.entry_runs += 1
+        self.stats.entry_ms += execution_ms
@@ -0,0 +1,202 @@
+"""
+response_cache.py - 専門家エージェントの応答キャッシュ
+
+同じ専門家に同じ質問をした場合の応答を保存し、2回目以降はモデルを呼ばずに返す。
+キーは (システムプロンプトのハッシュ, モデルID, 正規化した入力) で、
+入力は Unicode 正規化（NFKC）と空白の整理をしてから比較する。
+
+- メモリ層: 上限付きのLRU
+- ディスク層: SQLite（path を指定した場合のみ。プロセスをまたいで再利用できる）
+
+どちらの層もTTLを過ぎたエントリは返さない。
+
+環境変数:
+    RESPONSE_CACHE_PATH: get_response_cache() が使うSQLiteファイルのパス（未指定ならメモリのみ）
+    RESPONSE_CACHE_TTL: get_response_cache() のTTL（秒、既定: 86400）
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass
+class CacheStats:
+    """キャッシュのヒット・ミスの統計"""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """ヒット率（0.0〜1.0）"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+def normalize_input(text: str) -> str:
+    """表記ゆれで別のキーにならないよう入力を正規化する"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def cache_key(system_prompt: str, model_id: str, prompt: str) -> str:
+    """キャッシュキーを作成する"""
+    prompt_hash = hashlib.sha256(system_prompt.encode()).hexdigest()
+    payload = json.dumps(
+        [prompt_hash, model_id, normalize_input(prompt)], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """メモリ（LRU）とSQLiteの2層からなる応答キャッシュ。"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 86400,
+        path: str | Path | None = None,
+    ):
+        """キャッシュを初期化する。
+
+        Args:
+            max_entries: メモリ層に保持するエントリの最大数
+            ttl: エントリの有効期間（秒）
+            path: ディスク層のSQLiteファイルのパス（省略時はメモリ層のみ）
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT, expires_at REAL)"
+            )
+            self._db.commit()
+
+    def _remember(self, key: str, expires_at: float, response: str) -> None:
+        """メモリ層に保存する（ロック取得済みで呼ぶ）"""
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, system_prompt: str, model_id: str, prompt: str) -> str | None:
+        """キャッシュされた応答を返す（なければ None）"""
+        key = cache_key(system_prompt, model_id, prompt)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats.memory_hits += 1
+                return entry[1]
+            if entry:
+                del self._memory[key]
+
+            if self._db:
+                row = self._db.execute(
+                    "SELECT response, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+                if row:
+                    self._remember(key, row[1], row[0])
+                    self.stats.disk_hits += 1
+                    return row[0]
+
+            self.stats.misses += 1
+            return None
+
+    def set(
+        self, system_prompt: str, model_id: str, prompt: str, response: str
+    ) -> None:
+        """応答をキャッシュに保存する"""
+        key = cache_key(system_prompt, model_id, prompt)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, response)
+            if self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, response, expires_at),
+                )
+                self._db.commit()
+            self.stats.writes += 1
+
+    def purge_expired(self) -> int:
+        """期限切れのエントリを削除し、削除した件数を返す。
+
+        SQLite を使う場合はファイルから削除した件数（メモリ上のエントリはその写しのため数えない）。
+        """
+        now = time.time()
+        with self._lock:
+            expired = [
+                key
+                for key, (expires_at, _) in self._memory.items()
+                if expires_at <= now
+            ]
+            for key in expired:
+                del self._memory[key]
+            removed = len(expired)
+            if self._db:
+                removed = self._db.execute(
+                    "DELETE FROM responses WHERE expires_at <= ?", (now,)
+                ).rowcount
+                self._db.commit()
+            return removed
+
+    def clear(self) -> None:
+        """全エントリを削除する"""
+        with self._lock:
+            self._memory.clear()
+            if self._db:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def close(self) -> None:
+        """ディスク層の接続を閉じる"""
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
+
+
+_default_cache: ResponseCache | None = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """プロセス共通の ResponseCache を返す（環境変数で設定）"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(
+                ttl=float(os.getenv("RESPONSE_CACHE_TTL", "86400")),
+                path=os.getenv("RESPONSE_CACHE_PATH"),
+            )
+        return _default_cache
@@ -0,0 +1,141 @@
+"""
+routing.py - Graph の条件付きエッジのルーティング
+
+条件関数ごとに `str(state.results[...].result)` を作り直して部分文字列を探す代わりに、
+ノードの出力テキストを1回だけ取り出して GraphState にキャッシュし、
+そのノードから出る全エッジの条件をノードの実行ごとに1回だけまとめて評価する。
+strands の Graph は同じ条件関数を実行可能判定や入力の組み立てで何度も呼ぶが、
+2回目以降はキャッシュした評価結果を返す。
+
+キーワードは `in`、正規表現は `re.Pattern.search` で照合する。
+（Python の re には複数キーワードの同時検索の最適化がなく、
+全ルートを1つに結合した正規表現で走査するより個別に検索する方が速い）
+
+使い方:
+    router = EdgeRouter("review", {"code": "要修正", "approve": "承認"})
+    router.add_edges(builder)  # review → code, review → approve の条件付きエッジを追加
+
+    # または個別に条件関数として使う
+    builder.add_edge("review", "code", condition=router.condition("code"))
+"""
+
+import re
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from strands.multiagent.graph import GraphBuilder, GraphEdge, GraphState
+
+# GraphState に付与するキャッシュの属性名
+_CACHE_ATTR = "_routing_cache"
+
+
+@dataclass
+class RouterStats:
+    """ルーティングの評価回数と所要時間"""
+
+    evaluations: int = 0
+    cache_hits: int = 0
+    total_ms: float = 0.0
+    last_ms: float = 0.0
+
+    def to_dict(self) -> dict[str, float]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "evaluations": self.evaluations,
+            "cache_hits": self.cache_hits,
+            "total_ms": round(self.total_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+def _state_cache(state: GraphState) -> dict[Any, tuple[Any, Any]]:
+    """GraphState に付与したキャッシュを返す（なければ作成する）"""
+    cache = getattr(state, _CACHE_ATTR, None)
+    if cache is None:
+        cache = {}
+        setattr(state, _CACHE_ATTR, cache)
+    return cache
+
+
+def node_text(state: GraphState, node_id: str) -> str:
+    """ノードの出力テキストを返す（ノードが再実行されるまでキャッシュする）"""
+    node_result = state.results.get(node_id)
+    if node_result is None:
+        return ""
+    cache = _state_cache(state)
+    cached = cache.get(("text", node_id))
+    if cached and cached[0] is node_result:
+        return cached[1]
+    text = str(node_result.result)
+    cache[("text", node_id)] = (node_result, text)
+    return text
+
+
+class EdgeRouter:
+    """1つのノードから出る条件付きエッジを、ノードの実行ごとに1回だけまとめて評価するルーター。"""
+
+    def __init__(self, source: str, routes: Mapping[str, str | re.Pattern[str]]):
+        """ルーターを初期化する。
+
+        Args:
+            source: 出力を判定するノードのID
+            routes: 遷移先ノードのID → キーワードまたは正規表現
+        """
+        if not routes:
+            raise ValueError("routes must contain at least one target")
+        self.source = source
+        self.targets = list(routes)
+        self.stats = RouterStats()
+
+        self._rules = list(routes.values())
+
+    def _scan(self, text: str) -> list[str]:
+        """全ルートを評価し、一致した遷移先を返す"""
+        return [
+            target
+            for target, rule in zip(self.targets, self._rules)
+            if (rule in text if isinstance(rule, str) else rule.search(text))
+        ]
+
+    def route(self, state: GraphState) -> list[str]:
+        """source ノードの出力に一致する遷移先ノードのIDを返す。
+
+        結果は source ノードが再実行されるまで GraphState にキャッシュされる。
+        """
+        node_result = state.results.get(self.source)
+        if node_result is None:
+            return []
+        cache = _state_cache(state)
+        cached = cache.get(("route", id(self)))
+        if cached and cached[0] is node_result:
+            self.stats.cache_hits += 1
+            return cached[1]
+
+        start = time.perf_counter()
+        targets = self._scan(node_text(state, self.source))
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stats.evaluations += 1
+        self.stats.total_ms += elapsed
+        self.stats.last_ms = elapsed
+        cache[("route", id(self))] = (node_result, targets)
+        return targets
+
+    def condition(self, target: str) -> Callable[[GraphState], bool]:
+        """target への遷移条件として add_edge に渡せる関数を返す"""
+        if target not in self.targets:
+            raise ValueError(f"unknown route target: {target}")
+
+        def condition(state: GraphState) -> bool:
+            return target in self.route(state)
+
+        condition.__name__ = f"route_{self.source}_to_{target}"
+        return condition
+
+    def add_edges(self, builder: GraphBuilder) -> list[GraphEdge]:
+        """source から各遷移先への条件付きエッジを builder に追加する"""
+        return [
+            builder.add_edge(self.source, target, condition=self.condition(target))
+            for target in self.targets
+        ]
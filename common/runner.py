@@ -0,0 +1,152 @@
+"""
+runner.py - 多数のリクエストを1つのイベントループで同時に処理するランナー
+
+同期の agent(...) / graph(...) / swarm(...) は、呼び出しのたびに別スレッドで
+イベントループを動かして完了を待つため、同時に処理できるリクエスト数はスレッド数で決まる。
+RequestRunner は invoke_async / stream_async で実行し、モデルの応答待ちの間は
+同じイベントループで他のリクエストを進める。
+
+- Agent は同時に1つの実行しか受け付けず、Graph / Swarm も実行の状態を持つため、
+  リクエストごとに factory で新しく組み立てる（モデルやツールは factory の中で共有する）
+- max_concurrency で同時に実行するリクエスト数を制限し、超えた分は待たせる
+- 完了・失敗の件数、同時実行数の最大値、リクエストごとの所要時間は stats で確認できる
+
+使い方:
+    runner = RequestRunner(build_pipeline, max_concurrency=200)
+    results = await runner.run_many(tasks)
+
+    async for event in runner.stream_async(task):
+        ...
+"""
+
+import asyncio
+import statistics
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+from strands import Agent
+from strands.multiagent.base import MultiAgentBase
+
+from .events import EventStream, RunEvent
+
+type Runner = Agent | MultiAgentBase
+
+
+@dataclass
+class RunnerStats:
+    """RequestRunner の処理の統計"""
+
+    completed: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    latencies_ms: list[float] = field(default_factory=list)
+
+    def percentile(self, q: float) -> float | None:
+        """所要時間のパーセンタイル（q は 0〜100）"""
+        if not self.latencies_ms:
+            return None
+        ordered = sorted(self.latencies_ms)
+        index = min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))
+        return ordered[index]
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        p95 = self.percentile(95)
+        return {
+            "completed": self.completed,
+            "failed": self.failed,
+            "peak_in_flight": self.peak_in_flight,
+            "p50_ms": (
+                round(statistics.median(self.latencies_ms), 1)
+                if self.latencies_ms
+                else None
+            ),
+            "p95_ms": None if p95 is None else round(p95, 1),
+        }
+
+
+class RequestRunner:
+    """リクエストごとに Agent / Graph / Swarm を組み立て、非同期に同時実行するランナー。"""
+
+    def __init__(self, factory: Callable[[], Runner], max_concurrency: int = 100):
+        """ランナーを初期化する。
+
+        Args:
+            factory: リクエストごとに実行する Agent / Graph / Swarm を返す関数
+            max_concurrency: 同時に実行するリクエスト数の上限
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.factory = factory
+        self.max_concurrency = max_concurrency
+        self.stats = RunnerStats()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """実行中のイベントループ用のセマフォを返す（asyncio.run のたびに作り直す）"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[None]:
+        """同時実行数の枠を確保し、所要時間と成否を記録する"""
+        async with self._get_semaphore():
+            self.stats.in_flight += 1
+            self.stats.peak_in_flight = max(
+                self.stats.peak_in_flight, self.stats.in_flight
+            )
+            start = time.perf_counter()
+            try:
+                yield
+            except Exception:
+                # 読むのをやめた（GeneratorExit）・取り消された（CancelledError）は失敗と数えない
+                self.stats.failed += 1
+                raise
+            else:
+                self.stats.completed += 1
+                self.stats.latencies_ms.append((time.perf_counter() - start) * 1000)
+            finally:
+                self.stats.in_flight -= 1
+
+    async def invoke_async(
+        self, task: Any, invocation_state: dict[str, Any] | None = None
+    ) -> Any:
+        """リクエストを1件実行し、結果（AgentResult / MultiAgentResult）を返す"""
+        async with self._slot():
+            runner = self.factory()
+            return await runner.invoke_async(task, invocation_state=invocation_state)
+
+    async def stream_async(
+        self, task: Any, invocation_state: dict[str, Any] | None = None
+    ) -> AsyncIterator[RunEvent]:
+        """リクエストを1件実行し、common.events の RunEvent を順に返す"""
+        async with self._slot():
+            async for event in EventStream(self.factory(), task, invocation_state):
+                yield event
+
+    async def run_many(
+        self, tasks: Iterable[Any], return_exceptions: bool = True
+    ) -> list[Any]:
+        """tasks を同時に実行し、tasks と同じ順序で結果を返す。
+
+        Args:
+            tasks: 実行するタスク
+            return_exceptions: True なら失敗したリクエストは例外を結果として返す
+                （False なら最初の例外を送出する）
+        """
+        return await asyncio.gather(
+            *(self.invoke_async(task) for task in tasks),
+            return_exceptions=return_exceptions,
+        )
+
+    def run(self, tasks: Iterable[Any]) -> list[Any]:
+        """run_many() の同期版"""
+        return asyncio.run(self.run_many(tasks))
@@ -0,0 +1,376 @@
+"""
+swarm.py - 引き継ぎの入力の予算と前段のルーターに対応した Swarm
+
+strands の Swarm は、引き継ぎのたびに共有コンテキスト（shared context）の全件と
+これまでに担当したエージェントの履歴をすべて次のエージェントの入力に含める。
+引き継ぎが続くほど共有コンテキストが溜まり、1回ごとの入力が膨らんでいく。
+
+このモジュールの Swarm に HandoffPolicy を指定すると、次のエージェントへの入力が
+予算（max_tokens）を超える場合に、strands と同じ見出しの簡潔な形式に組み立て直す。
+予算内に収まっている間は strands の入力をそのまま渡す。
+
+- 引き継ぎメッセージ・ユーザーの依頼: そのまま（長すぎる場合は中間を省略）
+- 担当履歴: 担当したエージェントを重複なしで直近の順に並べ、引き継ぎ回数を添える
+- 共有コンテキスト: 引き継いだエージェントのもの → 新しいものの順に、予算に収まる分だけ
+  （値は1件ごとに max_value_tokens まで。収まらなかった件数は入力に明記する）
+
+引き継ぎごとの本来の入力トークン数と実際に渡したトークン数は、結果の handoffs で確認できる。
+トークン数は common.tokens の簡易的な見積もりで数える。
+
+pre_router に common.pre_router.PreRouter を指定すると、タスクがルールに確実に一致する場合は
+エントリーポイント（受付）を飛ばして振り分け先のエージェントから実行を始める。
+振り分け結果は結果の pre_route で確認できる（classifier が Swarm にない名前を返した場合は受付に任せる）。
+
+handoff_guard に common.handoff_guard.HandoffGuard を指定すると、引き継ぎの往復や
+同じメッセージの繰り返しを検出して Swarm を終了するか、別のエージェントへエスカレーションする。
+検出した繰り返しは結果の cycles で確認できる。
+
+使い方:
+    from common.swarm import HandoffPolicy, Swarm
+
+    swarm = Swarm(nodes=[...], handoff_policy=HandoffPolicy(max_tokens=800))
+    result = swarm(task)
+    for stats in result.handoffs:
+        print(stats.node_id, stats.original_tokens, stats.sent_tokens)
+"""
+
+import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from typing import Any, cast
+
+from strands.interrupt import Interrupt
+from strands.multiagent import swarm as strands_swarm
+from strands.multiagent.base import Status
+from strands.multiagent.swarm import SwarmNode, SwarmResult
+
+from .handoff_guard import HandoffCycle, HandoffGuard, HandoffLoopError
+from .pre_router import PreRouter, RouteDecision
+from .tokens import estimate_tokens, truncate_tokens
+
+# エージェントの説明に使うトークン数の上限
+_DESCRIPTION_TOKENS = 40
+
+_CLOSING = (
+    "You have access to swarm coordination tools if you need help from other agents. "
+    "If you don't hand off to another agent, the swarm will consider the task complete."
+)
+
+
+@dataclass
+class HandoffPolicy:
+    """次のエージェントに渡す入力の予算
+
+    Attributes:
+        max_tokens: 入力全体のトークン数の上限
+        max_value_tokens: 引き継ぎメッセージと共有コンテキストの値1件あたりの上限
+    """
+
+    max_tokens: int = 1000
+    max_value_tokens: int = 200
+
+    def __post_init__(self) -> None:
+        if self.max_tokens < 1:
+            raise ValueError("max_tokens must be at least 1")
+        if self.max_value_tokens < 1:
+            raise ValueError("max_value_tokens must be at least 1")
+
+
+@dataclass
+class HandoffStats:
+    """エージェント1回分の入力の削減量"""
+
+    node_id: str
+    hop: int
+    original_tokens: int
+    sent_tokens: int
+    dropped_context: int = 0
+
+    @property
+    def saved_tokens(self) -> int:
+        """削減したトークン数"""
+        return self.original_tokens - self.sent_tokens
+
+    def to_dict(self) -> dict[str, int | str]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "node_id": self.node_id,
+            "hop": self.hop,
+            "original_tokens": self.original_tokens,
+            "sent_tokens": self.sent_tokens,
+            "saved_tokens": self.saved_tokens,
+            "dropped_context": self.dropped_context,
+        }
+
+
+@dataclass
+class CompactSwarmResult(SwarmResult):
+    """引き継ぎごとの入力トークン数・前段のルーターの振り分け結果・検出した繰り返しを含む SwarmResult"""
+
+    handoffs: list[HandoffStats] = field(default_factory=list)
+    pre_route: RouteDecision | None = None
+    cycles: list[HandoffCycle] = field(default_factory=list)
+
+    @property
+    def saved_tokens(self) -> int:
+        """HandoffPolicy によって削減した入力トークン数の合計"""
+        return sum(stats.saved_tokens for stats in self.handoffs)
+
+
+def _recent_unique(node_ids: list[str]) -> list[str]:
+    """重複を除き、最後に現れた順に並べる"""
+    last = {node_id: i for i, node_id in enumerate(node_ids)}
+    return sorted(last, key=last.__getitem__)
+
+
+class Swarm(strands_swarm.Swarm):
+    """引き継ぎの入力の予算・前段のルーター・往復の検出に対応した Swarm。"""
+
+    def __init__(
+        self,
+        *args: Any,
+        handoff_policy: HandoffPolicy | None = None,
+        pre_router: PreRouter | None = None,
+        handoff_guard: HandoffGuard | None = None,
+        **kwargs: Any,
+    ):
+        """Swarm を初期化する。
+
+        Args:
+            *args: strands の Swarm と同じ引数
+            handoff_policy: 次のエージェントに渡す入力の予算（None の場合は strands と同じ）
+            pre_router: エントリーポイントの前段のルーター（None の場合は strands と同じ）
+            handoff_guard: 引き継ぎの往復を検出するガード（None の場合は strands と同じ）
+            **kwargs: strands の Swarm と同じキーワード引数
+        """
+        super().__init__(*args, **kwargs)
+        self.handoff_policy = handoff_policy
+        self.handoffs: list[HandoffStats] = []
+        self.pre_router = pre_router
+        self._pre_route: RouteDecision | None = None
+        if pre_router is not None:
+            unknown = set(pre_router.targets) - set(self.nodes)
+            if unknown:
+                raise ValueError(f"Unknown pre-router targets: {sorted(unknown)}")
+        self.handoff_guard = handoff_guard
+        escalate_to = handoff_guard.escalate_to if handoff_guard else None
+        if escalate_to is not None and escalate_to not in self.nodes:
+            raise ValueError(f"Unknown escalation target: {escalate_to}")
+        self.cycles: list[HandoffCycle] = []
+        self._handoff_log: list[tuple[str, str, str]] = []
+        self._handoffs_closed = False
+
+    async def stream_async(
+        self, task: Any, invocation_state: dict[str, Any] | None = None, **kwargs: Any
+    ) -> AsyncIterator[dict[str, Any]]:
+        """strands の Swarm と同じイベントを返す（結果は CompactSwarmResult）"""
+        if not self._interrupt_state.activated and not self._resume_from_session:
+            self.handoffs = []
+            self.cycles = []
+            self._handoff_log = []
+            self._handoffs_closed = False
+            self._pre_route = None
+            if self.pre_router is not None and isinstance(task, str):
+                self._pre_route = self.pre_router.classify(task, self.nodes)
+        async for event in super().stream_async(task, invocation_state, **kwargs):
+            yield event
+
+    def _initial_node(self) -> SwarmNode:
+        """前段のルーターが振り分けた場合は、振り分け先のエージェントから始める"""
+        if self._pre_route is not None and self._pre_route.target is not None:
+            return self.nodes[self._pre_route.target]
+        return super()._initial_node()
+
+    def _handle_handoff(
+        self, target_node: SwarmNode, message: str, context: dict[str, Any]
+    ) -> None:
+        """HandoffGuard があれば、引き継ぎを受け付ける前に繰り返しを調べる"""
+        if (
+            self.handoff_guard is None
+            or self.state.completion_status != Status.EXECUTING
+        ):
+            super()._handle_handoff(target_node, message, context)
+            return
+        if self._handoffs_closed:
+            raise HandoffLoopError(
+                "Handoffs are closed because a handoff loop was detected. "
+                "Answer the user with the information you have."
+            )
+
+        current = cast(SwarmNode, self.state.current_node)
+        sequence = [node.node_id for node in self.state.node_history]
+        sequence += [current.node_id, target_node.node_id]
+        handoffs = [
+            *self._handoff_log,
+            (current.node_id, target_node.node_id, message),
+        ]
+        escalated = any(cycle.action == "escalate" for cycle in self.cycles)
+        cycle = self.handoff_guard.check(sequence, handoffs, escalated)
+        if cycle is None:
+            self._handoff_log = handoffs
+            super()._handle_handoff(target_node, message, context)
+            return
+
+        self.cycles.append(cycle)
+        loop = " → ".join([*cycle.pattern, cycle.pattern[0]])
+        if cycle.action == "escalate":
+            escalation = self.nodes[cast(str, cycle.escalated_to)]
+            self._handoff_log.append((current.node_id, escalation.node_id, message))
+            super()._handle_handoff(
+                escalation,
+                f"Handoff loop detected ({loop}). "
+                f"Resolve the issue or conclude the task. Last message: {message}",
+                context,
+            )
+            return
+
+        # 引き継がずに、現在のエージェントの応答で終了させる
+        self._handoffs_closed = True
+        raise HandoffLoopError(
+            f"Handoff to {target_node.node_id} was rejected because a handoff loop "
+            f"was detected ({loop}). Answer the user with the information you have."
+        )
+
+    def _build_node_input(self, target_node: SwarmNode) -> str:
+        """HandoffPolicy があれば簡潔な入力を組み立て、入力のトークン数を記録する"""
+        route = self._pre_route
+        if (
+            route is not None
+            and route.target == target_node.node_id
+            and not self.state.node_history
+            and not self.state.handoff_message
+        ):
+            # 受付からの引き継ぎの代わりに、振り分けた理由を伝える
+            self.state.handoff_message = (
+                f"Routed directly by rules (matched: {', '.join(route.matched)})"
+                if route.matched
+                else "Routed directly by a classifier"
+            )
+        original = super()._build_node_input(target_node)
+        original_tokens = estimate_tokens(original)
+        dropped = 0
+        # 予算内に収まっていれば strands の入力をそのまま渡す
+        if (
+            self.handoff_policy is None
+            or original_tokens <= self.handoff_policy.max_tokens
+        ):
+            context_text = original
+        else:
+            context_text, dropped = self._build_compact_input(
+                target_node, self.handoff_policy
+            )
+        self.handoffs.append(
+            HandoffStats(
+                node_id=target_node.node_id,
+                hop=len(self.state.node_history),
+                original_tokens=original_tokens,
+                sent_tokens=estimate_tokens(context_text),
+                dropped_context=dropped,
+            )
+        )
+        return context_text
+
+    def _build_compact_input(
+        self, target_node: SwarmNode, policy: HandoffPolicy
+    ) -> tuple[str, int]:
+        """予算内に収めた入力と、省いた共有コンテキストの件数を返す"""
+        history = [node.node_id for node in self.state.node_history]
+        sections = []
+
+        # strands と同じ見出しを使い、エージェントが同じように読めるようにする
+        if self.state.handoff_message:
+            message = truncate_tokens(
+                self.state.handoff_message, policy.max_value_tokens
+            )
+            sections.append(f"Handoff Message: {message}")
+
+        task = self.state.task
+        if isinstance(task, str):
+            task_text = truncate_tokens(task, policy.max_tokens // 2)
+            sections.append(f"User Request: {task_text}")
+        elif isinstance(task, list):
+            sections.append("User Request: Multi-modal task")
+
+        if history:
+            sections.append(
+                f"Previous agents who worked on this: "
+                f"{' → '.join(_recent_unique(history))}\n"
+                f"Handoffs so far: {len(history)}"
+            )
+
+        agents = []
+        for node_id, node in self.nodes.items():
+            if node_id == target_node.node_id:
+                continue
+            line = f"Agent name: {node_id}."
+            description = getattr(node.executor, "description", None)
+            if description:
+                description = truncate_tokens(description, _DESCRIPTION_TOKENS)
+                line += f" Agent description: {description}"
+            agents.append(line)
+        if agents:
+            sections.append(
+                "Other agents available for collaboration:\n" + "\n".join(agents)
+            )
+
+        # 共有コンテキストは残りの予算に収まる分だけ、必要な順に入れる
+        entries = self._context_entries(history, policy.max_value_tokens)
+        remaining = policy.max_tokens - estimate_tokens(
+            "\n\n".join([*sections, _CLOSING])
+        )
+        included: list[str] = []
+        for entry in entries:
+            cost = estimate_tokens(entry) + 1
+            if cost > remaining:
+                break
+            included.append(entry)
+            remaining -= cost
+        dropped = len(entries) - len(included)
+        if included or dropped:
+            lines = ["Shared knowledge from previous agents:", *included]
+            if dropped:
+                lines.append(f"({dropped} older entries omitted)")
+            # 履歴の後、エージェント一覧の前に置く（strands と同じ順序）
+            sections.insert(len(sections) - bool(agents), "\n".join(lines))
+
+        sections.append(_CLOSING)
+        return "\n\n".join(sections), dropped
+
+    def _context_entries(self, history: list[str], max_value_tokens: int) -> list[str]:
+        """共有コンテキストを、引き継いだエージェントのもの → 新しいものの順に並べる"""
+        context = self.shared_context.context
+        recency = {node_id: i for i, node_id in enumerate(history)}
+        sender = history[-1] if history else None
+        node_ids = sorted(
+            (node_id for node_id, values in context.items() if values),
+            key=lambda node_id: (node_id != sender, -recency.get(node_id, -1)),
+        )
+        entries = []
+        for node_id in node_ids:
+            # 同じエージェントの中では後から追加したキーを優先する
+            for key, value in reversed(context[node_id].items()):
+                text = (
+                    value
+                    if isinstance(value, str)
+                    else json.dumps(value, ensure_ascii=False)
+                )
+                text = truncate_tokens(text, max_value_tokens)
+                entries.append(f"• {key} ({node_id}): {text}")
+        return entries
+
+    def _build_result(self, interrupts: list[Interrupt]) -> CompactSwarmResult:
+        """引き継ぎごとの入力トークン数・振り分け結果・検出した繰り返しを含む結果を作成する"""
+        result = super()._build_result(interrupts)
+        if self.pre_router is not None and (
+            self._pre_route is None or self._pre_route.target is None
+        ):
+            # 受付が実行された時間を、省いた時間の見積もりに使う
+            entry = self.state.results.get(super()._initial_node().node_id)
+            if entry is not None:
+                self.pre_router.record_entry(entry.execution_time)
+        return CompactSwarmResult(
+            **{name: getattr(result, name) for name in result.__dataclass_fields__},
+            handoffs=list(self.handoffs),
+            pre_route=self._pre_route,
+            cycles=list(self.cycles),
+        )
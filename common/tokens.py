@@ -0,0 +1,35 @@
+"""
+tokens.py - 簡易的なトークン数の見積もり
+
+トークナイザーを使わずに、テキストのトークン数を近似する。
+英数字は4文字、それ以外（日本語など）は1文字を1トークンとみなす。
+FakeModel の使用量の計算や、ノード間で受け渡すテキストの予算管理に使う。
+"""
+
+import re
+
+_TOKEN_PATTERN = re.compile(r"[\x00-\x7f]{1,4}|[^\x00-\x7f]", re.DOTALL)
+
+# 省略した箇所に挿入する目印
+ELLIPSIS = "\n…（中略）…\n"
+
+
+def split_tokens(text: str) -> list[str]:
+    """テキストを疑似的なトークン列に分割する"""
+    return _TOKEN_PATTERN.findall(text)
+
+
+def estimate_tokens(text: str) -> int:
+    """テキストの疑似トークン数を返す"""
+    return len(split_tokens(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """max_tokens に収まるよう、先頭と末尾を残して中間を省略する"""
+    tokens = split_tokens(text)
+    if len(tokens) <= max_tokens:
+        return text
+    keep = max(max_tokens - estimate_tokens(ELLIPSIS), 0)
+    head = keep * 2 // 3
+    tail = keep - head
+    return "".join(tokens[:head]) + ELLIPSIS + "".join(tokens[len(tokens) - tail :])
@@ -0,0 +1,943 @@
+"""
+workflow.py - 同時実行数を適応的に制御するワークフロー
+
+strands_tools の workflow ツールは、依存関係を満たしたタスクを最大8スレッドで一斉に実行する。
+同じモデルへの呼び出しが重なるとスロットリングが起き、タスクの Agent の再試行（4秒から倍々）と
+ツール自身の再試行（4〜30秒）で完了までの時間の裾が長くなる。また、タスクの timeout は使われない。
+
+common.workflow の workflow ツールは、同じタスク定義（task_id, description, system_prompt,
+dependencies, priority, timeout, model_provider, model_settings, tools）と
+action（create / start / status / list / delete）を受け付け、WorkflowScheduler で実行する。
+
+- モデル（プロバイダーとモデルID）ごとの AdaptiveConcurrencyLimiter（AIMD）:
+  成功するたびに同時実行数の上限を少しずつ上げ、スロットリングされたら半分にする
+- 上限に達しているときは、クリティカルパスの長い（そのタスクから最後のタスクまでの
+  所要時間の合計が最大の）タスクから開始する。所要時間はタスクごとの過去の実行時間
+  （指数移動平均）を使い、記録がなければ全タスク同じとみなす（order で fifo / priority も選べる）
+- 締め切り（実行可能になった時刻 + timeout。待ち行列で待った時間も含む）を過ぎたタスクは
+  打ち切って timeout とし、依存するタスクは skipped とする
+- スロットリングされたタスクは、ジッター付きの待ち時間の後に待ち行列へ戻す
+  （Agent 自身の再試行は無効にし、上限の調整と再試行をここでまとめて行う）
+
+ワークフローの定義と状態、タスクの結果と実行時間の履歴は common.workflow_store の WorkflowStore に
+タスクが完了するたびに保存する（既定ではキャッシュディレクトリの SQLite ファイルに保存するため、
+プロセスが落ちた後も再開できる。環境変数 WORKFLOW_STATE_PATH=:memory: でメモリのみにする）。
+タスクの出力は task_key()（説明・システムプロンプト・モデル・ツールと、
+依存するタスクの出力のハッシュ）をキーにワークフローごとに保存し、start は同じキーの出力があるタスクを
+実行せずにその出力を使う。ビルドシステムと同じく、定義を変えたタスクとそれに依存するタスクだけが実行し直される
+（依存先の出力が前回と同じなら、それに依存するタスクは実行しない）。
+start に dry_run=True を渡すと、実行せずにどのタスクが実行し直されるかを返す。
+force=True を渡すと、保存済みの出力を使わずに全タスクを実行し直す（delete でも出力は消える）。
+
+使い方:
+    from common.workflow import workflow
+
+    agent = Agent(model=model, tools=[workflow])
+    agent.tool.workflow(action="create", workflow_id="release", tasks=tasks)
+    agent.tool.workflow(action="start", workflow_id="release")
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from strands import Agent, ModelRetryStrategy, tool
+from strands.models.model import Model
+from strands.types.exceptions import ModelThrottledException
+
+from .models import get_model
+from .workflow_store import WorkflowStore, get_workflow_store
+
+DEFAULT_PRIORITY = 3
+DEFAULT_TIMEOUT = 300.0
+
+# 実行可能なタスクを開始する順序
+#   fifo: 実行可能になった順
+#   priority: priority の高い順、同じなら締め切りの早い順
+#   critical_path: クリティカルパスの長い順、同じなら priority の高い順
+ORDERS = ("fifo", "priority", "critical_path")
+
+# スロットリングとして扱う例外（上限を下げて再試行する）
+THROTTLE_ERRORS: tuple[type[BaseException], ...] = (ModelThrottledException,)
+
+
+class AdaptiveConcurrencyLimiter:
+    """スロットリングに応じて同時実行数の上限を調整するリミッター（AIMD）。"""
+
+    def __init__(
+        self,
+        initial: float = 4,
+        *,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        """リミッターを初期化する。
+
+        Args:
+            initial: 最初の同時実行数の上限
+            min_limit: 上限の下限
+            max_limit: 上限の上限
+            decrease: スロットリングされたときに上限に掛ける係数
+            cooldown: 続けて下げないようにする間隔（秒、同時に実行していた分のスロットリングは1回と数える）
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+        if not 1 <= min_limit <= initial <= max_limit:
+            raise ValueError(
+                "limits must satisfy 1 <= min_limit <= initial <= max_limit"
+            )
+        self.limit = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.throttles = 0
+        self.decreases = 0
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """上限に空きがあれば1つ確保する"""
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                return False
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def release(self, throttled: bool = False) -> None:
+        """確保した枠を返し、結果に応じて上限を調整する"""
+        with self._lock:
+            self.in_flight -= 1
+            if not throttled:
+                # 上限の分だけ成功すると、上限が1増える
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                return
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            self.decreases += 1
+
+    def abandon(self) -> None:
+        """確保した枠を、上限を調整せずに返す（取り消されて結果がわからない場合）"""
+        with self._lock:
+            self.in_flight -= 1
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "limit": round(self.limit, 2),
+            "peak_in_flight": self.peak_in_flight,
+            "throttles": self.throttles,
+            "decreases": self.decreases,
+        }
+
+
+@dataclass
+class TaskResult:
+    """ワークフローのタスク1件の結果"""
+
+    task_id: str
+    status: str
+    text: str = ""
+    attempts: int = 0
+    wait_ms: float = 0.0
+    elapsed_ms: float = 0.0
+    error: str | None = None
+    restored: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "task_id": self.task_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "wait_ms": round(self.wait_ms, 1),
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "error": self.error,
+            "restored": self.restored,
+        }
+
+
+@dataclass
+class WorkflowRun:
+    """ワークフローの1回の実行結果"""
+
+    workflow_id: str
+    results: dict[str, TaskResult]
+    start_order: list[str]
+    elapsed_ms: float
+    retries: int = 0
+    limiters: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> bool:
+        """全てのタスクが完了したかどうか"""
+        return all(r.status == "completed" for r in self.results.values())
+
+    @property
+    def restored(self) -> int:
+        """保存済みの結果を使い、実行しなかったタスクの数"""
+        return sum(r.restored for r in self.results.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSONに変換できる辞書を返す"""
+        return {
+            "workflow_id": self.workflow_id,
+            "succeeded": self.succeeded,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "retries": self.retries,
+            "restored": self.restored,
+            "start_order": self.start_order,
+            "results": {
+                task_id: result.to_dict() for task_id, result in self.results.items()
+            },
+            "limiters": self.limiters,
+        }
+
+
+@dataclass
+class _Entry:
+    """待ち行列のタスク"""
+
+    ready_at: float
+    deadline: float
+    seq: int = 0
+    rank: float = 0.0
+    not_before: float = 0.0
+    attempts: int = 0
+    started_at: float | None = None
+    attempt_started_at: float = 0.0
+
+
+def _order_key(order: str, task: dict[str, Any], entry: _Entry) -> tuple:
+    if order == "fifo":
+        return (entry.ready_at, entry.seq)
+    if order == "priority":
+        return (-task["priority"], entry.deadline, entry.seq)
+    return (-entry.rank, -task["priority"], entry.deadline, entry.seq)
+
+
+def normalize_tasks(tasks: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """タスク定義に既定値を補い、ID・依存関係・循環を検証する"""
+    normalized = []
+    for task in tasks:
+        if not task.get("task_id"):
+            raise ValueError("Each task must have a task_id")
+        if not task.get("description"):
+            raise ValueError(f"Task {task['task_id']} must have a description")
+        normalized.append(
+            {
+                **task,
+                "priority": task.get("priority", DEFAULT_PRIORITY),
+                "timeout": float(task.get("timeout", DEFAULT_TIMEOUT)),
+                "dependencies": list(task.get("dependencies", [])),
+            }
+        )
+
+    ids = [task["task_id"] for task in normalized]
+    if len(set(ids)) != len(ids):
+        raise ValueError("task_id must be unique")
+    by_id = {task["task_id"]: task for task in normalized}
+    for task in normalized:
+        for dep_id in task["dependencies"]:
+            if dep_id not in by_id:
+                raise ValueError(
+                    f"Task {task['task_id']} has invalid dependency: {dep_id}"
+                )
+
+    # 依存関係の循環（どのタスクからも実行を始められない）を検出する
+    visited: set[str] = set()
+    visiting: set[str] = set()
+
+    def visit(task_id: str) -> None:
+        if task_id in visited:
+            return
+        if task_id in visiting:
+            raise ValueError(f"Dependency cycle detected at task {task_id}")
+        visiting.add(task_id)
+        for dep_id in by_id[task_id]["dependencies"]:
+            visit(dep_id)
+        visiting.discard(task_id)
+        visited.add(task_id)
+
+    for task_id in ids:
+        visit(task_id)
+    return normalized
+
+
+def critical_path_lengths(
+    tasks: Sequence[dict[str, Any]],
+    durations: dict[str, float] | None = None,
+    default_duration: float = 1.0,
+) -> dict[str, float]:
+    """タスクごとに、そのタスクから最後のタスクまでの最長経路の所要時間（自身を含む）を返す。
+
+    Args:
+        tasks: normalize_tasks() 済みのタスク定義
+        durations: タスクIDごとの所要時間の見積もり（秒）
+        default_duration: 見積もりのないタスクの所要時間
+    """
+    durations = durations or {}
+    dependents: dict[str, list[str]] = {task["task_id"]: [] for task in tasks}
+    for task in tasks:
+        for dep_id in task["dependencies"]:
+            dependents[dep_id].append(task["task_id"])
+
+    lengths: dict[str, float] = {}
+
+    def length(task_id: str) -> float:
+        if task_id not in lengths:
+            lengths[task_id] = durations.get(task_id, default_duration) + max(
+                (length(child) for child in dependents[task_id]), default=0.0
+            )
+        return lengths[task_id]
+
+    for task_id in dependents:
+        length(task_id)
+    return lengths
+
+
+def simulate(
+    tasks: Sequence[dict[str, Any]],
+    durations: dict[str, float],
+    *,
+    concurrency: int,
+    order: str = "critical_path",
+    estimates: dict[str, float] | None = None,
+    default_duration: float = 1.0,
+) -> tuple[float, list[str]]:
+    """モデルを呼ばずに、同時実行数の上限のもとでのワークフローの実行を模擬する。
+
+    WorkflowScheduler と同じ順序でタスクを開始する。
+
+    Args:
+        tasks: タスク定義
+        durations: タスクIDごとの実際の所要時間（秒）
+        concurrency: 同時実行数の上限
+        order: 開始する順序（ORDERS のいずれか）
+        estimates: クリティカルパスの計算に使う見積もり（省略時は durations）
+        default_duration: durations にないタスクの所要時間
+
+    Returns:
+        全タスクの完了までの時間（メイクスパン）と、タスクを開始した順序
+    """
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of {ORDERS}")
+    tasks = normalize_tasks(tasks)
+    by_id = {task["task_id"]: task for task in tasks}
+    ranks = critical_path_lengths(
+        tasks, durations if estimates is None else estimates, default_duration
+    )
+    remaining = {task_id: len(task["dependencies"]) for task_id, task in by_id.items()}
+    dependents: dict[str, list[str]] = {task_id: [] for task_id in by_id}
+    for task in tasks:
+        for dep_id in task["dependencies"]:
+            dependents[dep_id].append(task["task_id"])
+
+    seq = 0
+    ready: dict[str, _Entry] = {}
+
+    def enqueue(task_id: str, now: float) -> None:
+        nonlocal seq
+        seq += 1
+        deadline = now + by_id[task_id]["timeout"]
+        ready[task_id] = _Entry(now, deadline, seq, ranks[task_id])
+
+    for task_id, count in remaining.items():
+        if count == 0:
+            enqueue(task_id, 0.0)
+    now = 0.0
+    running: list[tuple[float, str]] = []
+    start_order: list[str] = []
+    while ready or running:
+        for task_id in sorted(
+            ready, key=lambda i: _order_key(order, by_id[i], ready[i])
+        ):
+            if len(running) >= concurrency:
+                break
+            del ready[task_id]
+            start_order.append(task_id)
+            running.append((now + durations.get(task_id, default_duration), task_id))
+        running.sort()
+        now, task_id = running.pop(0)
+        for child in dependents[task_id]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                enqueue(child, now)
+    return now, start_order
+
+
+def task_key(task: dict[str, Any], model_key: str, outputs: dict[str, str]) -> str:
+    """タスクの出力を保存するキー（出力に影響する定義と、依存するタスクの出力のハッシュ）。
+
+    Args:
+        task: normalize_tasks() 済みのタスク定義
+        model_key: タスクが使うモデル（WorkflowScheduler.resolve_model() のキー）
+        outputs: 依存するタスクのIDごとの出力
+    """
+    payload = {
+        "description": task["description"],
+        "system_prompt": task.get("system_prompt"),
+        "model": model_key,
+        "model_settings": task.get("model_settings"),
+        "tools": task.get("tools"),
+        "dependencies": [
+            [dep_id, hashlib.sha256(outputs[dep_id].encode()).hexdigest()]
+            for dep_id in task["dependencies"]
+        ],
+    }
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def build_prompt(task: dict[str, Any], results: dict[str, TaskResult]) -> str:
+    """依存するタスクの結果を前置きしたタスクの入力を作る（strands_tools の workflow と同じ形式）"""
+    context = [
+        f"Results from {dep_id}:\n{results[dep_id].text}"
+        for dep_id in task["dependencies"]
+        if dep_id in results and results[dep_id].text
+    ]
+    if not context:
+        return task["description"]
+    return (
+        "Previous task results:\n"
+        + "\n\n".join(context)
+        + "\n\nCurrent Task:\n"
+        + task["description"]
+    )
+
+
+class WorkflowScheduler:
+    """モデルごとの同時実行数を適応的に制御して、ワークフローのタスクを実行するスケジューラー。"""
+
+    def __init__(
+        self,
+        *,
+        initial_limit: float = 4,
+        max_limit: float = 32,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        order: str = "critical_path",
+        history_weight: float = 0.5,
+    ):
+        """スケジューラーを初期化する。
+
+        Args:
+            initial_limit: モデルごとの最初の同時実行数の上限
+            max_limit: モデルごとの同時実行数の上限の上限
+            max_attempts: スロットリングされたタスクの実行回数の上限
+            base_delay: 最初の再試行までの待ち時間の上限（秒、回数ごとに2倍）
+            max_delay: 再試行までの待ち時間の上限（秒）
+            order: 実行可能なタスクを開始する順序（ORDERS のいずれか）
+            history_weight: 過去の実行時間の指数移動平均で、最新の実行時間に掛ける重み
+        """
+        if order not in ORDERS:
+            raise ValueError(f"order must be one of {ORDERS}")
+        self.initial_limit = initial_limit
+        self.max_limit = max_limit
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.order = order
+        self.history_weight = history_weight
+        # "ワークフローID/タスクID" ごとの実行時間（秒）の指数移動平均
+        self.durations: dict[str, float] = {}
+        self.limiters: dict[str, AdaptiveConcurrencyLimiter] = {}
+        self._lock = threading.Lock()
+        # 再試行はこのスケジューラーで行うため、タスクの Agent 自身の再試行は無効にする
+        self._retry_strategy = ModelRetryStrategy(max_attempts=1)
+
+    def limiter(self, key: str) -> AdaptiveConcurrencyLimiter:
+        """モデルのリミッターを返す（初回のみ生成。ワークフローをまたいで共有する）"""
+        with self._lock:
+            if key not in self.limiters:
+                self.limiters[key] = AdaptiveConcurrencyLimiter(
+                    min(self.initial_limit, self.max_limit), max_limit=self.max_limit
+                )
+            return self.limiters[key]
+
+    def resolve_model(
+        self, task: dict[str, Any], parent_agent: Agent | None
+    ) -> tuple[str, Model]:
+        """タスクが使うモデルと、リミッターのキー（プロバイダー:モデルID）を返す"""
+        provider = task.get("model_provider")
+        settings = dict(task.get("model_settings") or {})
+        if provider is None:
+            model = parent_agent.model if parent_agent else get_model()
+            provider = "parent"
+        elif provider == "bedrock":
+            model = get_model(**settings)
+        else:
+            from strands_tools.utils.models.model import create_model
+
+            model = create_model(provider=provider, config=settings)
+        model_id = model.get_config().get("model_id", "")
+        return f"{provider}:{model_id}", model
+
+    def create_agent(
+        self, task: dict[str, Any], model: Model, parent_agent: Agent | None
+    ) -> Agent:
+        """タスク用のエージェントを作る（tools を指定しない場合は workflow 以外の親のツールを使う）"""
+        tools = []
+        if parent_agent is not None:
+            registry = parent_agent.tool_registry.registry
+            names = task.get("tools")
+            if names is None:
+                names = [name for name in registry if name != "workflow"]
+            tools = [registry[name] for name in names if name in registry]
+        return Agent(
+            model=model,
+            system_prompt=task.get("system_prompt")
+            or "You are a helpful AI assistant specialized in task execution.",
+            tools=tools,
+            callback_handler=None,
+            retry_strategy=self._retry_strategy,
+        )
+
+    def record_duration(self, workflow_id: str, task_id: str, seconds: float) -> float:
+        """タスクの実行時間を記録し、更新した見積もり（秒）を返す（クリティカルパスの計算に使う）"""
+        key = f"{workflow_id}/{task_id}"
+        with self._lock:
+            previous = self.durations.get(key)
+            self.durations[key] = (
+                seconds
+                if previous is None
+                else previous + self.history_weight * (seconds - previous)
+            )
+            return self.durations[key]
+
+    def load_durations(self, workflow_id: str, store: WorkflowStore) -> None:
+        """保存済みの実行時間の履歴を読み込む（このプロセスで記録したものを優先する）"""
+        with self._lock:
+            for task_id, seconds in store.load_durations(workflow_id).items():
+                self.durations.setdefault(f"{workflow_id}/{task_id}", seconds)
+
+    def estimates(self, workflow_id: str) -> dict[str, float]:
+        """ワークフローのタスクIDごとの実行時間の見積もり（秒）"""
+        prefix = f"{workflow_id}/"
+        with self._lock:
+            return {
+                key.removeprefix(prefix): seconds
+                for key, seconds in self.durations.items()
+                if key.startswith(prefix)
+            }
+
+    def order_key(self, task: dict[str, Any], entry: _Entry) -> tuple:
+        """実行可能なタスクを開始する順序"""
+        return _order_key(self.order, task, entry)
+
+    def _backoff(self, attempt: int) -> float:
+        """再試行までの待ち時間（フルジッター）"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def _execute(
+        self, task: dict[str, Any], agent: Agent, prompt: str, timeout: float
+    ) -> str:
+        async with asyncio.timeout(timeout):
+            return str(await agent.invoke_async(prompt))
+
+    async def run_async(
+        self,
+        workflow_id: str,
+        tasks: Sequence[dict[str, Any]],
+        parent_agent: Agent | None = None,
+        store: WorkflowStore | None = None,
+        force: bool = False,
+    ) -> WorkflowRun:
+        """ワークフローを実行する。
+
+        Args:
+            workflow_id: ワークフローのID
+            tasks: タスク定義（strands_tools の workflow と同じ形式）
+            parent_agent: モデルやツールを引き継ぐ親エージェント
+            store: タスクの結果・出力と実行時間の履歴の保存先（同じ入力の出力が保存済みのタスクは実行しない）
+            force: 保存済みの出力を使わずに全タスクを実行する（出力は保存し直す）
+
+        Returns:
+            タスクごとの結果と、リミッターの状態
+        """
+        tasks = normalize_tasks(tasks)
+        by_id = {task["task_id"]: task for task in tasks}
+        dependents: dict[str, list[str]] = {task_id: [] for task_id in by_id}
+        remaining = {
+            task_id: len(task["dependencies"]) for task_id, task in by_id.items()
+        }
+        for task in tasks:
+            for dep_id in task["dependencies"]:
+                dependents[dep_id].append(task["task_id"])
+
+        if store is not None:
+            self.load_durations(workflow_id, store)
+        # 記録がないタスクは、記録のあるタスクの平均（なければ1秒）とみなす
+        estimates = self.estimates(workflow_id)
+        default = sum(estimates.values()) / len(estimates) if estimates else 1.0
+        ranks = critical_path_lengths(tasks, estimates, default)
+
+        start = time.monotonic()
+        results: dict[str, TaskResult] = {}
+        start_order: list[str] = []
+        retries = 0
+        seq = 0
+        ready: dict[str, _Entry] = {}
+
+        models: dict[str, tuple[str, Model]] = {}
+        keys: dict[str, str] = {}
+
+        def enqueue(task_id: str, now: float) -> None:
+            nonlocal seq
+            task = by_id[task_id]
+            models[task_id] = self.resolve_model(task, parent_agent)
+            if store is not None:
+                # 同じ入力の出力が保存済みなら、実行せずにその出力を使う
+                outputs = {
+                    dep_id: results[dep_id].text for dep_id in task["dependencies"]
+                }
+                keys[task_id] = task_key(task, models[task_id][0], outputs)
+                cached = None if force else store.get_output(workflow_id, keys[task_id])
+                if cached is not None:
+                    finish(task_id, None, "completed", text=cached, restored=True)
+                    return
+            seq += 1
+            deadline = now + task["timeout"]
+            ready[task_id] = _Entry(now, deadline, seq, ranks[task_id])
+
+        running: dict[
+            asyncio.Task[str], tuple[str, _Entry, AdaptiveConcurrencyLimiter]
+        ] = {}
+        used_limiters: dict[str, AdaptiveConcurrencyLimiter] = {}
+
+        def finish(
+            task_id: str, entry: _Entry | None, status: str, **kwargs: Any
+        ) -> None:
+            now = time.monotonic()
+            wait_from = entry.ready_at if entry else now
+            results[task_id] = TaskResult(
+                task_id,
+                status,
+                attempts=entry.attempts if entry else 0,
+                wait_ms=((entry.started_at or now) - wait_from) * 1000
+                if entry
+                else 0.0,
+                elapsed_ms=(now - wait_from) * 1000,
+                **kwargs,
+            )
+            if store is not None:
+                store.save_result(workflow_id, asdict(results[task_id]))
+                if status == "completed" and not results[task_id].restored:
+                    store.save_output(workflow_id, keys[task_id], results[task_id].text)
+            if status == "completed":
+                for child in dependents[task_id]:
+                    remaining[child] -= 1
+                    if remaining[child] == 0 and child not in results:
+                        enqueue(child, now)
+                return
+            # 失敗したタスクに依存するタスクは実行しない
+            for child in dependents[task_id]:
+                if child not in results:
+                    finish(
+                        child, None, "skipped", error=f"dependency {task_id} {status}"
+                    )
+
+        # 保存済みの出力を使うタスクは enqueue の中で完了し、依存するタスクも続けて enqueue される
+        for task_id in [task_id for task_id, count in remaining.items() if count == 0]:
+            enqueue(task_id, start)
+
+        try:
+            while ready or running:
+                now = time.monotonic()
+                for task_id, entry in list(ready.items()):
+                    if now >= entry.deadline:
+                        del ready[task_id]
+                        finish(
+                            task_id,
+                            entry,
+                            "timeout",
+                            error="deadline exceeded while queued",
+                        )
+
+                blocked = False
+                for task_id in sorted(
+                    ready, key=lambda i: self.order_key(by_id[i], ready[i])
+                ):
+                    entry = ready[task_id]
+                    if entry.not_before > now:
+                        continue
+                    task = by_id[task_id]
+                    key, model = models[task_id]
+                    limiter = used_limiters.setdefault(key, self.limiter(key))
+                    if not limiter.try_acquire():
+                        blocked = True
+                        continue
+                    del ready[task_id]
+                    entry.attempts += 1
+                    entry.attempt_started_at = now
+                    if entry.started_at is None:
+                        entry.started_at = now
+                        start_order.append(task_id)
+                    agent = self.create_agent(task, model, parent_agent)
+                    prompt = build_prompt(task, results)
+                    run = asyncio.create_task(
+                        self._execute(task, agent, prompt, entry.deadline - now)
+                    )
+                    running[run] = (task_id, entry, limiter)
+
+                if not ready and not running:
+                    break
+                wake = [e.not_before for e in ready.values() if e.not_before > now]
+                wake += [e.deadline for e in ready.values()]
+                timeout = max(0.0, min(wake) - now) if wake else None
+                if blocked:
+                    # 他のワークフローが枠を返すのを待つ
+                    timeout = min(timeout or 0.05, 0.05)
+                if not running:
+                    await asyncio.sleep(timeout or 0.05)
+                    continue
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for run in done:
+                    task_id, entry, limiter = running.pop(run)
+                    error = run.exception()
+                    throttled = isinstance(error, THROTTLE_ERRORS)
+                    limiter.release(throttled)
+                    if error is None:
+                        seconds = self.record_duration(
+                            workflow_id,
+                            task_id,
+                            time.monotonic() - entry.attempt_started_at,
+                        )
+                        if store is not None:
+                            store.save_duration(workflow_id, task_id, seconds)
+                        finish(task_id, entry, "completed", text=run.result())
+                    elif isinstance(error, TimeoutError):
+                        finish(task_id, entry, "timeout", error="timeout exceeded")
+                    elif throttled and entry.attempts < self.max_attempts:
+                        retries += 1
+                        entry.not_before = time.monotonic() + self._backoff(
+                            entry.attempts
+                        )
+                        ready[task_id] = entry
+                    else:
+                        finish(
+                            task_id,
+                            entry,
+                            "error",
+                            error=f"{type(error).__name__}: {error}",
+                        )
+        finally:
+            # 途中で取り消された場合は、実行中のタスクも取り消して終わるのを待つ
+            for run in running:
+                run.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            for _, _, limiter in running.values():
+                limiter.abandon()
+
+        return WorkflowRun(
+            workflow_id,
+            {task["task_id"]: results[task["task_id"]] for task in tasks},
+            start_order,
+            (time.monotonic() - start) * 1000,
+            retries,
+            {key: limiter.to_dict() for key, limiter in used_limiters.items()},
+        )
+
+    def plan(
+        self,
+        workflow_id: str,
+        tasks: Sequence[dict[str, Any]],
+        parent_agent: Agent | None = None,
+        store: WorkflowStore | None = None,
+        force: bool = False,
+    ) -> dict[str, str]:
+        """実行せずに、start で各タスクを実行し直すかどうかを返す（ドライラン）。
+
+        引数は run_async() と同じ。
+
+        Returns:
+            タスクIDごとに以下のいずれか
+            - "cached": 同じ入力の出力が保存済みのため実行しない
+            - "run": 定義が変わったか未実行のため実行する
+            - "stale": 依存するタスクを実行するため、その出力が前回と変わると実行する
+        """
+        tasks = normalize_tasks(tasks)
+        by_id = {task["task_id"]: task for task in tasks}
+        plan: dict[str, str] = {}
+        outputs: dict[str, str] = {}
+
+        def visit(task_id: str) -> str:
+            if task_id in plan:
+                return plan[task_id]
+            task = by_id[task_id]
+            states = [visit(dep_id) for dep_id in task["dependencies"]]
+            if any(state != "cached" for state in states):
+                plan[task_id] = "stale"
+                return plan[task_id]
+            key = task_key(task, self.resolve_model(task, parent_agent)[0], outputs)
+            cached = (
+                store.get_output(workflow_id, key)
+                if store is not None and not force
+                else None
+            )
+            if cached is not None:
+                outputs[task_id] = cached
+            plan[task_id] = "run" if cached is None else "cached"
+            return plan[task_id]
+
+        for task in tasks:
+            visit(task["task_id"])
+        return {task["task_id"]: plan[task["task_id"]] for task in tasks}
+
+    def run(
+        self,
+        workflow_id: str,
+        tasks: Sequence[dict[str, Any]],
+        parent_agent: Agent | None = None,
+        store: WorkflowStore | None = None,
+        force: bool = False,
+    ) -> WorkflowRun:
+        """run_async() の同期版"""
+        return asyncio.run(
+            self.run_async(workflow_id, tasks, parent_agent, store, force)
+        )
+
+
+_scheduler: WorkflowScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_workflow_scheduler() -> WorkflowScheduler:
+    """プロセス共通の WorkflowScheduler を返す（モデルごとの上限をワークフロー間で共有する）"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = WorkflowScheduler()
+        return _scheduler
+
+
+def _response(status: str, text: str) -> dict[str, Any]:
+    return {"status": status, "content": [{"text": text}]}
+
+
+def _status_text(workflow_id: str, workflow: dict[str, Any]) -> str:
+    results = get_workflow_store().load_results(workflow_id)
+    lines = [f"Workflow '{workflow_id}': {workflow['status']}"]
+    for task in workflow["tasks"]:
+        result = results.get(task["task_id"])
+        status = result["status"] if result else "pending"
+        line = f"- {task['task_id']} (priority {task['priority']}): {status}"
+        if result and status == "completed":
+            line += f" in {result['elapsed_ms']:.0f}ms, {result['attempts']} attempt(s)"
+        elif result and result["error"]:
+            line += f" ({result['error']})"
+        lines.append(line)
+    for key, limiter in get_workflow_scheduler().limiters.items():
+        lines.append(
+            f"Model {key}: limit {limiter.limit:.2f}, "
+            f"peak {limiter.peak_in_flight}, throttles {limiter.throttles}"
+        )
+    return "\n".join(lines)
+
+
+@tool
+async def workflow(
+    action: str,
+    workflow_id: str | None = None,
+    tasks: list[dict[str, Any]] | None = None,
+    dry_run: bool = False,
+    force: bool = False,
+    agent: Any = None,
+) -> dict[str, Any]:
+    """依存関係のあるタスクを、モデルごとの同時実行数を調整しながら実行するワークフローです。
+
+    Args:
+        action: create / start / status / list / delete
+        workflow_id: ワークフローのID
+        tasks: create で登録するタスク定義（task_id, description, system_prompt,
+            dependencies, priority, timeout, model_provider, model_settings, tools）
+        dry_run: start で実行せずに、実行し直すタスクを返す
+        force: start で保存済みの出力を使わずに、全タスクを実行し直す
+
+    Returns:
+        操作の結果
+    """
+    store = get_workflow_store()
+    if action == "list":
+        items = [f"- {wid}: {status}" for wid, status in store.list_workflows()]
+        return _response("success", "\n".join(items) or "No workflows")
+    if not workflow_id:
+        return _response("error", f"workflow_id is required for {action} action")
+
+    if action == "create":
+        try:
+            normalized = normalize_tasks(tasks or [])
+        except ValueError as e:
+            return _response("error", str(e))
+        if not normalized:
+            return _response("error", "Tasks are required for create action")
+        kept = store.save_workflow(workflow_id, normalized)
+        note = " (saved results kept)" if kept else ""
+        return _response(
+            "success",
+            f"Created workflow '{workflow_id}' with {len(normalized)} tasks{note}",
+        )
+
+    workflow_data = store.load_workflow(workflow_id)
+    if workflow_data is None:
+        return _response("error", f"Workflow '{workflow_id}' not found")
+
+    if action == "start" and dry_run:
+        plan = get_workflow_scheduler().plan(
+            workflow_id, workflow_data["tasks"], agent, store, force
+        )
+        rerun = [task_id for task_id, state in plan.items() if state != "cached"]
+        lines = [
+            f"Dry run for '{workflow_id}': {len(rerun)}/{len(plan)} tasks would run"
+        ]
+        lines += [f"- {task_id}: {state}" for task_id, state in plan.items()]
+        return _response("success", "\n".join(lines))
+    if action == "start":
+        store.set_status(workflow_id, "running")
+        run = await get_workflow_scheduler().run_async(
+            workflow_id, workflow_data["tasks"], agent, store, force
+        )
+        workflow_data["status"] = "completed" if run.succeeded else "failed"
+        store.set_status(workflow_id, workflow_data["status"])
+        done = sum(r.status == "completed" for r in run.results.values())
+        total = len(run.results)
+        restored = f", {run.restored} restored" if run.restored else ""
+        if run.succeeded:
+            return _response(
+                "success",
+                f"Workflow '{workflow_id}' completed successfully! "
+                f"({done}/{total} tasks succeeded{restored} in {run.elapsed_ms:.0f}ms)",
+            )
+        return _response(
+            "error",
+            f"Workflow '{workflow_id}' failed ({done}/{total} tasks succeeded{restored})\n"
+            + _status_text(workflow_id, workflow_data),
+        )
+    if action == "status":
+        return _response("success", _status_text(workflow_id, workflow_data))
+    if action == "delete":
+        store.delete_workflow(workflow_id)
+        return _response("success", f"Deleted workflow '{workflow_id}'")
+    return _response(
+        "error",
+        f"Unknown action: {action}. Available: create, start, list, status, delete",
+    )
@@ -0,0 +1,275 @@
+"""
+workflow_store.py - ワークフローの定義とタスクの結果の保存先
+
+common.workflow の workflow ツールは、ワークフローの定義と状態、タスクの結果をここに保存する。
+タスクの出力は、ワークフローごとに入力のハッシュ（common.workflow.task_key）をキーとして別に保存する。
+SQLite のファイルを指定すると、プロセスが途中で落ちても完了したタスクの出力が残り、
+再実行した start は入力が変わっていないタスクを飛ばしてその出力を依存するタスクに渡す。
+
+- タスクの結果と出力は完了するたびに1件ずつコミットする
+- タスクの実行時間の履歴（クリティカルパスの見積もり）も保存し、プロセスを起動し直しても使う
+- 同じ workflow_id で定義を変えて create し直した場合は、タスクごとの状態を消す
+  （出力は入力のハッシュで引くため、変わっていないタスクの出力はそのまま使われる）
+- ワークフローを削除すると、そのワークフローの出力も消す（同じ定義で作り直すと全タスクを実行する）
+- 保存してから output_ttl 秒を過ぎた出力は使わず、出力が max_outputs 件を超えたら古いものから消す
+- path を省略した場合はメモリ上の SQLite を使う（プロセス内でのみ再開できる）
+
+環境変数:
+    WORKFLOW_STATE_PATH: get_workflow_store() が使う SQLite ファイルのパス
+        （既定: $XDG_CACHE_HOME/strands-workflows.sqlite3、:memory: ならメモリのみ）
+    WORKFLOW_OUTPUT_TTL: get_workflow_store() の出力の有効期間（秒、既定: 604800）
+    WORKFLOW_MAX_OUTPUTS: get_workflow_store() が保存する出力の最大数（既定: 1024）
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+RESULT_FIELDS = ("task_id", "status", "text", "attempts", "elapsed_ms", "error")
+
+MEMORY_PATH = ":memory:"
+
+
+def default_state_path() -> Path:
+    """get_workflow_store() の既定の保存先（XDG_CACHE_HOME、なければ ~/.cache の下）"""
+    cache_dir = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_dir) / "strands-workflows.sqlite3"
+
+
+class WorkflowStore:
+    """ワークフローの定義・状態とタスクの結果を SQLite に保存するストア。"""
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        *,
+        output_ttl: float | None = 604800,
+        max_outputs: int | None = 1024,
+    ):
+        """ストアを初期化する。
+
+        Args:
+            path: SQLite ファイルのパス（省略時または ":memory:" はメモリ上に保存する）
+            output_ttl: タスクの出力の有効期間（秒、None の場合は無期限）
+            max_outputs: 保存するタスクの出力の最大数（None の場合は無制限）
+        """
+        self.output_ttl = output_ttl
+        self.max_outputs = max_outputs
+        if path and str(path) != MEMORY_PATH:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or MEMORY_PATH, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS workflows (workflow_id TEXT PRIMARY KEY, tasks TEXT, status TEXT, updated_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS task_results (workflow_id TEXT, task_id TEXT, status TEXT, text TEXT, "
+            "attempts INTEGER, elapsed_ms REAL, error TEXT, completed_at REAL, PRIMARY KEY (workflow_id, task_id))"
+        )
+        columns = [
+            row[1] for row in self._db.execute("PRAGMA table_info(task_outputs)")
+        ]
+        if columns and "workflow_id" not in columns:
+            # ワークフローで分けていない以前の形式の出力は使わない
+            self._db.execute("DROP TABLE task_outputs")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS task_outputs (workflow_id TEXT, key TEXT, text TEXT, created_at REAL, "
+            "PRIMARY KEY (workflow_id, key))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS task_outputs_created_at ON task_outputs (created_at)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS task_durations (workflow_id TEXT, task_id TEXT, seconds REAL, "
+            "updated_at REAL, PRIMARY KEY (workflow_id, task_id))"
+        )
+        self._db.commit()
+
+    def save_workflow(self, workflow_id: str, tasks: list[dict[str, Any]]) -> bool:
+        """ワークフローの定義を保存する。
+
+        Returns:
+            以前と同じ定義で、タスクごとの状態を残した場合は True
+        """
+        definition = json.dumps(tasks, ensure_ascii=False, sort_keys=True)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tasks FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            ).fetchone()
+            kept = row is not None and row[0] == definition
+            if not kept:
+                self._db.execute(
+                    "DELETE FROM task_results WHERE workflow_id = ?", (workflow_id,)
+                )
+            self._db.execute(
+                "INSERT OR REPLACE INTO workflows (workflow_id, tasks, status, updated_at) VALUES (?, ?, ?, ?)",
+                (workflow_id, definition, "created", time.time()),
+            )
+            self._db.commit()
+            return kept
+
+    def load_workflow(self, workflow_id: str) -> dict[str, Any] | None:
+        """ワークフローの定義と状態を返す（なければ None）"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT tasks, status FROM workflows WHERE workflow_id = ?",
+                (workflow_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"tasks": json.loads(row[0]), "status": row[1]}
+
+    def set_status(self, workflow_id: str, status: str) -> None:
+        """ワークフローの状態を更新する"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE workflows SET status = ?, updated_at = ? WHERE workflow_id = ?",
+                (status, time.time(), workflow_id),
+            )
+            self._db.commit()
+
+    def list_workflows(self) -> list[tuple[str, str]]:
+        """(workflow_id, 状態) の一覧を返す"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT workflow_id, status FROM workflows ORDER BY updated_at"
+            ).fetchall()
+
+    def delete_workflow(self, workflow_id: str) -> None:
+        """ワークフローとタスクの結果・出力・実行時間の履歴を削除する"""
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM task_results WHERE workflow_id = ?", (workflow_id,)
+            )
+            self._db.execute(
+                "DELETE FROM task_outputs WHERE workflow_id = ?", (workflow_id,)
+            )
+            self._db.execute(
+                "DELETE FROM task_durations WHERE workflow_id = ?", (workflow_id,)
+            )
+            self._db.execute(
+                "DELETE FROM workflows WHERE workflow_id = ?", (workflow_id,)
+            )
+            self._db.commit()
+
+    def save_result(self, workflow_id: str, result: dict[str, Any]) -> None:
+        """タスクの結果を保存してコミットする（RESULT_FIELDS のキーを持つ辞書）"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO task_results (workflow_id, task_id, status, text, attempts, elapsed_ms, error, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    workflow_id,
+                    *(result.get(name) for name in RESULT_FIELDS),
+                    time.time(),
+                ),
+            )
+            self._db.commit()
+
+    def load_results(
+        self, workflow_id: str, status: str | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """タスクIDごとの結果を返す（status を指定するとその状態の結果のみ）"""
+        query = (
+            f"SELECT {', '.join(RESULT_FIELDS)} FROM task_results WHERE workflow_id = ?"
+        )
+        params: tuple[Any, ...] = (workflow_id,)
+        if status is not None:
+            query += " AND status = ?"
+            params += (status,)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return {row[0]: dict(zip(RESULT_FIELDS, row, strict=True)) for row in rows}
+
+    def save_output(self, workflow_id: str, key: str, text: str) -> None:
+        """タスクの出力を入力のハッシュをキーに保存してコミットする（上限を超えた出力は消す）"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO task_outputs (workflow_id, key, text, created_at) VALUES (?, ?, ?, ?)",
+                (workflow_id, key, text, time.time()),
+            )
+            self._prune_outputs()
+            self._db.commit()
+
+    def get_output(self, workflow_id: str, key: str) -> str | None:
+        """入力のハッシュに対応する有効期間内の出力を返す（なければ None）"""
+        expired_before = (
+            time.time() - self.output_ttl if self.output_ttl is not None else 0.0
+        )
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text FROM task_outputs WHERE workflow_id = ? AND key = ? AND created_at >= ?",
+                (workflow_id, key, expired_before),
+            ).fetchone()
+        return row[0] if row else None
+
+    def prune_outputs(self) -> int:
+        """有効期間を過ぎた出力と、max_outputs を超えた古い出力を消し、消した数を返す"""
+        with self._lock:
+            deleted = self._prune_outputs()
+            self._db.commit()
+            return deleted
+
+    def _prune_outputs(self) -> int:
+        deleted = 0
+        if self.output_ttl is not None:
+            deleted += self._db.execute(
+                "DELETE FROM task_outputs WHERE created_at < ?",
+                (time.time() - self.output_ttl,),
+            ).rowcount
+        if self.max_outputs is not None:
+            deleted += self._db.execute(
+                "DELETE FROM task_outputs WHERE rowid NOT IN "
+                "(SELECT rowid FROM task_outputs ORDER BY created_at DESC LIMIT ?)",
+                (self.max_outputs,),
+            ).rowcount
+        return deleted
+
+    def save_duration(self, workflow_id: str, task_id: str, seconds: float) -> None:
+        """タスクの実行時間の見積もり（秒）を保存してコミットする"""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO task_durations (workflow_id, task_id, seconds, updated_at) VALUES (?, ?, ?, ?)",
+                (workflow_id, task_id, seconds, time.time()),
+            )
+            self._db.commit()
+
+    def load_durations(self, workflow_id: str) -> dict[str, float]:
+        """タスクIDごとの実行時間の見積もり（秒）を返す"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT task_id, seconds FROM task_durations WHERE workflow_id = ?",
+                (workflow_id,),
+            ).fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._db.close()
+
+
+_default_store: WorkflowStore | None = None
+_default_store_lock = threading.Lock()
+
+
+def get_workflow_store() -> WorkflowStore:
+    """プロセス共通の WorkflowStore を返す。
+
+    保存先は環境変数 WORKFLOW_STATE_PATH（未指定なら default_state_path()、":memory:" ならメモリのみ）。
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            path = os.getenv("WORKFLOW_STATE_PATH") or default_state_path()
+            _default_store = WorkflowStore(
+                Path(path).expanduser() if path != MEMORY_PATH else path,
+                output_ttl=float(os.getenv("WORKFLOW_OUTPUT_TTL", "604800")),
+                max_outputs=int(os.getenv("WORKFLOW_MAX_OUTPUTS", "1024")),
+            )
+        return _default_store
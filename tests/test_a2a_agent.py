@@ -0,0 +1,131 @@
+import asyncio
+import contextlib
+
+import pytest
+
+pytest.importorskip("a2a")
+
+from strands import Agent
+from strands.multiagent.a2a import A2AServer
+from strands.multiagent.base import Status
+from strands.multiagent.swarm import Swarm
+
+from common.a2a_agent import A2AModel, remote_agent
+from common.a2a_client import A2AClientManager
+from common.a2a_server import BackgroundA2AServer, build_app, free_port
+from common.fake_model import FakeModel
+from common.graph import GraphBuilder
+
+
+def _agent(name: str, latency: float = 0.01) -> Agent:
+    return Agent(
+        model=FakeModel(latency=latency, tokens_per_second=200, text_length=100),
+        name=name,
+        description=f"{name}の担当のエージェント",
+        callback_handler=None,
+    )
+
+
+@pytest.fixture(scope="module")
+def urls():
+    with contextlib.ExitStack() as stack:
+        urls = {}
+        for name, latency in (("writer", 0.01), ("slow", 2.0)):
+            server = A2AServer(
+                agent=_agent(name, latency),
+                port=free_port(),
+                enable_a2a_compliant_streaming=True,
+            )
+            urls[name] = stack.enter_context(
+                BackgroundA2AServer(server, app=build_app(server))
+            )
+        yield urls
+
+
+def test_remote_agent_as_graph_node(urls):
+    async def main():
+        async with A2AClientManager() as manager:
+            builder = GraphBuilder()
+            builder.add_node(_agent("planning"), "planning")
+            builder.add_node(
+                remote_agent(urls["writer"], "writer", manager=manager), "writing"
+            )
+            builder.add_edge("planning", "writing")
+            return await builder.build().invoke_async("記事を書いてください")
+
+    result = asyncio.run(main())
+    assert result.status == Status.COMPLETED
+    assert "[fake]" in str(result.results["writing"].result)
+
+
+def test_remote_agent_in_swarm_hands_off(urls):
+    async def main():
+        async with A2AClientManager() as manager:
+            checker = remote_agent(
+                urls["writer"],
+                "fact_checker",
+                description="事実関係を確認する（リモート）",
+                manager=manager,
+                handoff_to="final_editor",
+            )
+            swarm = Swarm(nodes=[checker, _agent("final_editor")], max_handoffs=3)
+            return await swarm.invoke_async("記事を確認してください")
+
+    result = asyncio.run(main())
+    assert result.status == Status.COMPLETED
+    assert [node.node_id for node in result.node_history] == [
+        "fact_checker",
+        "final_editor",
+    ]
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_remote_deltas_are_passed_through(urls, streaming):
+    async def main() -> tuple[list[str], str]:
+        async with A2AClientManager() as manager:
+            agent = remote_agent(
+                urls["writer"], "writer", manager=manager, streaming=streaming
+            )
+            deltas = []
+            async for event in agent.stream_async("自己紹介してください"):
+                if "data" in event:
+                    deltas.append(event["data"])
+            return deltas, str(event["result"])
+
+    deltas, text = asyncio.run(main())
+    assert "".join(deltas).strip() == text.strip()
+    assert len(deltas) > 1 if streaming else len(deltas) == 1
+
+
+def test_timeout_fails_graph_node(urls):
+    async def main():
+        async with A2AClientManager() as manager:
+            builder = GraphBuilder()
+            builder.add_node(
+                remote_agent(urls["slow"], "slow", manager=manager, timeout=0.2),
+                "research",
+            )
+            graph = builder.build()
+            with pytest.raises(TimeoutError, match="did not respond within 0.2s"):
+                await graph.invoke_async("調べてください")
+            return graph
+
+    graph = asyncio.run(main())
+    assert graph.nodes["research"].execution_status == Status.FAILED
+
+
+def test_timeout_is_not_raised_inside_consumer_code(urls):
+    # 締め切りを過ぎても、呼び出し元の await が取り消されずに TimeoutError になる
+    async def main() -> list[str]:
+        async with A2AClientManager() as manager:
+            model = A2AModel(urls["writer"], manager=manager, timeout=0.3)
+            seen = []
+            messages = [{"role": "user", "content": [{"text": "自己紹介してください"}]}]
+            with pytest.raises(TimeoutError):
+                async for event in model.stream(messages):
+                    if "contentBlockDelta" in event:
+                        seen.append(event["contentBlockDelta"]["delta"]["text"])
+                        await asyncio.sleep(0.5)
+            return seen
+
+    assert len(asyncio.run(main())) == 1
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("a2a")
+
+from strands import Agent
+from strands.multiagent.a2a import A2AServer
+
+from common.a2a_client import A2AClientManager
+from common.a2a_server import BackgroundA2AServer, build_app, free_port
+from common.fake_model import FakeModel
+
+
+@pytest.fixture(scope="module")
+def url():
+    agent = Agent(
+        model=FakeModel(latency=0.01, tokens_per_second=200, text_length=200),
+        name="writer",
+        description="文章を書くエージェント",
+        callback_handler=None,
+    )
+    server = A2AServer(
+        agent=agent, port=free_port(), enable_a2a_compliant_streaming=True
+    )
+    with BackgroundA2AServer(server, app=build_app(server)) as base_url:
+        yield base_url
+
+
+def test_clients_from_running_loop_in_other_thread_are_closed():
+    manager = A2AClientManager()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def create() -> object:
+        return manager.http_client("http://127.0.0.1:1")
+
+    old = asyncio.run_coroutine_threadsafe(create(), loop).result()
+
+    async def switch() -> None:
+        manager.http_client("http://127.0.0.1:1")
+        await manager.aclose()
+
+    asyncio.run(switch())
+    asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+    assert old.is_closed
+
+
+def test_clients_from_finished_loop_are_closed():
+    manager = A2AClientManager()
+
+    async def create() -> object:
+        return manager.http_client("http://127.0.0.1:1")
+
+    old = asyncio.run(create())
+
+    async def switch() -> None:
+        manager.http_client("http://127.0.0.1:1")
+        await manager.aclose()
+
+    asyncio.run(switch())
+    assert old.is_closed
+
+
+def test_abandoned_stream_is_not_counted_as_error(url):
+    async def main() -> dict:
+        async with A2AClientManager() as manager:
+            # 最初の差分で読むのをやめる（GeneratorExit）
+            deltas = manager.stream_text(url, "自己紹介してください")
+            async for _ in deltas:
+                break
+            await deltas.aclose()
+
+            # 応答の途中で取り消す（CancelledError）
+            async def consume() -> None:
+                async for _ in manager.stream_text(url, "自己紹介してください"):
+                    await asyncio.sleep(1)
+
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return manager.stats(url)
+
+    assert asyncio.run(main())["errors"] == 0
+
+
+def test_stats_of_unknown_url_is_empty():
+    assert A2AClientManager().stats("http://127.0.0.1:1") == {}
+
+
+def test_latency_samples_are_bounded():
+    manager = A2AClientManager()
+    _, stats = manager._endpoint("http://127.0.0.1:1")
+    stats.latencies_ms.extend(range(5000))
+    assert len(stats.latencies_ms) == 1000
+    assert manager.stats("http://127.0.0.1:1")["p50_ms"] == 4499.5
@@ -0,0 +1,45 @@
+import asyncio
+import statistics
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("a2a")
+
+from common.a2a_gateway import A2AGateway
+
+URLS = ["http://replica-a", "http://replica-b"]
+
+
+@pytest.mark.parametrize("q", [29, 57, 58, 95])
+def test_hedge_delay_uses_exact_percentile(q):
+    gateway = A2AGateway(URLS, hedge_after=f"p{q}")
+    latencies = [float(i) for i in range(1, 101)]
+    gateway._stats.latencies_ms.extend(latencies)
+    expected = statistics.quantiles(latencies, n=100, method="inclusive")[q - 1]
+    assert gateway._hedge_delay() == expected / 1000
+
+
+def _fake_cards(gateway: A2AGateway, names: dict[str, tuple[str, float]]) -> None:
+    async def get_card(url: str, *, refresh: bool = False) -> SimpleNamespace:
+        name, delay = names[url]
+        await asyncio.sleep(delay)
+        return SimpleNamespace(name=name)
+
+    gateway.manager.get_card = get_card
+
+
+def test_check_health_uses_first_replica_card_name():
+    gateway = A2AGateway(URLS, health_interval=None)
+    # 後のレプリカの方が先に応答しても、先頭のレプリカのカードの名前を基準にする
+    _fake_cards(gateway, {URLS[0]: ("writer", 0.05), URLS[1]: ("other", 0.0)})
+    health = asyncio.run(gateway.check_health())
+    assert gateway.card_name == "writer"
+    assert health == {URLS[0]: True, URLS[1]: False}
+
+
+def test_check_health_uses_expected_card_name():
+    gateway = A2AGateway(URLS, health_interval=None, card_name="other")
+    _fake_cards(gateway, {URLS[0]: ("writer", 0.0), URLS[1]: ("other", 0.0)})
+    health = asyncio.run(gateway.check_health())
+    assert health == {URLS[0]: False, URLS[1]: True}
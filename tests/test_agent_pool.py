@@ -0,0 +1,34 @@
+from strands import tool
+
+from common.agent_pool import AgentPool
+from common.fake_model import FakeModel
+
+
+def _lookup(version: str):
+    @tool
+    def lookup(query: str) -> str:
+        """情報を調べる"""
+        return version
+
+    return lookup
+
+
+def test_tools_with_same_name_get_separate_agents():
+    pool = AgentPool(model=FakeModel())
+    first, second = _lookup("v1"), _lookup("v2")
+    with pool.acquire("system", [first]):
+        pass
+    with pool.acquire("system", [second]) as agent:
+        assert agent.tool_registry.registry["lookup"] is second
+    assert pool.stats.created == 2
+    assert pool.stats.reused == 0
+
+
+def test_reset_restores_initial_state():
+    pool = AgentPool(model=FakeModel())
+    with pool.acquire("system", state={"user": "alice"}) as agent:
+        agent.state.set("user", "bob")
+        agent.state.set("step", 1)
+    with pool.acquire("system", state={"user": "alice"}) as agent:
+        assert agent.state.get() == {"user": "alice"}
+    assert pool.stats.reused == 1
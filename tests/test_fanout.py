@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+from common.fanout import fan_out, fan_out_async
+
+
+def test_fan_out_keeps_call_order():
+    assert fan_out([lambda i=i: i * 2 for i in range(5)]) == [0, 2, 4, 6, 8]
+
+
+def test_nested_fan_out_from_tool_thread_runs_in_caller():
+    # 専門家のツールは asyncio.to_thread で別のスレッドから呼ばれる
+    inner_threads: list[str] = []
+
+    def inner() -> str:
+        inner_threads.append(threading.current_thread().name)
+        return "inner"
+
+    def tool() -> list[str]:
+        return fan_out([inner, inner])
+
+    def specialist() -> list[str]:
+        return asyncio.run(asyncio.to_thread(tool))
+
+    assert fan_out([specialist, specialist]) == [["inner", "inner"]] * 2
+    assert not any(name.startswith("specialist") for name in inner_threads)
+
+
+def test_fan_out_async_is_bounded_by_max_workers(monkeypatch):
+    monkeypatch.setenv("SPECIALIST_MAX_WORKERS", "2")
+    running = peak = 0
+
+    async def call() -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return running
+
+    results = asyncio.run(fan_out_async([call] * 6))
+    assert len(results) == 6
+    assert peak == 2
+
+
+def test_nested_fan_out_async_does_not_wait_for_slots(monkeypatch):
+    monkeypatch.setenv("SPECIALIST_MAX_WORKERS", "1")
+
+    async def inner() -> str:
+        return "inner"
+
+    async def outer() -> list[str]:
+        return await fan_out_async([inner, inner])
+
+    async def main() -> list[list[str]]:
+        return await asyncio.wait_for(fan_out_async([outer, outer]), timeout=1)
+
+    assert asyncio.run(main()) == [["inner", "inner"]] * 2
@@ -0,0 +1,60 @@
+import pytest
+from strands import Agent
+from strands.hooks import BeforeNodeCallEvent
+from strands.multiagent.base import Status
+
+from common.fake_model import FakeModel
+from common.graph import GraphBuilder
+from common.payload import PayloadPolicy
+
+
+def _agent(name: str, text_length: int = 50) -> Agent:
+    return Agent(
+        model=FakeModel(text_length=text_length), name=name, callback_handler=None
+    )
+
+
+def _builder(summarizer: FakeModel) -> GraphBuilder:
+    builder = GraphBuilder()
+    builder.add_node(_agent("research", text_length=400), "research")
+    builder.add_node(_agent("writing"), "writing")
+    builder.add_edge("research", "writing")
+    builder.set_payload_policy(
+        PayloadPolicy(mode="summarize", max_tokens=20, summarizer=summarizer)
+    )
+    return builder
+
+
+def test_summarize_usage_is_added_to_node_and_graph():
+    summarizer = FakeModel(text_length=40)
+    graph = _builder(summarizer).build()
+    result = graph("task")
+
+    writing = result.results["writing"].accumulated_usage
+    agent_usage = graph.nodes["writing"].executor.event_loop_metrics.accumulated_usage
+    summary_tokens = summarizer.stats.input_tokens + summarizer.stats.output_tokens
+    assert summarizer.stats.invocations == 1
+    assert writing["totalTokens"] == agent_usage["totalTokens"] + summary_tokens
+    assert result.accumulated_usage["totalTokens"] == sum(
+        r.accumulated_usage["totalTokens"] for r in result.results.values()
+    )
+
+
+class _CancelWriting:
+    def register_hooks(self, registry) -> None:
+        registry.add_callback(BeforeNodeCallEvent, self.cancel)
+
+    def cancel(self, event: BeforeNodeCallEvent) -> None:
+        if event.node_id == "writing":
+            event.cancel_node = "skip writing"
+
+
+def test_cancelled_node_is_not_summarized():
+    summarizer = FakeModel(text_length=40)
+    builder = _builder(summarizer)
+    builder.set_hook_providers([_CancelWriting()])
+    graph = builder.build()
+    with pytest.raises(RuntimeError, match="skip writing"):
+        graph("task")
+    assert graph.nodes["writing"].execution_status == Status.FAILED
+    assert summarizer.stats.invocations == 0
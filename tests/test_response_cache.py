@@ -0,0 +1,27 @@
+import time
+
+from common.response_cache import ResponseCache
+
+
+def _fill(cache: ResponseCache, count: int) -> None:
+    for i in range(count):
+        cache.set("system", "model", f"prompt {i}", "response")
+
+
+def test_purge_counts_entries_on_disk_once(tmp_path, monkeypatch):
+    cache = ResponseCache(ttl=60, path=tmp_path / "cache.sqlite3")
+    _fill(cache, 3)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    # メモリ層とディスク層の両方にあるエントリも1件と数える
+    assert cache.purge_expired() == 3
+    assert cache.purge_expired() == 0
+
+
+def test_purge_counts_memory_entries_without_disk(monkeypatch):
+    cache = ResponseCache(ttl=60)
+    _fill(cache, 2)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert cache.purge_expired() == 2
+    assert cache.get("system", "model", "prompt 0") is None
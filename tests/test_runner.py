@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from strands import Agent
+
+from common.fake_model import FakeModel
+from common.runner import RequestRunner
+
+
+def _factory() -> Agent:
+    return Agent(
+        model=FakeModel(latency=0.01, tokens_per_second=200, text_length=200),
+        callback_handler=None,
+    )
+
+
+def test_abandoned_stream_is_not_counted_as_failed():
+    runner = RequestRunner(_factory)
+
+    async def main() -> None:
+        # 最初のイベントで読むのをやめる（GeneratorExit）
+        events = runner.stream_async("自己紹介してください")
+        async for _ in events:
+            break
+        await events.aclose()
+
+        # 応答の途中で取り消す（CancelledError）
+        async def consume() -> None:
+            async for _ in runner.stream_async("自己紹介してください"):
+                await asyncio.sleep(1)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert runner.stats.failed == 0
+    assert runner.stats.in_flight == 0
+
+
+def test_failed_request_is_counted():
+    def broken() -> Agent:
+        raise ValueError("broken")
+
+    runner = RequestRunner(broken)
+    results = runner.run(["x"])
+    assert isinstance(results[0], ValueError)
+    assert runner.stats.failed == 1
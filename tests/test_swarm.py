@@ -0,0 +1,31 @@
+from strands import Agent
+
+from common.fake_model import FakeModel
+from common.pre_router import PreRouter
+from common.swarm import Swarm
+
+
+def _agent(name: str) -> Agent:
+    return Agent(model=FakeModel(text_length=50), name=name, callback_handler=None)
+
+
+def _swarm(router: PreRouter) -> Swarm:
+    reception = _agent("reception")
+    return Swarm(
+        nodes=[reception, _agent("billing")], entry_point=reception, pre_router=router
+    )
+
+
+def test_pre_router_starts_from_target():
+    router = PreRouter(classifier=lambda text: ("billing", 1.0))
+    result = _swarm(router)("請求について")
+    assert result.pre_route.target == "billing"
+    assert [node.node_id for node in result.node_history] == ["billing"]
+
+
+def test_unknown_classifier_target_falls_back_to_entry_point():
+    router = PreRouter(classifier=lambda text: ("shipping", 1.0))
+    result = _swarm(router)("配送について")
+    assert result.pre_route.target is None
+    assert [node.node_id for node in result.node_history] == ["reception"]
+    assert router.stats.fallbacks == 1
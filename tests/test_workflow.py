@@ -0,0 +1,234 @@
+import asyncio
+import time
+
+import pytest
+from strands import Agent
+
+from common import workflow_store
+from common.fake_model import FakeModel
+from common.workflow import (
+    AdaptiveConcurrencyLimiter,
+    WorkflowScheduler,
+    simulate,
+    workflow,
+)
+from common.workflow_store import WorkflowStore, get_workflow_store
+
+
+def _parent(model: FakeModel) -> Agent:
+    return Agent(model=model, callback_handler=None)
+
+
+def test_limiter_grows_by_inverse_limit_on_success():
+    limiter = AdaptiveConcurrencyLimiter(4)
+    assert limiter.try_acquire()
+    limiter.release()
+    assert limiter.limit == pytest.approx(4.25)
+    assert limiter.in_flight == 0
+
+
+def test_limiter_halves_on_throttle():
+    limiter = AdaptiveConcurrencyLimiter(8, cooldown=0)
+    limiter.try_acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 4
+    limiter.try_acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 2
+    assert limiter.decreases == 2
+
+
+def test_limiter_respects_cooldown():
+    limiter = AdaptiveConcurrencyLimiter(8, cooldown=60)
+    for _ in range(3):
+        limiter.try_acquire()
+    for _ in range(3):
+        limiter.release(throttled=True)
+    # 同時に実行していた分のスロットリングは1回と数える
+    assert limiter.limit == 4
+    assert limiter.throttles == 3
+    assert limiter.decreases == 1
+
+
+def test_limiter_abandon_keeps_limit():
+    limiter = AdaptiveConcurrencyLimiter(4)
+    limiter.try_acquire()
+    limiter.abandon()
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_priority_order_breaks_ties_by_deadline():
+    tasks = [
+        {"task_id": "low", "description": "x", "priority": 1},
+        {"task_id": "late", "description": "x", "priority": 5, "timeout": 60},
+        {"task_id": "soon", "description": "x", "priority": 5, "timeout": 10},
+    ]
+    _, order = simulate(tasks, {}, concurrency=1, order="priority")
+    assert order == ["soon", "late", "low"]
+
+
+def test_critical_path_order_starts_longest_chain_first():
+    tasks = [
+        {"task_id": "short", "description": "x", "priority": 5},
+        {"task_id": "head", "description": "x"},
+        {"task_id": "tail", "description": "x", "dependencies": ["head"]},
+    ]
+    durations = {"short": 1.0, "head": 1.0, "tail": 3.0}
+    _, order = simulate(tasks, durations, concurrency=1)
+    assert order == ["head", "tail", "short"]
+    _, order = simulate(tasks, durations, concurrency=1, order="fifo")
+    assert order == ["short", "head", "tail"]
+
+
+def test_queued_timeout_skips_dependents():
+    scheduler = WorkflowScheduler(initial_limit=1, max_limit=1, order="priority")
+    tasks = [
+        {"task_id": "slow", "description": "x", "priority": 5},
+        {"task_id": "queued", "description": "x", "priority": 1, "timeout": 0.05},
+        {"task_id": "child", "description": "x", "dependencies": ["queued"]},
+    ]
+    parent = _parent(FakeModel(latency=0.2))
+    run = scheduler.run("wf", tasks, parent)
+    assert run.results["slow"].status == "completed"
+    assert run.results["queued"].status == "timeout"
+    assert run.results["queued"].error == "deadline exceeded while queued"
+    assert run.results["child"].status == "skipped"
+    assert run.start_order == ["slow"]
+
+
+def test_throttled_task_is_requeued_until_max_attempts():
+    model = FakeModel(max_concurrency=0)
+    scheduler = WorkflowScheduler(max_attempts=3, base_delay=0.001)
+    run = scheduler.run("wf", [{"task_id": "t", "description": "x"}], _parent(model))
+    result = run.results["t"]
+    assert result.status == "error"
+    assert result.attempts == 3
+    assert run.retries == 2
+    assert model.stats.throttled == 3
+
+
+def test_throttling_above_threshold_lowers_limit_and_completes():
+    # 同時に2件を超える呼び出しはスロットリングされる
+    model = FakeModel(latency=0.02, max_concurrency=2)
+    scheduler = WorkflowScheduler(initial_limit=6, base_delay=0.01)
+    tasks = [{"task_id": f"t{i}", "description": "x"} for i in range(6)]
+    run = scheduler.run("wf", tasks, _parent(model))
+    assert run.succeeded
+    assert run.retries > 0
+    limiter = next(iter(scheduler.limiters.values()))
+    assert limiter.decreases >= 1
+    assert limiter.limit < 6
+
+
+def test_cancelled_run_does_not_raise_limit():
+    scheduler = WorkflowScheduler(initial_limit=2)
+    tasks = [{"task_id": f"t{i}", "description": "x"} for i in range(2)]
+    parent = _parent(FakeModel(latency=10))
+
+    async def main() -> None:
+        run = asyncio.create_task(scheduler.run_async("wf", tasks, parent))
+        await asyncio.sleep(0.05)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+    asyncio.run(main())
+    limiter = next(iter(scheduler.limiters.values()))
+    assert limiter.limit == 2
+    assert limiter.in_flight == 0
+
+
+def test_durations_survive_restart(tmp_path):
+    path = tmp_path / "workflows.sqlite3"
+    tasks = [{"task_id": "t", "description": "x"}]
+    store = WorkflowStore(path)
+    WorkflowScheduler().run("wf", tasks, _parent(FakeModel(latency=0.05)), store)
+    store.close()
+
+    # プロセスを起動し直した想定（新しいスケジューラーとストア）
+    scheduler = WorkflowScheduler()
+    store = WorkflowStore(path)
+    assert scheduler.estimates("wf") == {}
+    scheduler.load_durations("wf", store)
+    assert scheduler.estimates("wf")["t"] >= 0.05
+    store.close()
+
+
+def test_default_store_is_under_cache_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("WORKFLOW_STATE_PATH", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(workflow_store, "_default_store", None)
+    store = get_workflow_store()
+    store.save_workflow("wf", [{"task_id": "t", "description": "x"}])
+    assert (tmp_path / "strands-workflows.sqlite3").exists()
+    store.close()
+
+
+def _release_tasks() -> list[dict[str, str]]:
+    return [
+        {"task_id": "plan", "description": "x"},
+        {"task_id": "build", "description": "y", "dependencies": ["plan"]},
+    ]
+
+
+def test_force_reruns_cached_tasks():
+    store = WorkflowStore()
+    scheduler = WorkflowScheduler()
+    model = FakeModel()
+    scheduler.run("wf", _release_tasks(), _parent(model), store)
+    assert scheduler.run("wf", _release_tasks(), _parent(model), store).restored == 2
+    assert scheduler.plan(
+        "wf", _release_tasks(), _parent(model), store, force=True
+    ) == {
+        "plan": "run",
+        "build": "stale",
+    }
+    run = scheduler.run("wf", _release_tasks(), _parent(model), store, force=True)
+    assert run.restored == 0
+    assert model.stats.invocations == 4
+
+
+def test_outputs_are_scoped_to_workflow_and_deleted_with_it():
+    store = WorkflowStore()
+    scheduler = WorkflowScheduler()
+    model = FakeModel()
+    scheduler.run("wf", _release_tasks(), _parent(model), store)
+    assert scheduler.run("other", _release_tasks(), _parent(model), store).restored == 0
+
+    store.delete_workflow("wf")
+    assert scheduler.run("wf", _release_tasks(), _parent(model), store).restored == 0
+    assert model.stats.invocations == 6
+
+
+def test_outputs_are_pruned_by_size_and_ttl(monkeypatch):
+    store = WorkflowStore(max_outputs=2, output_ttl=60)
+    for i in range(3):
+        store.save_output("wf", f"k{i}", "text")
+    assert store.get_output("wf", "k0") is None
+    assert store.get_output("wf", "k2") == "text"
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert store.get_output("wf", "k2") is None
+    assert store.prune_outputs() == 2
+
+
+def test_workflow_tool_force_and_delete(monkeypatch):
+    monkeypatch.setenv("WORKFLOW_STATE_PATH", ":memory:")
+    monkeypatch.setattr(workflow_store, "_default_store", None)
+    model = FakeModel()
+    agent = Agent(model=model, tools=[workflow], callback_handler=None)
+
+    def start(**kwargs) -> str:
+        result = agent.tool.workflow(action="start", workflow_id="wf", **kwargs)
+        return result["content"][0]["text"]
+
+    agent.tool.workflow(action="create", workflow_id="wf", tasks=_release_tasks())
+    start()
+    assert "2 restored" in start()
+    assert "restored" not in start(force=True)
+
+    agent.tool.workflow(action="delete", workflow_id="wf")
+    agent.tool.workflow(action="create", workflow_id="wf", tasks=_release_tasks())
+    assert "restored" not in start()